@@ -65,6 +65,17 @@ MICROTECH_GRAPHQL_URL = env_url("MICROTECH_GRAPHQL_URL", build_microtech_graphql
 MICROTECH_GRAPHQL_REQUEST_TIMEOUT = float(os.getenv("MICROTECH_GRAPHQL_REQUEST_TIMEOUT", "30"))
 MICROTECH_GRAPHQL_POLL_TIMEOUT = float(os.getenv("MICROTECH_GRAPHQL_POLL_TIMEOUT", "180"))
 MICROTECH_GRAPHQL_POLL_INTERVAL = float(os.getenv("MICROTECH_GRAPHQL_POLL_INTERVAL", "2"))
+# Gepoolte Keep-Alive-Session je Prozess; Wiederholungen nur bei Verbindungsabbruch.
+MICROTECH_GRAPHQL_POOL_SIZE = int(os.getenv("MICROTECH_GRAPHQL_POOL_SIZE", "10"))
+MICROTECH_GRAPHQL_MAX_RETRIES = int(os.getenv("MICROTECH_GRAPHQL_MAX_RETRIES", "3"))
+MICROTECH_GRAPHQL_RETRY_BACKOFF = float(os.getenv("MICROTECH_GRAPHQL_RETRY_BACKOFF", "0.5"))
+# Faellige Jobs je Poll-Task, abgefragt mit einem aliasierten GraphQL-Dokument.
+# 1 = ein Task und ein Request pro Job.
+MICROTECH_GRAPHQL_POLL_BATCH_SIZE = int(os.getenv("MICROTECH_GRAPHQL_POLL_BATCH_SIZE", "25"))
+# Wie lange Einheit/Bezeichnung aus Microtech am Produkt fuer den Bestell-Export gelten.
+MICROTECH_ARTICLE_CACHE_TTL_SECONDS = int(os.getenv("MICROTECH_ARTICLE_CACHE_TTL_SECONDS", "86400"))
+# Obergrenze fuer den kompilierten Bestellregelsatz, falls Redis (Versionszaehler) nicht erreichbar ist.
+ORDER_RULE_CACHE_SECONDS = float(os.getenv("ORDER_RULE_CACHE_SECONDS", "60"))
 MICROTECH_GRAPHQL_WEBHOOK_SECRET = os.getenv("MICROTECH_GRAPHQL_WEBHOOK_SECRET", "").strip()
 # Wartungsoperationen (Worker-Steuerung, Backup-Fenster) laufen synchron im
 # Wrapper und dauern bis zu mehreren Minuten. Sie brauchen deshalb ein eigenes
@@ -284,6 +295,25 @@ LANGUAGES = [
 ]
 
 SHOPWARE6_SHOP_URL = os.getenv("SHOPWARE6_SHOP_URL", "").rstrip("/")
+# Admin-API-Client und OAuth-Token werden prozessweit (Token zusaetzlich in
+# Redis) geteilt und vor Ablauf erneuert.
+SHOPWARE6_CONFIG_CACHE_SECONDS = float(os.getenv("SHOPWARE6_CONFIG_CACHE_SECONDS", "60"))
+SHOPWARE6_TOKEN_REFRESH_MARGIN_SECONDS = float(os.getenv("SHOPWARE6_TOKEN_REFRESH_MARGIN_SECONDS", "60"))
+# Bei 429/503 pausiert der Client alle Requests des Prozesses (Retry-After bzw.
+# exponentieller Backoff) und wiederholt den Request.
+SHOPWARE6_BACKPRESSURE_MAX_RETRIES = int(os.getenv("SHOPWARE6_BACKPRESSURE_MAX_RETRIES", "5"))
+SHOPWARE6_BACKPRESSURE_BACKOFF_SECONDS = float(os.getenv("SHOPWARE6_BACKPRESSURE_BACKOFF_SECONDS", "1"))
+# shopware_sync_products: Batches gleichzeitig unterwegs zu Shopware (1 = nacheinander).
+SHOPWARE6_SYNC_MAX_IN_FLIGHT = int(os.getenv("SHOPWARE6_SYNC_MAX_IN_FLIGHT", "1"))
+# Parallele Bild-Uploads (Shopware laedt die Dateien selbst per URL).
+SHOPWARE6_MEDIA_UPLOAD_WORKERS = int(os.getenv("SHOPWARE6_MEDIA_UPLOAD_WORKERS", "4"))
+# Produkt-Auto-Sync sammelt wartende Jobs je Zielsystem fuer dieses Fenster und
+# synchronisiert sie dann gemeinsam in einem Befehlslauf. 0 = sofort.
+PRODUCT_AUTO_SYNC_COALESCE_SECONDS = float(os.getenv("PRODUCT_AUTO_SYNC_COALESCE_SECONDS", "5"))
+PRODUCT_AUTO_SYNC_BATCH_SIZE = int(os.getenv("PRODUCT_AUTO_SYNC_BATCH_SIZE", "200"))
+# Wartet ein aelterer Job laenger als Sammelfenster + diese Sekunden, gilt sein
+# Task als verloren; juengere Jobs warten dann nicht mehr auf ihn.
+PRODUCT_AUTO_SYNC_STALE_SECONDS = float(os.getenv("PRODUCT_AUTO_SYNC_STALE_SECONDS", "300"))
 
 MODELTRANSLATION_DEFAULT_LANGUAGE = 'de'
 MODELTRANSLATION_LANGUAGES = ('de', 'en', 'ch-de', 'it-de', 'it-it')
@@ -313,9 +343,42 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 DOCUMENT_PDF_ROOT = BASE_DIR / 'Dokumente'
+# Parallele WeasyPrint-Prozesse fuer Preislisten-Abschnitte (1 = seriell).
+DOCUMENT_PDF_WORKERS = int(os.getenv("DOCUMENT_PDF_WORKERS", "4"))
 DB_BACKUP_DIR = os.getenv("DB_BACKUP_DIR", "tmp/backups")
 DB_BACKUP_SCHEMA = os.getenv("DB_BACKUP_SCHEMA", "public")
 
+# Live-Sync-Messenger (SSE): eine Verbindung bleibt hoechstens
+# LIVE_EVENTS_SSE_SECONDS offen und wartet per XREAD BLOCK in Runden von
+# LIVE_EVENTS_BLOCK_MS; danach verbindet sich der Browser nach
+# LIVE_EVENTS_SSE_RETRY_MS mit Last-Event-ID neu. Setzt gthread-Worker voraus
+# (siehe docker-compose.yml), sonst belegt jeder Tab einen ganzen Worker.
+LIVE_EVENTS_SSE_SECONDS = float(os.getenv("LIVE_EVENTS_SSE_SECONDS", "25"))
+LIVE_EVENTS_BLOCK_MS = int(os.getenv("LIVE_EVENTS_BLOCK_MS", "5000"))
+LIVE_EVENTS_SSE_RETRY_MS = int(os.getenv("LIVE_EVENTS_SSE_RETRY_MS", "5000"))
+# buffered_events(): Events gesammelt per Redis-Pipeline schreiben, sobald so
+# viele Events anliegen oder das aelteste so alt ist.
+LIVE_EVENTS_BUFFER_SIZE = int(os.getenv("LIVE_EVENTS_BUFFER_SIZE", "200"))
+LIVE_EVENTS_BUFFER_MS = int(os.getenv("LIVE_EVENTS_BUFFER_MS", "500"))
+
+# Statusleiste/Dashboard lesen einen Redis-Snapshot, den der Beat-Task
+# core.sample_health_metrics (alle 15 Sekunden) schreibt. Snapshots aelter als
+# ADMIN_HEALTH_MAX_AGE_SECONDS gelten als veraltet; Shopware-Kennzahlen werden
+# seltener neu gezaehlt.
+ADMIN_HEALTH_SAMPLE_SECONDS = float(os.getenv("ADMIN_HEALTH_SAMPLE_SECONDS", "15"))
+ADMIN_HEALTH_MAX_AGE_SECONDS = float(os.getenv("ADMIN_HEALTH_MAX_AGE_SECONDS", "120"))
+ADMIN_REMOTE_METRICS_REFRESH_SECONDS = float(os.getenv("ADMIN_REMOTE_METRICS_REFRESH_SECONDS", "60"))
+
+# MJML: langlebige Node-Worker je Prozess (0 = immer CLI) und Cache fuer
+# kompiliertes HTML (LRU-Eintraege je Prozess, Redis-TTL; 0 = aus). Gecacht
+# werden nur wiederverwendete Kompilate (Kampagnenvorlage, Vorschauen); die
+# Redis-Eintraege liegen auf dem Broker, daher die kurze TTL.
+MJML_WORKER_POOL_SIZE = int(os.getenv("MJML_WORKER_POOL_SIZE", "2"))
+MJML_WORKER_TIMEOUT_SECONDS = float(os.getenv("MJML_WORKER_TIMEOUT_SECONDS", "30"))
+MJML_NODE_PATH = os.getenv("MJML_NODE_PATH", "")
+MJML_CACHE_SIZE = int(os.getenv("MJML_CACHE_SIZE", "256"))
+MJML_CACHE_SECONDS = int(os.getenv("MJML_CACHE_SECONDS", "3600"))
+
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
 CELERY_ACCEPT_CONTENT = ["json"]
@@ -325,6 +388,11 @@ CELERY_TIMEZONE = TIME_ZONE
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
 CELERY_BEAT_SCHEDULE = {}
 CELERY_IMPORTS = ("core.tasks", "newsletter.tasks", "microtech.tasks", "products.tasks", "shopware.tasks")
+# Der Health-Sampler laeuft auf einer eigenen Queue (Worker "celery-health" in
+# docker-compose.yml), damit lange Syncs die Messungen nicht aufstauen.
+CELERY_TASK_ROUTES = {
+    "core.sample_health_metrics": {"queue": "health"},
+}
 
 
 UNFOLD = {
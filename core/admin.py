@@ -46,7 +46,7 @@ from django_celery_beat.models import (
 )
 
 from core.admin_status import admin_status_bar_api
-from core.live_events_view import live_events_api, live_events_detail_api, live_events_view
+from core.live_events_view import live_events_api, live_events_detail_api, live_events_stream, live_events_view
 from core.log_reader import get_allowed_log_files, log_file_info, search_log_file, tail_log_file
 from core.microtech_queue_view import microtech_queue_api, microtech_queue_view
 from core.services import CommandRuntimeService
@@ -456,6 +456,7 @@ def _admin_get_urls():
         path("live-events/", admin.site.admin_view(live_events_view), name="core_live_events"),
         path("live-events/api/", admin.site.admin_view(live_events_api), name="core_live_events_api"),
         path("live-events/detail/", admin.site.admin_view(live_events_detail_api), name="core_live_events_detail"),
+        path("live-events/stream/", admin.site.admin_view(live_events_stream), name="core_live_events_stream"),
         path("logs/", admin.site.admin_view(admin_log_reader_view), name="core_log_reader"),
         path("logs/search/", admin.site.admin_view(admin_log_search_api), name="core_log_search"),
         path("logs/download/", admin.site.admin_view(admin_log_download_view), name="core_log_download"),
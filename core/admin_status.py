@@ -2,17 +2,13 @@ from __future__ import annotations
 
 import socket
 import time
+from dataclasses import replace
 from urllib.parse import urlsplit
 
 from django.conf import settings
 from django.http import JsonResponse
 
-
-_STATUS_CACHE: dict = {
-    "checked_at": 0.0,
-    "value": None,
-}
-_STATUS_CACHE_SECONDS = 15.0
+from core.health_metrics import is_stale, read_status, request_sample, snapshot_age_seconds
 
 _CELERY_STATUS_CACHE: dict = {
     "checked_at": 0.0,
@@ -21,17 +17,58 @@ _CELERY_STATUS_CACHE: dict = {
 _CELERY_STATUS_CACHE_SECONDS = 10.0
 
 
-def _cached_status() -> dict | None:
-    checked_at = float(_STATUS_CACHE.get("checked_at") or 0.0)
-    value = _STATUS_CACHE.get("value")
-    if value is not None and time.monotonic() - checked_at < _STATUS_CACHE_SECONDS:
-        return dict(value)
-    return None
+def _pending_status(label: str) -> dict:
+    return {
+        "label": label,
+        "ok": None,
+        "status": "unknown",
+        "detail": "noch keine Messung",
+        "latency_ms": None,
+        "active_count": 0,
+    }
+
 
+def _stale_status(service: dict, age_seconds: float) -> dict:
+    # Ein alter Snapshot sagt nichts über den Dienst aus, nur über den Sampler.
+    return {
+        **service,
+        "ok": None,
+        "status": "unknown",
+        "detail": f"letzte Messung vor {int(age_seconds)} s – Health-Worker prüfen",
+    }
 
-def _store_status(value: dict) -> dict:
-    _STATUS_CACHE.update({"checked_at": time.monotonic(), "value": value})
-    return value
+
+def _snapshot_services() -> dict:
+    """Dienststatus aus dem Redis-Snapshot, Celery direkt (kurz gecacht).
+
+    Fehlt der Snapshot oder ist er veraltet, wird eine Messung angestoßen und
+    der Dienst als unbekannt gemeldet, nicht als Fehler.
+    """
+    snapshot = read_status()
+    if snapshot is None:
+        request_sample()
+        services = {
+            "graphql": _pending_status("GraphQL"),
+            "shopware": _pending_status("Shopware"),
+        }
+    else:
+        services = dict(snapshot.get("services") or {})
+        if is_stale(snapshot):
+            request_sample()
+            age_seconds = snapshot_age_seconds(snapshot)
+            services = {key: _stale_status(value, age_seconds) for key, value in services.items()}
+    services["celery"] = _cached_celery_status()
+    return services
+
+
+def _cached_celery_status() -> dict:
+    now = time.monotonic()
+    cached = _CELERY_STATUS_CACHE.get("value")
+    if cached is not None and now - float(_CELERY_STATUS_CACHE.get("checked_at") or 0.0) < _CELERY_STATUS_CACHE_SECONDS:
+        return dict(cached)
+    status = _celery_status()
+    _CELERY_STATUS_CACHE.update({"checked_at": now, "value": status})
+    return dict(status)
 
 
 def _microtech_graphql_status() -> dict:
@@ -42,11 +79,9 @@ def _microtech_graphql_status() -> dict:
         )
 
         configured = MicrotechGraphQLConfig.from_settings()
-        config = MicrotechGraphQLConfig(
-            url=configured.url,
+        config = replace(
+            configured,
             request_timeout=float(getattr(settings, "ADMIN_STATUS_GRAPHQL_TIMEOUT", 1.0)),
-            poll_timeout=configured.poll_timeout,
-            poll_interval=configured.poll_interval,
         )
         health = MicrotechGraphQLClientService(config=config).health()
         ok = health == "ok"
@@ -134,15 +169,10 @@ def _shopware_status() -> dict:
 
 
 def shopware_health_check() -> dict:
-    return _shopware_status()
+    return _snapshot_services().get("shopware") or _pending_status("Shopware")
 
 
 def _celery_status() -> dict:
-    now = time.monotonic()
-    cached = _CELERY_STATUS_CACHE.get("value")
-    if cached is not None and now - float(_CELERY_STATUS_CACHE.get("checked_at") or 0.0) < _CELERY_STATUS_CACHE_SECONDS:
-        return dict(cached)
-
     broker_url = str(getattr(settings, "CELERY_BROKER_URL", "") or "").strip()
     if not broker_url:
         status: dict = {
@@ -152,7 +182,6 @@ def _celery_status() -> dict:
             "detail": "kein Broker konfiguriert",
             "active_count": 0,
         }
-        _CELERY_STATUS_CACHE.update({"checked_at": now, "value": status})
         return status
 
     try:
@@ -176,7 +205,6 @@ def _celery_status() -> dict:
             "detail": str(exc),
             "active_count": 0,
         }
-        _CELERY_STATUS_CACHE.update({"checked_at": now, "value": status})
         return status
 
     try:
@@ -216,22 +244,8 @@ def _celery_status() -> dict:
             "active_count": 0,
         }
 
-    _CELERY_STATUS_CACHE.update({"checked_at": now, "value": status})
     return status
 
 
 def admin_status_bar_api(request):
-    cached = _cached_status()
-    if cached is not None:
-        celery = _celery_status()
-        cached["services"]["celery"] = celery
-        return JsonResponse(cached)
-
-    payload = {
-        "services": {
-            "graphql": _microtech_graphql_status(),
-            "shopware": _shopware_status(),
-            "celery": _celery_status(),
-        }
-    }
-    return JsonResponse(_store_status(payload))
+    return JsonResponse({"services": _snapshot_services()})
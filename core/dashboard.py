@@ -1,5 +1,4 @@
 import logging
-import time
 from decimal import Decimal, ROUND_HALF_UP
 
 from django.contrib import messages
@@ -23,8 +22,6 @@ _HIDDEN_DASHBOARD_APPS = {
     "shopware",
 }
 
-_REMOTE_METRICS_CACHE: dict = {"checked_at": 0.0, "value": None}
-_REMOTE_METRICS_CACHE_SECONDS = 30.0
 _PRICE_ANOMALY_ROW_LIMIT = 100
 
 
@@ -223,13 +220,24 @@ def _fetch_open_order_rows(limit: int = 10) -> tuple[int, list[list[str]]]:
 
 
 def _get_remote_shopware_metrics() -> dict:
-    """Load cached, read-only counts from the Shopware Admin API."""
-    now = time.monotonic()
-    cached = _REMOTE_METRICS_CACHE.get("value")
-    checked_at = float(_REMOTE_METRICS_CACHE.get("checked_at") or 0.0)
-    if cached is not None and now - checked_at < _REMOTE_METRICS_CACHE_SECONDS:
-        return dict(cached)
+    """Read the Shopware counts sampled in the background (see core.health_metrics)."""
+    from core.health_metrics import read_remote_metrics, request_sample
+
+    metrics = read_remote_metrics()
+    if metrics is not None:
+        return metrics
+    request_sample()
+    pending = "Noch keine Messung vorhanden, die Werte werden im Hintergrund ermittelt."
+    return {
+        "customer_count": None,
+        "customer_error": pending,
+        "product_rows": [],
+        "product_error": pending,
+    }
+
 
+def collect_remote_shopware_metrics() -> dict:
+    """Load read-only counts from the Shopware Admin API."""
     metrics: dict = {
         "customer_count": None,
         "customer_error": None,
@@ -295,8 +303,7 @@ def _get_remote_shopware_metrics() -> dict:
         except Exception as exc:
             metrics["product_error"] = str(exc)
 
-    _REMOTE_METRICS_CACHE.update({"checked_at": now, "value": metrics})
-    return dict(metrics)
+    return metrics
 
 
 def _fetch_price_anomaly_rows() -> tuple[int, list[list[str]], str | None, str | None]:
@@ -0,0 +1,119 @@
+"""Health- und Kennzahlen-Snapshot für Statusleiste und Dashboard.
+
+Ein Celery-Beat-Task (``core.sample_health_metrics``) prüft GraphQL und
+Shopware in festem Takt und legt das Ergebnis in Redis ab; Shopware-Kennzahlen
+(Kunden, Produkte je Verkaufskanal) werden seltener erneuert. Admin-Views lesen
+nur diesen Snapshot und warten damit nie auf ein entferntes System. Fehlt der
+Snapshot, wird eine Messung angestoßen und bis dahin "unbekannt" angezeigt; ist
+er älter als ``ADMIN_HEALTH_MAX_AGE_SECONDS``, läuft der Sampler nicht (Celery-
+Worker aus) und die Dienste gelten als veraltet.
+
+Celery selbst wird nicht hier gemessen: im Task sähe ``inspect().active()``
+immer den Sampler selbst.
+"""
+from __future__ import annotations
+
+import json
+import time
+from typing import Any
+
+from django.conf import settings
+from loguru import logger
+
+from core.redis_client import get_redis
+
+HEALTH_STATUS_KEY = "admin:health:status"
+REMOTE_METRICS_KEY = "admin:health:remote-metrics"
+SAMPLER_LOCK_KEY = "admin:health:sampler-lock"
+SAMPLE_REQUESTED_KEY = "admin:health:sample-requested"
+# Der Snapshot bleibt länger liegen als er gültig ist, damit ein ausbleibender
+# Sampler als "veraltet" statt als "noch keine Messung" erkennbar ist.
+STATUS_RETENTION_SECONDS = 86400
+
+
+def _read(key: str) -> dict | None:
+    try:
+        raw = get_redis().get(key)
+        return json.loads(raw) if raw else None
+    except Exception:
+        logger.opt(exception=False).warning("Health-Snapshot {} nicht lesbar.", key)
+        return None
+
+
+def _write(key: str, value: dict, *, ttl_seconds: float) -> None:
+    get_redis().set(key, json.dumps(value, default=str), ex=max(1, int(ttl_seconds)))
+
+
+def read_status() -> dict | None:
+    """Letzter Snapshot ``{"sampled_at": ..., "services": {...}}`` oder ``None``."""
+    return _read(HEALTH_STATUS_KEY)
+
+
+def snapshot_age_seconds(snapshot: dict) -> float:
+    return time.time() - float(snapshot.get("sampled_at") or 0.0)
+
+
+def is_stale(snapshot: dict) -> bool:
+    return snapshot_age_seconds(snapshot) > float(settings.ADMIN_HEALTH_MAX_AGE_SECONDS)
+
+
+def read_remote_metrics() -> dict | None:
+    return _read(REMOTE_METRICS_KEY)
+
+
+def request_sample() -> None:
+    """Stößt eine Messung an, höchstens einmal je Takt. Blockiert nicht und wirft nie."""
+    try:
+        interval = float(settings.ADMIN_HEALTH_SAMPLE_SECONDS)
+        if not get_redis().set(SAMPLE_REQUESTED_KEY, "1", nx=True, ex=max(1, int(interval))):
+            return
+        from core.tasks import sample_health_metrics as sample_task
+
+        # Verfaellt nach einem Takt, statt sich hinter langen Tasks aufzustauen.
+        sample_task.apply_async(expires=interval)
+    except Exception:
+        logger.opt(exception=False).warning("Health-Messung konnte nicht angestoßen werden.")
+
+
+def sample_health_metrics(*, refresh_remote: bool | None = None) -> dict[str, Any] | None:
+    """Prüft alle Dienste und schreibt den Snapshot; läuft nie parallel zu sich selbst.
+
+    ``refresh_remote=None`` erneuert die Shopware-Kennzahlen nur, wenn sie älter
+    als ``ADMIN_REMOTE_METRICS_REFRESH_SECONDS`` sind.
+    """
+    from core.admin_status import _microtech_graphql_status, _shopware_status
+
+    client = get_redis()
+    max_age = float(settings.ADMIN_HEALTH_MAX_AGE_SECONDS)
+    if not client.set(SAMPLER_LOCK_KEY, "1", nx=True, ex=max(1, int(max_age))):
+        return None
+    try:
+        status = {
+            "sampled_at": time.time(),
+            "services": {
+                "graphql": _microtech_graphql_status(),
+                "shopware": _shopware_status(),
+            },
+        }
+        _write(HEALTH_STATUS_KEY, status, ttl_seconds=STATUS_RETENTION_SECONDS)
+
+        if status["services"]["shopware"].get("ok") is True:
+            if refresh_remote is None:
+                remote = read_remote_metrics()
+                refresh_remote = remote is None or (
+                    time.time() - float(remote.get("sampled_at") or 0.0)
+                    >= float(settings.ADMIN_REMOTE_METRICS_REFRESH_SECONDS)
+                )
+            if refresh_remote:
+                from core.dashboard import collect_remote_shopware_metrics
+
+                metrics = {"sampled_at": time.time(), **collect_remote_shopware_metrics()}
+                _write(
+                    REMOTE_METRICS_KEY,
+                    metrics,
+                    ttl_seconds=max(max_age, 2 * float(settings.ADMIN_REMOTE_METRICS_REFRESH_SECONDS)),
+                )
+        return status
+    finally:
+        client.delete(SAMPLER_LOCK_KEY)
+
@@ -3,26 +3,47 @@ from __future__ import annotations
 
 import json
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from threading import local
 from typing import Any
 
 import redis
 from django.conf import settings
 from loguru import logger
 
+from core.redis_client import get_redis, registered_script
+
 LIVE_EVENTS_STREAM_KEY = "live:events"
+# Je Task ein eigener Stream mit denselben IDs wie der Hauptstream (ohne Payload),
+# damit gefilterte Ansichten serverseitig lesen statt den Hauptstream zu filtern.
+LIVE_EVENTS_TASK_STREAM_PREFIX = "live:events:task:"
 STREAM_MAXLEN = 10000
+TASK_STREAM_MAXLEN = 2000
 PAYLOAD_MAX_BYTES = 32768
 
-_redis_client: redis.Redis | None = None
+# Schreibt atomar in Haupt- und Task-Stream; die ID des Hauptstreams wird
+# übernommen und ist damit in beiden Streams gleich.
+_EMIT_SCRIPT = """
+local main_count = tonumber(ARGV[3])
+local main_fields = {}
+for i = 4, 3 + main_count do main_fields[#main_fields + 1] = ARGV[i] end
+local task_fields = {}
+for i = 4 + main_count, #ARGV do task_fields[#task_fields + 1] = ARGV[i] end
+local id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*', unpack(main_fields))
+redis.call('XADD', KEYS[2], 'MAXLEN', '~', ARGV[2], id, unpack(task_fields))
+return id
+"""
 
+_buffer_state = local()
+
+
+def task_stream_key(task: str) -> str:
+    return f"{LIVE_EVENTS_TASK_STREAM_PREFIX}{task}"
 
-def _get_redis() -> redis.Redis:
-    global _redis_client
-    if _redis_client is None:
-        _redis_client = redis.Redis.from_url(
-            settings.CELERY_BROKER_URL, decode_responses=True
-        )
-    return _redis_client
+
+def _flatten(fields: dict[str, str]) -> list[str]:
+    return [item for pair in fields.items() for item in pair]
 
 
 def _serialize_payload(payload: dict | None) -> str:
@@ -51,7 +72,10 @@ def emit_event(
     target: str | None = None,
     payload: dict | None = None,
 ) -> None:
-    """Best-effort: schreibt ein Live-Event in den Redis Stream. Wirft nie."""
+    """Best-effort: schreibt ein Live-Event in den Redis Stream. Wirft nie.
+
+    Innerhalb von ``buffered_events()`` wird das Event nur gepuffert.
+    """
     try:
         fields: dict[str, Any] = {
             "ts": f"{time.time():.3f}",
@@ -64,43 +88,151 @@ def emit_event(
             "summary": str(summary or ""),
             "payload": _serialize_payload(payload),
         }
+        incident = None
         if status in ("error", "skipped"):
-            _persist_incident(
+            incident = dict(
                 task=task, run_id=run_id, entity=entity, target=target,
                 step=step, status=status, message=summary, payload=payload,
             )
-        _get_redis().xadd(
+        buffer = getattr(_buffer_state, "buffer", None)
+        if buffer is not None:
+            buffer.add(fields, incident)
+            return
+        if incident is not None:
+            _persist_incident(**incident)
+        client = get_redis()
+        _write_event(client, fields)
+    except Exception:
+        logger.opt(exception=False).warning(
+            "emit_event fehlgeschlagen (best-effort): task={} entity={}", task, entity
+        )
+
+
+def _write_event(client: redis.Redis, fields: dict[str, Any], *, pipe=None) -> None:
+    """Schreibt ein Event direkt oder - mit ``pipe`` - in eine Redis-Pipeline."""
+    target = pipe if pipe is not None else client
+    if not fields["task"]:
+        target.xadd(
             LIVE_EVENTS_STREAM_KEY,
             fields,
             maxlen=STREAM_MAXLEN,
             approximate=True,
         )
-    except Exception:
-        logger.opt(exception=False).warning(
-            "emit_event fehlgeschlagen (best-effort): task={} entity={}", task, entity
-        )
+        return
+    task_fields = {key: value for key, value in fields.items() if key != "payload"}
+    task_fields["has_payload"] = "1" if fields["payload"] else ""
+    main_args = _flatten(fields)
+    registered_script(client, _EMIT_SCRIPT)(
+        keys=[LIVE_EVENTS_STREAM_KEY, task_stream_key(fields["task"])],
+        args=[STREAM_MAXLEN, TASK_STREAM_MAXLEN, len(main_args), *main_args, *_flatten(task_fields)],
+        client=target,
+    )
+
+
+def _incident_row(*, task, run_id, entity, target, step, status, message, payload):
+    from core.models import SyncEventLog
+
+    return SyncEventLog(
+        task=str(task or ""),
+        run_id=str(run_id or ""),
+        entity=str(entity or ""),
+        target=str(target or ""),
+        step=str(step or ""),
+        status=status,
+        message=str(message or ""),
+        payload=payload,
+    )
 
 
-def _persist_incident(*, task, run_id, entity, target, step, status, message, payload) -> None:
+def _persist_incident(**incident) -> None:
     try:
-        from core.models import SyncEventLog
-
-        SyncEventLog.objects.create(
-            task=str(task or ""),
-            run_id=str(run_id or ""),
-            entity=str(entity or ""),
-            target=str(target or ""),
-            step=str(step or ""),
-            status=status,
-            message=str(message or ""),
-            payload=payload,
-        )
+        _incident_row(**incident).save()
     except Exception:
         logger.opt(exception=False).warning(
-            "SyncEventLog-Persistierung fehlgeschlagen: task={} entity={}", task, entity
+            "SyncEventLog-Persistierung fehlgeschlagen: task={} entity={}",
+            incident.get("task"),
+            incident.get("entity"),
         )
 
 
+class LiveEventBuffer:
+    """Sammelt Events und Incidents eines Laufs und schreibt sie gebündelt.
+
+    Geleert wird nach ``max_events`` Events oder wenn das älteste gepufferte
+    Event ``max_delay_ms`` alt ist (geprüft beim nächsten Event), spätestens
+    beim Verlassen von ``buffered_events()``.
+    """
+
+    def __init__(self, *, max_events: int, max_delay_ms: int) -> None:
+        self.max_events = max(1, int(max_events))
+        self.max_delay = max(0, int(max_delay_ms)) / 1000
+        self.events: list[dict[str, Any]] = []
+        self.incidents: list[dict[str, Any]] = []
+        self._first_buffered_at: float | None = None
+
+    def add(self, fields: dict[str, Any], incident: dict[str, Any] | None) -> None:
+        if self._first_buffered_at is None:
+            self._first_buffered_at = time.monotonic()
+        self.events.append(fields)
+        if incident is not None:
+            self.incidents.append(incident)
+        if len(self.events) >= self.max_events or time.monotonic() - self._first_buffered_at >= self.max_delay:
+            self.flush()
+
+    def flush(self) -> None:
+        """Best-effort wie ``emit_event``: Fehler werden geloggt, nie geworfen."""
+        events, self.events = self.events, []
+        incidents, self.incidents = self.incidents, []
+        self._first_buffered_at = None
+        if incidents:
+            try:
+                from core.models import SyncEventLog
+
+                SyncEventLog.objects.bulk_create([_incident_row(**incident) for incident in incidents])
+            except Exception:
+                logger.opt(exception=False).warning(
+                    "SyncEventLog-Persistierung fehlgeschlagen: {} Incident(s)", len(incidents)
+                )
+        if not events:
+            return
+        try:
+            client = get_redis()
+            pipe = client.pipeline(transaction=False)
+            for fields in events:
+                _write_event(client, fields, pipe=pipe)
+            pipe.execute()
+        except Exception:
+            logger.opt(exception=False).warning(
+                "emit_event fehlgeschlagen (best-effort): {} gepufferte Event(s)", len(events)
+            )
+
+
+@contextmanager
+def buffered_events(
+    *,
+    max_events: int | None = None,
+    max_delay_ms: int | None = None,
+) -> Iterator[LiveEventBuffer]:
+    """Puffert alle ``emit_event``-Aufrufe des Threads und schreibt sie per Pipeline.
+
+    Verschachtelte Aufrufe nutzen den äußeren Puffer.
+    """
+    buffer = getattr(_buffer_state, "buffer", None)
+    if buffer is not None:
+        yield buffer
+        return
+    buffer = LiveEventBuffer(
+        max_events=settings.LIVE_EVENTS_BUFFER_SIZE if max_events is None else max_events,
+        max_delay_ms=settings.LIVE_EVENTS_BUFFER_MS if max_delay_ms is None else max_delay_ms,
+    )
+    _buffer_state.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        _buffer_state.buffer = None
+        buffer.flush()
+
+
 def emit_run_started(task: str, run_id: str, summary: str) -> None:
     emit_event(task, entity="", step="run:start", status="info", summary=summary, run_id=run_id)
 
@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 import json
+import time
 
+from django.conf import settings
 from django.contrib import admin
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.template.response import TemplateResponse
 
-from core.live_events import LIVE_EVENTS_STREAM_KEY, _get_redis
+from core.live_events import LIVE_EVENTS_STREAM_KEY, task_stream_key
+from core.redis_client import get_redis
 
 INITIAL_COUNT = 60
 POLL_COUNT = 200
@@ -23,31 +26,68 @@ def _row_to_event(stream_id: str, fields: dict) -> dict:
         "step": fields.get("step", ""),
         "status": fields.get("status", "info"),
         "summary": fields.get("summary", ""),
-        "has_payload": bool(fields.get("payload")),
+        "has_payload": bool(fields.get("payload") or fields.get("has_payload")),
     }
 
 
-def _read_events(after, task, count=POLL_COUNT):
-    client = _get_redis()
+def _read_events(after, task, count=POLL_COUNT, block_ms=None):
+    """Liest ab ``after`` aus dem Haupt- bzw. Task-Stream; ``block_ms`` wartet per XREAD BLOCK auf neue Einträge."""
+    client = get_redis()
+    stream_key = task_stream_key(task) if task else LIVE_EVENTS_STREAM_KEY
     events = []
     next_id = after
     if after:
-        result = client.xread({LIVE_EVENTS_STREAM_KEY: after}, count=count)
+        result = client.xread({stream_key: after}, count=count, block=block_ms)
     else:
         # Erstaufruf: die letzten INITIAL_COUNT Einträge, chronologisch.
-        rows = client.xrevrange(LIVE_EVENTS_STREAM_KEY, count=INITIAL_COUNT)
+        rows = client.xrevrange(stream_key, count=INITIAL_COUNT)
         rows = list(reversed(rows))
-        result = [(LIVE_EVENTS_STREAM_KEY, rows)] if rows else []
+        result = [(stream_key, rows)] if rows else []
     for _stream, rows in result or []:
         for stream_id, fields in rows:
-            if task and fields.get("task") != task:
-                next_id = stream_id
-                continue
             events.append(_row_to_event(stream_id, fields))
             next_id = stream_id
     return events, next_id
 
 
+def _sse_events(after, task):
+    """Hält die Verbindung höchstens LIVE_EVENTS_SSE_SECONDS offen (Long Polling).
+
+    Gewartet wird per XREAD BLOCK in Runden von LIVE_EVENTS_BLOCK_MS; danach
+    endet die Antwort und der Browser verbindet sich nach ``retry`` mit
+    Last-Event-ID neu. Gunicorn läuft dafür mit gthread-Workern, ein offener
+    Stream belegt nur einen Thread.
+    """
+    deadline = time.monotonic() + settings.LIVE_EVENTS_SSE_SECONDS
+    yield f"retry: {settings.LIVE_EVENTS_SSE_RETRY_MS}\n\n"
+    initial = after is None
+    while True:
+        remaining_ms = int((deadline - time.monotonic()) * 1000)
+        if remaining_ms <= 0 and not initial:
+            return
+        try:
+            if initial:
+                events, next_id = _read_events(None, task)
+                initial = False
+                # Bei leerem Stream ab "0-0" weiterlesen, damit kein Event verloren geht.
+                next_id = next_id or "0-0"
+            else:
+                events, next_id = _read_events(
+                    after,
+                    task,
+                    block_ms=max(1, min(settings.LIVE_EVENTS_BLOCK_MS, remaining_ms)),
+                )
+        except Exception:
+            yield "event: failure\ndata: {}\n\n"
+            return
+        for event in events:
+            yield f"id: {event['id']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+        if not events:
+            # Position auch ohne Events setzen, damit der Reconnect dort weiterliest.
+            yield f"id: {next_id}\n: keepalive\n\n"
+        after = next_id
+
+
 def live_events_api(request):
     after = request.GET.get("after") or None
     task = request.GET.get("task") or None
@@ -58,11 +98,20 @@ def live_events_api(request):
     return JsonResponse({"events": events, "next_id": next_id})
 
 
+def live_events_stream(request):
+    after = request.headers.get("Last-Event-ID") or request.GET.get("after") or None
+    task = request.GET.get("task") or None
+    response = StreamingHttpResponse(_sse_events(after, task), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 def live_events_detail_api(request):
     stream_id = request.GET.get("id") or ""
     payload = None
     try:
-        rows = _get_redis().xrange(LIVE_EVENTS_STREAM_KEY, min=stream_id, max=stream_id)
+        rows = get_redis().xrange(LIVE_EVENTS_STREAM_KEY, min=stream_id, max=stream_id)
         if rows:
             raw = rows[0][1].get("payload") or ""
             payload = json.loads(raw) if raw else None
@@ -0,0 +1,42 @@
+from django.db import migrations
+
+TASK_NAME = "Admin Health-Snapshot"
+TASK_PATH = "core.sample_health_metrics"
+
+
+def create_sampler_schedule(apps, schema_editor):
+    """Den Sampler fest einplanen: Statusleiste und Dashboard lesen nur noch seinen Snapshot."""
+    IntervalSchedule = apps.get_model("django_celery_beat", "IntervalSchedule")
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+
+    schedule, _ = IntervalSchedule.objects.get_or_create(every=15, period="seconds")
+    PeriodicTask.objects.get_or_create(
+        task=TASK_PATH,
+        defaults={
+            "name": TASK_NAME,
+            "interval": schedule,
+            "args": "[]",
+            "kwargs": "{}",
+            "enabled": True,
+            "description": (
+                "Prueft GraphQL, Shopware und Celery und schreibt den Status fuer "
+                "Statusleiste und Dashboard nach Redis."
+            ),
+        },
+    )
+
+
+def remove_sampler_schedule(apps, schema_editor):
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTask.objects.filter(task=TASK_PATH).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0003_alter_databasebackup_file_size_bytes_and_more"),
+        ("django_celery_beat", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_sampler_schedule, remove_sampler_schedule),
+    ]
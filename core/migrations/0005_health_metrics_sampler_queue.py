@@ -0,0 +1,28 @@
+from django.db import migrations
+
+TASK_PATH = "core.sample_health_metrics"
+HEALTH_QUEUE = "health"
+# Eine Messung, die nicht innerhalb eines Takts startet, ist durch die naechste ueberholt.
+EXPIRE_SECONDS = 15
+
+
+def route_sampler_to_health_queue(apps, schema_editor):
+    """Sampler auf eine eigene Queue legen und liegengebliebene Messungen verfallen lassen."""
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTask.objects.filter(task=TASK_PATH).update(queue=HEALTH_QUEUE, expire_seconds=EXPIRE_SECONDS)
+
+
+def unroute_sampler(apps, schema_editor):
+    PeriodicTask = apps.get_model("django_celery_beat", "PeriodicTask")
+    PeriodicTask.objects.filter(task=TASK_PATH).update(queue=None, expire_seconds=None)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0004_health_metrics_sampler_schedule"),
+        ("django_celery_beat", "0018_improve_crontab_helptext"),
+    ]
+
+    operations = [
+        migrations.RunPython(route_sampler_to_health_queue, unroute_sampler),
+    ]
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import Any
+
+import redis
+from django.conf import settings
+
+_redis_client: redis.Redis | None = None
+_scripts: dict[str, tuple[redis.Redis, Any]] = {}
+
+
+def get_redis() -> redis.Redis:
+    """Prozessweiter Redis-Client auf dem Celery-Broker, lazy erzeugt.
+
+    Gemeinsam genutzt von Caches, Live-Events, Health-Snapshots und Locks.
+    redis-py verwaltet die Verbindungen in einem threadsicheren Pool und
+    baut ihn nach einem Fork neu auf.
+    """
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = redis.Redis.from_url(settings.CELERY_BROKER_URL, decode_responses=True)
+    return _redis_client
+
+
+def registered_script(client: redis.Redis, source: str):
+    """``client.register_script(source)``, einmal je Client und Lua-Skript erzeugt.
+
+    Das Script-Objekt führt EVALSHA aus und lädt das Skript nur nach, wenn
+    Redis es nicht (mehr) kennt; es muss daher nicht je Aufruf neu entstehen.
+    """
+    cached = _scripts.get(source)
+    if cached is None or cached[0] is not client:
+        cached = _scripts[source] = (client, client.register_script(source))
+    return cached[1]
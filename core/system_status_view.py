@@ -89,6 +89,7 @@ def _get_graphql_health() -> dict:
             "ok": ok,
             "latency_ms": latency_ms,
             "error": None if ok else f"Unerwartete Antwort: {result!r}",
+            "transport": MicrotechGraphQLClientService.transport_stats(),
         }
     except Exception as exc:
         latency_ms = round((time.monotonic() - t0) * 1000)
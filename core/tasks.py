@@ -46,3 +46,10 @@ def cleanup_sync_event_log(max_age_days: int = 30) -> int:
     cutoff = timezone.now() - timedelta(days=max_age_days)
     deleted, _ = SyncEventLog.objects.filter(created_at__lt=cutoff).delete()
     return deleted
+
+
+@shared_task(name="core.sample_health_metrics", ignore_result=True)
+def sample_health_metrics() -> None:
+    from core.health_metrics import sample_health_metrics as sample
+
+    sample()
@@ -0,0 +1,104 @@
+import json
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core import admin_status, health_metrics
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+@override_settings(
+    ADMIN_HEALTH_SAMPLE_SECONDS=15,
+    ADMIN_HEALTH_MAX_AGE_SECONDS=120,
+    ADMIN_REMOTE_METRICS_REFRESH_SECONDS=60,
+)
+class HealthMetricsSamplerTests(SimpleTestCase):
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(health_metrics, "get_redis", return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        admin_status._CELERY_STATUS_CACHE.update({"checked_at": 0.0, "value": None})
+
+    def _probes(self, shopware_ok=True):
+        return (
+            mock.patch.object(admin_status, "_microtech_graphql_status", return_value={"label": "GraphQL", "ok": True}),
+            mock.patch.object(admin_status, "_shopware_status", return_value={"label": "Shopware", "ok": shopware_ok}),
+            mock.patch.object(admin_status, "_celery_status", return_value={"label": "Celery", "status": "idle"}),
+            mock.patch("core.dashboard.collect_remote_shopware_metrics", return_value={"customer_count": 7}),
+        )
+
+    def test_sampler_writes_snapshot_and_refreshes_remote_metrics_on_cadence(self):
+        graphql, shopware, celery, collect = self._probes()
+        with graphql, shopware, celery, collect as collect_mock:
+            health_metrics.sample_health_metrics()
+            health_metrics.sample_health_metrics()
+
+        status = health_metrics.read_status()
+        self.assertTrue(status["services"]["graphql"]["ok"])
+        self.assertEqual(health_metrics.read_remote_metrics()["customer_count"], 7)
+        collect_mock.assert_called_once()
+        self.assertNotIn(health_metrics.SAMPLER_LOCK_KEY, self.redis.values)
+
+    def test_sampler_skips_remote_metrics_when_shopware_is_down(self):
+        graphql, shopware, celery, collect = self._probes(shopware_ok=False)
+        with graphql, shopware, celery, collect as collect_mock:
+            health_metrics.sample_health_metrics()
+        collect_mock.assert_not_called()
+        self.assertIsNone(health_metrics.read_remote_metrics())
+
+    def test_status_bar_reads_snapshot_without_probing(self):
+        self.redis.values[health_metrics.HEALTH_STATUS_KEY] = json.dumps(
+            {"sampled_at": time.time(), "services": {"shopware": {"label": "Shopware", "ok": True}}}
+        )
+        celery_status = {"label": "Celery", "ok": True, "status": "idle"}
+        with mock.patch.object(admin_status, "_shopware_status") as probe, mock.patch.object(
+            admin_status, "_celery_status", return_value=celery_status
+        ):
+            response = admin_status.admin_status_bar_api(request=None)
+        probe.assert_not_called()
+        services = json.loads(response.content)["services"]
+        self.assertTrue(services["shopware"]["ok"])
+        self.assertEqual(services["celery"], celery_status)
+
+    def test_sampler_does_not_report_celery(self):
+        graphql, shopware, celery, collect = self._probes()
+        with graphql, shopware, celery as celery_probe, collect:
+            health_metrics.sample_health_metrics()
+        celery_probe.assert_not_called()
+        self.assertNotIn("celery", health_metrics.read_status()["services"])
+
+    def test_expired_snapshot_is_reported_as_unknown(self):
+        self.redis.values[health_metrics.HEALTH_STATUS_KEY] = json.dumps(
+            {"sampled_at": time.time() - 600, "services": {"shopware": {"label": "Shopware", "ok": True}}}
+        )
+        with mock.patch("core.tasks.sample_health_metrics.apply_async") as apply_async:
+            status = admin_status.shopware_health_check()
+        self.assertIsNone(status["ok"])
+        self.assertEqual(status["status"], "unknown")
+        apply_async.assert_called_once_with(expires=15.0)
+
+    def test_missing_snapshot_requests_one_sample(self):
+        with mock.patch("core.tasks.sample_health_metrics.apply_async") as apply_async:
+            first = admin_status.shopware_health_check()
+            admin_status.shopware_health_check()
+        self.assertIsNone(first["ok"])
+        self.assertEqual(first["status"], "unknown")
+        apply_async.assert_called_once_with(expires=15.0)
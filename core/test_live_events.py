@@ -24,7 +24,7 @@ class SerializePayloadTests(SimpleTestCase):
 class EmitEventTests(SimpleTestCase):
     def test_emit_event_writes_to_stream(self):
         fake_redis = mock.MagicMock()
-        with mock.patch.object(live_events, "_get_redis", return_value=fake_redis):
+        with mock.patch.object(live_events, "get_redis", return_value=fake_redis):
             live_events.emit_event(
                 task="products.auto_sync",
                 entity="4711",
@@ -33,22 +33,98 @@ class EmitEventTests(SimpleTestCase):
                 summary="Produkt 4711 nach Shopware6 geschrieben",
                 run_id="run-1",
                 target="shopware6",
+                payload={"price": 12},
             )
-        fake_redis.xadd.assert_called_once()
-        args, kwargs = fake_redis.xadd.call_args
-        self.assertEqual(args[0], live_events.LIVE_EVENTS_STREAM_KEY)
-        fields = args[1]
+        fake_redis.register_script.assert_called_once_with(live_events._EMIT_SCRIPT)
+        kwargs = fake_redis.register_script.return_value.call_args.kwargs
+        self.assertEqual(
+            kwargs["keys"],
+            [live_events.LIVE_EVENTS_STREAM_KEY, live_events.task_stream_key("products.auto_sync")],
+        )
+        args = kwargs["args"]
+        self.assertEqual(args[:2], [live_events.STREAM_MAXLEN, live_events.TASK_STREAM_MAXLEN])
+        main_count = args[2]
+        fields = dict(zip(args[3:3 + main_count:2], args[4:3 + main_count:2]))
+        task_fields = dict(zip(args[3 + main_count::2], args[4 + main_count::2]))
         self.assertEqual(fields["task"], "products.auto_sync")
         self.assertEqual(fields["entity"], "4711")
         self.assertEqual(fields["status"], "ok")
+        self.assertIn('"price": 12', fields["payload"])
+        self.assertNotIn("payload", task_fields)
+        self.assertEqual(task_fields["has_payload"], "1")
+        self.assertEqual(task_fields["entity"], "4711")
+
+    def test_emit_script_is_registered_once_per_client(self):
+        fake_redis = mock.MagicMock()
+        with mock.patch.object(live_events, "get_redis", return_value=fake_redis):
+            for entity in ("1", "2", "3"):
+                live_events.emit_event(task="t", entity=entity, step="s", status="ok", summary="x")
+        fake_redis.register_script.assert_called_once_with(live_events._EMIT_SCRIPT)
+        self.assertEqual(fake_redis.register_script.return_value.call_count, 3)
+
+    def test_emit_event_without_task_writes_main_stream_only(self):
+        fake_redis = mock.MagicMock()
+        with mock.patch.object(live_events, "get_redis", return_value=fake_redis):
+            live_events.emit_event(task="", entity="e", step="s", status="info", summary="x")
+        fake_redis.register_script.assert_not_called()
+        args, kwargs = fake_redis.xadd.call_args
+        self.assertEqual(args[0], live_events.LIVE_EVENTS_STREAM_KEY)
         self.assertEqual(kwargs["maxlen"], live_events.STREAM_MAXLEN)
         self.assertTrue(kwargs["approximate"])
 
     def test_emit_event_never_raises_on_redis_error(self):
         fake_redis = mock.MagicMock()
         fake_redis.xadd.side_effect = RuntimeError("redis down")
-        with mock.patch.object(live_events, "_get_redis", return_value=fake_redis):
+        fake_redis.register_script.return_value.side_effect = RuntimeError("redis down")
+        with mock.patch.object(live_events, "get_redis", return_value=fake_redis):
             # Must not raise
             live_events.emit_event(
                 task="t", entity="e", step="s", status="info", summary="x"
             )
+
+
+class BufferedEventsTests(SimpleTestCase):
+    def _emit(self, entity, status="ok"):
+        live_events.emit_event(
+            task="products.scheduled_product_sync", entity=entity,
+            step="microtech→django", status=status, summary=f"Produkt {entity}",
+        )
+
+    def test_events_are_flushed_through_one_pipeline_on_exit(self):
+        fake_redis = mock.MagicMock()
+        pipe = fake_redis.pipeline.return_value
+        with mock.patch.object(live_events, "get_redis", return_value=fake_redis):
+            with live_events.buffered_events(max_events=100, max_delay_ms=60000):
+                self._emit("1")
+                self._emit("2")
+                fake_redis.pipeline.assert_not_called()
+        fake_redis.pipeline.assert_called_once_with(transaction=False)
+        script_calls = fake_redis.register_script.return_value.call_args_list
+        self.assertEqual(len(script_calls), 2)
+        self.assertTrue(all(call.kwargs["client"] is pipe for call in script_calls))
+        pipe.execute.assert_called_once()
+
+    def test_buffer_flushes_every_max_events(self):
+        fake_redis = mock.MagicMock()
+        with mock.patch.object(live_events, "get_redis", return_value=fake_redis):
+            with live_events.buffered_events(max_events=2, max_delay_ms=60000):
+                for entity in "123":
+                    self._emit(entity)
+                self.assertEqual(fake_redis.pipeline.return_value.execute.call_count, 1)
+        self.assertEqual(fake_redis.pipeline.return_value.execute.call_count, 2)
+
+    def test_incidents_are_bulk_created_and_errors_never_raise(self):
+        fake_redis = mock.MagicMock()
+        fake_redis.pipeline.return_value.execute.side_effect = RuntimeError("redis down")
+        with (
+            mock.patch.object(live_events, "get_redis", return_value=fake_redis),
+            mock.patch("core.models.SyncEventLog.objects.bulk_create") as bulk_create,
+        ):
+            with live_events.buffered_events(max_events=100, max_delay_ms=60000):
+                self._emit("1", status="error")
+                self._emit("2", status="skipped")
+                self._emit("3")
+        bulk_create.assert_called_once()
+        rows = bulk_create.call_args.args[0]
+        self.assertEqual([row.entity for row in rows], ["1", "2"])
+        self.assertIsNone(getattr(live_events._buffer_state, "buffer", None))
@@ -1,7 +1,7 @@
 from unittest import mock
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.urls import reverse
 
 
@@ -29,7 +29,7 @@ class LiveEventsApiTests(TestCase):
                 "status": "ok", "summary": "OK", "payload": "",
             })])
         ]
-        with mock.patch("core.live_events_view._get_redis", return_value=fake_redis):
+        with mock.patch("core.live_events_view.get_redis", return_value=fake_redis):
             resp = self.client.get(reverse("admin:core_live_events_api"), {"after": "4-0"})
         data = resp.json()
         self.assertEqual(data["next_id"], "5-0")
@@ -37,26 +37,59 @@ class LiveEventsApiTests(TestCase):
         self.assertEqual(data["events"][0]["entity"], "4711")
         self.assertNotIn("payload", data["events"][0])  # payload nur im Detail-Endpunkt
 
-    def test_api_filters_by_task(self):
+    def test_api_reads_task_stream(self):
         self.client.login(username="staff", password="pw")
         fake_redis = mock.MagicMock()
         fake_redis.xread.return_value = [
-            ("live:events", [
-                ("6-0", {"task": "orders.upsert", "entity": "A", "status": "ok",
-                         "step": "s", "summary": "x", "run_id": "", "target": "", "ts": "1"}),
-                ("7-0", {"task": "products.auto_sync", "entity": "B", "status": "ok",
+            ("live:events:task:products.auto_sync", [
+                ("7-0", {"task": "products.auto_sync", "entity": "B", "status": "ok", "has_payload": "1",
                          "step": "s", "summary": "y", "run_id": "", "target": "", "ts": "1"}),
             ])
         ]
-        with mock.patch("core.live_events_view._get_redis", return_value=fake_redis):
+        with mock.patch("core.live_events_view.get_redis", return_value=fake_redis):
             resp = self.client.get(
                 reverse("admin:core_live_events_api"),
                 {"after": "0", "task": "products.auto_sync"},
             )
         data = resp.json()
+        self.assertEqual(list(fake_redis.xread.call_args.args[0]), ["live:events:task:products.auto_sync"])
         self.assertEqual([e["entity"] for e in data["events"]], ["B"])
+        self.assertTrue(data["events"][0]["has_payload"])
         self.assertEqual(data["next_id"], "7-0")
 
+    @override_settings(LIVE_EVENTS_SSE_SECONDS=0.05, LIVE_EVENTS_BLOCK_MS=5000)
+    def test_stream_resumes_from_last_event_id_with_blocking_read(self):
+        self.client.login(username="staff", password="pw")
+        fake_redis = mock.MagicMock()
+        rows = [("9-0", {"task": "orders.upsert", "entity": "C", "status": "ok",
+                         "step": "s", "summary": "z", "run_id": "", "target": "", "ts": "1"})]
+        fake_redis.xread.side_effect = lambda streams, **kwargs: (
+            [("live:events", rows)] if streams == {"live:events": "8-0"} else []
+        )
+        with mock.patch("core.live_events_view.get_redis", return_value=fake_redis):
+            resp = self.client.get(reverse("admin:core_live_events_stream"), HTTP_LAST_EVENT_ID="8-0")
+            body = b"".join(resp.streaming_content).decode()
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        first, second = fake_redis.xread.call_args_list[:2]
+        self.assertEqual(first.args[0], {"live:events": "8-0"})
+        self.assertEqual(second.args[0], {"live:events": "9-0"})
+        # Jede Runde blockiert höchstens bis zum Ende der Verbindungsdauer.
+        self.assertTrue(all(0 < call.kwargs["block"] <= 50 for call in fake_redis.xread.call_args_list))
+        self.assertIn('id: 9-0\ndata: {"id": "9-0"', body)
+        self.assertIn("id: 9-0\n: keepalive", body)
+
+    @override_settings(LIVE_EVENTS_SSE_SECONDS=0.05)
+    def test_stream_on_empty_stream_resumes_from_the_start(self):
+        self.client.login(username="staff", password="pw")
+        fake_redis = mock.MagicMock()
+        fake_redis.xrevrange.return_value = []
+        fake_redis.xread.return_value = []
+        with mock.patch("core.live_events_view.get_redis", return_value=fake_redis):
+            resp = self.client.get(reverse("admin:core_live_events_stream"))
+            body = b"".join(resp.streaming_content).decode()
+        self.assertIn("id: 0-0\n: keepalive", body)
+        self.assertEqual(fake_redis.xread.call_args.args[0], {"live:events": "0-0"})
+
     def test_live_events_page_renders(self):
         self.client.login(username="staff", password="pw")
         resp = self.client.get(reverse("admin:core_live_events"))
@@ -11,7 +11,7 @@ from core.models import SyncEventLog
 class SyncEventLogPersistenceTests(TestCase):
     def _emit(self, status):
         fake_redis = mock.MagicMock()
-        with mock.patch.object(live_events, "_get_redis", return_value=fake_redis):
+        with mock.patch.object(live_events, "get_redis", return_value=fake_redis):
             live_events.emit_event(
                 task="products.auto_sync",
                 entity="4711",
@@ -0,0 +1,130 @@
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db.models import Prefetch
+
+
+def _format_price(value) -> str:
+    return f"{value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + " EUR" if value else "-"
+
+
+@dataclass(frozen=True)
+class PriceListRow:
+    erp_nr: str
+    product_name: str
+    price: float | None
+    price_display: str
+    rebate_price: float | None
+    rebate_price_display: str
+    vpe_display: str
+    unit: str
+    factor: object
+    min_purchase: object
+    purchase_unit: object
+    category_level1_name: str
+    category_level1_id: int | None
+    category_level2_name: str
+    category_level2_id: int | None
+    attributes: str = ""
+    price_source: str = "Standardpreis"
+    rebate_quantity: int | None = None
+    rebate_quantity_display: str = "-"
+
+    @classmethod
+    def from_product(cls, product) -> "PriceListRow":
+        """Build a row from prefetched ``price_list_prices`` and ``price_list_categories``."""
+        prices = product.price_list_prices
+        price_obj = prices[0] if prices else None
+        price = price_obj.price if price_obj else None
+        rebate_price = price_obj.rebate_price if price_obj else None
+        factor = product.factor or 1
+        unit = product.unit or "Stk"
+        cat2 = next(iter(product.price_list_categories), None)
+        cat1 = cat2.parent if cat2 and cat2.parent else cat2
+        return cls(
+            erp_nr=product.erp_nr,
+            product_name=product.name,
+            price=float(price) if price else None,
+            price_display=_format_price(price),
+            rebate_price=float(rebate_price) if rebate_price else None,
+            rebate_price_display=_format_price(rebate_price),
+            vpe_display=f"{factor} {unit}",
+            unit=unit,
+            factor=factor,
+            min_purchase=product.min_purchase or 1,
+            purchase_unit=product.purchase_unit or 1,
+            category_level1_name=cat1.name if cat1 else "",
+            category_level1_id=cat1.pk if cat1 else None,
+            category_level2_name=cat2.name if cat2 else "",
+            category_level2_id=cat2.pk if cat2 else None,
+        )
+
+
+@dataclass(frozen=True)
+class PriceListGroup:
+    category_name: str
+    rows: list[PriceListRow]
+
+
+@dataclass(frozen=True)
+class PriceListCategorySection:
+    category_name: str
+    groups: list[PriceListGroup]
+
+
+@dataclass(frozen=True)
+class PriceListDataset:
+    """Plain rows and category sections of a price list for the document templates.
+
+    All products are loaded with one queryset; prices of the default sales
+    channel and the categories including their parents are attached by
+    filtered ``Prefetch`` objects. Building a dataset therefore costs a
+    constant number of queries regardless of the product count.
+    """
+
+    products: list = field(default_factory=list)
+    rows: list[PriceListRow] = field(default_factory=list)
+    category_sections: list[PriceListCategorySection] = field(default_factory=list)
+
+    @staticmethod
+    def product_queryset():
+        from products.models import Category, Price, Product
+
+        return (
+            Product.objects.select_related("tax")
+            .prefetch_related(
+                Prefetch(
+                    "prices",
+                    queryset=Price.objects.filter(sales_channel__is_default=True),
+                    to_attr="price_list_prices",
+                ),
+                Prefetch(
+                    "categories",
+                    queryset=Category.objects.select_related("parent"),
+                    to_attr="price_list_categories",
+                ),
+            )
+            .order_by("erp_nr")
+        )
+
+    @classmethod
+    def build(cls, *, limit: int | None = None) -> "PriceListDataset":
+        queryset = cls.product_queryset()
+        products = list(queryset[:limit] if limit is not None else queryset)
+        rows = [PriceListRow.from_product(product) for product in products]
+
+        sections_map: dict = defaultdict(lambda: defaultdict(list))
+        for row in rows:
+            sections_map[row.category_level1_name][row.category_level2_name].append(row)
+
+        category_sections = [
+            PriceListCategorySection(
+                category_name=cat1,
+                groups=[
+                    PriceListGroup(category_name=cat2, rows=grp_rows)
+                    for cat2, grp_rows in groups.items()
+                ],
+            )
+            for cat1, groups in sections_map.items()
+        ]
+        return cls(products=products, rows=rows, category_sections=category_sections)
@@ -1,5 +1,9 @@
+import hashlib
+import multiprocessing
 import re
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
+from itertools import repeat
 from pathlib import Path
 
 from django.apps import apps
@@ -16,6 +20,14 @@ from core.services import BaseService
 from documents.models import Document
 
 
+def _write_section_pdf(html: str, base_url: str, target: str) -> str:
+    """Render one price-list section; runs inside the process pool."""
+    tmp_path = Path(target).with_suffix(".tmp")
+    WeasyHTML(string=html, base_url=base_url).write_pdf(target=str(tmp_path))
+    tmp_path.replace(target)
+    return target
+
+
 class DocumentPdfService(BaseService):
     model = Document
     default_price_list_css_path = Path("templates/admin/products/includes/price_list_document_template.css")
@@ -24,6 +36,7 @@ class DocumentPdfService(BaseService):
     price_list_cover_date_x = 16 * mm
     price_list_cover_date_y_from_top = 9.4 * mm
     price_list_cover_date_font_size = 5 * mm
+    price_list_section_cache_dirname = ".sections"
     price_list_cover_month_map = {
         "jan": 1,
         "januar": 1,
@@ -130,70 +143,87 @@ class DocumentPdfService(BaseService):
                 return f"ab {month_number:02d}/{month_match.group(1)}"
         return f"ab {timezone.localdate():%m/%Y}"
 
-    def add_default_price_list_cover_date(self, pdf_path: Path, document: Document) -> None:
-        reader = PdfReader(str(pdf_path))
-        if not reader.pages:
-            return
-        writer = PdfWriter()
-        date_text = self.get_price_list_effective_date_text(document)
-        for page_index, page in enumerate(reader.pages):
-            if page_index == 0:
-                page_width = float(page.mediabox.width)
-                page_height = float(page.mediabox.height)
-                overlay_buffer = BytesIO()
-                overlay_canvas = pdf_canvas.Canvas(
-                    overlay_buffer,
-                    pagesize=(page_width, page_height),
-                )
-                overlay_canvas.setFont("Helvetica", self.price_list_cover_date_font_size)
-                overlay_canvas.drawString(
-                    self.price_list_cover_date_x,
-                    page_height - self.price_list_cover_date_y_from_top - self.price_list_cover_date_font_size,
-                    date_text,
-                )
-                overlay_canvas.save()
-                page.merge_page(PdfReader(overlay_buffer).pages[0])
-            writer.add_page(page)
-        dated_path = pdf_path.with_suffix(".dated.pdf")
-        with dated_path.open("wb") as output_file:
-            writer.write(output_file)
-        dated_path.replace(pdf_path)
+    @classmethod
+    def _cover_date_overlay(cls, page, date_text: str):
+        page_height = float(page.mediabox.height)
+        overlay_buffer = BytesIO()
+        overlay_canvas = pdf_canvas.Canvas(
+            overlay_buffer,
+            pagesize=(float(page.mediabox.width), page_height),
+        )
+        overlay_canvas.setFont("Helvetica", cls.price_list_cover_date_font_size)
+        overlay_canvas.drawString(
+            cls.price_list_cover_date_x,
+            page_height - cls.price_list_cover_date_y_from_top - cls.price_list_cover_date_font_size,
+            date_text,
+        )
+        overlay_canvas.save()
+        return PdfReader(overlay_buffer).pages[0]
 
     @staticmethod
-    def add_price_list_page_numbers(pdf_path: Path) -> None:
-        """Number the complete merged document, including the cover page."""
-        reader = PdfReader(str(pdf_path))
-        page_count = len(reader.pages)
+    def _page_number_overlay(page, page_number: int, page_count: int):
+        page_width = float(page.mediabox.width)
+        page_height = float(page.mediabox.height)
+        overlay_buffer = BytesIO()
+        overlay_canvas = pdf_canvas.Canvas(
+            overlay_buffer,
+            pagesize=(page_width, page_height),
+        )
+        overlay_canvas.setFillColorRGB(1, 1, 1)
+        overlay_canvas.rect(
+            (page_width - (44 * mm)) / 2,
+            4 * mm,
+            44 * mm,
+            10 * mm,
+            fill=1,
+            stroke=0,
+        )
+        overlay_canvas.setFillColorRGB(0.45, 0.45, 0.45)
+        overlay_canvas.setFont("Helvetica", 8)
+        overlay_canvas.drawCentredString(page_width / 2, 7 * mm, f"{page_number}/{page_count}")
+        overlay_canvas.save()
+        return PdfReader(overlay_buffer).pages[0]
+
+    def assemble_pdf(
+        self,
+        pdf_path: Path,
+        parts: list[Path],
+        *,
+        cover_date_text: str | None = None,
+        number_pages: bool = False,
+    ) -> None:
+        """Merge all parts and stamp cover date and page numbers in one write.
+
+        The page count is known from the parts before the first page is
+        written, so the document is not rewritten for every overlay.
+        """
+        readers = [PdfReader(str(part)) for part in parts]
+        page_count = sum(len(reader.pages) for reader in readers)
         writer = PdfWriter()
-        for page_number, page in enumerate(reader.pages, start=1):
-            page_width = float(page.mediabox.width)
-            page_height = float(page.mediabox.height)
-            overlay_buffer = BytesIO()
-            overlay_canvas = pdf_canvas.Canvas(
-                overlay_buffer,
-                pagesize=(page_width, page_height),
-            )
-            overlay_canvas.setFillColorRGB(1, 1, 1)
-            overlay_canvas.rect(
-                (page_width - (44 * mm)) / 2,
-                4 * mm,
-                44 * mm,
-                10 * mm,
-                fill=1,
-                stroke=0,
-            )
-            overlay_canvas.setFillColorRGB(0.45, 0.45, 0.45)
-            overlay_canvas.setFont("Helvetica", 8)
-            overlay_canvas.drawCentredString(page_width / 2, 7 * mm, f"{page_number}/{page_count}")
-            overlay_canvas.save()
-            overlay_page = PdfReader(overlay_buffer).pages[0]
-            page.merge_page(overlay_page)
-            writer.add_page(page)
-
-        numbered_path = pdf_path.with_suffix(".numbered.pdf")
-        with numbered_path.open("wb") as output_file:
+        page_number = 0
+        for reader in readers:
+            for page in reader.pages:
+                page_number += 1
+                if page_number == 1 and cover_date_text:
+                    page.merge_page(self._cover_date_overlay(page, cover_date_text))
+                if number_pages:
+                    page.merge_page(self._page_number_overlay(page, page_number, page_count))
+                writer.add_page(page)
+        assembled_path = pdf_path.with_suffix(".assembled.pdf")
+        with assembled_path.open("wb") as output_file:
             writer.write(output_file)
-        numbered_path.replace(pdf_path)
+        assembled_path.replace(pdf_path)
+
+    def add_default_price_list_cover_date(self, pdf_path: Path, document: Document) -> None:
+        self.assemble_pdf(
+            pdf_path,
+            [pdf_path],
+            cover_date_text=self.get_price_list_effective_date_text(document),
+        )
+
+    def add_price_list_page_numbers(self, pdf_path: Path) -> None:
+        """Number the complete merged document, including the cover page."""
+        self.assemble_pdf(pdf_path, [pdf_path], number_pages=True)
 
     def build_pdf_html(self, document: Document, context: dict | None = None) -> str:
         css_content = self.get_css_content(document)
@@ -214,11 +244,83 @@ class DocumentPdfService(BaseService):
             "</html>"
         )
 
+    def get_pdf_workers(self) -> int:
+        return max(1, int(getattr(settings, "DOCUMENT_PDF_WORKERS", 1)))
+
+    def get_price_list_sections(self, document: Document, context: dict | None = None) -> list[dict]:
+        """Return the catalogue sections when the document can be rendered per section.
+
+        Each section is rendered with the document template on its own, so this
+        only applies to Jinja price lists built from ``price_list_catalog_sections()``
+        without an explicit context. The bundled template is rendered per section
+        unless the document type setting ``"pdf_sections"`` is ``false``. A custom
+        template may have content outside the section loop or a layout spanning
+        sections, so it has to opt in with ``"pdf_sections": true``.
+        """
+        if (
+            context is not None
+            or document.document_type != Document.DocumentType.PRICE_LIST
+            or not document.use_jinja2
+        ):
+            return []
+        pdf_sections = document.get_document_type_settings().get("pdf_sections")
+        if self.should_use_default_price_list_template(document):
+            if pdf_sections is False:
+                return []
+            template_source = self.get_default_price_list_template_source()
+        else:
+            if pdf_sections is not True:
+                return []
+            template_source = document.get_template_source()
+        if "price_list_catalog_sections(" not in template_source:
+            return []
+        from documents.jinja2_env import price_list_catalog_sections
+
+        return price_list_catalog_sections(document=document)
+
+    def render_price_list_section_pdfs(self, document: Document, sections: list[dict], cache_dir: Path) -> list[Path]:
+        """Render every section to its own PDF, reusing unchanged sections.
+
+        Section PDFs are cached by the hash of their HTML, which contains the
+        template, the CSS and the section rows. A price change therefore only
+        re-renders the section that lists the product. Missing sections are
+        rendered in a process pool. The pool forks, so the workers inherit the
+        configured Django process instead of re-importing this module.
+        """
+        base_url = str(settings.BASE_DIR)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        section_paths: list[Path] = []
+        pending: dict[Path, str] = {}
+        for section in sections:
+            html = self.build_pdf_html(
+                document,
+                {"price_list_catalog_sections": lambda *args, _section=section, **kwargs: [_section]},
+            )
+            section_key = hashlib.sha256(f"{base_url}\n{html}".encode("utf-8")).hexdigest()
+            section_path = cache_dir / f"{section_key}.pdf"
+            section_paths.append(section_path)
+            if not section_path.exists():
+                pending[section_path] = html
+
+        workers = min(self.get_pdf_workers(), len(pending))
+        # Celery prefork workers are daemonic and must not start child processes.
+        if workers > 1 and not multiprocessing.current_process().daemon:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as executor:
+                list(executor.map(_write_section_pdf, pending.values(), repeat(base_url), map(str, pending)))
+        else:
+            for section_path, html in pending.items():
+                _write_section_pdf(html, base_url, str(section_path))
+
+        used_paths = set(section_paths)
+        for cached_path in cache_dir.glob("*.pdf"):
+            if cached_path not in used_paths:
+                cached_path.unlink(missing_ok=True)
+        return section_paths
+
     def generate_pdf(self, document: Document, context: dict | None = None) -> Path:
         output_dir = self.get_output_dir()
         output_dir.mkdir(parents=True, exist_ok=True)
         pdf_path = output_dir / self.build_pdf_filename(document)
-        html = self.build_pdf_html(document, context)
 
         parts: list[Path] = []
         cover_pdf_path = self.get_cover_pdf_path(document)
@@ -231,29 +333,37 @@ class DocumentPdfService(BaseService):
             parts.append(cover_pdf_path)
 
         main_tmp = pdf_path.with_suffix(".main.pdf")
-        WeasyHTML(string=html, base_url=str(settings.BASE_DIR)).write_pdf(target=str(main_tmp))
-        parts.append(main_tmp)
+        sections = self.get_price_list_sections(document, context)
+        if sections:
+            parts.extend(
+                self.render_price_list_section_pdfs(
+                    document,
+                    sections,
+                    output_dir / self.price_list_section_cache_dirname / pdf_path.stem,
+                )
+            )
+        else:
+            html = self.build_pdf_html(document, context)
+            WeasyHTML(string=html, base_url=str(settings.BASE_DIR)).write_pdf(target=str(main_tmp))
+            parts.append(main_tmp)
 
         if document.end_pdf and document.end_pdf.name:
             parts.append(Path(document.end_pdf.path))
 
-        if len(parts) > 1:
-            writer = PdfWriter()
-            for part in parts:
-                reader = PdfReader(str(part))
-                for page in reader.pages:
-                    writer.add_page(page)
-            with open(pdf_path, "wb") as fh:
-                writer.write(fh)
+        is_price_list = document.document_type == Document.DocumentType.PRICE_LIST
+        if is_price_list or len(parts) > 1:
+            self.assemble_pdf(
+                pdf_path,
+                parts,
+                cover_date_text=(
+                    self.get_price_list_effective_date_text(document) if uses_default_price_list_cover else None
+                ),
+                number_pages=is_price_list,
+            )
             main_tmp.unlink(missing_ok=True)
         else:
             main_tmp.rename(pdf_path)
 
-        if document.document_type == Document.DocumentType.PRICE_LIST:
-            if uses_default_price_list_cover:
-                self.add_default_price_list_cover_date(pdf_path, document)
-            self.add_price_list_page_numbers(pdf_path)
-
         document.pdf_filename = pdf_path.name
         document.pdf_generated_at = timezone.now()
         document.save(update_fields=("pdf_filename", "pdf_generated_at", "updated_at"))
@@ -263,76 +373,21 @@ class DocumentPdfService(BaseService):
 class DocumentTemplateContextService(BaseService):
     model = Document
 
-    def _product_to_row(self, product) -> dict:
-        price_obj = product.prices.filter(sales_channel__is_default=True).first()
-        price = price_obj.price if price_obj else None
-        rebate_price = price_obj.rebate_price if price_obj else None
-        factor = product.factor or 1
-        unit = product.unit or "Stk"
-        cat2 = next(iter(product.categories.all()), None)
-        cat1 = cat2.parent if cat2 and hasattr(cat2, "parent") and cat2.parent else cat2
-
-        def fmt(val):
-            return f"{val:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".") + " EUR" if val else "-"
-
-        return {
-            "erp_nr": product.erp_nr,
-            "product_name": product.name,
-            "attributes": "",
-            "price": float(price) if price else None,
-            "price_display": fmt(price),
-            "price_source": "Standardpreis",
-            "rebate_quantity": None,
-            "rebate_quantity_display": "-",
-            "rebate_price": float(rebate_price) if rebate_price else None,
-            "rebate_price_display": fmt(rebate_price),
-            "vpe_display": f"{factor} {unit}",
-            "unit": unit,
-            "factor": factor,
-            "min_purchase": product.min_purchase or 1,
-            "purchase_unit": product.purchase_unit or 1,
-            "category_level1_name": cat1.name if cat1 else "",
-            "category_level1_id": cat1.pk if cat1 else None,
-            "category_level2_name": cat2.name if cat2 else "",
-            "category_level2_id": cat2.pk if cat2 else None,
-        }
-
     def build_preview_context(self, document: Document) -> dict:
-        from collections import defaultdict
-        from products.models import Product
+        from documents.price_list_dataset import PriceListDataset
 
         created_at = timezone.now()
-        products = list(
-            Product.objects.select_related("tax")
-            .prefetch_related("prices", "categories", "categories__parent")
-            .order_by("erp_nr")[:200]
-        )
-        rows = [self._product_to_row(p) for p in products]
-
-        sections_map: dict = defaultdict(lambda: defaultdict(list))
-        for row in rows:
-            sections_map[row["category_level1_name"]][row["category_level2_name"]].append(row)
-
-        category_sections = [
-            {
-                "category_name": cat1,
-                "groups": [
-                    {"category_name": cat2, "rows": grp_rows}
-                    for cat2, grp_rows in groups.items()
-                ],
-            }
-            for cat1, groups in sections_map.items()
-        ]
+        dataset = PriceListDataset.build(limit=200)
 
         return {
             "document": document,
             "css": DocumentPdfService().get_css_content(document),
-            "products": products,
+            "products": dataset.products,
             "created_at": created_at,
             "created_at_display": created_at.strftime("%d.%m.%Y"),
-            "row_count": len(rows),
-            "rows": rows,
-            "category_sections": category_sections,
+            "row_count": len(dataset.rows),
+            "rows": dataset.rows,
+            "category_sections": dataset.category_sections,
         }
 
     def get_model_variable_reference(self) -> list[dict]:
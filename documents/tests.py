@@ -530,6 +530,48 @@ class DocumentPriceListCatalogSectionsTest(TestCase):
         )
 
 
+class PriceListDatasetTest(TestCase):
+    def setUp(self):
+        from shopware.models import ShopwareSettings
+
+        self.default_channel = ShopwareSettings.objects.create(name="Standard", is_active=True, is_default=True)
+        self.other_channel = ShopwareSettings.objects.create(name="B2B", is_active=True)
+        section = Category.objects.create(name="Papier", slug="dataset-papier")
+        self.group = Category.objects.create(name="Kopierpapier", slug="dataset-kopierpapier", parent=section)
+
+    def _create_products(self, start: int, count: int) -> None:
+        for index in range(start, start + count):
+            product = Product.objects.create(erp_nr=f"D-{index:04d}", name=f"Artikel {index}", unit="Pack", factor=5)
+            product.categories.add(self.group)
+            Price.objects.create(product=product, sales_channel=self.other_channel, price="9.90")
+            Price.objects.create(product=product, sales_channel=self.default_channel, price="12.50", rebate_price="11.00")
+
+    def test_builds_rows_with_default_channel_prices_and_category_levels(self):
+        from documents.price_list_dataset import PriceListDataset
+
+        self._create_products(0, 1)
+
+        dataset = PriceListDataset.build()
+
+        row = dataset.rows[0]
+        self.assertEqual(row.price_display, "12,50 EUR")
+        self.assertEqual(row.rebate_price_display, "11,00 EUR")
+        self.assertEqual(row.vpe_display, "5 Pack")
+        self.assertEqual((row.category_level1_name, row.category_level2_name), ("Papier", "Kopierpapier"))
+        self.assertEqual(dataset.category_sections[0].groups[0].rows, [row])
+
+    def test_query_count_does_not_grow_with_the_product_count(self):
+        from documents.price_list_dataset import PriceListDataset
+
+        self._create_products(0, 2)
+        with self.assertNumQueries(3):
+            self.assertEqual(len(PriceListDataset.build().rows), 2)
+
+        self._create_products(2, 8)
+        with self.assertNumQueries(3):
+            self.assertEqual(len(PriceListDataset.build().rows), 10)
+
+
 class DocumentPdfServiceTest(SimpleTestCase):
     def test_build_pdf_filename_uses_slug(self):
         document = Document(slug="datenschutz", title="Datenschutzerklaerung")
@@ -620,6 +662,99 @@ class DocumentPdfServiceTest(SimpleTestCase):
             self.assertIn("1/2", reader.pages[0].extract_text())
             self.assertIn("2/2", reader.pages[1].extract_text())
 
+    def test_assemble_pdf_numbers_all_parts_in_one_pass(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            parts = []
+            for name, page_count in (("cover", 1), ("main", 2)):
+                part_path = Path(tmpdir) / f"{name}.pdf"
+                writer = PdfWriter()
+                for _ in range(page_count):
+                    writer.add_blank_page(width=595, height=842)
+                with part_path.open("wb") as output_file:
+                    writer.write(output_file)
+                parts.append(part_path)
+            pdf_path = Path(tmpdir) / "preisliste.pdf"
+
+            DocumentPdfService().assemble_pdf(pdf_path, parts, cover_date_text="ab 05/2026", number_pages=True)
+
+            reader = PdfReader(str(pdf_path))
+            self.assertEqual(len(reader.pages), 3)
+            self.assertIn("ab 05/2026", reader.pages[0].extract_text())
+            self.assertIn("1/3", reader.pages[0].extract_text())
+            self.assertIn("3/3", reader.pages[2].extract_text())
+            self.assertNotIn("ab 05/2026", reader.pages[1].extract_text())
+
+    def test_custom_price_list_templates_render_per_section_only_when_enabled(self):
+        document = Document(
+            document_type=Document.DocumentType.PRICE_LIST,
+            title="Preisliste",
+            html_content="{% for section in price_list_catalog_sections() %}{{ section.name }}{% endfor %}",
+        )
+        sections = [{"name": "Ordner", "groups": []}]
+        service = DocumentPdfService()
+
+        with patch("documents.jinja2_env.price_list_catalog_sections", return_value=sections):
+            with patch.object(Document, "get_document_type_settings", return_value={}):
+                self.assertEqual(service.get_price_list_sections(document), [])
+            with patch.object(Document, "get_document_type_settings", return_value={"pdf_sections": True}):
+                self.assertEqual(service.get_price_list_sections(document), sections)
+
+    def test_default_price_list_template_renders_per_section_unless_disabled(self):
+        document = Document(document_type=Document.DocumentType.PRICE_LIST, title="Preisliste", html_content="")
+        sections = [{"name": "Ordner", "groups": []}]
+        service = DocumentPdfService()
+
+        with patch("documents.jinja2_env.price_list_catalog_sections", return_value=sections):
+            with patch.object(Document, "get_document_type_settings", return_value={}):
+                self.assertEqual(service.get_price_list_sections(document), sections)
+            with patch.object(Document, "get_document_type_settings", return_value={"pdf_sections": False}):
+                self.assertEqual(service.get_price_list_sections(document), [])
+
+    @override_settings(DOCUMENT_PDF_WORKERS=1)
+    def test_price_list_sections_are_cached_and_only_changed_sections_rerender(self):
+        document = Document(
+            document_type=Document.DocumentType.PRICE_LIST,
+            title="Preisliste",
+            css_content="body { margin: 0; }",
+            html_content=(
+                "{% for section in price_list_catalog_sections() %}"
+                "<p>{{ section.name }}: {{ section.groups[0].rows[0].price_display }}</p>"
+                "{% endfor %}"
+            ),
+        )
+
+        def section(name, price_display):
+            return {"name": name, "groups": [{"name": "Gruppe", "rows": [{"price_display": price_display}]}]}
+
+        rendered_html = []
+
+        def write_section_pdf(html, base_url, target):
+            rendered_html.append(html)
+            writer = PdfWriter()
+            writer.add_blank_page(width=595, height=842)
+            with open(target, "wb") as output_file:
+                writer.write(output_file)
+            return target
+
+        with tempfile.TemporaryDirectory() as tmpdir, patch(
+            "documents.services._write_section_pdf", side_effect=write_section_pdf
+        ):
+            cache_dir = Path(tmpdir) / "sections"
+            service = DocumentPdfService()
+            first_paths = service.render_price_list_section_pdfs(
+                document, [section("Ordner", "1,00 €"), section("Mappen", "2,00 €")], cache_dir
+            )
+            second_paths = service.render_price_list_section_pdfs(
+                document, [section("Ordner", "1,00 €"), section("Mappen", "2,50 €")], cache_dir
+            )
+
+            self.assertEqual(len(rendered_html), 3)
+            self.assertIn("Mappen: 2,50 €", rendered_html[-1])
+            self.assertNotIn("Ordner", rendered_html[-1])
+            self.assertEqual(first_paths[0], second_paths[0])
+            self.assertNotEqual(first_paths[1], second_paths[1])
+            self.assertEqual(sorted(cache_dir.glob("*.pdf")), sorted(second_paths))
+
 
 class DocumentShopwareUploadServiceTest(SimpleTestCase):
     def test_upload_pdf_keeps_the_existing_shopware_media_folder_without_a_selection(self):
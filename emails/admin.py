@@ -37,6 +37,11 @@ _PRODUCT_FIELD_EXCLUDES = {
     "created_at",
     "updated_at",
     "shopware_image_sync_hash",
+    "shopware_sync_hash",
+    "shopware_price_sync_hash",
+    "microtech_unit_raw",
+    "microtech_name",
+    "microtech_article_cached_at",
 }
 _PRODUCT_EMAIL_FIELDS = (
     ("product.price", "Listenpreis aus dem passenden Verkaufskanal"),
@@ -807,7 +812,7 @@ class EmailCampaignAdmin(BaseAdmin):
         try:
             preview_recipient = _latest_active_preview_recipient()
             mjml = render_campaign_mjml(campaign, recipient=preview_recipient)
-            html = compile_mjml_to_html(mjml)
+            html = compile_mjml_to_html(mjml, cache=True)
             text = html_to_plain_text(html)
         except Exception:
             logger.exception("MJML export failed for campaign %s", campaign_id)
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import html as html_lib
+import logging
 import os
 import re
 import shutil
 import subprocess
 import tempfile
+from dataclasses import dataclass
 from decimal import Decimal, ROUND_UP
 from types import SimpleNamespace
 from typing import TYPE_CHECKING, Iterable
@@ -12,12 +15,16 @@ from urllib.parse import quote_plus
 
 import jinja2
 from bs4 import BeautifulSoup
+from jinja2 import nodes as jinja_nodes
+from django.conf import settings
 from django.template.loader import render_to_string
 
 if TYPE_CHECKING:
     from emails.models import EmailCampaign, EmailCampaignComponent
     from newsletter.models import NewsletterRecipient
 
+logger = logging.getLogger(__name__)
+
 
 def _format_price(value, decimals: int = 2) -> str:
     if value is None:
@@ -461,8 +468,13 @@ def render_campaign_mjml(
     campaign: "EmailCampaign",
     *,
     recipient: "NewsletterRecipient | None" = None,
+    recipient_variables: dict | None = None,
 ) -> str:
-    """Renders a campaign to a MJML string using Jinja2 component templates."""
+    """Renders a campaign to a MJML string using Jinja2 component templates.
+
+    ``recipient_variables`` replaces the variables built from ``recipient``;
+    ``compile_campaign`` uses it to render placeholder tokens.
+    """
     sales_channel_ids = _campaign_sales_channel_ids(campaign)
 
     components = _campaign_components(campaign)
@@ -482,7 +494,7 @@ def render_campaign_mjml(
     base_context = {
         "products": products,
         "_sales_channel_ids": sales_channel_ids,
-        **recipient_context(recipient),
+        **(recipient_variables if recipient_variables is not None else recipient_context(recipient)),
         **campaign_offer_context(products),
     }
     child_map = _component_children_map(components)
@@ -510,7 +522,172 @@ def render_campaign_mjml(
     return render_to_string("emails/newsletter_base.mjml", context)
 
 
-def compile_mjml_to_html(mjml_string: str) -> str:
+_RECIPIENT_VARIABLE_NAMES = frozenset({"recipient", "newsletter_recipient", "customer", "is_customer"})
+_RECIPIENT_TOKEN_RE = re.compile(r"\[\[gc-recipient:(\d+)\]\]")
+
+
+def _recipient_variable_path(node) -> tuple | None:
+    """``recipient.customer.erp_nr`` -> ``("recipient", ("attr", "customer"), ("attr", "erp_nr"))``."""
+    steps = []
+    while True:
+        if isinstance(node, jinja_nodes.Getattr):
+            steps.append(("attr", node.attr))
+            node = node.node
+        elif isinstance(node, jinja_nodes.Getitem) and isinstance(node.arg, jinja_nodes.Const):
+            steps.append(("item", node.arg.value))
+            node = node.node
+        elif isinstance(node, jinja_nodes.Name) and node.name in _RECIPIENT_VARIABLE_NAMES:
+            return (node.name, *reversed(steps))
+        else:
+            return None
+
+
+def markup_uses_recipient_structure(markup: str) -> bool:
+    """True if recipient variables are used other than as plain ``{{ recipient.field }}`` output.
+
+    Conditions, loops, filters or assignments on recipient data change the
+    MJML structure per recipient, so such campaigns cannot be compiled once.
+    """
+    try:
+        template = _jinja_env.parse(normalize_hyphenated_placeholders(markup))
+    except jinja2.TemplateSyntaxError:
+        # Rendering swallows the same error and yields "" for every recipient.
+        return False
+
+    plain_names: set[int] = set()
+    for output in template.find_all(jinja_nodes.Output):
+        for child in output.nodes:
+            if _recipient_variable_path(child) is None:
+                continue
+            node = child
+            while not isinstance(node, jinja_nodes.Name):
+                node = node.node
+            plain_names.add(id(node))
+
+    return any(
+        name.name in _RECIPIENT_VARIABLE_NAMES and id(name) not in plain_names
+        for name in template.find_all(jinja_nodes.Name)
+    )
+
+
+def campaign_uses_recipient_structure(campaign: "EmailCampaign") -> bool:
+    for component in _campaign_components(campaign):
+        library_component = getattr(component, "library_component", None)
+        if library_component is None or getattr(library_component, "rendering_mode", "jinja") == "shopware":
+            continue
+        if markup_uses_recipient_structure(library_component.mjml_markup or ""):
+            return True
+    return False
+
+
+class _RecipientPlaceholder:
+    """Stands in for recipient variables and renders as a token naming its access path."""
+
+    def __init__(self, paths: list[tuple], path: tuple):
+        self._paths = paths
+        self._path = path
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return _RecipientPlaceholder(self._paths, (*self._path, ("attr", name)))
+
+    def __getitem__(self, key):
+        return _RecipientPlaceholder(self._paths, (*self._path, ("item", key)))
+
+    def __str__(self) -> str:
+        self._paths.append(self._path)
+        return f"[[gc-recipient:{len(self._paths) - 1}]]"
+
+
+def _resolve_recipient_path(variables: dict, path: tuple) -> str:
+    """Resolves a token path exactly like Jinja would have rendered ``{{ path }}``."""
+    value = variables.get(path[0])
+    for kind, key in path[1:]:
+        value = _jinja_env.getattr(value, key) if kind == "attr" else _jinja_env.getitem(value, key)
+    return str(value)
+
+
+@dataclass(frozen=True)
+class CompiledCampaign:
+    """Campaign compiled to HTML once; recipient fields are tokens substituted per recipient."""
+
+    campaign_id: int | None
+    mjml: str
+    html: str
+    text: str
+    paths: tuple[tuple, ...]
+
+    def render(self, recipient: "NewsletterRecipient | None") -> tuple[str, str, str]:
+        """Returns ``(mjml, html, text)``; values are HTML-escaped except in the plain text."""
+        variables = recipient_context(recipient)
+        values = [_resolve_recipient_path(variables, path) for path in self.paths]
+        escaped = [html_lib.escape(value, quote=True) for value in values]
+
+        def substitute(markup: str, replacements: list[str]) -> str:
+            return _RECIPIENT_TOKEN_RE.sub(lambda match: replacements[int(match.group(1))], markup)
+
+        return (
+            substitute(self.mjml, escaped),
+            substitute(self.html, escaped),
+            substitute(self.text, values),
+        )
+
+
+def compile_campaign(campaign: "EmailCampaign") -> CompiledCampaign | None:
+    """Compiles a campaign once for all recipients.
+
+    Returns ``None`` when a component uses recipient data structurally; callers
+    then render and compile per recipient.
+    """
+    if campaign_uses_recipient_structure(campaign):
+        return None
+    paths: list[tuple] = []
+    recipient_variables = {
+        name: _RecipientPlaceholder(paths, (name,))
+        for name in _RECIPIENT_VARIABLE_NAMES
+    }
+    mjml = render_campaign_mjml(campaign, recipient_variables=recipient_variables)
+    html = compile_mjml_to_html(mjml, cache=True)
+    return CompiledCampaign(
+        campaign_id=getattr(campaign, "pk", None),
+        mjml=mjml,
+        html=html,
+        text=html_to_plain_text(html),
+        paths=tuple(paths),
+    )
+
+
+def compile_mjml_to_html(mjml_string: str, *, cache: bool = False) -> str:
+    """Compiles a MJML string to HTML.
+
+    Compiled by the persistent worker pool; the MJML CLI is the fallback.
+    With ``cache`` the result is served from and stored in the content-hash
+    cache. Only pass it for documents that are compiled again, such as the
+    campaign template and previews; one-off documents would only fill Redis.
+    """
+    from emails.mjml_pool import html_cache, mjml_cache_key, worker_pool
+
+    cache_key = mjml_cache_key(mjml_string) if cache else None
+    if cache_key is not None:
+        html = html_cache.get(cache_key)
+        if html is not None:
+            return html
+
+    html = None
+    if int(settings.MJML_WORKER_POOL_SIZE) > 0:
+        try:
+            html = worker_pool.compile(mjml_string)
+        except Exception as exc:
+            logger.warning("MJML worker pool failed, falling back to the CLI: %s", exc)
+    if html is None:
+        html = _compile_mjml_cli(mjml_string)
+    if cache_key is not None:
+        html_cache.set(cache_key, html)
+    return html
+
+
+def _compile_mjml_cli(mjml_string: str) -> str:
     """Compiles a MJML string to HTML using the MJML CLI."""
     with tempfile.NamedTemporaryFile(suffix=".mjml", mode="w", encoding="utf-8", delete=False) as f:
         f.write(mjml_string)
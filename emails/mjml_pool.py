@@ -0,0 +1,244 @@
+"""Persistent MJML compiler processes and a content-hash cache for compiled HTML.
+
+Every ``mjml``/``npx mjml`` call starts a new Node process, and resolving the
+CLI often costs more than the compile itself. This module keeps up to
+``MJML_WORKER_POOL_SIZE`` Node workers (``mjml_worker.js``) per process alive
+and talks to them with line-delimited JSON over stdin/stdout. Crashed or hung
+workers are killed and replaced on the next compile; callers fall back to the
+CLI when the pool is unavailable.
+
+Reusable compiles (see ``compile_mjml_to_html(cache=True)``) are cached by
+the SHA-256 of MJML source and options, in an in-process LRU and in Redis
+(shared by all Gunicorn and Celery workers, short TTL). Both caches are best
+effort.
+"""
+from __future__ import annotations
+
+import atexit
+import hashlib
+import itertools
+import json
+import logging
+import os
+import select
+import shutil
+import subprocess
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+
+from core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+WORKER_SCRIPT = Path(__file__).with_name("mjml_worker.js")
+CACHE_KEY_PREFIX = "emails:mjml-html"
+DEFAULT_OPTIONS = {"validationLevel": "soft"}
+
+
+class MjmlWorkerError(RuntimeError):
+    pass
+
+
+def mjml_cache_key(mjml_string: str, options: dict | None = None) -> str:
+    payload = json.dumps(
+        {"mjml": mjml_string, "options": {**DEFAULT_OPTIONS, **(options or {})}},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompiledHtmlCache:
+    """LRU in front of Redis; ``MJML_CACHE_SIZE``/``MJML_CACHE_SECONDS`` = 0 disables a level."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                return html
+        if int(settings.MJML_CACHE_SECONDS) <= 0:
+            return None
+        try:
+            html = get_redis().get(f"{CACHE_KEY_PREFIX}:{key}")
+        except Exception:
+            logger.warning("MJML cache read from Redis failed.", exc_info=False)
+            return None
+        if html is not None:
+            self._remember(key, html)
+        return html
+
+    def set(self, key: str, html: str) -> None:
+        self._remember(key, html)
+        if int(settings.MJML_CACHE_SECONDS) <= 0:
+            return
+        try:
+            get_redis().set(f"{CACHE_KEY_PREFIX}:{key}", html, ex=int(settings.MJML_CACHE_SECONDS))
+        except Exception:
+            logger.warning("MJML cache write to Redis failed.", exc_info=False)
+
+    def _remember(self, key: str, html: str) -> None:
+        size = int(settings.MJML_CACHE_SIZE)
+        if size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class _MjmlWorker:
+    def __init__(self, command: list[str], env: dict[str, str]) -> None:
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env=env,
+        )
+        self._ids = itertools.count(1)
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def compile(self, mjml_string: str, options: dict, timeout: float) -> str:
+        request_id = next(self._ids)
+        line = json.dumps({"id": request_id, "mjml": mjml_string, "options": options}) + "\n"
+        try:
+            self.process.stdin.write(line.encode("utf-8"))
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as exc:
+            raise MjmlWorkerError(f"MJML worker not writable: {exc}") from exc
+
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            raise MjmlWorkerError(f"MJML worker timed out after {timeout}s.")
+        raw = self.process.stdout.readline()
+        if not raw:
+            raise MjmlWorkerError("MJML worker exited.")
+        try:
+            response = json.loads(raw)
+        except ValueError as exc:
+            raise MjmlWorkerError("MJML worker sent invalid JSON.") from exc
+        if response.get("id") != request_id:
+            raise MjmlWorkerError("MJML worker answered out of order.")
+        if response.get("error"):
+            raise MjmlWorkerError(str(response["error"]))
+        return response.get("html") or ""
+
+    def stop(self) -> None:
+        if self.alive:
+            self.process.kill()
+        try:
+            self.process.wait(timeout=1)
+        except Exception:
+            pass
+
+
+class MjmlWorkerPool:
+    """Per-process pool; a forked child (Gunicorn/Celery prefork) starts its own workers."""
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._idle: list[_MjmlWorker] = []
+        self._busy = 0
+        self._pid = os.getpid()
+        self._env: dict[str, str] | None = None
+
+    def _reset_after_fork(self) -> None:
+        if self._pid != os.getpid():
+            # Pipes belong to the parent's workers; never share them.
+            self._idle = []
+            self._busy = 0
+            self._pid = os.getpid()
+
+    def _worker_env(self) -> dict[str, str]:
+        if self._env is None:
+            env = dict(os.environ)
+            node_path = settings.MJML_NODE_PATH
+            if not node_path and shutil.which("npm"):
+                # The Docker image installs mjml globally (npm install -g).
+                try:
+                    node_path = subprocess.run(
+                        ["npm", "root", "-g"], check=True, capture_output=True, text=True, timeout=10,
+                    ).stdout.strip()
+                except Exception:
+                    node_path = ""
+            if node_path:
+                env["NODE_PATH"] = os.pathsep.join(filter(None, [node_path, env.get("NODE_PATH", "")]))
+            self._env = env
+        return self._env
+
+    def _spawn(self) -> _MjmlWorker:
+        node = shutil.which("node")
+        if node is None:
+            raise MjmlWorkerError("node is not installed.")
+        return _MjmlWorker([node, str(WORKER_SCRIPT)], self._worker_env())
+
+    def _acquire(self, timeout: float) -> _MjmlWorker:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._reset_after_fork()
+            while True:
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.alive:
+                        self._busy += 1
+                        return worker
+                    worker.stop()
+                if self._busy < int(settings.MJML_WORKER_POOL_SIZE):
+                    self._busy += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise MjmlWorkerError("No MJML worker available.")
+                self._condition.wait(remaining)
+        try:
+            return self._spawn()
+        except Exception:
+            self._release(None)
+            raise
+
+    def _release(self, worker: _MjmlWorker | None) -> None:
+        with self._condition:
+            self._busy = max(0, self._busy - 1)
+            if worker is not None and worker.alive and self._pid == os.getpid():
+                self._idle.append(worker)
+            self._condition.notify()
+
+    def compile(self, mjml_string: str, options: dict | None = None) -> str:
+        timeout = float(settings.MJML_WORKER_TIMEOUT_SECONDS)
+        worker = self._acquire(timeout)
+        try:
+            html = worker.compile(mjml_string, {**DEFAULT_OPTIONS, **(options or {})}, timeout)
+        except Exception:
+            worker.stop()
+            self._release(None)
+            raise
+        self._release(worker)
+        return html
+
+    def shutdown(self) -> None:
+        with self._condition:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            worker.stop()
+
+
+html_cache = CompiledHtmlCache()
+worker_pool = MjmlWorkerPool()
+atexit.register(worker_pool.shutdown)
@@ -0,0 +1,34 @@
+// emails/mjml_worker.js
+// Long-lived MJML compiler for emails.mjml_pool: reads one JSON request per
+// line from stdin ({"id", "mjml", "options"}) and answers with one JSON line
+// ({"id", "html", "errors"} or {"id", "error"}). Uses the locally installed
+// mjml package, no network access.
+'use strict';
+
+const readline = require('readline');
+const mjml2html = require('mjml');
+
+function write(payload) {
+  process.stdout.write(JSON.stringify(payload) + '\n');
+}
+
+readline.createInterface({ input: process.stdin, terminal: false }).on('line', (line) => {
+  let request;
+  try {
+    request = JSON.parse(line);
+  } catch (err) {
+    write({ id: null, error: 'invalid request: ' + err.message });
+    return;
+  }
+  try {
+    const options = Object.assign({ validationLevel: 'soft' }, request.options || {});
+    const result = mjml2html(request.mjml || '', options);
+    write({
+      id: request.id,
+      html: result.html,
+      errors: (result.errors || []).map((error) => error.formattedMessage || error.message),
+    });
+  } catch (err) {
+    write({ id: request.id, error: String((err && err.message) || err) });
+  }
+});
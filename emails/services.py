@@ -9,7 +9,13 @@ from django.db import transaction
 from django.utils import timezone
 
 from core.services import BaseService
-from emails.mjml import compile_mjml_to_html, html_to_plain_text, render_campaign_mjml
+from emails.mjml import (
+    CompiledCampaign,
+    compile_campaign,
+    compile_mjml_to_html,
+    html_to_plain_text,
+    render_campaign_mjml,
+)
 from emails.models import EmailCampaign, EmailCampaignQueueEntry
 
 logger = logging.getLogger(__name__)
@@ -103,11 +109,12 @@ class EmailCampaignQueueService(BaseService):
             "queued": 0,
             "failed": 0,
         }
+        compiled = self._compile_campaign(campaign)
 
         for recipient in recipients.iterator():
             summary["recipients"] += 1
             try:
-                self.queue_recipient_campaign(recipient)
+                self.queue_recipient_campaign(recipient, compiled=compiled)
                 summary["queued"] += 1
             except Exception:
                 summary["failed"] += 1
@@ -119,8 +126,22 @@ class EmailCampaignQueueService(BaseService):
 
         return summary
 
+    @staticmethod
+    def _compile_campaign(campaign: EmailCampaign) -> CompiledCampaign | None:
+        """Compiles the campaign once; ``None`` falls back to one MJML compile per recipient."""
+        try:
+            return compile_campaign(campaign)
+        except Exception:
+            logger.exception("Failed to precompile email campaign %s, compiling per recipient.", campaign.pk)
+            return None
+
     @transaction.atomic
-    def queue_recipient_campaign(self, recipient) -> EmailCampaignQueueEntry:
+    def queue_recipient_campaign(
+        self,
+        recipient,
+        *,
+        compiled: CompiledCampaign | None = None,
+    ) -> EmailCampaignQueueEntry:
         campaign = recipient.selected_email_campaign
 
         if campaign is None:
@@ -130,9 +151,12 @@ class EmailCampaignQueueService(BaseService):
         if not recipient.is_active_status:
             raise ValueError(f"Empfaenger ist nicht aktiv (Status: {recipient.status or '-'}).")
 
-        mjml = render_campaign_mjml(campaign, recipient=recipient)
-        html = compile_mjml_to_html(mjml)
-        text = html_to_plain_text(html)
+        if compiled is not None and compiled.campaign_id == campaign.pk:
+            mjml, html, text = compiled.render(recipient)
+        else:
+            mjml = render_campaign_mjml(campaign, recipient=recipient)
+            html = compile_mjml_to_html(mjml)
+            text = html_to_plain_text(html)
 
         entry = (
             self.model.objects.select_for_update()
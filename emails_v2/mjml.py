@@ -1,5 +1,9 @@
 from __future__ import annotations
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import lru_cache
 from html import escape
+import re
 import jinja2
 from urllib.parse import quote_plus
 
@@ -16,10 +20,34 @@ _jinja_env.filters["urlencode"] = lambda value: quote_plus(str(value or ""))
 _jinja_env.filters["format_price"] = lambda value, decimals=2: "" if value is None else f"{value:.{decimals}f}"
 _jinja_env.filters["format_date"] = _format_date
 
+# Placeholder in the preview shell where the pre-compiled blocks are spliced in.
+PREVIEW_BLOCKS_MARKER = "<!-- gc-preview-blocks -->"
+_BODY_WRAPPER_RE = re.compile(r"<body[^>]*>\s*<div[^>]*>(?P<inner>.*)</div>\s*</body>", re.S | re.I)
+_HEAD_RE = re.compile(r"<head[^>]*>(?P<inner>.*)</head>", re.S | re.I)
+_HEAD_CHUNK_RE = re.compile(
+    r"<!--\[if[^\]]*\]>.*?<!\[endif\]-->|<style[^>]*>.*?</style>|<link[^>]*>",
+    re.S | re.I,
+)
+
+
+class PreviewSuperseded(Exception):
+    """A newer preview request from the same editor made this one obsolete."""
+
+
+@dataclass(frozen=True)
+class PreviewFragment:
+    head_chunks: tuple[str, ...]
+    body: str
+
+
+@lru_cache(maxsize=512)
+def _template(source: str) -> jinja2.Template:
+    return _jinja_env.from_string(source)
+
 
 def _render_value(value: object, context: dict) -> str:
     try:
-        return _jinja_env.from_string(str(value)).render(context)
+        return _template(str(value)).render(context)
     except Exception:
         return str(value)
 
@@ -59,7 +87,7 @@ def _render_block(
         if getattr(block.component, "rendering_mode", "jinja") == "shopware":
             return markup
         try:
-            return _jinja_env.from_string(markup).render(block_context)
+            return _template(markup).render(block_context)
         except Exception:
             return ""
 
@@ -72,7 +100,16 @@ def _render_block(
     return f"<{block.tag}{attrs}>{inner}</{block.tag}>"
 
 
-def build_mjml_from_blocks(campaign: EmailBuilderCampaign) -> str:
+def _head_markup(campaign: EmailBuilderCampaign) -> str:
+    return f"<mj-style>{campaign.global_css}</mj-style>" if campaign.global_css.strip() else ""
+
+
+def _mjml_document(head: str, body: str) -> str:
+    return f"<mjml><mj-head>{head}</mj-head><mj-body>{body}</mj-body></mjml>"
+
+
+def render_block_fragments(campaign: EmailBuilderCampaign) -> list[str]:
+    """MJML of each top-level block, in display order."""
     campaign_products = list(
         campaign.campaign_products.select_related("product").order_by("order", "id")
     )
@@ -97,11 +134,70 @@ def build_mjml_from_blocks(campaign: EmailBuilderCampaign) -> str:
         child_map.setdefault(block.parent_id, []).append(block)
 
     top_blocks = sorted(child_map.get(None, []), key=lambda b: (b.order, b.id))
-    body_inner = "".join(_render_block(b, child_map, context, product_map) for b in top_blocks)
+    return [_render_block(b, child_map, context, product_map) for b in top_blocks]
 
-    css_block = f"<mj-style>{campaign.global_css}</mj-style>" if campaign.global_css.strip() else ""
-    return f"<mjml><mj-head>{css_block}</mj-head><mj-body>{body_inner}</mj-body></mjml>"
 
-
-def render_campaign_preview(campaign: EmailBuilderCampaign) -> str:
-    return compile_mjml_to_html(build_mjml_from_blocks(campaign))
+def build_mjml_from_blocks(campaign: EmailBuilderCampaign) -> str:
+    return _mjml_document(_head_markup(campaign), "".join(render_block_fragments(campaign)))
+
+
+def _head_chunks(html: str) -> tuple[str, ...]:
+    match = _HEAD_RE.search(html)
+    if match is None:
+        raise ValueError("MJML output has no <head>.")
+    return tuple(_HEAD_CHUNK_RE.findall(match.group("inner")))
+
+
+@lru_cache(maxsize=256)
+def _compile_fragment(head: str, block_mjml: str) -> PreviewFragment:
+    # Each block is compiled on its own; compile_mjml_to_html additionally caches
+    # by content hash across processes.
+    html = compile_mjml_to_html(_mjml_document(head, block_mjml), cache=True)
+    match = _BODY_WRAPPER_RE.search(html)
+    if match is None:
+        raise ValueError("MJML output has no body wrapper.")
+    return PreviewFragment(head_chunks=_head_chunks(html), body=match.group("inner"))
+
+
+@lru_cache(maxsize=32)
+def _compile_shell(head: str) -> str:
+    html = compile_mjml_to_html(_mjml_document(head, f"<mj-raw>{PREVIEW_BLOCKS_MARKER}</mj-raw>"), cache=True)
+    if PREVIEW_BLOCKS_MARKER not in html or "</head>" not in html:
+        raise ValueError("MJML preview shell lost its marker.")
+    return html
+
+
+def _splice_preview(shell: str, fragments: list[PreviewFragment]) -> str:
+    known = set(_head_chunks(shell))
+    extra_head: list[str] = []
+    for fragment in fragments:
+        for chunk in fragment.head_chunks:
+            if chunk not in known:
+                known.add(chunk)
+                extra_head.append(chunk)
+    html = shell.replace(PREVIEW_BLOCKS_MARKER, "".join(fragment.body for fragment in fragments), 1)
+    return html.replace("</head>", "".join(extra_head) + "</head>", 1)
+
+
+def render_campaign_preview(
+    campaign: EmailBuilderCampaign,
+    *,
+    is_superseded: Callable[[], bool] | None = None,
+) -> str:
+    """Builds the preview from separately compiled blocks spliced into a cached shell.
+
+    Only changed blocks go through MJML again. ``is_superseded`` is checked before
+    each block and aborts with ``PreviewSuperseded``. If the output cannot be
+    split, the whole campaign is compiled at once.
+    """
+    head = _head_markup(campaign)
+    block_fragments = render_block_fragments(campaign)
+    try:
+        fragments = []
+        for block_mjml in block_fragments:
+            if is_superseded is not None and is_superseded():
+                raise PreviewSuperseded()
+            fragments.append(_compile_fragment(head, block_mjml))
+        return _splice_preview(_compile_shell(head), fragments)
+    except ValueError:
+        return compile_mjml_to_html(_mjml_document(head, "".join(block_fragments)), cache=True)
@@ -0,0 +1,62 @@
+"""Request coalescing for the editor preview.
+
+Each editor tab sends a client id and an increasing sequence number with its
+preview requests. The highest number per campaign and client is kept in Redis;
+a render that sees a higher number stops early instead of finishing work that
+the browser has already discarded. Best effort: without Redis nothing is
+dropped.
+"""
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+
+from core.redis_client import get_redis, registered_script
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_SEQ_KEY_PREFIX = "emails_v2:preview-seq"
+PREVIEW_SEQ_TTL_SECONDS = 300
+
+# Stores the sequence number if it is the highest so far and returns the highest.
+_CLAIM_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local seq = tonumber(ARGV[1])
+if seq > current then
+  redis.call('SET', KEYS[1], seq, 'EX', ARGV[2])
+  return seq
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return current
+"""
+
+
+def claim_preview(campaign_id: int, client_id: str | None, seq: str | None) -> Callable[[], bool] | None:
+    """Registers a preview request and returns its ``is_superseded`` check.
+
+    Returns ``None`` for requests without client id/sequence number or when
+    Redis is unavailable.
+    """
+    if not client_id or not seq:
+        return None
+    try:
+        seq_number = int(seq)
+    except ValueError:
+        return None
+    key = f"{PREVIEW_SEQ_KEY_PREFIX}:{campaign_id}:{client_id[:64]}"
+    try:
+        client = get_redis()
+        latest = int(registered_script(client, _CLAIM_SCRIPT)(keys=[key], args=[seq_number, PREVIEW_SEQ_TTL_SECONDS]))
+    except Exception:
+        logger.warning("Preview sequence for campaign %s could not be stored.", campaign_id)
+        return None
+    if latest > seq_number:
+        return lambda: True
+
+    def is_superseded() -> bool:
+        try:
+            return int(client.get(key) or 0) > seq_number
+        except Exception:
+            return False
+
+    return is_superseded
@@ -8,7 +8,8 @@ from django.views.decorators.http import require_http_methods
 from emails.models import MjmlComponent
 from emails_v2.catalog import MJML_TAGS, MJML_TAG_MAP
 from emails_v2.models import EmailBuilderCampaign, EmailBlock, EmailBuilderCampaignProduct
-from emails_v2.mjml import render_campaign_preview
+from emails_v2.mjml import PreviewSuperseded, render_campaign_preview
+from emails_v2.preview import claim_preview
 from emails_v2.variable_parser import infer_field_type
 
 
@@ -403,8 +404,15 @@ def htmx_block_product_update(request, block_id):
 @require_http_methods(["POST"])
 def htmx_preview(request, campaign_id):
     campaign = get_object_or_404(EmailBuilderCampaign, pk=campaign_id)
+    is_superseded = claim_preview(
+        campaign.pk,
+        request.headers.get("X-Preview-Client"),
+        request.headers.get("X-Preview-Seq"),
+    )
     try:
-        html = render_campaign_preview(campaign)
+        html = render_campaign_preview(campaign, is_superseded=is_superseded)
+    except PreviewSuperseded:
+        return HttpResponse(status=204)
     except Exception as e:
         html = f"<html><body><p style='color:red'>Preview-Fehler: {e}</p></body></html>"
     return HttpResponse(html)
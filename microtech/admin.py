@@ -1,6 +1,7 @@
 from django.contrib import admin, messages
 from django.db import models
 from django.http import HttpResponseRedirect, JsonResponse
+from django.template.response import TemplateResponse
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.urls import reverse
@@ -359,6 +360,9 @@ class MicrotechOrderRuleAdmin(BaseAdmin):
     ordering = ("priority", "id")
     inlines = (ConditionInline, ActionInline)
     readonly_fields = BaseAdmin.readonly_fields + ("live_rule_summary",)
+    actions = ("simulate_selected_rules",)
+    # Obergrenze fuer die Simulation im Request; groessere Laeufe ueber simulate_order_rules.
+    SIMULATION_ORDER_LIMIT = 5000
 
     class Media:
         js = ("microtech/js/order_rule_builder.js",)
@@ -455,6 +459,39 @@ class MicrotechOrderRuleAdmin(BaseAdmin):
         }
         return JsonResponse(payload)
 
+    @admin.action(description="Was-waere-wenn: Auswahl umschalten und gegen Bestellungen pruefen")
+    def simulate_selected_rules(self, request, queryset):
+        from orders.services import OrderRuleSimulationService
+
+        selected = list(queryset.order_by("priority", "id"))
+        enable_rule_ids = [rule.pk for rule in selected if not rule.is_active]
+        disable_rule_ids = [rule.pk for rule in selected if rule.is_active]
+        try:
+            result = OrderRuleSimulationService().simulate(
+                enable_rule_ids=enable_rule_ids,
+                disable_rule_ids=disable_rule_ids,
+                limit=self.SIMULATION_ORDER_LIMIT,
+            )
+        except Exception as exc:
+            self.message_user(request, f"Simulation fehlgeschlagen: {exc}", level=messages.ERROR)
+            return None
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": "Regel-Simulation",
+            "opts": self.model._meta,
+            "enabled_rules": [rule for rule in selected if rule.pk in enable_rule_ids],
+            "disabled_rules": [rule for rule in selected if rule.pk in disable_rule_ids],
+            "order_limit": self.SIMULATION_ORDER_LIMIT,
+            "result": result,
+            "transitions": [
+                {"from_label": from_label, "to_label": to_label, "orders": count}
+                for (from_label, to_label), count in result.transitions.most_common()
+            ],
+            "changelist_url": reverse("admin:microtech_microtechorderrule_changelist"),
+        }
+        return TemplateResponse(request, "admin/microtech/order_rule_simulation.html", context)
+
     @admin.display(description="Live-Zusammenfassung")
     def live_rule_summary(self, obj):
         # Statisches Markup ohne Interpolation; format_html ohne Argumente
@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_migrate
+from django.db.models.signals import post_delete, post_migrate, post_save
 from django.utils.translation import gettext_lazy as _
 
 
@@ -9,8 +9,19 @@ class MicrotechConfig(AppConfig):
     verbose_name = _("Microtech")
 
     def ready(self) -> None:
+        from microtech.models import (
+            MicrotechDatasetCatalog,
+            MicrotechDatasetField,
+            MicrotechOrderRule,
+            MicrotechOrderRuleAction,
+            MicrotechOrderRuleCondition,
+            MicrotechOrderRuleDjangoField,
+            MicrotechOrderRuleDjangoFieldPolicy,
+            MicrotechOrderRuleOperator,
+        )
         from microtech.signals import (
             ensure_swiss_customs_field_defaults,
+            invalidate_compiled_order_rules,
             sync_order_rule_django_field_catalog,
         )
 
@@ -24,3 +35,21 @@ class MicrotechConfig(AppConfig):
             sender=self,
             dispatch_uid="microtech.sync_order_rule_django_field_catalog",
         )
+        # Der Bestellregel-Resolver kompiliert diese Tabellen einmal und haelt
+        # das Ergebnis, bis sich eine davon aendert.
+        for model in (
+            MicrotechOrderRule,
+            MicrotechOrderRuleCondition,
+            MicrotechOrderRuleAction,
+            MicrotechOrderRuleOperator,
+            MicrotechOrderRuleDjangoField,
+            MicrotechOrderRuleDjangoFieldPolicy,
+            MicrotechDatasetCatalog,
+            MicrotechDatasetField,
+        ):
+            for signal_name, signal in (("post_save", post_save), ("post_delete", post_delete)):
+                signal.connect(
+                    invalidate_compiled_order_rules,
+                    sender=model,
+                    dispatch_uid=f"microtech.invalidate_compiled_order_rules.{signal_name}.{model.__name__}",
+                )
@@ -272,30 +272,35 @@ class Command(MonitoredBaseCommand):
             if not include_inactive:
                 artikel_service.set_filter({"WBSHpKZ": 1})
 
-            while not artikel_service.range_eof():
-                if limit and processed >= limit:
-                    break
-                processed += 1
-                try:
-                    self._sync_current_record(
-                        artikel_service,
-                        lager_service,
-                        tax_map=tax_map,
-                        admin_user_id=admin_user_id,
-                        content_type_id=content_type_id,
-                        preserve_is_active=preserve_is_active,
-                        skip_images=skip_images,
-                    )
-                    success_count += 1
-                except Exception as exc:
-                    error_count += 1
-                    _log_admin_error(
-                        admin_user_id=admin_user_id,
-                        content_type_id=content_type_id,
-                        message=f"Microtech sync error: {exc}",
-                        object_repr="Microtech Sync (batch)",
-                    )
-                artikel_service.range_next()
+            # Vorauslesen nur beim vollen Scan; mit Limit bliebe der letzte Job liegen.
+            artikel_service.read_ahead = not limit
+            try:
+                while not artikel_service.range_eof():
+                    if limit and processed >= limit:
+                        break
+                    processed += 1
+                    try:
+                        self._sync_current_record(
+                            artikel_service,
+                            lager_service,
+                            tax_map=tax_map,
+                            admin_user_id=admin_user_id,
+                            content_type_id=content_type_id,
+                            preserve_is_active=preserve_is_active,
+                            skip_images=skip_images,
+                        )
+                        success_count += 1
+                    except Exception as exc:
+                        error_count += 1
+                        _log_admin_error(
+                            admin_user_id=admin_user_id,
+                            content_type_id=content_type_id,
+                            message=f"Microtech sync error: {exc}",
+                            object_repr="Microtech Sync (batch)",
+                        )
+                    artikel_service.range_next()
+            finally:
+                artikel_service.close()
             return {
                 "mode": "all",
                 "processed": processed,
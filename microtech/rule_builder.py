@@ -576,14 +576,19 @@ def sync_django_field_catalog() -> dict[str, int]:
             row.save(update_fields=[*defaults.keys()])
 
     if active_paths:
-        (
+        deactivated = (
             MicrotechOrderRuleDjangoField.objects
             .exclude(field_path__in=active_paths)
             .filter(is_active=True)
             .update(is_active=False)
         )
     else:
-        MicrotechOrderRuleDjangoField.objects.filter(is_active=True).update(is_active=False)
+        deactivated = MicrotechOrderRuleDjangoField.objects.filter(is_active=True).update(is_active=False)
+    if deactivated:
+        # update() sendet kein post_save; der kompilierte Regelsatz muss trotzdem neu gebaut werden.
+        from orders.services.order_rule_resolver import invalidate_order_rules
+
+        invalidate_order_rules()
 
     return {
         row.field_path: row.id
@@ -178,6 +178,8 @@ class MicrotechArtikelService(MicrotechDatasetService):
         return self._parse_weight(self.get_bez3(), "netto")
 
     def _load_product_record(self, product: dict[str, Any] | None) -> None:
+        self._discard_pending_page()
+        self._page_offset = 0
         self._records = []
         self._cursor = 0
         self._loaded = True
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterator
 from typing import Any
 
 from loguru import logger
@@ -18,6 +19,10 @@ class MicrotechDatasetService(BaseService):
     index_field: str | None = None
     default_fields: tuple[str, ...] = ()
     page_limit: int = 500
+    # Cursor-API: Folgeseite sofort beim Eintreffen einer Seite anfordern, damit der COM-Worker
+    # nicht leerlaeuft. Nur fuer volle Scans einschalten und danach close() aufrufen; ein
+    # liegengelassener Job blockiert den einzigen COM-Worker. iter_pages() liest immer voraus.
+    read_ahead: bool = False
 
     def __init__(
         self,
@@ -38,6 +43,8 @@ class MicrotechDatasetService(BaseService):
         self._loaded = False
         self._has_more = False
         self._next_cursor: list[Any] | None = None
+        self._pending_page: tuple[str, float] | None = None
+        self._page_offset = 0
         self._range: dict[str, Any] | None = None
         self._filter: str = ""
         self._last_result: dict[str, Any] = {}
@@ -97,6 +104,10 @@ class MicrotechDatasetService(BaseService):
 
     def range_first(self) -> None:
         self._ensure_loaded()
+        if self._page_offset:
+            # Bereits verbrauchte Seiten wurden verworfen; ab der ersten Seite neu lesen.
+            self._reset_records()
+            self._ensure_loaded()
         self._cursor = 0
 
     def range_last(self) -> None:
@@ -111,13 +122,42 @@ class MicrotechDatasetService(BaseService):
         if self._cursor >= len(self._records) and self._has_more:
             self._fetch_next_page()
 
+    def iter_records(self) -> Iterator[dict[str, Any]]:
+        """Stream all records of the current range page by page.
+
+        Independent of the cursor API: only the page being consumed is held in memory,
+        and the next page is already requested while the caller works on the current one.
+        """
+        for page in self.iter_pages():
+            yield from page
+
+    def iter_pages(self) -> Iterator[list[dict[str, Any]]]:
+        if not self._range:
+            return
+        pending: tuple[str, float] | None = self._submit_page()
+        try:
+            while pending is not None:
+                result = self._await_page(pending)
+                pending = None
+                next_cursor = result.get("nextCursor")
+                if result.get("hasMore") and next_cursor:
+                    pending = self._submit_page(after=next_cursor)
+                yield self._normalize_records(result.get("records") or [])
+        finally:
+            if pending is not None:
+                self._cancel_page(pending)
+
     def range_eof(self) -> bool:
         self._ensure_loaded()
         return self._cursor >= len(self._records)
 
     def range_count(self) -> int:
         self._ensure_loaded()
-        return int(self._last_result.get("recordCount") or len(self._records))
+        return int(self._last_result.get("recordCount") or self._page_offset + len(self._records))
+
+    def close(self) -> None:
+        """Cancel a read-ahead page that will not be consumed anymore."""
+        self._discard_pending_page()
 
     def get_field_img_filename(self, field_name: str) -> str | None:
         return self._find_image_filename_in_path(self.get_field(field_name, silent=True))
@@ -184,28 +224,52 @@ class MicrotechDatasetService(BaseService):
             self._records = []
             self._loaded = True
             return
-        result = self.client.poll_dataset_records(self._build_request(index_field=self._range.get("indexField")))
-        self._load_result(result)
+        self._load_result(self._await_page(self._submit_page()))
+        self._prefetch_next_page()
 
     def _fetch_next_page(self) -> None:
         if not self._has_more or not self._next_cursor:
             return
-        previous_len = len(self._records)
-        result = self.client.poll_dataset_records(
-            self._build_request(index_field=self._range.get("indexField"), after=self._next_cursor),
-        )
-        new_records = self._normalize_records(result.get("records") or [])
-        self._records.extend(new_records)
+        pending = self._pending_page or self._submit_page(after=self._next_cursor)
+        self._pending_page = None
+        result = self._await_page(pending)
+        # Verbrauchte Seite verwerfen statt anzuhaengen, damit volle Scans nicht alles im Speicher halten.
+        self._page_offset += len(self._records)
+        self._records = self._normalize_records(result.get("records") or [])
         self._last_result = result
         self._has_more = bool(result.get("hasMore"))
         self._next_cursor = result.get("nextCursor")
-        self._cursor = previous_len
+        self._cursor = 0
+        self._prefetch_next_page()
+
+    def _prefetch_next_page(self) -> None:
+        if not self.read_ahead or self._pending_page or not self._has_more or not self._next_cursor:
+            return
+        self._pending_page = self._submit_page(after=self._next_cursor)
+
+    def _submit_page(self, *, after: list[Any] | None = None) -> tuple[str, float]:
+        return self.client.submit_dataset_job(
+            self._build_request(index_field=self._range.get("indexField"), after=after),
+        )
+
+    def _await_page(self, pending: tuple[str, float]) -> dict[str, Any]:
+        job_id, retry_after = pending
+        return self.client.poll_job(job_id, query_job=self.client.dataset_job, retry_after=retry_after)
+
+    def _cancel_page(self, pending: tuple[str, float]) -> None:
+        job_id, _ = pending
+        try:
+            self.client.cancel_job(job_id)
+        except Exception as exc:
+            logger.debug("Dataset '{}' read-ahead job {} could not be cancelled: {}", self.dataset_name, job_id, exc)
 
     def load_result(self, result: dict[str, Any]) -> None:
         """Load a completed dataset job result directly, bypassing GraphQL polling."""
         self._load_result(result)
 
     def _load_result(self, result: dict[str, Any]) -> None:
+        self._discard_pending_page()
+        self._page_offset = 0
         self._records = self._normalize_records(result.get("records") or [])
         self._cursor = 0
         self._loaded = True
@@ -214,6 +278,8 @@ class MicrotechDatasetService(BaseService):
         self._next_cursor = result.get("nextCursor")
 
     def _reset_records(self) -> None:
+        self._discard_pending_page()
+        self._page_offset = 0
         self._records = []
         self._cursor = 0
         self._loaded = False
@@ -221,6 +287,11 @@ class MicrotechDatasetService(BaseService):
         self._next_cursor = None
         self._last_result = {}
 
+    def _discard_pending_page(self) -> None:
+        if self._pending_page is not None:
+            pending, self._pending_page = self._pending_page, None
+            self._cancel_page(pending)
+
     @staticmethod
     def _format_filter_value(value: Any) -> str:
         if isinstance(value, bool):
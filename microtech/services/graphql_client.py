@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+import threading
 import time
 from collections.abc import Sequence
 from contextlib import contextmanager
@@ -9,6 +11,12 @@ from typing import Any
 import requests
 from django.conf import settings
 from loguru import logger
+from http.client import HTTPException
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ProtocolError
+from urllib3.util.retry import Retry
 
 from core.services import BaseService
 
@@ -31,6 +39,9 @@ class MicrotechGraphQLConfig:
     request_timeout: float = 30.0
     poll_timeout: float = 180.0
     poll_interval: float = 2.0
+    pool_size: int = 10
+    max_retries: int = 3
+    retry_backoff: float = 0.5
 
     @classmethod
     def from_settings(cls) -> "MicrotechGraphQLConfig":
@@ -42,18 +53,319 @@ class MicrotechGraphQLConfig:
             request_timeout=float(getattr(settings, "MICROTECH_GRAPHQL_REQUEST_TIMEOUT", 30.0)),
             poll_timeout=float(getattr(settings, "MICROTECH_GRAPHQL_POLL_TIMEOUT", 180.0)),
             poll_interval=float(getattr(settings, "MICROTECH_GRAPHQL_POLL_INTERVAL", 2.0)),
+            pool_size=int(getattr(settings, "MICROTECH_GRAPHQL_POOL_SIZE", 10)),
+            max_retries=int(getattr(settings, "MICROTECH_GRAPHQL_MAX_RETRIES", 3)),
+            retry_backoff=float(getattr(settings, "MICROTECH_GRAPHQL_RETRY_BACKOFF", 0.5)),
         )
 
 
+class _TransportStats:
+    """Zaehler fuer den gepoolten Transport, je Prozess."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests_sent += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.connections_opened = 0
+            self.requests_sent = 0
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            opened = self.connections_opened
+            sent = self.requests_sent
+        return {
+            "connections_opened": opened,
+            "requests_sent": sent,
+            "requests_per_connection": round(sent / opened, 2) if opened else None,
+        }
+
+
+_TRANSPORT_STATS = _TransportStats()
+
+
+class _RequestNotSentError(ConnectionError):
+    """Die Verbindung brach ab, bevor die Anfrage vollstaendig gesendet war."""
+
+
+# Ob die laufende Anfrage des Threads gefahrlos wiederholt werden darf (Query/Poll).
+_REQUEST_SCOPE = threading.local()
+
+
+class _SendTrackingConnectionMixin:
+    request_sent = False
+
+    def request(self, *args, **kwargs):
+        self.request_sent = False
+        super().request(*args, **kwargs)
+        self.request_sent = True
+
+
+class _SendTrackingHTTPConnection(_SendTrackingConnectionMixin, HTTPConnection):
+    pass
+
+
+class _SendTrackingHTTPSConnection(_SendTrackingConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CountingPoolMixin:
+    def _new_conn(self):
+        _TRANSPORT_STATS.record_connection()
+        return super()._new_conn()
+
+    def _make_request(self, conn, *args, **kwargs):
+        try:
+            return super()._make_request(conn, *args, **kwargs)
+        except (OSError, HTTPException) as exc:
+            # Typisch fuer eine veraltete Keep-Alive-Verbindung, die der Wrapper
+            # schon geschlossen hat: der Wrapper kann die Anfrage nicht erhalten haben.
+            if not getattr(conn, "request_sent", True):
+                raise _RequestNotSentError(str(exc)) from exc
+            raise
+
+
+class _CountingHTTPConnectionPool(_CountingPoolMixin, HTTPConnectionPool):
+    ConnectionCls = _SendTrackingHTTPConnection
+
+
+class _CountingHTTPSConnectionPool(_CountingPoolMixin, HTTPSConnectionPool):
+    ConnectionCls = _SendTrackingHTTPSConnection
+
+
+class _ConnectionResetRetry(Retry):
+    """Wiederholt Verbindungsfehler, die den Wrapper nicht erreicht haben koennen.
+
+    Das sind Fehler beim Verbindungsaufbau und Abbrueche, bevor die Anfrage
+    vollstaendig gesendet war (z.B. eine veraltete Keep-Alive-Verbindung aus
+    dem Pool). Ein Abbruch nach dem Senden wird nur fuer Queries und Polls
+    wiederholt; bei einer Mutation koennte ein erneutes POST den Job doppelt
+    einreihen. Lese-Timeouts gehen immer unveraendert an den Aufrufer.
+    """
+
+    def _is_connection_error(self, err: Exception) -> bool:
+        if isinstance(err, ProtocolError) and any(isinstance(arg, _RequestNotSentError) for arg in err.args):
+            return True
+        return super()._is_connection_error(err)
+
+    @staticmethod
+    def _request_is_idempotent() -> bool:
+        return bool(getattr(_REQUEST_SCOPE, "idempotent", False))
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        if error is not None and not self._is_connection_error(error):
+            if not (isinstance(error, ProtocolError) and self._request_is_idempotent()):
+                raise error
+        return super().increment(
+            method=method,
+            url=url,
+            response=response,
+            error=error,
+            _pool=_pool,
+            _stacktrace=_stacktrace,
+        )
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+_SESSIONS: dict[tuple, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_microtech_graphql_session(config: MicrotechGraphQLConfig) -> requests.Session:
+    """Prozessweite Keep-Alive-Session zum Wrapper.
+
+    Die Session haengt an der PID: nach einem Fork (Celery prefork) baut jeder
+    Kindprozess seinen eigenen Pool auf, statt Sockets des Elternprozesses zu
+    teilen.
+    """
+    key = (os.getpid(), config.pool_size, config.max_retries, config.retry_backoff)
+    session = _SESSIONS.get(key)
+    if session is not None:
+        return session
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(key)
+        if session is None:
+            session = requests.Session()
+            retry = _ConnectionResetRetry(
+                total=config.max_retries,
+                connect=config.max_retries,
+                read=config.max_retries,
+                status=0,
+                backoff_factor=config.retry_backoff,
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False,
+            )
+            adapter = _CountingHTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=max(1, config.pool_size),
+                max_retries=retry,
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _SESSIONS[key] = session
+    return session
+
+
+def reset_microtech_graphql_sessions() -> None:
+    """Alle Sessions schliessen und die Zaehler zuruecksetzen."""
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        session.close()
+    _TRANSPORT_STATS.reset()
+
+
 class MicrotechGraphQLClientService(BaseService):
     """HTTP GraphQL client for the external Microtech wrapper."""
 
     TERMINAL_SUCCESS = {"DONE", "SUCCEEDED", "SUCCESS"}
     TERMINAL_FAILED = {"FAILED", "ERROR", "CANCELLED"}
 
+    # Abfragefeld -> (Operationsname, Auswahl). Grundlage fuer die Einzelabfragen
+    # und fuer query_jobs(), das mehrere Jobs in einem Dokument abfragt.
+    JOB_QUERIES: dict[str, tuple[str, str]] = {
+        "datasetJob": (
+            "DatasetJob",
+            """
+            jobId
+            status
+            message
+            errorMessage
+            dataset
+            indexField
+            recordCount
+            returnedCount
+            hasMore
+            nextCursor
+            records
+            fieldMeta {
+              fieldName
+              label
+              fieldType
+              isCalcField
+              canAccess
+            }
+            """,
+        ),
+        "microtechJob": (
+            "MicrotechJob",
+            """
+            jobId status message result errorMessage
+            """,
+        ),
+        "productListJob": (
+            "ProductListJob",
+            """
+            jobId status message errorMessage
+            products {
+              erpNumber name description descriptionShort isActive factor unit
+              minPurchase purchaseUnit sortOrder taxKey taxRate
+              customsTariffNumber weightGrossKg weightNetKg price
+              rebateQuantity rebatePrice specialPrice specialStartDate specialEndDate
+              warehouseNumber stock storageLocation deleted images source
+            }
+            """,
+        ),
+        "productJob": (
+            "ProductJob",
+            """
+            jobId status message deleted errorMessage
+            product {
+              erpNumber name description descriptionShort isActive factor unit
+              minPurchase purchaseUnit sortOrder taxKey taxRate
+              customsTariffNumber weightGrossKg weightNetKg price
+              rebateQuantity rebatePrice specialPrice specialStartDate specialEndDate
+              warehouseNumber stock storageLocation deleted images source
+            }
+            """,
+        ),
+        "customerJob": (
+            "CustomerJob",
+            """
+            jobId status message errorMessage
+            customer {
+              customerNumber erpAddressNumber salutation firstName lastName
+              name1 name2 name3 street zipCode city email phone department country
+              defaultShippingAddressNumber defaultBillingAddressNumber source
+              addresses {
+                addressNumber addressSubNumber isDefaultShipping isDefaultBilling
+                name1 name2 name3 street zipCode city email phone department country
+                contacts {
+                  addressNumber addressSubNumber contactNumber isDefault salutation
+                  firstName lastName displayName department email phone
+                }
+              }
+            }
+            postalAddress {
+              addressNumber addressSubNumber isDefaultShipping isDefaultBilling
+              name1 street zipCode city email phone country
+              contacts { contactNumber firstName lastName email phone }
+            }
+            contactPerson {
+              addressNumber addressSubNumber contactNumber isDefault salutation
+              firstName lastName displayName department email phone
+            }
+            """,
+        ),
+        "customerSearchJob": (
+            "CustomerSearchJob",
+            """
+            jobId status message limitReached errorMessage
+            customers {
+              customerNumber erpAddressNumber salutation firstName lastName
+              name1 name2 name3 street zipCode city email phone department country
+              defaultShippingAddressNumber defaultBillingAddressNumber source
+              addresses {
+                addressNumber addressSubNumber isDefaultShipping isDefaultBilling
+                name1 name2 name3 street zipCode city email phone department country
+                contacts {
+                  addressNumber addressSubNumber contactNumber isDefault salutation
+                  firstName lastName displayName department email phone
+                }
+              }
+            }
+            """,
+        ),
+        "vorgangJob": (
+            "VorgangJob",
+            """
+            jobId status message errorMessage
+            vorgang {
+              belegNr vorgangArt erpAddressNumber orderNumber date description
+              netto brutto currency status source
+              positions { belegNr positionNr erpNumber name quantity unit unitPrice totalPrice taxKey discountRate }
+            }
+            """,
+        ),
+    }
+
     def __init__(self, *, config: MicrotechGraphQLConfig | None = None) -> None:
         self.config = config or MicrotechGraphQLConfig.from_settings()
 
+    @staticmethod
+    def transport_stats() -> dict[str, Any]:
+        """Verbindungs-Zaehler des gepoolten Transports in diesem Prozess."""
+        return _TRANSPORT_STATS.snapshot()
+
     def execute(
         self,
         query: str,
@@ -62,24 +374,10 @@ class MicrotechGraphQLClientService(BaseService):
         timeout: float | None = None,
         bypass_backup_mode: bool = False,
     ) -> dict[str, Any]:
-        if not bypass_backup_mode:
-            # Import lokal: backup_mode importiert die Exception aus diesem Modul.
-            from microtech.services.backup_mode import MicrotechBackupModeService
-
-            MicrotechBackupModeService.ensure_available()
-
-        response = requests.post(
-            self.config.url,
-            json={"query": query, "variables": variables or {}},
-            headers={"Content-Type": "application/json"},
-            timeout=timeout or self.config.request_timeout,
-        )
-        response.raise_for_status()
-        payload = response.json()
+        payload = self._post(query, variables, timeout=timeout, bypass_backup_mode=bypass_backup_mode)
         errors = payload.get("errors") or []
         if errors:
-            message = "; ".join(str((item or {}).get("message") or item) for item in errors)
-            raise GraphQLMicrotechError(message)
+            raise GraphQLMicrotechError(self._error_message(errors))
         data = payload.get("data")
         if data is None:
             raise GraphQLMicrotechError(
@@ -87,6 +385,95 @@ class MicrotechGraphQLClientService(BaseService):
             )
         return data
 
+    def _post(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+        *,
+        timeout: float | None = None,
+        bypass_backup_mode: bool = False,
+    ) -> dict[str, Any]:
+        if not bypass_backup_mode:
+            # Import lokal: backup_mode importiert die Exception aus diesem Modul.
+            from microtech.services.backup_mode import MicrotechBackupModeService
+
+            MicrotechBackupModeService.ensure_available()
+
+        _TRANSPORT_STATS.record_request()
+        _REQUEST_SCOPE.idempotent = self._is_idempotent(query)
+        try:
+            response = get_microtech_graphql_session(self.config).post(
+                self.config.url,
+                json={"query": query, "variables": variables or {}},
+                headers={"Content-Type": "application/json"},
+                timeout=timeout or self.config.request_timeout,
+            )
+        finally:
+            _REQUEST_SCOPE.idempotent = False
+        response.raise_for_status()
+        return response.json()
+
+    @staticmethod
+    def _is_idempotent(query: str) -> bool:
+        # Queries lesen nur; Mutationen reihen Jobs ein und duerfen nicht doppelt laufen.
+        document = query.lstrip()
+        return document.startswith("{") or document.startswith("query")
+
+    @staticmethod
+    def _error_message(errors: Sequence[Any]) -> str:
+        return "; ".join(str((item or {}).get("message") or item) for item in errors)
+
+    def query_job(self, field: str, job_id: str) -> dict[str, Any]:
+        """Status und Ergebnis eines Wrapper-Jobs ueber sein Abfragefeld lesen."""
+        operation, selection = self.JOB_QUERIES[field]
+        data = self.execute(
+            f"query {operation}($jobId: ID!) {{ {field}(jobId: $jobId) {{ {selection} }} }}",
+            {"jobId": job_id},
+        )
+        return data.get(field) or {}
+
+    def query_jobs(self, jobs: Sequence[tuple[str, str]]) -> list[dict[str, Any] | GraphQLMicrotechError]:
+        """Mehrere Wrapper-Jobs mit einem einzigen, aliasierten GraphQL-Dokument lesen.
+
+        ``jobs`` enthaelt Paare aus Abfragefeld und Job-ID. Das Ergebnis hat
+        dieselbe Reihenfolge; ein Job, dessen Teilabfrage fehlschlaegt, liefert
+        statt eines Dicts einen ``GraphQLMicrotechError``. Fehler ohne Bezug zu
+        einem Alias (Transport, Syntax) brechen die ganze Abfrage ab.
+        """
+        if not jobs:
+            return []
+        declarations: list[str] = []
+        selections: list[str] = []
+        variables: dict[str, str] = {}
+        for index, (field, job_id) in enumerate(jobs):
+            _, selection = self.JOB_QUERIES[field]
+            alias = f"job{index}"
+            declarations.append(f"${alias}: ID!")
+            selections.append(f"{alias}: {field}(jobId: ${alias}) {{ {selection} }}")
+            variables[alias] = str(job_id)
+
+        payload = self._post(
+            f"query BatchJobs({', '.join(declarations)}) {{ {' '.join(selections)} }}",
+            variables,
+        )
+        errors_by_alias: dict[str, list[Any]] = {}
+        for error in payload.get("errors") or []:
+            path = (error or {}).get("path") if isinstance(error, dict) else None
+            alias = str(path[0]) if path else ""
+            if alias not in variables:
+                raise GraphQLMicrotechError(self._error_message(payload.get("errors") or []))
+            errors_by_alias.setdefault(alias, []).append(error)
+
+        data = payload.get("data") or {}
+        results: list[dict[str, Any] | GraphQLMicrotechError] = []
+        for index in range(len(jobs)):
+            alias = f"job{index}"
+            if alias in errors_by_alias:
+                results.append(GraphQLMicrotechError(self._error_message(errors_by_alias[alias])))
+                continue
+            results.append(data.get(alias) or {})
+        return results
+
     # --- Wartung ---------------------------------------------------------
     #
     # Wartungsoperationen laufen im API-Prozess des Wrappers, nicht im
@@ -266,34 +653,7 @@ class MicrotechGraphQLClientService(BaseService):
         return self._accepted(data, "requestDatasetRecords")
 
     def dataset_job(self, job_id: str) -> dict[str, Any]:
-        data = self.execute(
-            """
-            query DatasetJob($jobId: ID!) {
-              datasetJob(jobId: $jobId) {
-                jobId
-                status
-                message
-                errorMessage
-                dataset
-                indexField
-                recordCount
-                returnedCount
-                hasMore
-                nextCursor
-                records
-                fieldMeta {
-                  fieldName
-                  label
-                  fieldType
-                  isCalcField
-                  canAccess
-                }
-              }
-            }
-            """,
-            {"jobId": job_id},
-        )
-        return data.get("datasetJob") or {}
+        return self.query_job("datasetJob", job_id)
 
     def poll_dataset_records(self, input_data: dict[str, Any], *, timeout: float | None = None) -> dict[str, Any]:
         accepted = self.request_dataset_records(input_data)
@@ -407,17 +767,7 @@ class MicrotechGraphQLClientService(BaseService):
         return job.get("result") or {}
 
     def microtech_job(self, job_id: str) -> dict[str, Any]:
-        data = self.execute(
-            """
-            query MicrotechJob($jobId: ID!) {
-              microtechJob(jobId: $jobId) {
-                jobId status message result errorMessage
-              }
-            }
-            """,
-            {"jobId": job_id},
-        )
-        return data.get("microtechJob") or {}
+        return self.query_job("microtechJob", job_id)
 
     def request_product(self, erp_number: str) -> dict[str, Any]:
         accepted = self._mutation_with_job(
@@ -455,24 +805,7 @@ class MicrotechGraphQLClientService(BaseService):
         return str(accepted["jobId"]), float(accepted.get("retryAfterSeconds") or self.config.poll_interval)
 
     def product_list_job(self, job_id: str) -> dict[str, Any]:
-        data = self.execute(
-            """
-            query ProductListJob($jobId: ID!) {
-              productListJob(jobId: $jobId) {
-                jobId status message errorMessage
-                products {
-                  erpNumber name description descriptionShort isActive factor unit
-                  minPurchase purchaseUnit sortOrder taxKey taxRate
-                  customsTariffNumber weightGrossKg weightNetKg price
-                  rebateQuantity rebatePrice specialPrice specialStartDate specialEndDate
-                  warehouseNumber stock storageLocation deleted images source
-                }
-              }
-            }
-            """,
-            {"jobId": job_id},
-        )
-        return data.get("productListJob") or {}
+        return self.query_job("productListJob", job_id)
 
     def update_product(self, erp_number: str, input_data: dict[str, Any]) -> dict[str, Any]:
         accepted = self._mutation_with_job(
@@ -504,24 +837,7 @@ class MicrotechGraphQLClientService(BaseService):
         return str(accepted["jobId"]), float(accepted.get("retryAfterSeconds") or self.config.poll_interval)
 
     def product_job(self, job_id: str) -> dict[str, Any]:
-        data = self.execute(
-            """
-            query ProductJob($jobId: ID!) {
-              productJob(jobId: $jobId) {
-                jobId status message deleted errorMessage
-                product {
-                  erpNumber name description descriptionShort isActive factor unit
-                  minPurchase purchaseUnit sortOrder taxKey taxRate
-                  customsTariffNumber weightGrossKg weightNetKg price
-                  rebateQuantity rebatePrice specialPrice specialStartDate specialEndDate
-                  warehouseNumber stock storageLocation deleted images source
-                }
-              }
-            }
-            """,
-            {"jobId": job_id},
-        )
-        return data.get("productJob") or {}
+        return self.query_job("productJob", job_id)
 
     def request_customer(self, customer_number: str) -> dict[str, Any]:
         accepted = self._mutation_with_job(
@@ -849,84 +1165,14 @@ class MicrotechGraphQLClientService(BaseService):
         return self._submit_accepted(accepted)
 
     def customer_job(self, job_id: str) -> dict[str, Any]:
-        data = self.execute(
-            """
-            query CustomerJob($jobId: ID!) {
-              customerJob(jobId: $jobId) {
-                jobId status message errorMessage
-                customer {
-                  customerNumber erpAddressNumber salutation firstName lastName
-                  name1 name2 name3 street zipCode city email phone department country
-                  defaultShippingAddressNumber defaultBillingAddressNumber source
-                  addresses {
-                    addressNumber addressSubNumber isDefaultShipping isDefaultBilling
-                    name1 name2 name3 street zipCode city email phone department country
-                    contacts {
-                      addressNumber addressSubNumber contactNumber isDefault salutation
-                      firstName lastName displayName department email phone
-                    }
-                  }
-                }
-                postalAddress {
-                  addressNumber addressSubNumber isDefaultShipping isDefaultBilling
-                  name1 street zipCode city email phone country
-                  contacts { contactNumber firstName lastName email phone }
-                }
-                contactPerson {
-                  addressNumber addressSubNumber contactNumber isDefault salutation
-                  firstName lastName displayName department email phone
-                }
-              }
-            }
-            """,
-            {"jobId": job_id},
-        )
-        return data.get("customerJob") or {}
+        return self.query_job("customerJob", job_id)
 
     def customer_search_job(self, job_id: str) -> dict[str, Any]:
         """Read the status and complete results of a structured customer search."""
-        data = self.execute(
-            """
-            query CustomerSearchJob($jobId: ID!) {
-              customerSearchJob(jobId: $jobId) {
-                jobId status message limitReached errorMessage
-                customers {
-                  customerNumber erpAddressNumber salutation firstName lastName
-                  name1 name2 name3 street zipCode city email phone department country
-                  defaultShippingAddressNumber defaultBillingAddressNumber source
-                  addresses {
-                    addressNumber addressSubNumber isDefaultShipping isDefaultBilling
-                    name1 name2 name3 street zipCode city email phone department country
-                    contacts {
-                      addressNumber addressSubNumber contactNumber isDefault salutation
-                      firstName lastName displayName department email phone
-                    }
-                  }
-                }
-              }
-            }
-            """,
-            {"jobId": job_id},
-        )
-        return data.get("customerSearchJob") or {}
+        return self.query_job("customerSearchJob", job_id)
 
     def vorgang_job(self, job_id: str) -> dict[str, Any]:
-        data = self.execute(
-            """
-            query VorgangJob($jobId: ID!) {
-              vorgangJob(jobId: $jobId) {
-                jobId status message errorMessage
-                vorgang {
-                  belegNr vorgangArt erpAddressNumber orderNumber date description
-                  netto brutto currency status source
-                  positions { belegNr positionNr erpNumber name quantity unit unitPrice totalPrice taxKey discountRate }
-                }
-              }
-            }
-            """,
-            {"jobId": job_id},
-        )
-        return data.get("vorgangJob") or {}
+        return self.query_job("vorgangJob", job_id)
 
     def poll_job(
         self,
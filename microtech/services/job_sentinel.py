@@ -516,10 +516,15 @@ class MicrotechJobSentinelService(BaseService):
 
     def poll_due_jobs(self, *, limit: int = 50) -> int:
         job_ids = self._claim_due_jobs(limit=limit)
-        from microtech.tasks import poll_graphql_job
+        from microtech.tasks import poll_graphql_job, poll_graphql_job_batch
 
-        for job_id in job_ids:
-            poll_graphql_job.delay(job_id)
+        batch_size = self._poll_batch_size()
+        for offset in range(0, len(job_ids), batch_size):
+            chunk = job_ids[offset : offset + batch_size]
+            if len(chunk) == 1:
+                poll_graphql_job.delay(chunk[0])
+            else:
+                poll_graphql_job_batch.delay(chunk)
         remaining = max(0, limit - len(job_ids))
         continuation_ids = self._claim_pending_continuations(limit=remaining)
         if continuation_ids:
@@ -574,6 +579,11 @@ class MicrotechJobSentinelService(BaseService):
                 )
         return job_ids
 
+    @staticmethod
+    def _poll_batch_size() -> int:
+        """Jobs je Poll-Task; 1 schaltet auf einen Task und Request pro Job zurueck."""
+        return max(1, int(getattr(settings, "MICROTECH_GRAPHQL_POLL_BATCH_SIZE", 25) or 1))
+
     @staticmethod
     def _skip_locked_kwargs() -> dict[str, bool]:
         if connection.features.has_select_for_update_skip_locked:
@@ -606,18 +616,85 @@ class MicrotechJobSentinelService(BaseService):
             job = MicrotechGraphQLJob.objects.select_for_update().get(pk=job_id)
             if job.is_terminal:
                 return True
-            job.result_payload = remote
-            self._apply_remote_status(job, remote)
-            if not job.is_terminal:
-                if attempt >= max_attempts:
-                    self._mark_exhausted(job, remote, attempt)
-                else:
-                    job.next_poll_at = self._reschedule_at(remote)
-            job.save()
+            self._apply_poll_result(job, remote, attempt=attempt, max_attempts=max_attempts)
 
         self._after_terminal_update(job_id)
         return True
 
+    def poll_jobs_once(self, *, job_ids: Sequence[int]) -> int:
+        """Mehrere Jobs mit einer GraphQL-Abfrage pollen und in einer Transaktion anwenden.
+
+        Gegenstueck zu ``poll_job_once`` fuer den Batch-Modus des Beat-Pollers.
+        Schlaegt die gesamte Abfrage fehl, laeuft jeder Job in die normale
+        Poll-Fehlerbehandlung; Fehler einzelner Teilabfragen betreffen nur
+        ihren Job. Rueckgabe: Anzahl der angewendeten Remote-Status.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            jobs = [
+                job
+                for job in MicrotechGraphQLJob.objects.select_for_update(**self._skip_locked_kwargs())
+                .filter(pk__in=list(job_ids))
+                .order_by("pk")
+                if not job.is_terminal and job.external_job_id
+            ]
+            for job in jobs:
+                job.attempt += 1
+                job.last_polled_at = now
+                job.updated_at = now
+            MicrotechGraphQLJob.objects.bulk_update(jobs, ["attempt", "last_polled_at", "updated_at"])
+        if not jobs:
+            return 0
+
+        client = MicrotechGraphQLClientService()
+        try:
+            results = client.query_jobs(
+                [(self._remote_job_field(job), str(job.external_job_id)) for job in jobs]
+            )
+        except Exception as exc:
+            for job in jobs:
+                self._handle_poll_failure(job_id=job.pk, attempt=job.attempt, max_attempts=job.max_attempts, error=exc)
+            return 0
+
+        applied: list[int] = []
+        with transaction.atomic():
+            locked = MicrotechGraphQLJob.objects.select_for_update().in_bulk([job.pk for job in jobs])
+            for claimed, remote in zip(jobs, results, strict=True):
+                if isinstance(remote, Exception):
+                    self._handle_poll_failure(
+                        job_id=claimed.pk,
+                        attempt=claimed.attempt,
+                        max_attempts=claimed.max_attempts,
+                        error=remote,
+                    )
+                    continue
+                job = locked.get(claimed.pk)
+                if job is None or job.is_terminal:
+                    continue
+                self._apply_poll_result(job, remote, attempt=claimed.attempt, max_attempts=claimed.max_attempts)
+                applied.append(job.pk)
+
+        for job_id in applied:
+            self._after_terminal_update(job_id)
+        return len(applied)
+
+    def _apply_poll_result(
+        self,
+        job: MicrotechGraphQLJob,
+        remote: dict[str, Any],
+        *,
+        attempt: int,
+        max_attempts: int,
+    ) -> None:
+        job.result_payload = remote
+        self._apply_remote_status(job, remote)
+        if not job.is_terminal:
+            if attempt >= max_attempts:
+                self._mark_exhausted(job, remote, attempt)
+            else:
+                job.next_poll_at = self._reschedule_at(remote)
+        job.save()
+
     def cancel_job(self, *, job_id: int) -> None:
         with transaction.atomic():
             job = MicrotechGraphQLJob.objects.select_for_update().get(pk=job_id)
@@ -778,21 +855,26 @@ class MicrotechJobSentinelService(BaseService):
         job.status = MicrotechGraphQLJob.Status.RUNNING
         job.next_step = job.next_step or "Warte auf Microtech GraphQL Abschluss."
 
-    @classmethod
-    def _fetch_remote_job(cls, *, client: MicrotechGraphQLClientService, job: MicrotechGraphQLJob) -> dict[str, Any]:
+    @staticmethod
+    def _remote_job_field(job: MicrotechGraphQLJob) -> str:
+        """GraphQL-Abfragefeld, ueber das der Wrapper den Status dieses Jobs liefert."""
         if job.kind == MicrotechGraphQLJob.Kind.DATASET_RECORDS:
             if job.operation == "searchCustomers":
-                return client.customer_search_job(str(job.external_job_id))
-            return client.dataset_job(str(job.external_job_id))
+                return "customerSearchJob"
+            return "datasetJob"
         if job.kind == MicrotechGraphQLJob.Kind.PRODUCT_READ:
-            return client.product_list_job(str(job.external_job_id))
+            return "productListJob"
         if job.kind == MicrotechGraphQLJob.Kind.PRODUCT_UPDATE:
-            return client.product_job(str(job.external_job_id))
+            return "productJob"
         if job.kind in {MicrotechGraphQLJob.Kind.CUSTOMER_READ, MicrotechGraphQLJob.Kind.CUSTOMER_UPSERT}:
-            return client.customer_job(str(job.external_job_id))
+            return "customerJob"
         if job.kind in {MicrotechGraphQLJob.Kind.ORDER_READ, MicrotechGraphQLJob.Kind.ORDER_UPSERT}:
-            return client.vorgang_job(str(job.external_job_id))
-        return client.microtech_job(str(job.external_job_id))
+            return "vorgangJob"
+        return "microtechJob"
+
+    @classmethod
+    def _fetch_remote_job(cls, *, client: MicrotechGraphQLClientService, job: MicrotechGraphQLJob) -> dict[str, Any]:
+        return client.query_job(cls._remote_job_field(job), str(job.external_job_id))
 
     def _handle_poll_failure(self, *, job_id: int, attempt: int, max_attempts: int, error: Exception) -> None:
         now = timezone.now()
@@ -0,0 +1,619 @@
+"""Mengenbasierter Microtech -> Django Produktimport.
+
+Der zeilenweise Pfad ``Command._sync_current_record`` kostet pro Artikel ein
+``get_or_create``, ein vollstaendiges ``product.save()``, ein Lager-
+``get_or_create``, eine Preisabfrage samt Historien-Lookup und eine frische
+Sales-Channel-Abfrage. Dieser Service laedt Produkte, Lager, Preise, Bilder und
+Sales-Channels stattdessen einmal pro Block, berechnet die Aenderungen im
+Speicher und schreibt sie mit ``bulk_create``/``bulk_update``.
+
+Die Semantik des Einzelpfads bleibt erhalten: Staffel-Wiederherstellung
+waehrend Sonderpreisen, abgeleitete Kanalpreise nur fuer fehlende Zeilen und
+``preserve_is_active`` fuer bestehende Produkte. Schlaegt ein Block fehl, wird
+er ueber den Einzelpfad wiederholt, damit ein defekter Datensatz nicht den
+ganzen Block verwirft.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from loguru import logger
+from modeltranslation.translator import translator
+from modeltranslation.utils import build_localized_fieldname, get_language
+
+from core.services import BaseService
+from microtech.management.commands.microtech_sync_products import (
+    Command as MicrotechSyncProductsCommand,
+    _apply_factor,
+    _log_admin_error,
+    _to_decimal,
+    _to_int,
+    _to_stock,
+    _unique_preserve_order,
+)
+from microtech.services.artikel import MicrotechArtikelService
+from microtech.services.graphql_client import MicrotechGraphQLClientService
+from products.models import Image, Price, PriceHistory, Product, ProductImage, Storage, Tax
+from shopware.models import ShopwareSettings
+
+PRODUCT_IMPORT_FIELDS = (
+    "factor",
+    "is_active",
+    "unit",
+    "min_purchase",
+    "purchase_unit",
+    "name",
+    "description",
+    "description_short",
+    "sort_order",
+    "customs_tariff_number",
+    "weight_gross",
+    "weight_net",
+    "tax",
+)
+STORAGE_IMPORT_FIELDS = ("stock", "location")
+PRICE_IMPORT_FIELDS = (
+    "price",
+    "rebate_quantity",
+    "rebate_price",
+    "special_price",
+    "special_start_date",
+    "special_end_date",
+)
+
+
+@dataclass
+class MicrotechProductRecord:
+    product_data: dict[str, Any]
+    erp_nr: str
+    name: str
+    values: dict[str, Any]
+    is_active: bool
+    sort_order: int | None
+    stock_value: Any
+    location: Any
+    price: Decimal | None
+    rebate_quantity: int | None
+    rebate_price: Decimal | None
+    special_price: Decimal | None
+    special_start_date: Any
+    special_end_date: Any
+    image_names: list[str]
+
+
+@dataclass
+class MicrotechProductImportResult:
+    imported: list[str] = field(default_factory=list)
+    failed: list[tuple[str, str]] = field(default_factory=list)
+    missing: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    price_history: int = 0
+    fallback_chunks: int = 0
+
+    @property
+    def processed(self) -> int:
+        return len(self.imported) + len(self.failed) + self.missing
+
+
+class MicrotechProductImportService(BaseService):
+    model = Product
+    chunk_size = 500
+
+    def __init__(
+        self,
+        *,
+        client: MicrotechGraphQLClientService | None = None,
+        tax_map: dict[Decimal, Tax] | None = None,
+        admin_user_id: int | None = None,
+        content_type_id: int | None = None,
+        preserve_is_active: bool = False,
+        skip_images: bool = False,
+        chunk_size: int | None = None,
+    ) -> None:
+        self.client = client
+        self.tax_map = tax_map
+        self.admin_user_id = admin_user_id
+        self.content_type_id = content_type_id
+        self.preserve_is_active = preserve_is_active
+        self.skip_images = skip_images
+        self.chunk_size = max(1, int(chunk_size or self.chunk_size))
+        self._channels: list[ShopwareSettings] | None = None
+        self._channel_warnings_logged = False
+
+    def import_products(self, products: Iterable[dict[str, Any]]) -> MicrotechProductImportResult:
+        """Import GraphQL product job records in chunks of ``chunk_size``."""
+        result = MicrotechProductImportResult()
+        if self.tax_map is None:
+            self.tax_map = MicrotechSyncProductsCommand._ensure_taxes()
+        artikel_service = MicrotechArtikelService(erp=self.client)
+
+        chunk: list[MicrotechProductRecord] = []
+        for product_data in products:
+            try:
+                record = self._read_record(artikel_service, product_data)
+            except Exception as exc:
+                result.failed.append((self._entity_for(product_data), str(exc)))
+                continue
+            if record is None:
+                result.missing += 1
+                continue
+            chunk.append(record)
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk, result=result, artikel_service=artikel_service)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk, result=result, artikel_service=artikel_service)
+        return result
+
+    @staticmethod
+    def _entity_for(product_data: Any) -> str:
+        if not isinstance(product_data, dict):
+            return ""
+        return str(product_data.get("artNr") or product_data.get("erpNr") or product_data.get("erpNumber") or "")
+
+    def _read_record(
+        self,
+        artikel_service: MicrotechArtikelService,
+        product_data: dict[str, Any],
+    ) -> MicrotechProductRecord | None:
+        artikel_service.load_product_record(product_data)
+        if artikel_service.range_eof():
+            return None
+        erp_nr = artikel_service.get_erp_nr()
+        if not erp_nr:
+            raise ValueError("Artikel ohne ArtNr gefunden.")
+
+        name = artikel_service.get_name() or ""
+        values = {
+            "factor": _to_int(artikel_service.get_factor()),
+            "unit": artikel_service.get_unit(),
+            "min_purchase": _to_int(artikel_service.get_min_purchase()),
+            "purchase_unit": _to_int(artikel_service.get_purchase_unit()),
+            "description": artikel_service.get_description(),
+            "description_short": artikel_service.get_description_short(),
+            "customs_tariff_number": artikel_service.get_customs_tariff_number(),
+            "weight_gross": artikel_service.get_weight_gross(),
+            "weight_net": artikel_service.get_weight_net(),
+            "tax": MicrotechSyncProductsCommand._resolve_product_tax(
+                artikel_service=artikel_service,
+                tax_map=self.tax_map,
+            ),
+        }
+        return MicrotechProductRecord(
+            product_data=product_data,
+            erp_nr=str(erp_nr),
+            name=name,
+            values=values,
+            is_active=bool(artikel_service.get_is_active()),
+            sort_order=_to_int(artikel_service.get_sort_order()),
+            stock_value=artikel_service.get_stock(),
+            location=artikel_service.get_storage_location(),
+            price=_to_decimal(artikel_service.get_price()),
+            rebate_quantity=_to_int(artikel_service.get_rebate_quantity()),
+            rebate_price=_to_decimal(artikel_service.get_rebate_price()),
+            special_price=_to_decimal(artikel_service.get_special_price()),
+            special_start_date=self._to_datetime(artikel_service.get_special_start_date()),
+            special_end_date=self._to_datetime(artikel_service.get_special_end_date()),
+            image_names=_unique_preserve_order(artikel_service.get_image_list()),
+        )
+
+    @staticmethod
+    def _to_datetime(value: Any) -> Any:
+        # GraphQL liefert Datumswerte als Strings. Fuer den Vergleich mit den
+        # gespeicherten Werten wird wie beim Speichern nach datetime konvertiert.
+        if value in (None, ""):
+            return None
+        try:
+            parsed = Price._meta.get_field("special_start_date").to_python(value)
+        except ValidationError:
+            return value
+        if isinstance(parsed, datetime) and timezone.is_naive(parsed):
+            return timezone.make_aware(parsed)
+        return parsed
+
+    # ------------------------------------------------------------------
+    # Blockverarbeitung
+    # ------------------------------------------------------------------
+
+    def _import_chunk(
+        self,
+        records: list[MicrotechProductRecord],
+        *,
+        result: MicrotechProductImportResult,
+        artikel_service: MicrotechArtikelService,
+    ) -> None:
+        # Doppelte ArtNr im selben Block: wie im Einzelpfad gewinnt der letzte Datensatz.
+        unique_records = list({record.erp_nr: record for record in records}.values())
+        try:
+            with transaction.atomic():
+                stats = self._write_chunk(unique_records)
+        except Exception as exc:
+            logger.warning(
+                "Microtech bulk import: Block mit {} Artikeln fehlgeschlagen ({}); Einzelimport als Fallback.",
+                len(unique_records),
+                exc,
+            )
+            result.fallback_chunks += 1
+            self._import_records_individually(records, result=result, artikel_service=artikel_service)
+            return
+
+        result.imported.extend(record.erp_nr for record in records)
+        result.created += stats["created"]
+        result.updated += stats["updated"]
+        result.unchanged += stats["unchanged"]
+        result.price_history += stats["price_history"]
+
+    def _import_records_individually(
+        self,
+        records: Sequence[MicrotechProductRecord],
+        *,
+        result: MicrotechProductImportResult,
+        artikel_service: MicrotechArtikelService,
+    ) -> None:
+        command = MicrotechSyncProductsCommand()
+        for record in records:
+            try:
+                with transaction.atomic():
+                    artikel_service.load_product_record(record.product_data)
+                    command._sync_current_record(
+                        artikel_service,
+                        None,
+                        tax_map=self.tax_map,
+                        admin_user_id=self.admin_user_id,
+                        content_type_id=self.content_type_id,
+                        preserve_is_active=self.preserve_is_active,
+                        skip_images=self.skip_images,
+                    )
+            except Exception as exc:
+                result.failed.append((record.erp_nr, str(exc)))
+                continue
+            result.imported.append(record.erp_nr)
+
+    def _write_chunk(self, records: list[MicrotechProductRecord]) -> dict[str, int]:
+        products, created_erp_nrs, stats = self._write_products(records)
+        self._write_storages(records, products)
+        stats["price_history"] = self._write_prices(records, products, created_erp_nrs)
+        if not self.skip_images:
+            self._write_images(records, products)
+        return stats
+
+    # ------------------------------------------------------------------
+    # Produkte
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _product_update_fields() -> list[str]:
+        translated = set(translator.get_options_for_model(Product).all_fields)
+        language = get_language()
+        update_fields: list[str] = []
+        for field_name in PRODUCT_IMPORT_FIELDS:
+            update_fields.append(field_name)
+            if field_name in translated:
+                update_fields.append(build_localized_fieldname(field_name, language))
+        return update_fields
+
+    @staticmethod
+    def _snapshot(instance, field_names: Sequence[str]) -> tuple:
+        snapshot = []
+        for field_name in field_names:
+            model_field = instance._meta.get_field(field_name)
+            snapshot.append(getattr(instance, model_field.attname))
+        return tuple(snapshot)
+
+    def _apply_product_values(self, product: Product, record: MicrotechProductRecord, *, created: bool) -> None:
+        product.factor = record.values["factor"]
+        if not (self.preserve_is_active and not created):
+            product.is_active = record.is_active
+        product.unit = record.values["unit"]
+        product.min_purchase = record.values["min_purchase"]
+        product.purchase_unit = record.values["purchase_unit"]
+        product.name = record.name or product.name
+        product.description = record.values["description"]
+        product.description_short = record.values["description_short"]
+        product.sort_order = record.sort_order or product.sort_order
+        product.customs_tariff_number = record.values["customs_tariff_number"]
+        product.weight_gross = record.values["weight_gross"]
+        product.weight_net = record.values["weight_net"]
+        product.tax = record.values["tax"]
+
+    def _write_products(
+        self,
+        records: list[MicrotechProductRecord],
+    ) -> tuple[dict[str, Product], set[str], dict[str, int]]:
+        update_fields = self._product_update_fields()
+        # Uebersetzte Basisfelder liefern ueber den Descriptor Fallback-Werte;
+        # der Vergleich laeuft daher auf den lokalisierten Spalten.
+        compare_fields = [
+            field_name
+            for field_name in update_fields
+            if field_name not in translator.get_options_for_model(Product).all_fields
+        ]
+        products = {
+            product.erp_nr: product
+            for product in Product.objects.filter(erp_nr__in=[record.erp_nr for record in records])
+        }
+        now = timezone.now()
+        to_create: list[Product] = []
+        to_update: list[Product] = []
+        for record in records:
+            product = products.get(record.erp_nr)
+            if product is None:
+                product = Product(erp_nr=record.erp_nr)
+                product.name = record.name
+                self._apply_product_values(product, record, created=True)
+                products[record.erp_nr] = product
+                to_create.append(product)
+                continue
+            before = self._snapshot(product, compare_fields)
+            self._apply_product_values(product, record, created=False)
+            if self._snapshot(product, compare_fields) != before:
+                product.updated_at = now
+                to_update.append(product)
+
+        if to_create:
+            Product.objects.bulk_create(to_create, batch_size=self.chunk_size)
+        if to_update:
+            Product.objects.bulk_update(to_update, [*update_fields, "updated_at"], batch_size=self.chunk_size)
+        stats = {
+            "created": len(to_create),
+            "updated": len(to_update),
+            "unchanged": len(records) - len(to_create) - len(to_update),
+        }
+        return products, {product.erp_nr for product in to_create}, stats
+
+    # ------------------------------------------------------------------
+    # Lager
+    # ------------------------------------------------------------------
+
+    def _write_storages(self, records: list[MicrotechProductRecord], products: dict[str, Product]) -> None:
+        product_ids = [products[record.erp_nr].pk for record in records]
+        storages = {storage.product_id: storage for storage in Storage.objects.filter(product_id__in=product_ids)}
+        now = timezone.now()
+        to_create: list[Storage] = []
+        to_update: list[Storage] = []
+        for record in records:
+            product = products[record.erp_nr]
+            storage = storages.get(product.pk)
+            created = storage is None
+            if created:
+                storage = Storage(product=product)
+            before = self._snapshot(storage, STORAGE_IMPORT_FIELDS)
+            stock = _to_stock(record.stock_value)
+            if stock is None:
+                logger.warning(
+                    "Microtech sync: Bestand fuer Artikel {} ist ungueltig ({!r}); bestehender Bestand {} bleibt erhalten.",
+                    product.erp_nr,
+                    record.stock_value,
+                    storage.stock,
+                )
+            else:
+                storage.stock = stock
+            storage.location = record.location
+            if created:
+                to_create.append(storage)
+            elif self._snapshot(storage, STORAGE_IMPORT_FIELDS) != before:
+                storage.updated_at = now
+                to_update.append(storage)
+
+        if to_create:
+            Storage.objects.bulk_create(to_create, batch_size=self.chunk_size)
+        if to_update:
+            Storage.objects.bulk_update(to_update, [*STORAGE_IMPORT_FIELDS, "updated_at"], batch_size=self.chunk_size)
+
+    # ------------------------------------------------------------------
+    # Preise
+    # ------------------------------------------------------------------
+
+    def _active_channels(self) -> list[ShopwareSettings]:
+        if self._channels is None:
+            self._channels = list(ShopwareSettings.objects.filter(is_active=True))
+        return self._channels
+
+    def _channel_factors(self, channels: list[ShopwareSettings]) -> dict[int, Decimal]:
+        factors: dict[int, Decimal] = {}
+        for channel in channels:
+            factor, suspicious_factor = MicrotechSyncProductsCommand._normalize_price_factor(channel.price_factor)
+            if suspicious_factor and not self._channel_warnings_logged:
+                _log_admin_error(
+                    admin_user_id=self.admin_user_id,
+                    content_type_id=self.content_type_id,
+                    message=(
+                        f"Ungueltiger Preisfaktor '{channel.price_factor}' fuer Sales-Channel "
+                        f"{channel.name}. Fallback auf 1.0 angewendet."
+                    ),
+                    object_repr="Microtech Sync (batch)",
+                )
+            factors[channel.pk] = factor
+        self._channel_warnings_logged = True
+        return factors
+
+    def _write_prices(
+        self,
+        records: list[MicrotechProductRecord],
+        products: dict[str, Product],
+        created_erp_nrs: set[str],
+    ) -> int:
+        priced_records = [record for record in records if record.price is not None]
+        if not priced_records:
+            return 0
+        channels = self._active_channels()
+        default_channel = next((channel for channel in channels if channel.is_default), None)
+        if default_channel is None:
+            if not self._channel_warnings_logged:
+                _log_admin_error(
+                    admin_user_id=self.admin_user_id,
+                    content_type_id=self.content_type_id,
+                    message="Kein aktiver Default-Sales-Channel gefunden. Preise wurden nicht aktualisiert.",
+                    object_repr="Microtech Sync (batch)",
+                )
+                self._channel_warnings_logged = True
+            return 0
+        derived_channels = [channel for channel in channels if channel.pk != default_channel.pk]
+        factors = self._channel_factors(derived_channels)
+
+        product_ids = [
+            products[record.erp_nr].pk
+            for record in priced_records
+            if record.erp_nr not in created_erp_nrs
+        ]
+        existing: dict[tuple[int, int | None], Price] = {}
+        for price_entry in Price.objects.filter(product_id__in=product_ids).order_by("pk"):
+            existing.setdefault((price_entry.product_id, price_entry.sales_channel_id), price_entry)
+
+        now = timezone.now()
+        to_create: list[Price] = []
+        to_update: list[Price] = []
+        history_candidates: list[tuple[Price, dict | None, bool]] = []
+        for record in priced_records:
+            product = products[record.erp_nr]
+            base_price = existing.get((product.pk, default_channel.pk))
+            is_create = base_price is None
+            if is_create:
+                base_price = Price(product=product, sales_channel=default_channel)
+                previous_state = None
+            else:
+                previous_state = base_price.history_state()
+            before = self._snapshot(base_price, PRICE_IMPORT_FIELDS)
+            self._apply_microtech_price(base_price, record)
+            if is_create:
+                to_create.append(base_price)
+            elif self._snapshot(base_price, PRICE_IMPORT_FIELDS) != before:
+                base_price.updated_at = now
+                to_update.append(base_price)
+            history_candidates.append((base_price, previous_state, is_create))
+
+            for channel in derived_channels:
+                if (product.pk, channel.pk) in existing:
+                    continue
+                factor = factors[channel.pk]
+                derived_price = Price(
+                    product=product,
+                    sales_channel=channel,
+                    price=_apply_factor(base_price.price, factor),
+                    rebate_quantity=base_price.rebate_quantity,
+                    rebate_price=_apply_factor(base_price.rebate_price, factor),
+                    special_price=_apply_factor(base_price.special_price, factor),
+                    special_start_date=base_price.special_start_date,
+                    special_end_date=base_price.special_end_date,
+                )
+                derived_price.normalize_special_price()
+                existing[(product.pk, channel.pk)] = derived_price
+                to_create.append(derived_price)
+                history_candidates.append((derived_price, None, True))
+
+        if to_create:
+            Price.objects.bulk_create(to_create, batch_size=self.chunk_size)
+        if to_update:
+            Price.objects.bulk_update(to_update, [*PRICE_IMPORT_FIELDS, "updated_at"], batch_size=self.chunk_size)
+
+        history_entries: list[PriceHistory] = []
+        for price_entry, previous_state, is_create in history_candidates:
+            history_entry = price_entry.build_history_entry(
+                previous_state=previous_state,
+                is_create=is_create,
+                history_tracked_fields=Price.MICROTECH_HISTORY_FIELDS,
+            )
+            if history_entry is not None:
+                history_entries.append(history_entry)
+        if history_entries:
+            PriceHistory.objects.bulk_create(history_entries, batch_size=self.chunk_size)
+        return len(history_entries)
+
+    @staticmethod
+    def _apply_microtech_price(price_entry: Price, record: MicrotechProductRecord) -> None:
+        rebate_quantity = record.rebate_quantity
+        rebate_price = record.rebate_price
+        # Während eines Sonderpreises wird die Staffel bewusst aus Microtech
+        # entfernt. Sie bleibt in Django als Wiederherstellungswert erhalten.
+        if (
+            record.special_price is not None
+            and rebate_quantity in (None, 0)
+            and rebate_price in (None, Decimal("0"))
+            and (price_entry.rebate_quantity is not None or price_entry.rebate_price is not None)
+        ):
+            rebate_quantity = price_entry.rebate_quantity
+            rebate_price = price_entry.rebate_price
+
+        price_entry.price = record.price
+        price_entry.rebate_quantity = rebate_quantity
+        price_entry.rebate_price = rebate_price
+        price_entry.special_price = record.special_price
+        price_entry.special_start_date = record.special_start_date
+        price_entry.special_end_date = record.special_end_date
+        price_entry.normalize_special_price()
+
+    # ------------------------------------------------------------------
+    # Bilder
+    # ------------------------------------------------------------------
+
+    def _write_images(self, records: list[MicrotechProductRecord], products: dict[str, Product]) -> None:
+        all_names = _unique_preserve_order([name for record in records for name in record.image_names])
+        images_by_path: dict[str, Image] = {}
+        if all_names:
+            images_by_path = {image.path: image for image in Image.objects.filter(path__in=all_names)}
+            missing = [Image(path=name) for name in all_names if name not in images_by_path]
+            if missing:
+                Image.objects.bulk_create(missing, ignore_conflicts=True)
+                images_by_path = {image.path: image for image in Image.objects.filter(path__in=all_names)}
+
+        product_ids = [products[record.erp_nr].pk for record in records]
+        relations: dict[int, dict[int, ProductImage]] = {}
+        for relation in ProductImage.objects.filter(product_id__in=product_ids):
+            relations.setdefault(relation.product_id, {})[relation.image_id] = relation
+        legacy_through = Product.images.through
+        legacy_links: dict[int, dict[int, int]] = {}
+        for link_id, product_id, image_id in legacy_through.objects.filter(product_id__in=product_ids).values_list(
+            "pk", "product_id", "image_id"
+        ):
+            legacy_links.setdefault(product_id, {})[image_id] = link_id
+
+        now = timezone.now()
+        relations_to_create: list[ProductImage] = []
+        relations_to_update: list[ProductImage] = []
+        relation_ids_to_delete: list[int] = []
+        links_to_create = []
+        link_ids_to_delete: list[int] = []
+        for record in records:
+            product = products[record.erp_nr]
+            ordered_images = [images_by_path[name] for name in record.image_names if name in images_by_path]
+            wanted_ids = {image.pk for image in ordered_images}
+            product_relations = relations.get(product.pk, {})
+            product_links = legacy_links.get(product.pk, {})
+
+            relation_ids_to_delete.extend(
+                relation.pk for image_id, relation in product_relations.items() if image_id not in wanted_ids
+            )
+            link_ids_to_delete.extend(
+                link_id for image_id, link_id in product_links.items() if image_id not in wanted_ids
+            )
+            for order, image in enumerate(ordered_images, start=1):
+                if image.pk not in product_links:
+                    links_to_create.append(legacy_through(product_id=product.pk, image_id=image.pk))
+                relation = product_relations.get(image.pk)
+                if relation is None:
+                    relations_to_create.append(ProductImage(product=product, image=image, order=order))
+                elif relation.order != order:
+                    relation.order = order
+                    relation.updated_at = now
+                    relations_to_update.append(relation)
+
+        if relation_ids_to_delete:
+            ProductImage.objects.filter(pk__in=relation_ids_to_delete).delete()
+        if link_ids_to_delete:
+            legacy_through.objects.filter(pk__in=link_ids_to_delete).delete()
+        if links_to_create:
+            legacy_through.objects.bulk_create(links_to_create, batch_size=self.chunk_size, ignore_conflicts=True)
+        if relations_to_create:
+            ProductImage.objects.bulk_create(relations_to_create, batch_size=self.chunk_size)
+        if relations_to_update:
+            ProductImage.objects.bulk_update(relations_to_update, ["order", "updated_at"], batch_size=self.chunk_size)
@@ -11,3 +11,9 @@ def sync_order_rule_django_field_catalog(sender, **kwargs) -> None:
     from microtech.rule_builder import sync_django_field_catalog
 
     sync_django_field_catalog()
+
+
+def invalidate_compiled_order_rules(sender, **kwargs) -> None:
+    from orders.services.order_rule_resolver import invalidate_order_rules
+
+    invalidate_order_rules()
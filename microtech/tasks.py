@@ -45,6 +45,14 @@ def poll_graphql_job(job_id: int) -> bool:
     return MicrotechJobSentinelService().poll_job_once(job_id=job_id)
 
 
+@shared_task(name="microtech.poll_graphql_job_batch")
+def poll_graphql_job_batch(job_ids: list[int]) -> int:
+    """Pollt mehrere Jobs mit einer GraphQL-Abfrage (Batch-Modus des Beat-Pollers)."""
+    from microtech.services import MicrotechJobSentinelService
+
+    return MicrotechJobSentinelService().poll_jobs_once(job_ids=job_ids)
+
+
 @shared_task(name="microtech.cleanup_old_graphql_jobs")
 def cleanup_old_graphql_jobs(
     max_age_days: int = 30,
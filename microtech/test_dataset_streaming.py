@@ -0,0 +1,135 @@
+from django.test import SimpleTestCase
+
+from microtech.services.base import MicrotechDatasetService
+from microtech.services.graphql_client import MicrotechGraphQLClientService
+
+
+class _FakePagedClient(MicrotechGraphQLClientService):
+    """Liefert Seiten aus einer festen Liste; protokolliert Submit/Poll-Reihenfolge."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.events: list[tuple[str, str]] = []
+        self.cancelled: list[str] = []
+        self._jobs: dict[str, dict] = {}
+
+    def submit_dataset_job(self, input_data):
+        index = int(input_data["after"][0]) if input_data.get("after") else 0
+        job_id = f"job-{index}"
+        records = self.pages[index]
+        has_more = index + 1 < len(self.pages)
+        self._jobs[job_id] = {
+            "status": "DONE",
+            "records": records,
+            "hasMore": has_more,
+            "nextCursor": [str(index + 1)] if has_more else None,
+            "recordCount": sum(len(page) for page in self.pages),
+        }
+        self.events.append(("submit", job_id))
+        return job_id, 0.0
+
+    def poll_job(self, job_id, *, query_job, retry_after=None, timeout=None):
+        self.events.append(("poll", job_id))
+        return self._jobs[job_id]
+
+    def cancel_job(self, job_id):
+        self.cancelled.append(job_id)
+        return {"accepted": True, "jobId": job_id}
+
+
+def _pages():
+    return [
+        [{"Nr": "1"}, {"Nr": "2"}],
+        [{"Nr": "3"}, {"Nr": "4"}],
+        [{"Nr": "5"}],
+    ]
+
+
+class MicrotechDatasetStreamingTest(SimpleTestCase):
+    def _service(self, client):
+        service = MicrotechDatasetService(erp=client, dataset_name="Artikel", index_field="Nr")
+        service.set_range("0", "9")
+        return service
+
+    def test_iter_records_submits_next_page_before_yielding_current(self):
+        client = _FakePagedClient(_pages())
+        service = self._service(client)
+
+        iterator = service.iter_records()
+        self.assertEqual(next(iterator), {"Nr": "1"})
+        self.assertEqual(client.events, [("submit", "job-0"), ("poll", "job-0"), ("submit", "job-1")])
+
+        self.assertEqual([record["Nr"] for record in iterator], ["2", "3", "4", "5"])
+        self.assertEqual(client.cancelled, [])
+
+    def test_closing_iterator_early_cancels_read_ahead_job(self):
+        client = _FakePagedClient(_pages())
+        service = self._service(client)
+
+        iterator = service.iter_records()
+        next(iterator)
+        iterator.close()
+
+        self.assertEqual(client.cancelled, ["job-1"])
+
+    def test_cursor_api_does_not_read_ahead_by_default(self):
+        client = _FakePagedClient(_pages())
+        service = self._service(client)
+
+        service.range_first()
+        service.range_next()
+        service.range_next()
+
+        self.assertEqual(service.get_field("Nr"), "3")
+        self.assertEqual(
+            client.events,
+            [("submit", "job-0"), ("poll", "job-0"), ("submit", "job-1"), ("poll", "job-1")],
+        )
+
+    def test_cursor_api_reads_ahead_and_drops_consumed_pages(self):
+        client = _FakePagedClient(_pages())
+        service = self._service(client)
+        service.read_ahead = True
+
+        seen = []
+        while not service.range_eof():
+            seen.append(service.get_field("Nr"))
+            self.assertLessEqual(len(service._records), 2)
+            service.range_next()
+
+        self.assertEqual(seen, ["1", "2", "3", "4", "5"])
+        self.assertEqual(service.range_count(), 5)
+        self.assertEqual(
+            client.events[:3],
+            [("submit", "job-0"), ("poll", "job-0"), ("submit", "job-1")],
+        )
+
+    def test_range_first_rereads_after_pages_were_dropped(self):
+        client = _FakePagedClient(_pages())
+        service = self._service(client)
+
+        service.range_last()
+        self.assertEqual(service.get_field("Nr"), "5")
+
+        service.range_first()
+        self.assertEqual(service.get_field("Nr"), "1")
+
+    def test_closing_cursor_api_cancels_read_ahead_job(self):
+        client = _FakePagedClient(_pages())
+        service = self._service(client)
+        service.read_ahead = True
+        service.range_first()
+
+        service.close()
+
+        self.assertEqual(client.cancelled, ["job-1"])
+
+    def test_changing_range_cancels_pending_read_ahead(self):
+        client = _FakePagedClient(_pages())
+        service = self._service(client)
+        service.read_ahead = True
+        service.range_first()
+
+        service.set_range("0", "1")
+
+        self.assertEqual(client.cancelled, ["job-1"])
@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 from django.test import SimpleTestCase
 
@@ -230,3 +230,32 @@ class SubmitMutationTest(SimpleTestCase):
 
         self.assertTrue(result["worker"]["microtechConnected"])
         self.assertIn("microtechWorkerStatus", mock_execute.call_args.args[0])
+
+
+class QueryJobsTest(SimpleTestCase):
+    def test_query_jobs_sends_one_aliased_document_and_splits_errors(self):
+        client = MicrotechGraphQLClientService.__new__(MicrotechGraphQLClientService)
+        client._post = MagicMock(
+            return_value={
+                "data": {"job0": {"jobId": "a", "status": "DONE"}, "job1": None},
+                "errors": [{"message": "Job b unbekannt", "path": ["job1"]}],
+            }
+        )
+
+        results = client.query_jobs([("datasetJob", "a"), ("vorgangJob", "b")])
+
+        client._post.assert_called_once()
+        query, variables = client._post.call_args.args
+        self.assertIn("job0: datasetJob(jobId: $job0)", query)
+        self.assertIn("job1: vorgangJob(jobId: $job1)", query)
+        self.assertEqual(variables, {"job0": "a", "job1": "b"})
+        self.assertEqual(results[0], {"jobId": "a", "status": "DONE"})
+        self.assertIsInstance(results[1], GraphQLMicrotechError)
+        self.assertIn("Job b unbekannt", str(results[1]))
+
+    def test_query_jobs_raises_on_document_level_errors(self):
+        client = MicrotechGraphQLClientService.__new__(MicrotechGraphQLClientService)
+        client._post = MagicMock(return_value={"errors": [{"message": "Syntax Error"}]})
+
+        with self.assertRaises(GraphQLMicrotechError):
+            client.query_jobs([("datasetJob", "a")])
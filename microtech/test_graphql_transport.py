@@ -0,0 +1,146 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.test import SimpleTestCase
+from urllib3.exceptions import NewConnectionError, ProtocolError, ReadTimeoutError
+
+from microtech.services.graphql_client import (
+    MicrotechGraphQLClientService,
+    MicrotechGraphQLConfig,
+    _ConnectionResetRetry,
+    _RequestNotSentError,
+    get_microtech_graphql_session,
+    reset_microtech_graphql_sessions,
+)
+
+
+class _GraphQLHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        body = json.dumps({"data": {"health": "ok"}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StaleKeepAliveHandler(_GraphQLHandler):
+    """Beantwortet je Verbindung nur die erste Anfrage und schliesst sie bei der zweiten."""
+
+    received: list[str] = []
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.received.append(json.loads(self.rfile.read(length))["query"])
+        if getattr(self, "_answered", False):
+            self.close_connection = True
+            return
+        self._answered = True
+        body = json.dumps({"data": {"health": "ok", "ping": "pong"}}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class MicrotechGraphQLTransportTest(SimpleTestCase):
+    def setUp(self):
+        reset_microtech_graphql_sessions()
+        self.addCleanup(reset_microtech_graphql_sessions)
+
+    def _serve(self, handler=_GraphQLHandler) -> str:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_address[1]}/graphql/"
+
+    def test_clients_share_one_session_per_process(self):
+        config = MicrotechGraphQLConfig(url="http://wrapper.invalid/graphql/")
+
+        first = get_microtech_graphql_session(config)
+        second = get_microtech_graphql_session(MicrotechGraphQLConfig(url=config.url, request_timeout=1.0))
+
+        self.assertIs(first, second)
+        adapter = first.get_adapter(config.url)
+        self.assertEqual(adapter._pool_maxsize, config.pool_size)
+        self.assertEqual(adapter.max_retries.connect, config.max_retries)
+
+    def test_execute_reuses_keep_alive_connection(self):
+        config = MicrotechGraphQLConfig(url=self._serve(), request_timeout=5.0)
+
+        for _ in range(5):
+            data = MicrotechGraphQLClientService(config=config).execute(
+                "query { health }",
+                bypass_backup_mode=True,
+            )
+            self.assertEqual(data, {"health": "ok"})
+
+        stats = MicrotechGraphQLClientService.transport_stats()
+        self.assertEqual(stats["requests_sent"], 5)
+        self.assertEqual(stats["connections_opened"], 1)
+        self.assertEqual(stats["requests_per_connection"], 5.0)
+
+    def test_read_timeouts_are_not_retried(self):
+        retry = _ConnectionResetRetry(total=3, connect=3, read=3, allowed_methods=frozenset({"POST"}))
+        error = ReadTimeoutError(None, "/graphql/", "read timed out")
+
+        with self.assertRaises(ReadTimeoutError):
+            retry.increment(method="POST", url="/graphql/", error=error)
+
+    def test_resets_after_sending_are_not_retried(self):
+        retry = _ConnectionResetRetry(total=3, connect=3, read=0, allowed_methods=frozenset({"POST"}))
+        error = ProtocolError("Connection aborted.", ConnectionResetError(104, "reset by peer"))
+
+        with self.assertRaises(ProtocolError):
+            retry.increment(method="POST", url="/graphql/", error=error)
+
+    def test_connect_errors_are_retried(self):
+        retry = _ConnectionResetRetry(total=3, connect=3, read=0, allowed_methods=frozenset({"POST"}))
+        error = NewConnectionError(None, "connection refused")
+
+        retried = retry.increment(method="POST", url="/graphql/", error=error)
+
+        self.assertEqual(retried.connect, 2)
+
+    def test_resets_before_sending_are_retried(self):
+        retry = _ConnectionResetRetry(total=3, connect=3, read=0, allowed_methods=frozenset({"POST"}))
+        error = ProtocolError("Connection aborted.", _RequestNotSentError("broken pipe"))
+
+        retried = retry.increment(method="POST", url="/graphql/", error=error)
+
+        self.assertEqual(retried.connect, 2)
+
+    def test_stale_keep_alive_connection_is_retried_for_queries(self):
+        _StaleKeepAliveHandler.received = []
+        config = MicrotechGraphQLConfig(url=self._serve(_StaleKeepAliveHandler), request_timeout=5.0, retry_backoff=0.0)
+        client = MicrotechGraphQLClientService(config=config)
+
+        client.execute("query { health }", bypass_backup_mode=True)
+        data = client.execute("query { health }", bypass_backup_mode=True)
+
+        self.assertEqual(data["health"], "ok")
+        self.assertEqual(_StaleKeepAliveHandler.received, ["query { health }"] * 3)
+        self.assertEqual(MicrotechGraphQLClientService.transport_stats()["connections_opened"], 2)
+
+    def test_stale_keep_alive_connection_is_not_retried_for_mutations(self):
+        _StaleKeepAliveHandler.received = []
+        config = MicrotechGraphQLConfig(url=self._serve(_StaleKeepAliveHandler), request_timeout=5.0, retry_backoff=0.0)
+        client = MicrotechGraphQLClientService(config=config)
+
+        client.execute("query { health }", bypass_backup_mode=True)
+        with self.assertRaises(requests.ConnectionError):
+            client.execute("mutation { ping }", bypass_backup_mode=True)
+
+        self.assertEqual(_StaleKeepAliveHandler.received, ["query { health }", "mutation { ping }"])
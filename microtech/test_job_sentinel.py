@@ -4,7 +4,7 @@ import uuid
 from datetime import timedelta
 from unittest.mock import patch
 
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from microtech.models import MicrotechGraphQLJob
@@ -151,6 +151,7 @@ class TestJobSentinelLoopSafety(TestCase):
 class TestJobSentinelPoller(TestCase):
     """Punkt 4 - der Beat-Poller verteilt Arbeit und beansprucht Jobs."""
 
+    @override_settings(MICROTECH_GRAPHQL_POLL_BATCH_SIZE=1)
     @patch("microtech.tasks.poll_graphql_job.delay")
     def test_dispatches_one_task_per_due_job(self, mock_delay):
         past = timezone.now() - timedelta(minutes=1)
@@ -163,6 +164,22 @@ class TestJobSentinelPoller(TestCase):
         dispatched = {call.args[0] for call in mock_delay.call_args_list}
         self.assertEqual(dispatched, {j1.pk, j2.pk})
 
+    @override_settings(MICROTECH_GRAPHQL_POLL_BATCH_SIZE=2)
+    @patch("microtech.tasks.poll_graphql_job_batch.delay")
+    @patch("microtech.tasks.poll_graphql_job.delay")
+    def test_dispatches_due_jobs_in_batches(self, mock_delay, mock_batch_delay):
+        past = timezone.now() - timedelta(minutes=1)
+        jobs = [_make_job(next_poll_at=past - timedelta(seconds=index)) for index in range(3)]
+
+        count = MicrotechJobSentinelService().poll_due_jobs()
+
+        self.assertEqual(count, 3)
+        mock_batch_delay.assert_called_once()
+        batched = mock_batch_delay.call_args.args[0]
+        self.assertEqual(len(batched), 2)
+        mock_delay.assert_called_once()
+        self.assertEqual(set(batched) | {mock_delay.call_args.args[0]}, {job.pk for job in jobs})
+
     @patch("microtech.tasks.poll_graphql_job.delay")
     def test_claims_dispatched_jobs_so_they_are_not_redispatched(self, mock_delay):
         past = timezone.now() - timedelta(minutes=1)
@@ -277,3 +294,63 @@ class TestJobSentinelContinuations(TestCase):
         job.refresh_from_db()
         self.assertEqual(job.next_step, "Continuation eingereiht.")
         self.assertGreater(job.next_poll_at, timezone.now())
+
+
+@patch("microtech.services.job_sentinel.MicrotechGraphQLClientService")
+class TestJobSentinelBatchPoll(TestCase):
+    def test_applies_all_remote_states_from_one_request(self, mock_client_cls):
+        running = _make_job()
+        done = _make_job(
+            kind=MicrotechGraphQLJob.Kind.PRODUCT_READ,
+            operation="requestProducts",
+            delete_after_completion=False,
+        )
+        mock_client_cls.return_value.query_jobs.return_value = [
+            {"status": "RUNNING", "retryAfterSeconds": 30},
+            {"status": "DONE", "products": []},
+        ]
+
+        applied = MicrotechJobSentinelService().poll_jobs_once(job_ids=[running.pk, done.pk])
+
+        self.assertEqual(applied, 2)
+        mock_client_cls.return_value.query_jobs.assert_called_once_with(
+            [("datasetJob", running.external_job_id), ("productListJob", done.external_job_id)]
+        )
+        running.refresh_from_db()
+        done.refresh_from_db()
+        self.assertEqual(running.status, MicrotechGraphQLJob.Status.RUNNING)
+        self.assertEqual(running.attempt, 1)
+        self.assertGreater(running.next_poll_at, timezone.now())
+        self.assertEqual(done.status, MicrotechGraphQLJob.Status.SUCCEEDED)
+        self.assertEqual(done.result_payload, {"status": "DONE", "products": []})
+
+    def test_partial_error_only_affects_its_job(self, mock_client_cls):
+        ok = _make_job()
+        broken = _make_job(attempt=2, max_attempts=3)
+        mock_client_cls.return_value.query_jobs.return_value = [
+            {"status": "RUNNING"},
+            GraphQLMicrotechError("Job unbekannt"),
+        ]
+
+        applied = MicrotechJobSentinelService().poll_jobs_once(job_ids=[ok.pk, broken.pk])
+
+        self.assertEqual(applied, 1)
+        ok.refresh_from_db()
+        broken.refresh_from_db()
+        self.assertEqual(ok.status, MicrotechGraphQLJob.Status.RUNNING)
+        self.assertEqual(broken.status, MicrotechGraphQLJob.Status.FAILED)
+        self.assertIn("Job unbekannt", broken.error_message)
+
+    def test_request_error_backs_off_every_job(self, mock_client_cls):
+        jobs = [_make_job(), _make_job()]
+        mock_client_cls.return_value.query_jobs.side_effect = GraphQLMicrotechError("Wrapper weg")
+        before = timezone.now()
+
+        applied = MicrotechJobSentinelService().poll_jobs_once(job_ids=[job.pk for job in jobs])
+
+        self.assertEqual(applied, 0)
+        for job in jobs:
+            job.refresh_from_db()
+            self.assertIn(job.status, MicrotechJobSentinelService.LOCAL_ACTIVE)
+            self.assertGreater(job.next_poll_at, before)
+            self.assertIn("Wrapper weg", job.error_message)
@@ -2,7 +2,9 @@ from datetime import timedelta
 from decimal import Decimal
 from unittest.mock import MagicMock
 
+from django.db import connection
 from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from microtech.management.commands.microtech_sync_products import (
@@ -16,6 +18,7 @@ from microtech.services.base import MicrotechDatasetService
 from microtech.services.artikel import MicrotechArtikelService
 from microtech.services.expired_specials import MicrotechExpiredSpecialSyncService
 from microtech.services.graphql_client import MicrotechGraphQLClientService
+from microtech.services.product_import import MicrotechProductImportService
 from microtech.services.product_payload import MicrotechProductPayloadService
 from products.models import Price, Product, ProductImage, Storage, Tax
 from shopware.models import ShopwareSettings
@@ -714,6 +717,117 @@ class MicrotechSyncProductsCommandTest(TestCase):
         )
 
 
+class MicrotechProductImportServiceTest(TestCase):
+    def setUp(self):
+        self.tax_19 = Tax.objects.create(name="MwSt 19", rate=Decimal("19.00"), shopware_id="tax-19")
+        self.tax_7 = Tax.objects.create(name="MwSt 7", rate=Decimal("7.00"), shopware_id="tax-7")
+        self.default_channel = ShopwareSettings.objects.create(name="Default", is_default=True, is_active=True)
+        self.b2b_channel = ShopwareSettings.objects.create(
+            name="B2B",
+            is_active=True,
+            price_factor=Decimal("1.25"),
+        )
+
+    def _service(self, **kwargs) -> MicrotechProductImportService:
+        return MicrotechProductImportService(
+            client=_FakeGraphQLClient({}),
+            tax_map={Decimal("19.00"): self.tax_19, Decimal("7.00"): self.tax_7},
+            **kwargs,
+        )
+
+    @staticmethod
+    def _product_data(erp_nr: str, **overrides) -> dict:
+        data = {
+            "erpNumber": erp_nr,
+            "name": f"Artikel {erp_nr}",
+            "description": "Beschreibung",
+            "descriptionShort": "Kurz",
+            "isActive": True,
+            "unit": "Stk",
+            "price": "100.00",
+            "rebateQuantity": 10,
+            "rebatePrice": "95.00",
+            "taxRate": "19.00",
+            "stock": "12.00",
+            "storageLocation": "A1",
+            "images": [f"{erp_nr}-1.jpg", f"{erp_nr}-2.jpg"],
+        }
+        data.update(overrides)
+        return data
+
+    def test_import_creates_products_storage_prices_and_images(self):
+        result = self._service().import_products([self._product_data("2000"), {"deleted": True}])
+
+        self.assertEqual(result.imported, ["2000"])
+        self.assertEqual(result.missing, 1)
+        self.assertEqual(result.created, 1)
+        product = Product.objects.get(erp_nr="2000")
+        self.assertEqual(product.name, "Artikel 2000")
+        self.assertEqual(product.tax, self.tax_19)
+        self.assertEqual(product.storage.stock, Decimal("12.00"))
+        self.assertEqual(product.storage.location, "A1")
+        default_price = Price.objects.get(product=product, sales_channel=self.default_channel)
+        derived_price = Price.objects.get(product=product, sales_channel=self.b2b_channel)
+        self.assertEqual(default_price.price, Decimal("100.00"))
+        self.assertEqual(derived_price.price, Decimal("125.00"))
+        self.assertEqual(derived_price.rebate_price, Decimal("118.75"))
+        self.assertEqual(default_price.history_entries.count(), 1)
+        self.assertEqual(derived_price.history_entries.count(), 1)
+        self.assertEqual([image.path for image in product.get_images()], ["2000-1.jpg", "2000-2.jpg"])
+
+    def test_unchanged_reimport_writes_nothing_and_preserves_is_active(self):
+        self._service().import_products([self._product_data("2001")])
+        Product.objects.filter(erp_nr="2001").update(is_active=False)
+
+        result = self._service(preserve_is_active=True).import_products(
+            [self._product_data("2001", isActive=True, images=["2001-2.jpg"])]
+        )
+
+        product = Product.objects.get(erp_nr="2001")
+        self.assertFalse(product.is_active)
+        self.assertEqual(result.unchanged, 1)
+        self.assertEqual(result.price_history, 0)
+        self.assertEqual([image.path for image in product.get_images()], ["2001-2.jpg"])
+
+    def test_special_price_without_rebate_keeps_local_rebate_and_existing_channel_price(self):
+        self._service().import_products([self._product_data("2002")])
+        Price.objects.filter(product__erp_nr="2002", sales_channel=self.b2b_channel).update(price=Decimal("137.00"))
+
+        self._service().import_products(
+            [
+                self._product_data(
+                    "2002",
+                    rebateQuantity=None,
+                    rebatePrice=None,
+                    specialPrice="80.00",
+                    specialStartDate=(timezone.now() - timedelta(days=1)).isoformat(),
+                    specialEndDate=(timezone.now() + timedelta(days=1)).isoformat(),
+                )
+            ]
+        )
+
+        default_price = Price.objects.get(product__erp_nr="2002", sales_channel=self.default_channel)
+        self.assertEqual(default_price.rebate_quantity, 10)
+        self.assertEqual(default_price.rebate_price, Decimal("95.00"))
+        self.assertEqual(default_price.special_price, Decimal("80.00"))
+        self.assertTrue(default_price.is_special_active)
+        self.assertEqual(
+            Price.objects.get(product__erp_nr="2002", sales_channel=self.b2b_channel).price,
+            Decimal("137.00"),
+        )
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        def count_queries(erp_nrs: list[str]) -> int:
+            with CaptureQueriesContext(connection) as queries:
+                self._service().import_products([self._product_data(erp_nr) for erp_nr in erp_nrs])
+            return len(queries)
+
+        small_batch = count_queries(["3000", "3001"])
+        large_batch = count_queries([f"31{index:02d}" for index in range(20)])
+
+        self.assertEqual(small_batch, large_batch)
+
+
 class MicrotechArtikelServiceTaxTest(TestCase):
     def test_get_tax_rate_uses_optional_field_and_falls_back_to_tax_key(self):
         service = MicrotechArtikelService.__new__(MicrotechArtikelService)
@@ -781,7 +781,8 @@ class OrderAdmin(BaseAdmin):
             request,
             (
                 f"Orders gesehen: {summary['orders_seen']}, erstellt: {summary['orders_created']}, "
-                f"aktualisiert: {summary['orders_updated']}, Details: {summary['details_upserted']}, "
+                f"aktualisiert: {summary['orders_updated']}, unveraendert: {summary['orders_unchanged']}, "
+                f"Details: {summary['details_upserted']}, "
                 f"auf 'In Bearbeitung': {summary['orders_promoted']}, Fehler: {summary['orders_failed']}"
             ),
         )
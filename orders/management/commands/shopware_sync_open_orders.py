@@ -30,16 +30,23 @@ class Command(MonitoredBaseCommand):
             default=None,
             help="Optional: limit how many open orders are processed.",
         )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Ignore the stored per-channel watermark and fetch all open orders.",
+        )
 
     def handle(self, *args, **options):
         sales_channel_ids = [value.strip() for value in options["sales_channel_id"] if value and value.strip()]
         limit_orders = options.get("limit_orders")
+        full_sync = bool(options.get("full"))
 
         runtime = CommandRuntimeService().start(
             command_name="shopware_sync_open_orders",
             argv=sys.argv,
             metadata={
                 "limit_orders": limit_orders,
+                "full_sync": full_sync,
                 "sales_channel_count": len(sales_channel_ids),
             },
         )
@@ -49,6 +56,7 @@ class Command(MonitoredBaseCommand):
                 summary = OrderSyncService().sync_open_orders(
                     sales_channel_ids=sales_channel_ids or None,
                     limit_orders=limit_orders,
+                    full_sync=full_sync,
                 )
             except Exception as exc:  # pragma: no cover - runtime/network errors
                 logger.exception("Shopware open-order sync failed.")
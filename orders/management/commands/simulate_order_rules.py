@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+
+from core.management.base import MonitoredBaseCommand
+
+from orders.services import OrderRuleSimulationService
+
+
+class Command(MonitoredBaseCommand):
+    help = (
+        "Evaluates a draft order rule set against stored orders and reports which orders "
+        "would switch rules. Read-only; nothing is written to Django or Microtech."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--enable-rule",
+            action="append",
+            type=int,
+            default=[],
+            help="Rule ID to include in the draft, e.g. an inactive draft rule. Repeatable.",
+        )
+        parser.add_argument(
+            "--disable-rule",
+            action="append",
+            type=int,
+            default=[],
+            help="Active rule ID to leave out of the draft. Repeatable.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Optional: only evaluate the most recent N orders.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=OrderRuleSimulationService.DEFAULT_CHUNK_SIZE,
+            help="Orders loaded per query.",
+        )
+        parser.add_argument(
+            "--show",
+            type=int,
+            default=OrderRuleSimulationService.DEFAULT_MAX_SWITCHES,
+            help="How many switching orders to list individually.",
+        )
+
+    def handle(self, *args, **options):
+        result = OrderRuleSimulationService().simulate(
+            enable_rule_ids=options["enable_rule"],
+            disable_rule_ids=options["disable_rule"],
+            limit=options.get("limit"),
+            chunk_size=max(1, int(options["chunk_size"])),
+            max_switches=max(0, int(options["show"])),
+        )
+        self.stdout.write(json.dumps(result.as_dict(), ensure_ascii=False, indent=2))
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.2 on 2026-10-16 21:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0007_alter_microtechordersyncworkflow_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='shopware_payload_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='Shopware Bestell-Sync-Hash'),
+        ),
+        migrations.CreateModel(
+            name='OpenOrderSyncWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Angelegt am')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Aktualisiert am')),
+                ('sales_channel_id', models.CharField(max_length=255, unique=True, verbose_name='Verkaufskanal-ID')),
+                ('synced_until', models.DateTimeField(blank=True, null=True, verbose_name='Synchronisiert bis')),
+            ],
+            options={
+                'verbose_name': 'Bestell-Sync Stand',
+                'verbose_name_plural': 'Bestell-Sync Staende',
+            },
+        ),
+    ]
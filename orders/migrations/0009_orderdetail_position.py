@@ -0,0 +1,22 @@
+# Generated by Django 6.0.2 on 2026-10-16 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0008_order_shopware_payload_hash_openordersyncwatermark'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='orderdetail',
+            options={'ordering': ('order', 'position', 'id'), 'verbose_name': 'Bestellposition', 'verbose_name_plural': 'Bestellpositionen'},
+        ),
+        migrations.AddField(
+            model_name='orderdetail',
+            name='position',
+            field=models.PositiveIntegerField(default=0, verbose_name='Position'),
+        ),
+    ]
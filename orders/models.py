@@ -110,6 +110,12 @@ class Order(BaseModel):
         blank=True,
         verbose_name=_("Lieferanschrift"),
     )
+    shopware_payload_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        verbose_name=_("Shopware Bestell-Sync-Hash"),
+    )
 
     class Meta:
         verbose_name = _("Bestellung")
@@ -120,6 +126,20 @@ class Order(BaseModel):
         return self.order_number or self.api_id
 
 
+class OpenOrderSyncWatermark(BaseModel):
+    """Stand des inkrementellen Imports offener Bestellungen je Verkaufskanal."""
+
+    sales_channel_id = models.CharField(max_length=255, unique=True, verbose_name=_("Verkaufskanal-ID"))
+    synced_until = models.DateTimeField(null=True, blank=True, verbose_name=_("Synchronisiert bis"))
+
+    class Meta:
+        verbose_name = _("Bestell-Sync Stand")
+        verbose_name_plural = _("Bestell-Sync Staende")
+
+    def __str__(self) -> str:
+        return f"{self.sales_channel_id} @ {self.synced_until or '-'}"
+
+
 class OrderDetail(BaseModel):
     order = models.ForeignKey(
         Order,
@@ -128,6 +148,7 @@ class OrderDetail(BaseModel):
         verbose_name=_("Bestellung"),
     )
     api_id = models.CharField(max_length=64, blank=True, default="", verbose_name=_("Shopware Position-ID"))
+    position = models.PositiveIntegerField(default=0, verbose_name=_("Position"))
     erp_nr = models.CharField(max_length=255, blank=True, default="", verbose_name=_("ERP-Nummer"))
     name = models.CharField(max_length=255, blank=True, default="", verbose_name=_("Bezeichnung"))
     unit = models.CharField(max_length=64, blank=True, default="", verbose_name=_("Einheit"))
@@ -155,7 +176,7 @@ class OrderDetail(BaseModel):
     class Meta:
         verbose_name = _("Bestellposition")
         verbose_name_plural = _("Bestellpositionen")
-        ordering = ("order", "id")
+        ordering = ("order", "position", "id")
 
     def __str__(self) -> str:
         return f"{self.order_id} | {self.name or self.erp_nr or self.api_id}"
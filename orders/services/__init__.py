@@ -2,6 +2,7 @@ from .order_customer_change import CONTINUATION_NAME as ORDER_CUSTOMER_CHANGE_CO
 from .order_customer_change import OrderCustomerChangeService
 from .order_address_reconciliation import OrderAddressReconciliationService
 from .order_rule_resolver import OrderRuleResolverService, ResolvedOrderRule
+from .order_rule_simulation import OrderRuleSimulationService
 from .order_sync import OrderSyncService
 from .order_sync_workflow import CONTINUATION_NAME, OrderSyncWorkflowService
 from .order_upsert_microtech import OrderUpsertMicrotechService
@@ -13,6 +14,7 @@ __all__ = [
     "OrderCustomerChangeService",
     "OrderAddressReconciliationService",
     "OrderRuleResolverService",
+    "OrderRuleSimulationService",
     "OrderSyncService",
     "OrderSyncWorkflowService",
     "OrderUpsertMicrotechService",
@@ -1,11 +1,18 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, replace
+import operator as operator_module
+import threading
+import time
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field, replace
 from datetime import date, datetime
 from decimal import Decimal, InvalidOperation
 
+from django.conf import settings
+from django.db import transaction
 from loguru import logger
 
+from core.redis_client import get_redis
 from core.services import BaseService
 from microtech.models import MicrotechOrderRule, MicrotechOrderRuleAction, MicrotechOrderRuleCondition
 from microtech.rule_builder import get_django_field_map, get_operator_engine_map, resolve_django_field_value
@@ -84,6 +91,77 @@ def _to_datetime(value: object) -> datetime | None:
         return None
 
 
+ORDER_RULE_VERSION_KEY = "orders:order-rules:version"
+
+# Der kompilierte Regelsatz gilt, bis Regeln, Bedingungen, Aktionen oder der
+# Feld-/Operator-Katalog gespeichert werden. Die Versionsnummer liegt in Redis,
+# damit Admin-Änderungen auch Celery-Worker erreichen; ohne Redis greift nur
+# der lokale Zähler plus ORDER_RULE_CACHE_SECONDS als Obergrenze.
+_rule_set_lock = threading.Lock()
+_rule_set_cache: dict[str, object] = {
+    "version": None,
+    "loaded_at": 0.0,
+    "value": None,
+}
+_local_version = [0]
+_pending = threading.local()
+
+
+def _rule_cache_seconds() -> float:
+    return float(getattr(settings, "ORDER_RULE_CACHE_SECONDS", 60.0))
+
+
+def _current_rule_version() -> tuple[int, str | None]:
+    try:
+        shared = get_redis().get(ORDER_RULE_VERSION_KEY)
+    except Exception as exc:
+        logger.debug("Order rule version read failed: {}", exc)
+        return _local_version[0], None
+    return _local_version[0], str(shared or "0")
+
+
+def bump_order_rule_version() -> None:
+    """Verwirft den kompilierten Regelsatz in allen Prozessen."""
+    _pending.dirty = False
+    with _rule_set_lock:
+        _local_version[0] += 1
+        _rule_set_cache.update({"version": None, "loaded_at": 0.0, "value": None})
+    try:
+        get_redis().incr(ORDER_RULE_VERSION_KEY)
+    except Exception as exc:
+        logger.debug("Order rule version bump failed: {}", exc)
+
+
+def invalidate_order_rules() -> None:
+    """Markiert den Regelsatz nach einer Änderung als veraltet.
+
+    Bis zum Commit sieht nur die eigene Verbindung die Änderung; solange
+    kompiliert dieser Thread ohne Cache, damit nie ein später zurückgerollter
+    Stand im Prozess-Cache landet. Der Commit räumt die Markierung über
+    ``bump_order_rule_version`` ab, ein Rollback über
+    ``_has_uncommitted_rule_changes``.
+    """
+    _pending.dirty = True
+    transaction.on_commit(bump_order_rule_version)
+
+
+def _has_uncommitted_rule_changes() -> bool:
+    if not getattr(_pending, "dirty", False):
+        return False
+    if transaction.get_connection().in_atomic_block:
+        return True
+    # Transaktion ohne Commit beendet: der on_commit-Callback wurde verworfen.
+    _pending.dirty = False
+    return False
+
+
+def reset_order_rule_cache() -> None:
+    """Vergisst den kompilierten Regelsatz dieses Prozesses (z.B. in Tests)."""
+    _pending.dirty = False
+    with _rule_set_lock:
+        _rule_set_cache.update({"version": None, "loaded_at": 0.0, "value": None})
+
+
 @dataclass(frozen=True, slots=True)
 class ResolvedDatasetAction:
     action_type: str
@@ -121,134 +199,255 @@ class ResolvedOrderRule:
         )
 
 
+@dataclass(frozen=True, slots=True)
+class CompiledOrderRuleCondition:
+    condition_id: int | None
+    field_path: str
+    operator_code: str
+    expected_raw: str
+    predicate: Callable[[object], bool] | None
+
+    def matches(self, values: "OrderFieldValues") -> bool:
+        if self.predicate is None:
+            return False
+        return self.predicate(values[self.field_path])
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledOrderRule:
+    rule_id: int | None
+    rule_name: str
+    match_any: bool
+    conditions: tuple[CompiledOrderRuleCondition, ...]
+    dataset_actions: tuple[ResolvedDatasetAction, ...]
+
+    def matches(self, values: "OrderFieldValues") -> bool:
+        # Ohne aktive Bedingung ist die Regel globaler Fallback.
+        if not self.conditions:
+            return True
+        if self.match_any:
+            return any(condition.matches(values) for condition in self.conditions)
+        return all(condition.matches(values) for condition in self.conditions)
+
+    def resolve(self, *, customer_type: str) -> ResolvedOrderRule:
+        return ResolvedOrderRule(
+            rule_id=self.rule_id,
+            rule_name=self.rule_name,
+            customer_type=customer_type,
+            dataset_actions=self.dataset_actions,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledOrderRuleSet:
+    rules: tuple[CompiledOrderRule, ...] = ()
+    version: tuple[int, str | None] | None = None
+    compiled_at: float = field(default_factory=time.monotonic)
+
+    def first_match(self, values: "OrderFieldValues") -> CompiledOrderRule | None:
+        for rule in self.rules:
+            if rule.matches(values):
+                return rule
+        return None
+
+
+class OrderFieldValues(dict):
+    """Feldwerte einer Bestellung; jeder Pfad wird höchstens einmal aufgelöst."""
+
+    def __init__(self, order: Order):
+        super().__init__()
+        self.order = order
+
+    def __missing__(self, path: str) -> object:
+        value = resolve_django_field_value(order=self.order, path=path)
+        self[path] = value
+        return value
+
+
+_COMPARATORS = {
+    MicrotechOrderRuleCondition.Operator.GREATER_THAN.value: operator_module.gt,
+    MicrotechOrderRuleCondition.Operator.LESS_THAN.value: operator_module.lt,
+}
+_VALUE_CONVERTERS: dict[str, Callable[[object], object]] = {
+    "int": _to_decimal,
+    "decimal": _to_decimal,
+    "bool": _to_bool,
+    "date": _to_date,
+    "datetime": _to_datetime,
+}
+
+
 class OrderRuleResolverService(BaseService):
     model = MicrotechOrderRule
 
     def resolve_for_order(self, *, order: Order) -> ResolvedOrderRule:
         if not isinstance(order, Order):
             raise TypeError("order must be an instance of Order.")
-
+        return self._resolve_with(rule_set=self.compiled_rule_set(), order=order)
+
+    def resolve_for_orders(self, *, orders: Iterable[Order]) -> list[ResolvedOrderRule]:
+        """Löst viele Bestellungen gegen einen einmal geladenen Regelsatz auf."""
+        rule_set = self.compiled_rule_set()
+        resolved: list[ResolvedOrderRule] = []
+        for order in orders:
+            if not isinstance(order, Order):
+                raise TypeError("order must be an instance of Order.")
+            resolved.append(self._resolve_with(rule_set=rule_set, order=order))
+        return resolved
+
+    def _resolve_with(self, *, rule_set: CompiledOrderRuleSet, order: Order) -> ResolvedOrderRule:
         customer_type = self._detect_customer_type(order=order)
         order_label = _to_str(order.order_number) or f"id={order.pk}"
+        values = OrderFieldValues(order)
+
+        rule = rule_set.first_match(values)
+        if rule is None:
+            logger.info("Order {}: no active rule matched, using defaults.", order_label)
+            return ResolvedOrderRule(customer_type=customer_type)
 
+        logger.info(
+            "Order {}: rule {} ('{}') matched with {} dataset action(s).",
+            order_label,
+            rule.rule_id,
+            rule.rule_name,
+            len(rule.dataset_actions),
+        )
+        return rule.resolve(customer_type=customer_type)
+
+    def compiled_rule_set(self) -> CompiledOrderRuleSet:
+        """Liefert den kompilierten Regelsatz, neu kompiliert nur nach einer Versionsänderung."""
+        if _has_uncommitted_rule_changes():
+            return self.compile_rule_set()
+
+        version = _current_rule_version()
+        with _rule_set_lock:
+            cached = _rule_set_cache["value"]
+            expired = version[1] is None and (
+                time.monotonic() - float(_rule_set_cache["loaded_at"] or 0.0) >= _rule_cache_seconds()
+            )
+            if cached is not None and _rule_set_cache["version"] == version and not expired:
+                return cached
+
+        rule_set = self.compile_rule_set(version=version)
+        with _rule_set_lock:
+            _rule_set_cache.update({"version": version, "loaded_at": time.monotonic(), "value": rule_set})
+        return rule_set
+
+    def compile_rule_set(
+        self,
+        *,
+        version: tuple[int, str | None] | None = None,
+        queryset=None,
+    ) -> CompiledOrderRuleSet:
+        """Kompiliert die aktiven Regeln, oder ``queryset`` (z.B. einen Entwurf für die Simulation)."""
+        if queryset is None:
+            queryset = self.get_queryset().filter(is_active=True)
         rules = list(
-            self.get_queryset()
-            .filter(is_active=True)
+            queryset
             .prefetch_related("conditions", "actions", "actions__dataset", "actions__dataset_field")
             .order_by("priority", "id")
         )
         django_field_map = get_django_field_map()
         operator_engine_map = get_operator_engine_map()
-        logger.info("Order {}: evaluating {} active rule(s).", order_label, len(rules))
-
-        for rule in rules:
-            if not self._matches_rule(
-                rule=rule,
-                order=order,
-                order_label=order_label,
-                django_field_map=django_field_map,
-                operator_engine_map=operator_engine_map,
-            ):
-                logger.info(
-                    "Order {}: rule {} ('{}') did not match.",
-                    order_label,
-                    rule.pk,
-                    _to_str(rule.name),
-                )
-                continue
 
-            resolved = ResolvedOrderRule.from_rule(rule=rule, customer_type=customer_type)
-            resolved = replace(
-                resolved,
-                dataset_actions=self._collect_dataset_actions(rule=rule, order_label=order_label),
-            )
-            logger.info(
-                "Order {}: rule {} ('{}') matched with {} dataset action(s).",
-                order_label,
-                rule.pk,
-                _to_str(rule.name),
-                len(resolved.dataset_actions),
+        compiled = tuple(
+            CompiledOrderRule(
+                rule_id=rule.pk,
+                rule_name=_to_str(rule.name),
+                match_any=rule.condition_logic == MicrotechOrderRule.ConditionLogic.ANY,
+                conditions=self._compile_conditions(
+                    rule=rule,
+                    django_field_map=django_field_map,
+                    operator_engine_map=operator_engine_map,
+                ),
+                dataset_actions=self._collect_dataset_actions(rule=rule, order_label="*"),
             )
-            return resolved
-
-        logger.info("Order {}: no active rule matched, using defaults.", order_label)
-        return ResolvedOrderRule(customer_type=customer_type)
+            for rule in rules
+        )
+        logger.info("Compiled {} active order rule(s).", len(compiled))
+        return CompiledOrderRuleSet(rules=compiled, version=version)
 
-    def _matches_rule(
+    def _compile_conditions(
         self,
         *,
         rule: MicrotechOrderRule,
-        order: Order,
-        order_label: str,
         django_field_map: dict[str, object],
         operator_engine_map: dict[str, str],
-    ) -> bool:
+    ) -> tuple[CompiledOrderRuleCondition, ...]:
         active_conditions = [condition for condition in rule.conditions.all() if condition.is_active]
-        if not active_conditions:
-            logger.info(
-                "Order {}: rule {} ('{}') has no active conditions and acts as global fallback.",
-                order_label,
-                rule.pk,
-                _to_str(rule.name),
-            )
-            return True
-
-        evaluations: list[bool] = []
+        compiled: list[CompiledOrderRuleCondition] = []
         for condition in sorted(active_conditions, key=lambda item: (item.priority, item.id)):
             field_path = _to_str(condition.django_field_path)
             field_def = django_field_map.get(field_path)
             operator_code = _to_str(condition.operator_code)
+            expected_raw = _to_str(condition.expected_value)
 
-            if not field_def:
+            predicate = None
+            if field_def:
+                predicate = self._compile_predicate(
+                    operator=_to_str(operator_engine_map.get(operator_code)) or operator_code,
+                    expected_raw=expected_raw,
+                    value_kind=_to_str(getattr(field_def, "value_kind", "string")) or "string",
+                )
+            else:
                 logger.warning(
-                    "Order {}: condition {} uses unknown django field path '{}'.",
-                    order_label,
+                    "Rule {} ('{}'): condition {} uses unknown django field path '{}'.",
+                    rule.pk,
+                    _to_str(rule.name),
                     condition.pk,
                     field_path,
                 )
-                evaluations.append(False)
-                continue
+            compiled.append(
+                CompiledOrderRuleCondition(
+                    condition_id=condition.pk,
+                    field_path=field_path,
+                    operator_code=operator_code,
+                    expected_raw=expected_raw,
+                    predicate=predicate,
+                )
+            )
+        return tuple(compiled)
 
-            engine_operator = _to_str(operator_engine_map.get(operator_code)) or operator_code
-            actual_value = resolve_django_field_value(order=order, path=field_path)
-            expected_raw = _to_str(condition.expected_value)
-            value_kind = _to_str(getattr(field_def, "value_kind", "string")) or "string"
+    @classmethod
+    def _compile_predicate(
+        cls,
+        *,
+        operator: str,
+        expected_raw: str,
+        value_kind: str,
+    ) -> Callable[[object], bool]:
+        """Wie ``_evaluate_condition``, aber der Vergleichswert wird nur einmal geparst."""
+        if operator == "ne":
+            equals = cls._compile_predicate(operator="eq", expected_raw=expected_raw, value_kind=value_kind)
+            return lambda actual_value: not equals(actual_value)
 
-            result = self._evaluate_condition(
-                operator=engine_operator,
+        if operator in {"is_empty", "is_not_empty", MicrotechOrderRuleCondition.Operator.CONTAINS.value}:
+            return lambda actual_value: cls._evaluate_condition(
+                operator=operator,
                 actual_value=actual_value,
                 expected_raw=expected_raw,
                 value_kind=value_kind,
             )
-            evaluations.append(result)
-
-            logger.info(
-                "Order {}: rule {} ('{}') condition {} -> field='{}' operator='{}' expected='{}' actual='{}' => {}",
-                order_label,
-                rule.pk,
-                _to_str(rule.name),
-                condition.pk,
-                field_path,
-                operator_code,
-                expected_raw,
-                _to_str(actual_value),
-                "MATCH" if result else "NO_MATCH",
-            )
 
-        if rule.condition_logic == MicrotechOrderRule.ConditionLogic.ANY:
-            final_result = any(evaluations)
+        convert = _VALUE_CONVERTERS.get(value_kind)
+        if convert is None:
+            # string
+            convert = lambda value: _to_str(value).lower()  # noqa: E731
+            expected = expected_raw.lower()
         else:
-            final_result = all(evaluations)
+            expected = convert(expected_raw)
+            if expected is None:
+                return lambda actual_value: False
 
-        logger.info(
-            "Order {}: rule {} ('{}') final condition result={} (logic='{}').",
-            order_label,
-            rule.pk,
-            _to_str(rule.name),
-            final_result,
-            rule.condition_logic,
-        )
-        return final_result
+        compare = operator_module.eq if value_kind == "bool" else _COMPARATORS.get(operator, operator_module.eq)
+
+        def predicate(actual_value: object) -> bool:
+            actual = convert(actual_value)
+            if actual is None:
+                return False
+            return compare(actual, expected)
+
+        return predicate
 
     @classmethod
     def _evaluate_condition(
@@ -424,4 +623,15 @@ class OrderRuleResolverService(BaseService):
         return True
 
 
-__all__ = ["OrderRuleResolverService", "ResolvedDatasetAction", "ResolvedOrderRule"]
+__all__ = [
+    "CompiledOrderRule",
+    "CompiledOrderRuleCondition",
+    "CompiledOrderRuleSet",
+    "OrderFieldValues",
+    "OrderRuleResolverService",
+    "ResolvedDatasetAction",
+    "ResolvedOrderRule",
+    "bump_order_rule_version",
+    "invalidate_order_rules",
+    "reset_order_rule_cache",
+]
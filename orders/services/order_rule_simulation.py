@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+
+from django.db.models import Q
+from loguru import logger
+
+from core.services import BaseService
+from microtech.models import MicrotechOrderRule
+from orders.models import Order
+from orders.services.order_rule_resolver import (
+    CompiledOrderRule,
+    OrderFieldValues,
+    OrderRuleResolverService,
+    _to_str,
+)
+
+
+def _rule_label(rule: CompiledOrderRule | None) -> str:
+    if rule is None:
+        return "Standard (keine Regel)"
+    return f"#{rule.rule_id} {rule.rule_name}"
+
+
+@dataclass(frozen=True, slots=True)
+class OrderRuleSwitch:
+    order_id: int
+    order_number: str
+    from_rule_id: int | None
+    from_rule_name: str
+    to_rule_id: int | None
+    to_rule_name: str
+
+
+@dataclass(slots=True)
+class OrderRuleSimulationResult:
+    orders_evaluated: int = 0
+    orders_switched: int = 0
+    switches: list[OrderRuleSwitch] = field(default_factory=list)
+    transitions: Counter = field(default_factory=Counter)
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "orders_evaluated": self.orders_evaluated,
+            "orders_switched": self.orders_switched,
+            "transitions": [
+                {"from": from_label, "to": to_label, "orders": count}
+                for (from_label, to_label), count in self.transitions.most_common()
+            ],
+            "switches": [
+                {
+                    "order_id": switch.order_id,
+                    "order_number": switch.order_number,
+                    "from_rule_id": switch.from_rule_id,
+                    "from_rule": switch.from_rule_name,
+                    "to_rule_id": switch.to_rule_id,
+                    "to_rule": switch.to_rule_name,
+                }
+                for switch in self.switches
+            ],
+        }
+
+
+class OrderRuleSimulationService(BaseService):
+    """Was-wäre-wenn: vergleicht den aktiven Regelsatz mit einem Entwurf über gespeicherte Bestellungen.
+
+    Schreibt nichts und spricht Microtech nicht an. Beide Regelsätze werden
+    einmal kompiliert; Bestellungen werden in Blöcken samt Kunde und Adressen
+    geladen und jeder Feldpfad wird je Bestellung nur einmal aufgelöst.
+    """
+
+    model = Order
+    DEFAULT_CHUNK_SIZE = 500
+    DEFAULT_MAX_SWITCHES = 200
+
+    @staticmethod
+    def candidate_queryset(
+        *,
+        enable_rule_ids: Iterable[int] = (),
+        disable_rule_ids: Iterable[int] = (),
+    ):
+        """Entwurf = aktive Regeln plus ``enable_rule_ids`` (z.B. inaktive Entwürfe) ohne ``disable_rule_ids``."""
+        enable_rule_ids = list(enable_rule_ids)
+        disable_rule_ids = list(disable_rule_ids)
+        return (
+            MicrotechOrderRule.objects
+            .filter(Q(is_active=True) | Q(pk__in=enable_rule_ids))
+            .exclude(pk__in=disable_rule_ids)
+        )
+
+    def iter_orders(self, *, queryset=None, limit: int | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Order]:
+        """Neueste Bestellungen zuerst, blockweise per Keyset auf der ID."""
+        queryset = (queryset if queryset is not None else self.get_queryset()).select_related(
+            "customer",
+            "billing_address",
+            "shipping_address",
+        )
+        remaining = limit
+        last_pk = None
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk_queryset = queryset.order_by("-pk")
+            if last_pk is not None:
+                chunk_queryset = chunk_queryset.filter(pk__lt=last_pk)
+            chunk = list(chunk_queryset[:size])
+            if not chunk:
+                return
+            yield from chunk
+            last_pk = chunk[-1].pk
+            if remaining is not None:
+                remaining -= len(chunk)
+            if len(chunk) < size:
+                return
+
+    def simulate(
+        self,
+        *,
+        enable_rule_ids: Iterable[int] = (),
+        disable_rule_ids: Iterable[int] = (),
+        orders=None,
+        limit: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_switches: int = DEFAULT_MAX_SWITCHES,
+    ) -> OrderRuleSimulationResult:
+        resolver = OrderRuleResolverService()
+        current = resolver.compiled_rule_set()
+        candidate = resolver.compile_rule_set(
+            queryset=self.candidate_queryset(
+                enable_rule_ids=enable_rule_ids,
+                disable_rule_ids=disable_rule_ids,
+            )
+        )
+
+        result = OrderRuleSimulationResult()
+        for order in self.iter_orders(queryset=orders, limit=limit, chunk_size=chunk_size):
+            values = OrderFieldValues(order)
+            before = current.first_match(values)
+            after = candidate.first_match(values)
+            result.orders_evaluated += 1
+
+            before_id = before.rule_id if before else None
+            after_id = after.rule_id if after else None
+            if before_id == after_id:
+                continue
+            result.orders_switched += 1
+            result.transitions[(_rule_label(before), _rule_label(after))] += 1
+            if len(result.switches) < max_switches:
+                result.switches.append(
+                    OrderRuleSwitch(
+                        order_id=order.pk,
+                        order_number=_to_str(order.order_number) or _to_str(order.api_id),
+                        from_rule_id=before_id,
+                        from_rule_name=before.rule_name if before else "",
+                        to_rule_id=after_id,
+                        to_rule_name=after.rule_name if after else "",
+                    )
+                )
+
+        logger.info(
+            "Order rule simulation: {} order(s) evaluated, {} would switch rules.",
+            result.orders_evaluated,
+            result.orders_switched,
+        )
+        return result
+
+
+__all__ = [
+    "OrderRuleSimulationResult",
+    "OrderRuleSimulationService",
+    "OrderRuleSwitch",
+]
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from decimal import Decimal, InvalidOperation
 from typing import Any
 
 from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from loguru import logger
 
 from core.services import BaseService
 from customer.models import Address, Customer
-from orders.models import Order, OrderDetail
+from orders.models import OpenOrderSyncWatermark, Order, OrderDetail
 from shopware.models import ShopwareSettings
 from shopware.services import CustomerService, OrderService
 
@@ -66,12 +72,144 @@ def _to_int(value: Any) -> int:
         return 0
 
 
+def _order_payload_hash(order_data: dict[str, Any]) -> str:
+    normalized = json.dumps(order_data, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _order_changed_at(order_data: dict[str, Any]) -> datetime | None:
+    return parse_datetime(_to_str(order_data.get("updatedAt"))) or parse_datetime(_to_str(order_data.get("createdAt")))
+
+
+ORDER_DETAIL_SYNC_FIELDS = (
+    "api_id",
+    "position",
+    "erp_nr",
+    "name",
+    "quantity",
+    "unit_price",
+    "total_price",
+    "tax",
+    "unit",
+)
+
+# Overlap applied to the stored watermark so orders written while the last run
+# was reading are fetched again; unchanged ones are skipped via their hash.
+OPEN_ORDER_WATERMARK_OVERLAP = timedelta(minutes=5)
+
 # Transition applied to orders that the autosync just created.
 NEW_ORDER_FROM_STATE = "open"
 NEW_ORDER_TRANSITION = "process"
 NEW_ORDER_TO_STATE = "in_progress"
 
 
+# Shopware-Kunden je /search/customer-Request beim Vorladen einer Bestellseite.
+SHOPWARE_CUSTOMER_BATCH_SIZE = 100
+CUSTOMER_SYNC_FIELDS = ("name", "email", "api_id", "is_gross", "shopware_customer_group", "vat_id")
+ADDRESS_SYNC_FIELDS = (
+    "api_id",
+    "erp_nr",
+    "name1",
+    "name2",
+    "name3",
+    "department",
+    "street",
+    "postal_code",
+    "city",
+    "country_code",
+    "email",
+    "title",
+    "first_name",
+    "last_name",
+    "phone",
+    "is_invoice",
+    "is_shipping",
+)
+
+
+@dataclass
+class CustomerSyncBatch:
+    """Vorgeladene Shopware-Kunden und lokale Kunden/Adressen einer Bestellseite."""
+
+    shopware_customers: dict[str, dict[str, Any]] = field(default_factory=dict)
+    customers_by_erp_nr: dict[str, Customer] = field(default_factory=dict)
+    customers_by_api_id: dict[str, Customer] = field(default_factory=dict)
+    addresses_by_customer: dict[int, list[Address]] = field(default_factory=dict)
+    # Kunden, die die laufende Bestellung gelesen oder angelegt hat.
+    touched_customers: list[Customer] = field(default_factory=list)
+
+    def load_customers(self, *, customer_numbers: set[str], customer_ids: list[str] | set[str]) -> None:
+        customers = list(Customer.objects.filter(Q(erp_nr__in=customer_numbers) | Q(api_id__in=customer_ids)))
+        for customer in customers:
+            self.customers_by_erp_nr[customer.erp_nr] = customer
+            if customer.api_id:
+                self.customers_by_api_id.setdefault(customer.api_id, customer)
+            self.addresses_by_customer[customer.pk] = []
+        for address in Address.objects.filter(customer__in=customers).order_by("-updated_at", "-pk"):
+            self.addresses_by_customer[address.customer_id].append(address)
+
+    def find_customer(self, *, customer_number: str, customer_id: str) -> Customer | None:
+        customer = self._cached_customer(customer_number=customer_number, customer_id=customer_id)
+        if customer is None and (customer_number or customer_id):
+            # Nicht vorgeladen (z.B. inzwischen von einem anderen Lauf angelegt):
+            # in der DB nachsehen, sonst legt der Aufrufer den Kunden doppelt an.
+            self.load_customers(
+                customer_numbers={customer_number} if customer_number else set(),
+                customer_ids={customer_id} if customer_id else set(),
+            )
+            customer = self._cached_customer(customer_number=customer_number, customer_id=customer_id)
+        if customer is not None:
+            self.touched_customers.append(customer)
+        return customer
+
+    def _cached_customer(self, *, customer_number: str, customer_id: str) -> Customer | None:
+        customer = self.customers_by_erp_nr.get(customer_number) if customer_number else None
+        if customer is None and customer_id:
+            customer = self.customers_by_api_id.get(customer_id)
+        return customer
+
+    def remember_customer(self, customer: Customer) -> None:
+        self.customers_by_erp_nr[customer.erp_nr] = customer
+        if customer.api_id:
+            self.customers_by_api_id.setdefault(customer.api_id, customer)
+        self.addresses_by_customer.setdefault(customer.pk, [])
+        self.touched_customers.append(customer)
+
+    def addresses_for(self, customer: Customer) -> list[Address]:
+        return self.addresses_by_customer.setdefault(customer.pk, [])
+
+    def start_order(self) -> None:
+        self.touched_customers = []
+
+    def reload_touched_customers(self) -> None:
+        """Lädt die Kunden einer zurückgerollten Bestellung neu aus der DB.
+
+        Die gecachten Instanzen tragen sonst PKs und Werte der verworfenen
+        Transaktion; die nächste Bestellung desselben Kunden würde nicht
+        existierende Zeilen aktualisieren oder Änderungen überspringen.
+        """
+        touched = {id(customer): customer for customer in self.touched_customers}
+        self.touched_customers = []
+        if not touched:
+            return
+        customer_numbers = {customer.erp_nr for customer in touched.values() if customer.erp_nr}
+        customer_ids = {customer.api_id for customer in touched.values() if customer.api_id}
+        for mapping in (self.customers_by_erp_nr, self.customers_by_api_id):
+            for key in [key for key, customer in mapping.items() if id(customer) in touched]:
+                del mapping[key]
+        for customer in touched.values():
+            self.addresses_by_customer.pop(customer.pk, None)
+        self.load_customers(customer_numbers=customer_numbers, customer_ids=customer_ids)
+
+
+def _field_snapshot(instance, field_names: tuple[str, ...]) -> dict[str, Any]:
+    return {name: getattr(instance, name) for name in field_names}
+
+
+def _changed_fields(instance, snapshot: dict[str, Any]) -> list[str]:
+    return [name for name, value in snapshot.items() if getattr(instance, name) != value]
+
+
 class OrderSyncService(BaseService):
     model = Order
 
@@ -80,7 +218,15 @@ class OrderSyncService(BaseService):
         *,
         sales_channel_ids: list[str] | None = None,
         limit_orders: int | None = None,
+        full_sync: bool = False,
     ) -> dict[str, int]:
+        """
+        Imports open Shopware orders incrementally.
+
+        Per sales channel only orders created or updated since the stored
+        watermark are fetched, and orders whose payload hash matches the stored
+        one are skipped. ``full_sync`` ignores the watermark (not the hash).
+        """
         sales_channel_ids = sales_channel_ids or self._active_sales_channel_ids()
         if not sales_channel_ids:
             raise ValueError("No active sales channel IDs configured.")
@@ -90,6 +236,7 @@ class OrderSyncService(BaseService):
             "orders_seen": 0,
             "orders_created": 0,
             "orders_updated": 0,
+            "orders_unchanged": 0,
             "orders_failed": 0,
             "orders_promoted": 0,
             "customers_upserted": 0,
@@ -98,12 +245,36 @@ class OrderSyncService(BaseService):
         }
 
         for sales_channel_id in sales_channel_ids:
-            response = service.list_all_open_by_sales_channel(sales_channel_id=sales_channel_id)
-            orders = (response or {}).get("data", []) or []
+            watermark = self._load_watermark(sales_channel_id)
+            changed_since = None
+            if watermark.synced_until and not full_sync:
+                changed_since = watermark.synced_until - OPEN_ORDER_WATERMARK_OVERLAP
+            response = service.list_all_open_by_sales_channel(
+                sales_channel_id=sales_channel_id,
+                changed_since=changed_since,
+            )
+            orders = [_normalize_entity(order_data) for order_data in (response or {}).get("data", []) or []]
             logger.info(
-                "SalesChannel {}: {} offene Bestellung(en) fuer Upsert.",
+                "SalesChannel {}: {} offene Bestellung(en) seit {} fuer Upsert.",
                 sales_channel_id,
                 len(orders),
+                changed_since or "Beginn",
+            )
+
+            stored_hashes = dict(
+                Order.objects.filter(api_id__in=[_to_str(order_data.get("id")) for order_data in orders])
+                .values_list("api_id", "shopware_payload_hash")
+            )
+            channel_failed = False
+            synced_until = watermark.synced_until
+            unchanged_ids = {
+                _to_str(order_data.get("id"))
+                for order_data in orders
+                if stored_hashes.get(_to_str(order_data.get("id"))) == _order_payload_hash(order_data)
+            }
+            # Kunden und Adressen aller zu aktualisierenden Bestellungen der Seite auf einmal laden.
+            customer_batch = self.prefetch_customer_batch(
+                orders=[order_data for order_data in orders if _to_str(order_data.get("id")) not in unchanged_ids]
             )
 
             for order_data in orders:
@@ -111,13 +282,26 @@ class OrderSyncService(BaseService):
                     return summary
 
                 summary["orders_seen"] += 1
+                changed_at = _order_changed_at(order_data)
+                if changed_at and (synced_until is None or changed_at > synced_until):
+                    synced_until = changed_at
+
+                if _to_str(order_data.get("id")) in unchanged_ids:
+                    summary["orders_unchanged"] += 1
+                    continue
+
+                customer_batch.start_order()
                 try:
                     result = self.upsert_from_shopware_order(
                         order_data=order_data,
                         sales_channel_id=sales_channel_id,
+                        customer_batch=customer_batch,
                     )
                 except Exception as exc:
+                    # Die Transaktion der Bestellung ist zurückgerollt.
+                    customer_batch.reload_touched_customers()
                     summary["orders_failed"] += 1
+                    channel_failed = True
                     logger.error("Order-Upsert fehlgeschlagen: {}", exc)
                     continue
 
@@ -131,20 +315,33 @@ class OrderSyncService(BaseService):
                 summary["addresses_upserted"] += result["addresses_upserted"]
                 summary["details_upserted"] += result["details_upserted"]
 
+            # Bei Fehlern bleibt der Stand stehen, damit der naechste Lauf die Bestellung erneut holt.
+            if not channel_failed and synced_until != watermark.synced_until:
+                watermark.synced_until = synced_until
+                watermark.save(update_fields=["synced_until", "updated_at"])
+
         return summary
 
+    @staticmethod
+    def _load_watermark(sales_channel_id: str) -> OpenOrderSyncWatermark:
+        watermark, _ = OpenOrderSyncWatermark.objects.get_or_create(sales_channel_id=sales_channel_id)
+        return watermark
+
     @transaction.atomic
     def upsert_from_shopware_order(
         self,
         *,
         order_data: dict[str, Any],
         sales_channel_id: str = "",
+        customer_batch: CustomerSyncBatch | None = None,
     ) -> dict[str, Any]:
         order_data = _normalize_entity(order_data)
+        payload_hash = _order_payload_hash(order_data)
         order_customer = order_data.get("orderCustomer") or {}
         customer, billing_address, shipping_address, addresses_count = self._upsert_customer_block(
             order_data=order_data,
             order_customer=order_customer,
+            customer_batch=customer_batch,
         )
 
         order_id = _to_str(order_data.get("id"))
@@ -181,13 +378,14 @@ class OrderSyncService(BaseService):
             "customer": customer,
             "billing_address": billing_address,
             "shipping_address": shipping_address,
+            "shopware_payload_hash": payload_hash,
         }
 
         order, created = Order.objects.update_or_create(
             api_id=order_id,
             defaults=order_defaults,
         )
-        details_count = self._replace_order_details(
+        details_count = self._reconcile_order_details(
             order=order,
             line_items=order_data.get("lineItems") or [],
             tax_status=tax_status,
@@ -239,16 +437,73 @@ class OrderSyncService(BaseService):
         )
         return True
 
+    def prefetch_customer_batch(self, *, orders: list[dict[str, Any]]) -> CustomerSyncBatch:
+        """Lädt Shopware-Kunden, lokale Kunden und deren Adressen einer Bestellseite gesammelt."""
+        batch = CustomerSyncBatch()
+        customer_ids: list[str] = []
+        customer_numbers: set[str] = set()
+        for order_data in orders:
+            order_customer = _normalize_entity((order_data or {}).get("orderCustomer") or {})
+            customer_id = _to_str(order_customer.get("customerId")) or _to_str(
+                (order_customer.get("customer") or {}).get("id")
+            )
+            if customer_id and customer_id not in customer_ids:
+                customer_ids.append(customer_id)
+            if _to_str(order_customer.get("customerNumber")):
+                customer_numbers.add(_to_str(order_customer.get("customerNumber")))
+        if not customer_ids and not customer_numbers:
+            return batch
+
+        batch.shopware_customers = self._load_shopware_customers(customer_ids=customer_ids)
+        customer_numbers.update(
+            _to_str(payload.get("customerNumber"))
+            for payload in batch.shopware_customers.values()
+            if _to_str(payload.get("customerNumber"))
+        )
+        customer_numbers.update(f"sw6-{customer_id[:12]}" for customer_id in customer_ids)
+
+        batch.load_customers(customer_numbers=customer_numbers, customer_ids=customer_ids)
+        return batch
+
+    def _load_shopware_customers(self, *, customer_ids: list[str]) -> dict[str, dict[str, Any]]:
+        cache = getattr(self, "_shopware_customer_cache", None)
+        if cache is None:
+            cache = {}
+            self._shopware_customer_cache = cache
+
+        missing = [customer_id for customer_id in customer_ids if customer_id not in cache]
+        for offset in range(0, len(missing), SHOPWARE_CUSTOMER_BATCH_SIZE):
+            chunk = missing[offset:offset + SHOPWARE_CUSTOMER_BATCH_SIZE]
+            try:
+                response = CustomerService().list_by_ids(chunk)
+            except Exception as exc:  # pragma: no cover - network/runtime errors
+                # Ohne Vorabladung greift je Bestellung der Einzelabruf.
+                logger.warning("Shopware customers could not be prefetched: {}", exc)
+                continue
+            for row in (response or {}).get("data", []) or []:
+                payload = _normalize_entity(row)
+                if _to_str(payload.get("id")):
+                    cache[_to_str(payload.get("id"))] = payload
+            for customer_id in chunk:
+                if customer_id not in cache:
+                    logger.warning("Shopware customer {} konnte nicht geladen werden.", customer_id)
+                    cache[customer_id] = {}
+        return {customer_id: cache[customer_id] for customer_id in customer_ids if customer_id in cache}
+
     def _upsert_customer_block(
         self,
         *,
         order_data: dict[str, Any],
         order_customer: dict[str, Any],
+        customer_batch: CustomerSyncBatch | None = None,
     ) -> tuple[Customer, Address | None, Address | None, int]:
         order_data = _normalize_entity(order_data)
         order_customer = _normalize_entity(order_customer)
         customer_id = _to_str(order_customer.get("customerId")) or _to_str((order_customer.get("customer") or {}).get("id"))
-        customer_payload = self._load_shopware_customer(customer_id=customer_id)
+        if customer_batch is not None and customer_id in customer_batch.shopware_customers:
+            customer_payload = customer_batch.shopware_customers[customer_id]
+        else:
+            customer_payload = self._load_shopware_customer(customer_id=customer_id)
         if not customer_id:
             customer_id = _to_str(customer_payload.get("id"))
 
@@ -260,11 +515,15 @@ class OrderSyncService(BaseService):
         if not customer_number:
             raise ValueError("Order has no customerNumber/customerId.")
 
-        customer = Customer.objects.filter(erp_nr=customer_number).first()
-        if not customer and customer_id:
-            customer = Customer.objects.filter(api_id=customer_id).first()
+        if customer_batch is not None:
+            customer = customer_batch.find_customer(customer_number=customer_number, customer_id=customer_id)
+        else:
+            customer = Customer.objects.filter(erp_nr=customer_number).first()
+            if not customer and customer_id:
+                customer = Customer.objects.filter(api_id=customer_id).first()
         if not customer:
             customer = Customer(erp_nr=customer_number)
+        snapshot = _field_snapshot(customer, CUSTOMER_SYNC_FIELDS)
 
         nested_customer = customer_payload or _normalize_entity(order_customer.get("customer") or {})
         vat_ids = nested_customer.get("vatIds") or []
@@ -276,7 +535,14 @@ class OrderSyncService(BaseService):
         customer.is_gross = display_gross
         customer.shopware_customer_group = _to_str(customer_group.get("name")) or customer.shopware_customer_group
         customer.vat_id = _to_str(vat_ids[0]) if vat_ids else customer.vat_id
-        customer.save()
+        if customer_batch is None or customer.pk is None:
+            customer.save()
+            if customer_batch is not None:
+                customer_batch.remember_customer(customer)
+        else:
+            changed = _changed_fields(customer, snapshot)
+            if changed:
+                customer.save(update_fields=[*changed, "updated_at"])
 
         billing_data = _normalize_entity(order_data.get("billingAddress") or {})
         billing_address = self._upsert_address(
@@ -285,6 +551,7 @@ class OrderSyncService(BaseService):
             fallback_email=customer.email,
             is_invoice=True,
             is_shipping=False,
+            customer_batch=customer_batch,
         ) if billing_data else None
 
         deliveries = _normalize_entity(order_data.get("deliveries") or [])
@@ -295,6 +562,7 @@ class OrderSyncService(BaseService):
             fallback_email=customer.email,
             is_invoice=False,
             is_shipping=True,
+            customer_batch=customer_batch,
         ) if shipping_data else None
 
         (
@@ -305,6 +573,7 @@ class OrderSyncService(BaseService):
             customer=customer,
             customer_payload=customer_payload,
             fallback_email=customer.email,
+            customer_batch=customer_batch,
         )
 
         if shipping_address and not billing_address:
@@ -323,9 +592,9 @@ class OrderSyncService(BaseService):
             shipping_address = default_shipping_address
 
         if not default_billing_address and billing_address:
-            customer.set_billing_address(billing_address)
+            self._set_default_address(customer, billing_address, "is_invoice", customer_batch=customer_batch)
         if not default_shipping_address and shipping_address:
-            customer.set_shipping_address(shipping_address)
+            self._set_default_address(customer, shipping_address, "is_shipping", customer_batch=customer_batch)
 
         synced_address_ids = set(default_address_pks)
         if billing_address and billing_address.pk:
@@ -336,6 +605,25 @@ class OrderSyncService(BaseService):
 
         return customer, billing_address, shipping_address, addresses_count
 
+    @staticmethod
+    def _set_default_address(
+        customer: Customer,
+        address: Address,
+        flag: str,
+        *,
+        customer_batch: CustomerSyncBatch | None = None,
+    ) -> None:
+        if flag == "is_invoice":
+            customer.set_billing_address(address)
+        else:
+            customer.set_shipping_address(address)
+        # set_*_address setzt das Flag aller übrigen Adressen per update(); die
+        # vorgeladenen Instanzen müssen das spiegeln, sonst gilt ein späterer
+        # Abgleich fälschlich als unverändert.
+        if customer_batch is not None:
+            for candidate in customer_batch.addresses_for(customer):
+                setattr(candidate, flag, candidate.pk == address.pk)
+
     def _load_shopware_customer(self, *, customer_id: str) -> dict[str, Any]:
         customer_id = _to_str(customer_id)
         if not customer_id:
@@ -368,6 +656,7 @@ class OrderSyncService(BaseService):
         customer: Customer,
         customer_payload: dict[str, Any],
         fallback_email: str,
+        customer_batch: CustomerSyncBatch | None = None,
     ) -> tuple[Address | None, Address | None, set[int]]:
         if not customer_payload:
             return None, None, set()
@@ -400,6 +689,7 @@ class OrderSyncService(BaseService):
                 fallback_email=fallback_email,
                 is_invoice=True,
                 is_shipping=True,
+                customer_batch=customer_batch,
             )
             default_shipping_address = default_billing_address
             if default_billing_address.pk:
@@ -412,6 +702,7 @@ class OrderSyncService(BaseService):
                     fallback_email=fallback_email,
                     is_invoice=True,
                     is_shipping=False,
+                    customer_batch=customer_batch,
                 )
                 if default_billing_address.pk:
                     upserted_ids.add(default_billing_address.pk)
@@ -422,14 +713,15 @@ class OrderSyncService(BaseService):
                     fallback_email=fallback_email,
                     is_invoice=False,
                     is_shipping=True,
+                    customer_batch=customer_batch,
                 )
                 if default_shipping_address.pk:
                     upserted_ids.add(default_shipping_address.pk)
 
         if default_billing_address:
-            customer.set_billing_address(default_billing_address)
+            self._set_default_address(customer, default_billing_address, "is_invoice", customer_batch=customer_batch)
         if default_shipping_address:
-            customer.set_shipping_address(default_shipping_address)
+            self._set_default_address(customer, default_shipping_address, "is_shipping", customer_batch=customer_batch)
 
         return default_billing_address, default_shipping_address, upserted_ids
 
@@ -451,17 +743,25 @@ class OrderSyncService(BaseService):
         fallback_email: str,
         is_invoice: bool,
         is_shipping: bool,
+        customer_batch: CustomerSyncBatch | None = None,
     ) -> Address:
         address_data = _normalize_entity(address_data)
         api_id = _to_str(address_data.get("id"))
-        qs = Address.objects.filter(customer=customer)
-        address = qs.filter(api_id=api_id).first() if api_id else None
+        if customer_batch is not None:
+            candidates = customer_batch.addresses_for(customer)
+            address = next((item for item in candidates if api_id and item.api_id == api_id), None)
+            if not address:
+                address = self._match_contact_address(candidates, address_data=address_data)
+        else:
+            qs = Address.objects.filter(customer=customer)
+            address = qs.filter(api_id=api_id).first() if api_id else None
 
-        if not address:
-            address = self._find_contact_address(customer=customer, address_data=address_data)
+            if not address:
+                address = self._find_contact_address(customer=customer, address_data=address_data)
 
         if not address:
             address = Address(customer=customer)
+        snapshot = _field_snapshot(address, ADDRESS_SYNC_FIELDS) if customer_batch is not None else {}
 
         if api_id and address.api_id != api_id:
             address.api_id = api_id
@@ -486,9 +786,45 @@ class OrderSyncService(BaseService):
         address.phone = _to_str(address_data.get("phoneNumber"))
         address.is_invoice = is_invoice
         address.is_shipping = is_shipping
-        address.save()
+        if customer_batch is None or address.pk is None:
+            address.save()
+            if customer_batch is not None:
+                customer_batch.addresses_for(customer).insert(0, address)
+            return address
+
+        changed = _changed_fields(address, snapshot)
+        if changed:
+            if "erp_nr" in changed and address.erp_ans_id is not None:
+                changed.append("erp_combined_id")
+            address.save(update_fields=[*changed, "updated_at"])
         return address
 
+    @staticmethod
+    def _match_contact_address(candidates: list[Address], *, address_data: dict[str, Any]) -> Address | None:
+        """In-memory-Gegenstück zu ``_find_contact_address``; ``candidates`` ist nach Aktualität sortiert."""
+        street = _to_str(address_data.get("street"))
+        postal_code = _to_str(address_data.get("zipcode"))
+        city = _to_str(address_data.get("city"))
+        first_name = _to_str(address_data.get("firstName"))
+        last_name = _to_str(address_data.get("lastName"))
+        email = _to_str(address_data.get("email"))
+        if not street or not postal_code:
+            return None
+
+        same_location = [
+            item for item in candidates
+            if (item.street, item.postal_code, item.city) == (street, postal_code, city)
+        ]
+        if first_name or last_name:
+            for item in same_location:
+                if (item.first_name, item.last_name) == (first_name, last_name):
+                    return item
+        if email:
+            for item in same_location:
+                if item.email == email:
+                    return item
+        return None
+
     @staticmethod
     def _find_contact_address(*, customer: Customer, address_data: dict[str, Any]) -> Address | None:
         street = _to_str(address_data.get("street"))
@@ -516,39 +852,75 @@ class OrderSyncService(BaseService):
                 return match
         return None
 
-    def _replace_order_details(
+    def _reconcile_order_details(
         self,
         *,
         order: Order,
         line_items: list[dict[str, Any]],
         tax_status: str,
     ) -> int:
-        order.details.all().delete()
-        created_count = 0
-
-        for item in line_items:
-            item = _normalize_entity(item)
-            price_data = item.get("price") or {}
-            calculated_taxes = price_data.get("calculatedTaxes") or []
-            tax_value = _to_decimal((calculated_taxes[0] or {}).get("tax")) if calculated_taxes else None
-
-            OrderDetail.objects.create(
-                order=order,
-                api_id=_to_str(item.get("id")),
-                erp_nr=_to_str((item.get("payload") or {}).get("productNumber")),
-                name=_to_str(item.get("label")),
-                quantity=_to_int(item.get("quantity")),
-                unit_price=self._net_unit_price_from_shopware_price(
-                    price_data,
-                    quantity=_to_int(item.get("quantity")) or 1,
-                    tax_status=tax_status,
-                ),
-                total_price=_to_decimal(price_data.get("totalPrice")),
-                tax=tax_value,
-                unit=_to_str(item.get("unitName")),
-            )
-            created_count += 1
-        return created_count
+        """
+        Abgleich der Positionen ueber die Shopware-Position-ID: geaenderte werden
+        aktualisiert, neue gesammelt angelegt und entfallene geloescht.
+
+        Die Reihenfolge folgt der Shopware-Positionsnummer (bei gleicher Nummer
+        der Payload-Reihenfolge) und wird als ``position`` gespeichert, da
+        erhaltene Zeilen ihre alte ID behalten.
+        """
+        existing: dict[str, OrderDetail] = {}
+        to_delete: list[int] = []
+        for detail in order.details.all():
+            if detail.api_id and detail.api_id not in existing:
+                existing[detail.api_id] = detail
+            else:
+                to_delete.append(detail.pk)
+
+        now = timezone.now()
+        to_create: list[OrderDetail] = []
+        to_update: list[OrderDetail] = []
+        ordered_items = sorted(
+            (_normalize_entity(item) for item in line_items),
+            key=lambda item: _to_int(item.get("position")),
+        )
+        for position, item in enumerate(ordered_items, start=1):
+            values = {"position": position, **self._order_detail_values(item=item, tax_status=tax_status)}
+            detail = existing.pop(values["api_id"], None) if values["api_id"] else None
+            if detail is None:
+                to_create.append(OrderDetail(order=order, **values))
+                continue
+            if any(getattr(detail, field) != value for field, value in values.items()):
+                for field, value in values.items():
+                    setattr(detail, field, value)
+                detail.updated_at = now
+                to_update.append(detail)
+        to_delete.extend(detail.pk for detail in existing.values())
+
+        if to_delete:
+            OrderDetail.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            OrderDetail.objects.bulk_update(to_update, [*ORDER_DETAIL_SYNC_FIELDS, "updated_at"])
+        if to_create:
+            OrderDetail.objects.bulk_create(to_create)
+        return len(line_items)
+
+    def _order_detail_values(self, *, item: dict[str, Any], tax_status: str) -> dict[str, Any]:
+        price_data = item.get("price") or {}
+        calculated_taxes = price_data.get("calculatedTaxes") or []
+        tax_value = _to_decimal((calculated_taxes[0] or {}).get("tax")) if calculated_taxes else None
+        return {
+            "api_id": _to_str(item.get("id")),
+            "erp_nr": _to_str((item.get("payload") or {}).get("productNumber")),
+            "name": _to_str(item.get("label")),
+            "quantity": _to_int(item.get("quantity")),
+            "unit_price": self._net_unit_price_from_shopware_price(
+                price_data,
+                quantity=_to_int(item.get("quantity")) or 1,
+                tax_status=tax_status,
+            ),
+            "total_price": _to_decimal(price_data.get("totalPrice")),
+            "tax": tax_value,
+            "unit": _to_str(item.get("unitName")),
+        }
 
     @staticmethod
     def _net_unit_price_from_shopware_price(
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from datetime import timedelta
 from typing import Any
 
 from customer.models import Address
@@ -29,6 +30,7 @@ class OrderSyncWorkflowService(BaseService):
 
     model = MicrotechOrderSyncWorkflow
 
+    # Topologische Reihenfolge; dient auch als Tie-Breaker, wenn mehrere Steps bereit sind.
     STEP_ORDER = (
         "write_customer",
         "writeback_adrnr",
@@ -41,6 +43,34 @@ class OrderSyncWorkflowService(BaseService):
         "set_default_addresses",
         "write_vorgang",
     )
+    # Datenabhängigkeiten je Step. Alle Steps, deren Vorgänger erledigt oder
+    # nicht anwendbar sind, werden gemeinsam submittet; der Workflow dauert
+    # damit nur so lange wie sein kritischer Pfad.
+    STEP_DEPENDENCIES: dict[str, tuple[str, ...]] = {
+        "write_customer": (),
+        "writeback_adrnr": ("write_customer",),
+        "shipping_address": ("write_customer",),
+        "shipping_contact": ("shipping_address",),
+        "billing_address": ("write_customer",),
+        "billing_contact": ("billing_address",),
+        "clear_default_shipping_address": ("write_customer", "shipping_address"),
+        "clear_default_billing_address": ("write_customer", "shipping_address", "billing_address"),
+        "set_default_addresses": (
+            "shipping_address",
+            "billing_address",
+            "clear_default_shipping_address",
+            "clear_default_billing_address",
+        ),
+        "write_vorgang": (
+            "writeback_adrnr",
+            "shipping_contact",
+            "billing_contact",
+            "set_default_addresses",
+        ),
+    }
+    LOCAL_STEPS = ("writeback_adrnr",)
+    # Beanspruchte, aber noch nicht submittete Steps gelten erst danach als verwaist.
+    CLAIM_GRACE = timedelta(minutes=10)
 
     def _completed_steps(self, workflow: MicrotechOrderSyncWorkflow) -> set[str]:
         """Gibt die Menge aller bereits abgeschlossenen Step-Keys zurück."""
@@ -78,15 +108,40 @@ class OrderSyncWorkflowService(BaseService):
             return False
         return NEW_CUSTOMER_NUMBER_MIN <= int(number_text) <= NEW_CUSTOMER_NUMBER_MAX
 
-    def next_step(self, workflow: MicrotechOrderSyncWorkflow) -> str | None:
-        """Liefert den nächsten ausstehenden und anwendbaren Step-Key, oder None wenn fertig."""
+    def _running_steps(self, workflow: MicrotechOrderSyncWorkflow) -> dict[str, int | None]:
+        """Laufende Remote-Steps mit ihrer Job-ID (None = beansprucht, noch nicht submittet)."""
+        state = workflow.state or {}
+        if "running_steps" in state:
+            return dict(state.get("running_steps") or {})
+        # Workflows aus der Zeit vor der DAG-Ausführung kennen nur current_step/current_job.
+        if workflow.status == MicrotechOrderSyncWorkflow.Status.WAITING and workflow.current_step:
+            return {workflow.current_step: workflow.current_job_id}
+        return {}
+
+    def ready_steps(self, workflow: MicrotechOrderSyncWorkflow) -> list[str]:
+        """Alle Steps, deren Abhängigkeiten erfüllt sind und die weder laufen noch erledigt sind."""
         done = self._completed_steps(workflow)
+        running = self._running_steps(workflow)
+        settled: set[str] = set()
+        ready: list[str] = []
         for step in self.STEP_ORDER:
             if step in done:
+                settled.add(step)
                 continue
-            if self._is_step_applicable(workflow, step):
-                return step
-        return None
+            if not all(dependency in settled for dependency in self.STEP_DEPENDENCIES.get(step, ())):
+                continue
+            if step in running:
+                continue
+            if not self._is_step_applicable(workflow, step):
+                settled.add(step)
+                continue
+            ready.append(step)
+        return ready
+
+    def next_step(self, workflow: MicrotechOrderSyncWorkflow) -> str | None:
+        """Liefert den ersten bereiten Step-Key, oder None wenn nichts mehr ansteht."""
+        ready = self.ready_steps(workflow)
+        return ready[0] if ready else None
 
     def _resolve_addresses(self, order) -> tuple[Address, Address]:
         """Ermittelt Liefer- und Rechnungsadresse aus den Order-eigenen FKs."""
@@ -215,8 +270,12 @@ class OrderSyncWorkflowService(BaseService):
             if locked is None or not locked.is_active:
                 return False
 
-            job = locked.current_job
-            if job is not None and not job.is_terminal:
+            job_ids = {job_id for job_id in self._running_steps(locked).values() if job_id}
+            if locked.current_job_id:
+                job_ids.add(locked.current_job_id)
+            for job in MicrotechGraphQLJob.objects.filter(pk__in=job_ids):
+                if job.is_terminal:
+                    continue
                 job.status = MicrotechGraphQLJob.Status.CANCELLED
                 job.error_message = reason
                 job.next_step = "Workflow lokal abgebrochen; Remote-Status wird nicht weiter verfolgt."
@@ -236,9 +295,10 @@ class OrderSyncWorkflowService(BaseService):
             locked.status = MicrotechOrderSyncWorkflow.Status.CANCELLED
             locked.current_job = None
             locked.error_message = reason
+            locked.state = {**(locked.state or {}), "running_steps": {}}
             self._log_step(locked, locked.current_step, "cancelled", error=reason)
             locked.save(
-                update_fields=("status", "current_job", "error_message", "step_log", "updated_at")
+                update_fields=("status", "current_job", "error_message", "state", "step_log", "updated_at")
             )
         logger.warning("Order-Sync-Workflow #%s wurde manuell abgebrochen: %s", workflow.pk, reason)
         return True
@@ -354,54 +414,145 @@ class OrderSyncWorkflowService(BaseService):
                 .filter(pk=workflow_id)
                 .first()
             )
-            if workflow is None or workflow.current_step != step:
+            if workflow is None:
+                return
+            running = self._running_steps(workflow)
+            expected_job_id = running.get(step)
+            if step not in running or (expected_job_id and expected_job_id != job.pk):
                 return
             try:
                 self._apply_result(workflow, step, job.result_payload or {}, job=job)
             except Exception as exc:
                 self._mark_step_failed(workflow, step, exc)
                 return
+            running.pop(step, None)
+            workflow.state = {**(workflow.state or {}), "running_steps": running}
             self._log_step(workflow, step, "completed")
-            workflow.error_message = ""
+            # Ein parallel fehlgeschlagener Zweig hält den Workflow an, bis er fortgesetzt wird.
+            failed = workflow.status == MicrotechOrderSyncWorkflow.Status.FAILED
+            if not failed:
+                workflow.error_message = ""
             workflow.save(update_fields=("state", "step_log", "error_message", "updated_at"))
-        self._advance(workflow)
+        if not failed:
+            self._advance(workflow)
 
     def _advance(self, workflow: MicrotechOrderSyncWorkflow) -> None:
-        """Schleife: lokale Steps inline ausführen, Remote-Steps submitten, sonst SUCCEEDED setzen."""
+        """Schleife: bereite lokale Steps inline ausführen, bereite Remote-Steps gemeinsam submitten."""
         while True:
-            step = self.next_step(workflow)
-            if step is None:
-                workflow.status = MicrotechOrderSyncWorkflow.Status.SUCCEEDED
-                workflow.current_step = ""
-                workflow.current_job = None
-                workflow.save(update_fields=("status", "current_step", "current_job", "updated_at"))
-                logger.info("Order-Sync-Workflow #%s für Bestellung %s erfolgreich abgeschlossen.", workflow.pk, workflow.order_id)
+            ready = self._claim_ready_steps(workflow)
+            if not ready:
                 return
-            if step == "writeback_adrnr":
+            local_steps = [step for step in ready if step in self.LOCAL_STEPS]
+            remote_steps = [step for step in ready if step not in self.LOCAL_STEPS]
+            for step in local_steps:
                 try:
                     self._run_local_step(workflow, step)
                 except Exception as exc:
-                    self._mark_step_failed(workflow, step, exc)
+                    self._mark_step_failed(workflow, step, exc, release=[s for s in ready if s != step])
                     raise
-                self._log_step(workflow, step, "completed")
-                workflow.save(update_fields=("state", "step_log", "updated_at"))
+                self._complete_local_step(workflow, step)
                 logger.info("Order-Sync-Workflow #%s: lokaler Schritt '%s' abgeschlossen.", workflow.pk, step)
-                continue
-            try:
-                self.submit_step(workflow, step)
-            except Exception as exc:
-                self._mark_step_failed(workflow, step, exc)
-                raise
-            return
+            for index, step in enumerate(remote_steps):
+                try:
+                    self.submit_step(workflow, step)
+                except Exception as exc:
+                    self._mark_step_failed(workflow, step, exc, release=remote_steps[index + 1:])
+                    raise
+            if not local_steps:
+                return
 
-    def _mark_step_failed(self, workflow: MicrotechOrderSyncWorkflow, step: str, exc: Exception) -> None:
+    def _claim_ready_steps(self, workflow: MicrotechOrderSyncWorkflow) -> list[str]:
+        """Beansprucht alle bereiten Steps unter Zeilensperre; setzt SUCCEEDED, wenn nichts mehr aussteht."""
+        ready: list[str] = []
+
+        def claim(locked: MicrotechOrderSyncWorkflow) -> tuple[str, ...]:
+            ready.extend(self.ready_steps(locked))
+            running = self._running_steps(locked)
+            if not ready and not running:
+                locked.status = MicrotechOrderSyncWorkflow.Status.SUCCEEDED
+                locked.current_step = ""
+                locked.current_job = None
+                return ("status", "current_step", "current_job")
+            if not ready:
+                return ()
+            running.update({step: None for step in ready})
+            locked.state = {**(locked.state or {}), "running_steps": running}
+            return ("state",)
+
+        self._locked_update(workflow, claim)
+        if workflow.status == MicrotechOrderSyncWorkflow.Status.SUCCEEDED:
+            logger.info("Order-Sync-Workflow #%s für Bestellung %s erfolgreich abgeschlossen.", workflow.pk, workflow.order_id)
+        return ready
+
+    def _complete_local_step(self, workflow: MicrotechOrderSyncWorkflow, step: str) -> None:
+        def complete(locked: MicrotechOrderSyncWorkflow) -> tuple[str, ...]:
+            running = self._running_steps(locked)
+            running.pop(step, None)
+            locked.state = {**(locked.state or {}), "running_steps": running}
+            self._log_step(locked, step, "completed")
+            return ("state", "step_log")
+
+        self._locked_update(workflow, complete)
+
+    def _mark_step_submitted(self, workflow: MicrotechOrderSyncWorkflow, step: str, job: MicrotechGraphQLJob) -> None:
+        def submitted(locked: MicrotechOrderSyncWorkflow) -> tuple[str, ...]:
+            is_job = isinstance(job, MicrotechGraphQLJob)
+            running = self._running_steps(locked)
+            running[step] = job.pk if is_job else None
+            locked.state = {**(locked.state or {}), "running_steps": running}
+            locked.status = MicrotechOrderSyncWorkflow.Status.WAITING
+            locked.current_step = step
+            if is_job:
+                locked.current_job = job
+                return ("state", "status", "current_step", "current_job")
+            return ("state", "status", "current_step")
+
+        self._locked_update(workflow, submitted)
+
+    def _mark_step_failed(
+        self,
+        workflow: MicrotechOrderSyncWorkflow,
+        step: str,
+        exc: Exception | str,
+        *,
+        release: list[str] | tuple[str, ...] = (),
+    ) -> None:
         """Setzt den Workflow auf FAILED, damit er nicht aktiv hängen bleibt und resumebar ist."""
-        logger.exception("Order-Sync-Workflow #%s: Schritt '%s' fehlgeschlagen.", workflow.pk, step)
-        workflow.status = MicrotechOrderSyncWorkflow.Status.FAILED
-        workflow.current_step = step
-        workflow.error_message = str(exc)
-        self._log_step(workflow, step, "failed", error=str(exc))
-        workflow.save(update_fields=("status", "current_step", "error_message", "step_log", "updated_at"))
+        if isinstance(exc, Exception):
+            logger.exception("Order-Sync-Workflow #%s: Schritt '%s' fehlgeschlagen.", workflow.pk, step)
+
+        def failed(locked: MicrotechOrderSyncWorkflow) -> tuple[str, ...]:
+            running = self._running_steps(locked)
+            for released in (step, *release):
+                running.pop(released, None)
+            locked.state = {**(locked.state or {}), "running_steps": running}
+            locked.status = MicrotechOrderSyncWorkflow.Status.FAILED
+            locked.current_step = step
+            locked.error_message = str(exc)
+            self._log_step(locked, step, "failed", error=str(exc))
+            return ("state", "status", "current_step", "error_message", "step_log")
+
+        self._locked_update(workflow, failed)
+
+    def _merge_state(self, workflow: MicrotechOrderSyncWorkflow, values: dict[str, Any]) -> None:
+        def merge(locked: MicrotechOrderSyncWorkflow) -> tuple[str, ...]:
+            locked.state = {**(locked.state or {}), **values}
+            return ("state",)
+
+        self._locked_update(workflow, merge)
+
+    @staticmethod
+    def _locked_update(workflow: MicrotechOrderSyncWorkflow, mutate) -> None:
+        """Ändert den Workflow unter Zeilensperre; parallele Steps schreiben sonst ihren Zustand gegenseitig über."""
+        from django.db import transaction
+
+        with transaction.atomic():
+            locked = MicrotechOrderSyncWorkflow.objects.select_for_update().get(pk=workflow.pk)
+            update_fields = tuple(mutate(locked))
+            if update_fields:
+                locked.save(update_fields=(*update_fields, "updated_at"))
+        for field_name in ("status", "current_step", "current_job_id", "state", "step_log", "error_message", "updated_at"):
+            setattr(workflow, field_name, getattr(locked, field_name))
 
     def submit_step(self, workflow: MicrotechOrderSyncWorkflow, step: str) -> MicrotechGraphQLJob:
         """Submittet einen Customer-Remote-Step an den Sentinel."""
@@ -455,7 +606,9 @@ class OrderSyncWorkflowService(BaseService):
             if sub_number <= 0:
                 address_step = "shipping_address" if step == "shipping_contact" else "billing_address"
                 current_job = workflow.current_job
-                if current_job is not None:
+                # Bei parallelen Steps kann current_job zu einem anderen Zweig gehören.
+                job_step = str((getattr(current_job, "context", None) or {}).get("step") or "")
+                if current_job is not None and job_step in ("", address_step):
                     sub_number = self._address_sub_number_from_result(
                         current_job.result_payload or {},
                         step=address_step,
@@ -463,16 +616,14 @@ class OrderSyncWorkflowService(BaseService):
                         operation=current_job.operation,
                     ) or 0
                     if sub_number > 0:
-                        state = dict(state)
-                        state[sub_key] = sub_number
-                        workflow.state = state
                         self._persist_address_sub_number(
                             workflow=workflow,
                             address=address,
                             sub_number=sub_number,
                             result=current_job.result_payload or {},
                         )
-                        workflow.save(update_fields=("state", "updated_at"))
+                        self._merge_state(workflow, {sub_key: sub_number})
+                        state = workflow.state
             if sub_number <= 0:
                 raise ValueError(
                     f"{step} ohne bekannte Anschrift-Nummer (weder im Workflow-Zustand noch an der Adresse persistiert)."
@@ -534,13 +685,7 @@ class OrderSyncWorkflowService(BaseService):
             continuation=CONTINUATION_NAME,
             next_step=f"Microtech {operation} ({step}).",
         )
-        workflow.status = MicrotechOrderSyncWorkflow.Status.WAITING
-        workflow.current_step = step
-        update_fields = ["status", "current_step", "updated_at"]
-        if isinstance(job, MicrotechGraphQLJob):
-            workflow.current_job = job
-            update_fields.append("current_job")
-        workflow.save(update_fields=update_fields)
+        self._mark_step_submitted(workflow, step, job)
         return job
 
     def _run_local_step(self, workflow: MicrotechOrderSyncWorkflow, step: str) -> None:
@@ -602,13 +747,7 @@ class OrderSyncWorkflowService(BaseService):
             continuation=CONTINUATION_NAME,
             next_step=f"Microtech {operation} ({step}).",
         )
-        workflow.status = MicrotechOrderSyncWorkflow.Status.WAITING
-        workflow.current_step = step
-        update_fields = ["status", "current_step", "updated_at"]
-        if isinstance(job, MicrotechGraphQLJob):
-            workflow.current_job = job
-            update_fields.append("current_job")
-        workflow.save(update_fields=update_fields)
+        self._mark_step_submitted(workflow, step, job)
         return job
 
     def _log_step(self, workflow: MicrotechOrderSyncWorkflow, step: str, status: str, error: str = "") -> None:
@@ -758,7 +897,6 @@ class OrderSyncWorkflowService(BaseService):
 
     def reconcile_failures(self) -> int:
         """Verarbeitet fehlgeschlagene Jobs und erkennt verwaiste wartende Workflows."""
-        from django.db import transaction
         from django.utils import timezone
 
         changed = 0
@@ -768,92 +906,123 @@ class OrderSyncWorkflowService(BaseService):
             ).select_related("current_job")
         )
         for workflow in waiting:
-            job = workflow.current_job
-            if job is None:
-                error_message = "Microtech-Job fehlt; der Workflow kann keinen Status mehr erhalten."
-                with transaction.atomic():
-                    wf = MicrotechOrderSyncWorkflow.objects.select_for_update().get(pk=workflow.pk)
-                    wf.status = MicrotechOrderSyncWorkflow.Status.FAILED
-                    wf.error_message = error_message
-                    self._log_step(wf, wf.current_step, "failed", error=error_message)
-                    wf.save(update_fields=("status", "error_message", "step_log", "updated_at"))
-                logger.error("Order-Sync-Workflow #%s: %s", workflow.pk, error_message)
-                changed += 1
-                continue
-
-            if not job.external_job_id:
-                error_message = "Microtech-Job hat keine externe GraphQL-Job-ID und kann nicht abgefragt werden."
-                if not job.is_terminal:
-                    job.status = MicrotechGraphQLJob.Status.FAILED
-                    job.error_message = error_message
-                    job.next_step = "Keine externe Job-ID erhalten."
-                    job.next_poll_at = None
-                    job.completed_at = timezone.now()
-                    job.save(
-                        update_fields=(
-                            "status",
-                            "error_message",
-                            "next_step",
-                            "next_poll_at",
-                            "completed_at",
-                            "updated_at",
-                        )
-                    )
-                with transaction.atomic():
-                    wf = MicrotechOrderSyncWorkflow.objects.select_for_update().get(pk=workflow.pk)
-                    wf.status = MicrotechOrderSyncWorkflow.Status.FAILED
-                    wf.error_message = error_message
-                    self._log_step(wf, wf.current_step, "failed", error=error_message)
-                    wf.save(update_fields=("status", "error_message", "step_log", "updated_at"))
-                logger.error("Order-Sync-Workflow #%s: %s", workflow.pk, error_message)
-                changed += 1
-                continue
-
-            if not job.is_terminal:
-                continue
-            if job.status == MicrotechGraphQLJob.Status.SUCCEEDED:
-                continue
-
-            step = workflow.current_step
-            if step in ("probe_customer", "probe_vorgang") and self._looks_like_not_found_error(job.error_message):
-                with transaction.atomic():
-                    wf = MicrotechOrderSyncWorkflow.objects.select_for_update().get(pk=workflow.pk)
-                    self._apply_probe_not_found(wf, step)
-                    self._log_step(wf, step, "completed", error="probe-not-found")
-                    wf.save(update_fields=("state", "step_log", "updated_at"))
-                logger.info(
-                    "Order-Sync-Workflow #%s: Probe '%s' als 'nicht gefunden' verbucht.", workflow.pk, step
-                )
+            running = self._running_steps(workflow)
+            if not running and "running_steps" in (workflow.state or {}):
+                # Alle Zweige fertig, aber die Kette wurde nicht weitergetrieben (z.B. Abbruch zwischen Commit und Submit).
                 try:
-                    self._advance(MicrotechOrderSyncWorkflow.objects.get(pk=workflow.pk))
+                    self._advance(workflow)
                 except Exception:
-                    # _advance hat den Workflow bereits FAILED markiert und geloggt;
-                    # die übrigen Workflows sollen trotzdem reconciled werden.
                     pass
                 changed += 1
                 continue
+            if not running:
+                running = {workflow.current_step: None}
+            jobs = {
+                job.pk: job
+                for job in MicrotechGraphQLJob.objects.filter(
+                    pk__in=[job_id for job_id in running.values() if job_id]
+                )
+            }
+            claim_cutoff = timezone.now() - self.CLAIM_GRACE
+            for step, job_id in running.items():
+                job = jobs.get(job_id) if job_id else None
+                if job is None and not job_id and "running_steps" in (workflow.state or {}) and workflow.updated_at > claim_cutoff:
+                    # Frisch beanspruchter Step, dessen Submit noch läuft.
+                    continue
+                if self._reconcile_step(workflow, step, job):
+                    changed += 1
+                    break
+        if changed:
+            logger.info("Order-Sync-Reconcile: %s Workflow(s) verarbeitet.", changed)
+        return changed
 
-            if step in ("probe_customer", "probe_vorgang"):
-                logger.warning(
-                    "Order-Sync-Workflow #%s: Probe-Fehler nicht als 'nicht gefunden' erkennbar, "
-                    "Workflow wird FAILED markiert: %s",
-                    workflow.pk,
-                    job.error_message,
+    def _reconcile_step(
+        self,
+        workflow: MicrotechOrderSyncWorkflow,
+        step: str,
+        job: MicrotechGraphQLJob | None,
+    ) -> bool:
+        """Prüft einen laufenden Step; liefert True, wenn der Workflow verändert wurde."""
+        from django.db import transaction
+        from django.utils import timezone
+
+        if job is None:
+            self._fail_waiting_step(
+                workflow,
+                step,
+                "Microtech-Job fehlt; der Workflow kann keinen Status mehr erhalten.",
+            )
+            return True
+
+        if not job.external_job_id:
+            error_message = "Microtech-Job hat keine externe GraphQL-Job-ID und kann nicht abgefragt werden."
+            if not job.is_terminal:
+                job.status = MicrotechGraphQLJob.Status.FAILED
+                job.error_message = error_message
+                job.next_step = "Keine externe Job-ID erhalten."
+                job.next_poll_at = None
+                job.completed_at = timezone.now()
+                job.save(
+                    update_fields=(
+                        "status",
+                        "error_message",
+                        "next_step",
+                        "next_poll_at",
+                        "completed_at",
+                        "updated_at",
+                    )
                 )
+            self._fail_waiting_step(workflow, step, error_message)
+            return True
 
+        if not job.is_terminal:
+            return False
+        if job.status == MicrotechGraphQLJob.Status.SUCCEEDED:
+            return False
+
+        if step in ("probe_customer", "probe_vorgang") and self._looks_like_not_found_error(job.error_message):
             with transaction.atomic():
                 wf = MicrotechOrderSyncWorkflow.objects.select_for_update().get(pk=workflow.pk)
-                wf.status = MicrotechOrderSyncWorkflow.Status.FAILED
-                wf.error_message = job.error_message or "Microtech-Job fehlgeschlagen."
-                self._log_step(wf, step, "failed", error=wf.error_message)
-                wf.save(update_fields=("status", "error_message", "step_log", "updated_at"))
-            logger.error(
-                "Order-Sync-Workflow #%s: Schritt '%s' fehlgeschlagen: %s", workflow.pk, step, wf.error_message
+                self._apply_probe_not_found(wf, step)
+                running = self._running_steps(wf)
+                running.pop(step, None)
+                wf.state = {**(wf.state or {}), "running_steps": running}
+                self._log_step(wf, step, "completed", error="probe-not-found")
+                wf.save(update_fields=("state", "step_log", "updated_at"))
+            logger.info(
+                "Order-Sync-Workflow #%s: Probe '%s' als 'nicht gefunden' verbucht.", workflow.pk, step
             )
-            changed += 1
-        if changed:
-            logger.info("Order-Sync-Reconcile: %s Workflow(s) verarbeitet.", changed)
-        return changed
+            try:
+                self._advance(MicrotechOrderSyncWorkflow.objects.get(pk=workflow.pk))
+            except Exception:
+                # _advance hat den Workflow bereits FAILED markiert und geloggt;
+                # die übrigen Workflows sollen trotzdem reconciled werden.
+                pass
+            return True
+
+        if step in ("probe_customer", "probe_vorgang"):
+            logger.warning(
+                "Order-Sync-Workflow #%s: Probe-Fehler nicht als 'nicht gefunden' erkennbar, "
+                "Workflow wird FAILED markiert: %s",
+                workflow.pk,
+                job.error_message,
+            )
+        self._fail_waiting_step(workflow, step, job.error_message or "Microtech-Job fehlgeschlagen.")
+        return True
+
+    def _fail_waiting_step(self, workflow: MicrotechOrderSyncWorkflow, step: str, error_message: str) -> None:
+        def failed(locked: MicrotechOrderSyncWorkflow) -> tuple[str, ...]:
+            running = self._running_steps(locked)
+            running.pop(step, None)
+            locked.state = {**(locked.state or {}), "running_steps": running}
+            locked.status = MicrotechOrderSyncWorkflow.Status.FAILED
+            locked.current_step = step
+            locked.error_message = error_message
+            self._log_step(locked, step, "failed", error=error_message)
+            return ("state", "status", "current_step", "error_message", "step_log")
+
+        self._locked_update(workflow, failed)
+        logger.error("Order-Sync-Workflow #%s: Schritt '%s' fehlgeschlagen: %s", workflow.pk, step, error_message)
 
     def resume(self, workflow: MicrotechOrderSyncWorkflow) -> MicrotechGraphQLJob | None:
         """Startet den aktuellen fehlgeschlagenen Workflow-Schritt erneut."""
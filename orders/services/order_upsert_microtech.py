@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, replace
+from datetime import timedelta
 from decimal import Decimal, ROUND_HALF_UP
 import re
 from typing import Any
 
+from django.conf import settings
+from django.utils import timezone
 from loguru import logger
 
 from core.services import BaseService
@@ -345,8 +348,10 @@ class OrderUpsertMicrotechService(BaseService):
     ) -> tuple[list[dict[str, str]], OrderRuleDebugInfo]:
         details = self._sort_order_details(order.details.all())
         artikel_service = MicrotechArtikelService(erp=client)
-        article_name_cache: dict[str, str] = {}
-        article_raw_unit_cache: dict[str, str] = {}
+        article_name_cache, article_raw_unit_cache = self._prefetch_article_data(
+            details=details,
+            artikel_service=artikel_service,
+        )
         product_unit_map = self._build_product_unit_map(details)
         product_export_text_map = self._build_product_export_text_map(details)
         append_customs_metadata = self._has_swiss_billing_address(order)
@@ -695,8 +700,10 @@ class OrderUpsertMicrotechService(BaseService):
     def _add_positions(self, *, order: Order, so_vorgang, erp) -> None:
         details = self._sort_order_details(order.details.all())
         artikel_service = MicrotechArtikelService(erp=erp)
-        article_name_cache: dict[str, str] = {}
-        article_raw_unit_cache: dict[str, str] = {}
+        article_name_cache, article_raw_unit_cache = self._prefetch_article_data(
+            details=details,
+            artikel_service=artikel_service,
+        )
         product_unit_map = self._build_product_unit_map(details)
         product_export_text_map = self._build_product_export_text_map(details)
         append_customs_metadata = self._has_swiss_billing_address(order)
@@ -741,6 +748,87 @@ class OrderUpsertMicrotechService(BaseService):
                     position_name=position_name,
                 )
 
+    @staticmethod
+    def _prefetch_article_data(
+        *,
+        details: list[OrderDetail],
+        artikel_service: MicrotechArtikelService,
+    ) -> tuple[dict[str, str], dict[str, str]]:
+        """
+        Fill the per-order name/raw-unit caches for all positions at once.
+
+        Fresh values come from the Product cache fields; the rest is read with a
+        single product list job and written back. Articles the batch does not
+        return stay uncached and fall back to the per-position find() in
+        _resolve_position_unit/_name.
+        """
+        article_name_cache: dict[str, str] = {}
+        article_raw_unit_cache: dict[str, str] = {}
+        erp_nrs = sorted({(detail.erp_nr or "").strip() for detail in details if (detail.erp_nr or "").strip()})
+        if not erp_nrs:
+            return article_name_cache, article_raw_unit_cache
+
+        now = timezone.now()
+        fresh_after = now - timedelta(seconds=int(getattr(settings, "MICROTECH_ARTICLE_CACHE_TTL_SECONDS", 86400)))
+        products = {
+            str(product.erp_nr).strip(): product
+            for product in Product.objects.filter(erp_nr__in=erp_nrs).only(
+                "id", "erp_nr", "microtech_unit_raw", "microtech_name", "microtech_article_cached_at"
+            )
+        }
+        missing: list[str] = []
+        for erp_nr in erp_nrs:
+            product = products.get(erp_nr)
+            if product and product.microtech_article_cached_at and product.microtech_article_cached_at >= fresh_after:
+                article_raw_unit_cache[erp_nr] = product.microtech_unit_raw
+                article_name_cache[erp_nr] = product.microtech_name
+            else:
+                missing.append(erp_nr)
+        if not missing:
+            return article_name_cache, article_raw_unit_cache
+
+        client = artikel_service.client
+        try:
+            job_id, retry_after = client.submit_request_products(erp_numbers=missing, include_images=False)
+            job = client.poll_job(job_id, query_job=client.product_list_job, retry_after=retry_after)
+        except Exception:
+            logger.exception(
+                "Failed to load {} articles in one batch while building order positions; falling back to single reads.",
+                len(missing),
+            )
+            return article_name_cache, article_raw_unit_cache
+
+        loaded: dict[str, dict[str, Any]] = {}
+        for product_data in job.get("products") or []:
+            if isinstance(product_data, dict) and str(product_data.get("erpNumber") or "").strip():
+                loaded[str(product_data["erpNumber"]).strip()] = product_data
+
+        to_update: list[Product] = []
+        for erp_nr in missing:
+            if erp_nr not in loaded:
+                # Nicht im Batch: ungecacht lassen, damit die Einzelsuche per find()
+                # (ArtNr-Index, dann Standardindex) wie bisher greift.
+                continue
+            artikel_service.load_product_record(loaded[erp_nr])
+            if artikel_service.range_eof():
+                continue
+            raw_unit = str(artikel_service.get_unit(raw=True) or "").strip()
+            name = str(artikel_service.get_name() or "").strip()
+            article_raw_unit_cache[erp_nr] = raw_unit
+            article_name_cache[erp_nr] = name
+            product = products.get(erp_nr)
+            if product is not None:
+                product.microtech_unit_raw = raw_unit[:64]
+                product.microtech_name = name[:255]
+                product.microtech_article_cached_at = now
+                to_update.append(product)
+        if to_update:
+            Product.objects.bulk_update(
+                to_update,
+                ["microtech_unit_raw", "microtech_name", "microtech_article_cached_at"],
+            )
+        return article_name_cache, article_raw_unit_cache
+
     @staticmethod
     def _build_product_unit_map(details: list[OrderDetail]) -> dict[str, str]:
         erp_nrs = {(detail.erp_nr or "").strip() for detail in details if (detail.erp_nr or "").strip()}
@@ -758,13 +846,14 @@ class OrderUpsertMicrotechService(BaseService):
     @staticmethod
     def _sort_order_details(details) -> list[OrderDetail]:
         """Sort regular order positions by ERP article number before adding extras."""
-        def sort_key(detail: OrderDetail) -> tuple[tuple[tuple[int, int | str], ...], str, int]:
+        def sort_key(detail: OrderDetail) -> tuple[tuple[tuple[int, int | str], ...], str, int, int]:
             erp_nr = (detail.erp_nr or "").strip()
             parts = tuple(
                 (0, int(part)) if part.isdigit() else (1, part.casefold())
                 for part in re.split(r"(\d+)", erp_nr)
             )
-            return parts, erp_nr.casefold(), int(detail.pk or 0)
+            # Gleiche Artikelnummer: Shopware-Position vor PK, da abgeglichene Zeilen alte PKs behalten.
+            return parts, erp_nr.casefold(), int(getattr(detail, "position", 0) or 0), int(detail.pk or 0)
 
         return sorted(details, key=sort_key)
 
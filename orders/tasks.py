@@ -37,8 +37,9 @@ def shopware_sync_open_orders(
     *,
     sales_channel_ids: Sequence[str] | None = None,
     limit_orders: int | None = None,
+    full_sync: bool = False,
 ) -> None:
-    command_options = {"limit_orders": limit_orders}
+    command_options = {"limit_orders": limit_orders, "full": full_sync}
     for sales_channel_id in sales_channel_ids or []:
         value = str(sales_channel_id).strip()
         if value:
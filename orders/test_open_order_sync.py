@@ -0,0 +1,257 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from django.db import transaction
+from django.test import TestCase
+
+from customer.models import Address, Customer
+from orders.models import OpenOrderSyncWatermark, Order, OrderDetail
+from orders.services.order_sync import (
+    OPEN_ORDER_WATERMARK_OVERLAP,
+    CustomerSyncBatch,
+    OrderSyncService,
+    _order_payload_hash,
+)
+
+CHANNEL = "channel-1"
+
+
+def _order(order_id: str, updated_at: str | None = None, created_at: str = "2026-10-01T08:00:00.000+00:00") -> dict:
+    return {"id": order_id, "orderNumber": order_id, "createdAt": created_at, "updatedAt": updated_at}
+
+
+class OpenOrderIncrementalSyncTest(TestCase):
+    def _run(self, orders, *, upsert=None, full_sync=False):
+        service = OrderSyncService()
+        order_service = MagicMock()
+        order_service.list_all_open_by_sales_channel.return_value = {"data": orders}
+        with (
+            patch("orders.services.order_sync.OrderService", return_value=order_service),
+            patch.object(service, "upsert_from_shopware_order", upsert or MagicMock(return_value={
+                "created": False,
+                "order": None,
+                "customer_upserted": True,
+                "addresses_upserted": 0,
+                "details_upserted": 0,
+            })) as upsert_mock,
+        ):
+            summary = service.sync_open_orders(sales_channel_ids=[CHANNEL], full_sync=full_sync)
+        return summary, order_service, upsert_mock
+
+    def test_first_run_fetches_everything_and_stores_watermark(self):
+        summary, order_service, _ = self._run([
+            _order("a", updated_at="2026-10-02T09:00:00.000+00:00"),
+            _order("b", created_at="2026-10-03T10:00:00.000+00:00"),
+        ])
+
+        order_service.list_all_open_by_sales_channel.assert_called_once_with(
+            sales_channel_id=CHANNEL,
+            changed_since=None,
+        )
+        self.assertEqual(summary["orders_updated"], 2)
+        watermark = OpenOrderSyncWatermark.objects.get(sales_channel_id=CHANNEL)
+        self.assertEqual(watermark.synced_until, datetime(2026, 10, 3, 10, 0, tzinfo=timezone.utc))
+
+    def test_next_run_filters_by_watermark_minus_overlap(self):
+        synced_until = datetime(2026, 10, 3, 10, 0, tzinfo=timezone.utc)
+        OpenOrderSyncWatermark.objects.create(sales_channel_id=CHANNEL, synced_until=synced_until)
+
+        _, order_service, _ = self._run([])
+
+        order_service.list_all_open_by_sales_channel.assert_called_once_with(
+            sales_channel_id=CHANNEL,
+            changed_since=synced_until - OPEN_ORDER_WATERMARK_OVERLAP,
+        )
+
+    def test_full_sync_ignores_watermark(self):
+        OpenOrderSyncWatermark.objects.create(
+            sales_channel_id=CHANNEL,
+            synced_until=datetime(2026, 10, 3, 10, 0, tzinfo=timezone.utc),
+        )
+
+        _, order_service, _ = self._run([], full_sync=True)
+
+        self.assertIsNone(order_service.list_all_open_by_sales_channel.call_args.kwargs["changed_since"])
+
+    def test_unchanged_payload_hash_skips_upsert(self):
+        order_data = _order("a", updated_at="2026-10-02T09:00:00.000+00:00")
+        Order.objects.create(api_id="a", shopware_payload_hash=_order_payload_hash(order_data))
+
+        summary, _, upsert_mock = self._run([order_data, _order("b")])
+
+        self.assertEqual(summary["orders_unchanged"], 1)
+        upsert_mock.assert_called_once()
+        self.assertEqual(upsert_mock.call_args.kwargs["order_data"]["id"], "b")
+
+    def test_failed_upsert_keeps_watermark(self):
+        synced_until = datetime(2026, 10, 1, 0, 0, tzinfo=timezone.utc)
+        OpenOrderSyncWatermark.objects.create(sales_channel_id=CHANNEL, synced_until=synced_until)
+
+        summary, _, _ = self._run(
+            [_order("a", updated_at=(synced_until + timedelta(days=1)).isoformat())],
+            upsert=MagicMock(side_effect=ValueError("kaputt")),
+        )
+
+        self.assertEqual(summary["orders_failed"], 1)
+        self.assertEqual(OpenOrderSyncWatermark.objects.get(sales_channel_id=CHANNEL).synced_until, synced_until)
+
+
+class CustomerBatchUpsertTest(TestCase):
+    ADDRESS = {
+        "id": "addr-1",
+        "firstName": "Erika",
+        "lastName": "Muster",
+        "street": "Hauptstr. 1",
+        "zipcode": "12345",
+        "city": "Berlin",
+        "country": {"iso": "DE"},
+    }
+
+    def setUp(self):
+        self.customer = Customer.objects.create(erp_nr="10001", api_id="cust-1", name="Erika", email="erika@example.com")
+        self.address = Address.objects.create(
+            customer=self.customer,
+            api_id="addr-1",
+            erp_nr=10001,
+            name2="Erika Muster",
+            street="Hauptstr. 1",
+            postal_code="12345",
+            city="Berlin",
+            country_code="DE",
+            email="erika@example.com",
+            first_name="Erika",
+            last_name="Muster",
+            is_invoice=True,
+            is_shipping=True,
+        )
+
+    def _order(self, order_id: str) -> dict:
+        return {
+            "id": order_id,
+            "orderCustomer": {"customerId": "cust-1", "customerNumber": "10001", "email": "erika@example.com"},
+            "billingAddress": dict(self.ADDRESS),
+        }
+
+    def test_page_prefetch_loads_customers_once_and_skips_unchanged_customer(self):
+        customer_service = MagicMock()
+        customer_service.list_by_ids.return_value = {
+            "data": [{"id": "cust-1", "customerNumber": "10001", "firstName": "Erika", "group": {"displayGross": True}}]
+        }
+        service = OrderSyncService()
+        customer_updated_at = Customer.objects.get(pk=self.customer.pk).updated_at
+
+        with patch("orders.services.order_sync.CustomerService", return_value=customer_service):
+            batch = service.prefetch_customer_batch(orders=[self._order("o-1"), self._order("o-2")])
+            results = [
+                service._upsert_customer_block(
+                    order_data=order_data,
+                    order_customer=order_data["orderCustomer"],
+                    customer_batch=batch,
+                )
+                for order_data in (self._order("o-1"), self._order("o-2"))
+            ]
+
+        customer_service.list_by_ids.assert_called_once_with(["cust-1"])
+        customer_service.get_by_id.assert_not_called()
+        self.assertTrue(all(result[0].pk == self.customer.pk for result in results))
+        self.assertTrue(all(result[1].pk == self.address.pk for result in results))
+        self.assertEqual(Address.objects.filter(customer=self.customer).count(), 1)
+        self.assertEqual(Customer.objects.get(pk=self.customer.pk).updated_at, customer_updated_at)
+        address = Address.objects.get(pk=self.address.pk)
+        self.assertTrue(address.is_invoice and address.is_shipping)
+
+    def test_rolled_back_order_reloads_touched_customers(self):
+        batch = CustomerSyncBatch()
+        batch.load_customers(customer_numbers={"10001"}, customer_ids={"cust-1"})
+        batch.start_order()
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            cached = batch.find_customer(customer_number="10001", customer_id="cust-1")
+            cached.name = "Geändert"
+            cached.save()
+            created = Customer.objects.create(erp_nr="10002")
+            batch.remember_customer(created)
+            raise RuntimeError("Bestellung fehlgeschlagen")
+        batch.reload_touched_customers()
+
+        reloaded = batch.find_customer(customer_number="10001", customer_id="cust-1")
+        self.assertIsNot(reloaded, cached)
+        self.assertEqual(reloaded.name, "Erika")
+        self.assertEqual([address.pk for address in batch.addresses_for(reloaded)], [self.address.pk])
+        self.assertIsNone(batch.find_customer(customer_number="10002", customer_id=""))
+
+    def test_customer_missing_from_the_batch_is_looked_up_in_the_db(self):
+        batch = CustomerSyncBatch()
+        batch.load_customers(customer_numbers={"10002"}, customer_ids={"cust-2"})
+        batch.start_order()
+
+        by_number = batch.find_customer(customer_number="10001", customer_id="")
+        by_api_id = batch.find_customer(customer_number="", customer_id="cust-1")
+
+        self.assertEqual(by_number.pk, self.customer.pk)
+        self.assertIs(by_api_id, by_number)
+        self.assertEqual([address.pk for address in batch.addresses_for(by_number)], [self.address.pk])
+        self.assertEqual(batch.touched_customers, [by_number, by_number])
+
+
+class OrderDetailReconciliationTest(TestCase):
+    def setUp(self):
+        self.order = Order.objects.create(api_id="order-1")
+        self.kept = OrderDetail.objects.create(
+            order=self.order, api_id="li-1", position=1, erp_nr="100", name="Alt", quantity=1
+        )
+        self.changed = OrderDetail.objects.create(
+            order=self.order, api_id="li-2", position=2, erp_nr="200", name="Alt", quantity=1
+        )
+        self.removed = OrderDetail.objects.create(order=self.order, api_id="li-3", position=3, erp_nr="300", quantity=1)
+
+    @staticmethod
+    def _line_item(api_id: str, erp_nr: str, label: str, quantity: int, position: int | None = None) -> dict:
+        return {
+            "id": api_id,
+            "position": position,
+            "label": label,
+            "quantity": quantity,
+            "payload": {"productNumber": erp_nr},
+            "price": {"unitPrice": 0, "totalPrice": 0, "calculatedTaxes": []},
+        }
+
+    def test_line_items_are_matched_by_api_id(self):
+        kept_updated_at = OrderDetail.objects.get(pk=self.kept.pk).updated_at
+
+        count = OrderSyncService()._reconcile_order_details(
+            order=self.order,
+            line_items=[
+                self._line_item("li-1", "100", "Alt", 1),
+                self._line_item("li-2", "200", "Neu", 3),
+                self._line_item("li-4", "400", "Zusatz", 2),
+            ],
+            tax_status="gross",
+        )
+
+        self.assertEqual(count, 3)
+        details = {detail.api_id: detail for detail in self.order.details.all()}
+        self.assertEqual(set(details), {"li-1", "li-2", "li-4"})
+        self.assertEqual(details["li-1"].pk, self.kept.pk)
+        self.assertEqual(details["li-1"].updated_at, kept_updated_at)
+        self.assertEqual(details["li-2"].pk, self.changed.pk)
+        self.assertEqual((details["li-2"].name, details["li-2"].quantity), ("Neu", 3))
+        self.assertFalse(OrderDetail.objects.filter(pk=self.removed.pk).exists())
+
+    def test_details_follow_the_shopware_position_number(self):
+        OrderSyncService()._reconcile_order_details(
+            order=self.order,
+            line_items=[
+                self._line_item("li-1", "100", "Alt", 1, position=3),
+                self._line_item("li-5", "500", "Neu", 1, position=1),
+                self._line_item("li-2", "200", "Alt", 1, position=2),
+            ],
+            tax_status="gross",
+        )
+
+        # Erhaltene Zeilen behalten ihre ID; die Reihenfolge kommt aus der Positionsnummer.
+        self.assertEqual([detail.api_id for detail in self.order.details.all()], ["li-5", "li-2", "li-1"])
+        self.assertEqual(
+            list(self.order.details.values_list("api_id", "position")),
+            [("li-5", 1), ("li-2", 2), ("li-1", 3)],
+        )
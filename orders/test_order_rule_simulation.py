@@ -0,0 +1,83 @@
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from customer.models import Address, Customer
+from microtech.models import MicrotechOrderRule, MicrotechOrderRuleCondition
+from orders.models import Order
+from orders.services import OrderRuleSimulationService, order_rule_resolver
+from orders.services.order_rule_resolver import reset_order_rule_cache
+
+
+def _order(api_id: str, country: str) -> Order:
+    customer = Customer.objects.create(erp_nr=f"ERP-{api_id}", name="Testkunde", is_gross=True)
+    address = Address.objects.create(customer=customer, first_name="Max", last_name="Muster", country_code=country)
+    return Order.objects.create(
+        api_id=api_id,
+        order_number=f"ORDER-{api_id}",
+        customer=customer,
+        billing_address=address,
+        shipping_address=address,
+        total_price=Decimal("0.00"),
+        total_tax=Decimal("0.00"),
+        shipping_costs=Decimal("0.00"),
+    )
+
+
+def _rule(name: str, country: str, *, priority: int, is_active: bool) -> MicrotechOrderRule:
+    rule = MicrotechOrderRule.objects.create(name=name, priority=priority, is_active=is_active)
+    MicrotechOrderRuleCondition.objects.create(
+        rule=rule,
+        django_field_path="shipping_address__country_code",
+        operator_code="eq",
+        expected_value=country,
+    )
+    return rule
+
+
+class OrderRuleSimulationTest(TestCase):
+    def setUp(self):
+        reset_order_rule_cache()
+        self.addCleanup(reset_order_rule_cache)
+        redis_down = patch.object(order_rule_resolver, "get_redis", side_effect=ConnectionError("redis down"))
+        redis_down.start()
+        self.addCleanup(redis_down.stop)
+        self.at_order = _order("S1", "AT")
+        self.de_order = _order("S2", "DE")
+        self.other_order = _order("S3", "CH")
+        self.at_rule = _rule("AT", "AT", priority=10, is_active=True)
+        self.de_draft = _rule("DE Entwurf", "DE", priority=5, is_active=False)
+
+    def test_reports_orders_that_would_switch_rules(self):
+        result = OrderRuleSimulationService().simulate(
+            enable_rule_ids=[self.de_draft.pk],
+            disable_rule_ids=[self.at_rule.pk],
+            chunk_size=1,
+        )
+
+        self.assertEqual(result.orders_evaluated, 3)
+        self.assertEqual(result.orders_switched, 2)
+        switches = {switch.order_id: (switch.from_rule_id, switch.to_rule_id) for switch in result.switches}
+        self.assertEqual(
+            switches,
+            {
+                self.at_order.pk: (self.at_rule.pk, None),
+                self.de_order.pk: (None, self.de_draft.pk),
+            },
+        )
+
+    def test_limit_evaluates_most_recent_orders_only(self):
+        result = OrderRuleSimulationService().simulate(enable_rule_ids=[self.de_draft.pk], limit=2, chunk_size=1)
+
+        self.assertEqual(result.orders_evaluated, 2)
+        self.assertEqual([switch.order_id for switch in result.switches], [self.de_order.pk])
+
+    def test_command_prints_summary(self):
+        output = StringIO()
+
+        call_command("simulate_order_rules", "--enable-rule", str(self.de_draft.pk), stdout=output)
+
+        self.assertIn('"orders_switched": 1', output.getvalue())
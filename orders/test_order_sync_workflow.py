@@ -324,6 +324,63 @@ class AdvanceHandlerTest(TestCase):
         self.assertEqual(order.shipping_address.erp_asp_nr, 5)
 
 
+class ParallelStepTest(TestCase):
+    @patch("orders.services.order_sync_workflow.OrderSyncWorkflowService.submit_step")
+    def test_independent_address_steps_are_submitted_together(self, mock_submit):
+        order = make_order()
+        job = MicrotechGraphQLJob.objects.create(
+            kind=MicrotechGraphQLJob.Kind.CUSTOMER_UPSERT,
+            operation="upsertCustomer",
+            status=MicrotechGraphQLJob.Status.SUCCEEDED,
+            context={"step": "write_customer"},
+            result_payload={"customer": {"customerNumber": "100012", "erpAddressNumber": 100012}},
+        )
+        wf = MicrotechOrderSyncWorkflow.objects.create(
+            order=order,
+            status=MicrotechOrderSyncWorkflow.Status.WAITING,
+            current_step="write_customer",
+            current_job=job,
+            state={
+                "erp_nr": order.customer.erp_nr,
+                "is_new_customer": False,
+                "billing_same_as_shipping": False,
+                "running_steps": {"write_customer": job.pk},
+            },
+        )
+        job.context = {"workflow_id": wf.pk, "step": "write_customer"}
+        job.save(update_fields=("context",))
+
+        OrderSyncWorkflowService().advance(job)
+
+        submitted = [call.args[1] for call in mock_submit.call_args_list]
+        self.assertEqual(submitted, ["shipping_address", "billing_address"])
+        wf.refresh_from_db()
+        self.assertEqual(wf.state["running_steps"], {"shipping_address": None, "billing_address": None})
+
+    @patch("orders.services.order_sync_workflow.OrderSyncWorkflowService.submit_step")
+    def test_result_of_superseded_job_is_ignored(self, mock_submit):
+        order = make_order()
+        job = MicrotechGraphQLJob.objects.create(
+            kind=MicrotechGraphQLJob.Kind.CUSTOMER_UPSERT,
+            operation="createPostalAddress",
+            status=MicrotechGraphQLJob.Status.SUCCEEDED,
+            result_payload={},
+        )
+        wf = MicrotechOrderSyncWorkflow.objects.create(
+            order=order,
+            status=MicrotechOrderSyncWorkflow.Status.WAITING,
+            state={"running_steps": {"shipping_address": job.pk + 1}},
+        )
+        job.context = {"workflow_id": wf.pk, "step": "shipping_address"}
+        job.save(update_fields=("context",))
+
+        OrderSyncWorkflowService().advance(job)
+
+        wf.refresh_from_db()
+        self.assertEqual(wf.step_log, [])
+        mock_submit.assert_not_called()
+
+
 class StartAndSubmitTest(TestCase):
     @patch("orders.services.order_sync_workflow.MicrotechGraphQLClientService")
     @patch("orders.services.order_sync_workflow.MicrotechJobSentinelService.submit_wrapper_job")
@@ -1,8 +1,11 @@
+from datetime import timedelta
 from decimal import Decimal
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
-from django.test import SimpleTestCase, TestCase
+from django.db import transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.utils import timezone
 
 from customer.models import Address, Customer
 from customer.services.customer_upsert_microtech import CustomerUpsertMicrotechService
@@ -13,14 +16,19 @@ from microtech.models import (
     MicrotechOrderRuleAction,
     MicrotechOrderRuleCondition,
 )
+from microtech.services import MicrotechArtikelService
+from microtech.services.graphql_client import MicrotechGraphQLClientService
 from orders.models import Order
+from orders.services import order_rule_resolver
 from orders.services.order_rule_resolver import (
     OrderRuleResolverService,
     ResolvedDatasetAction,
     ResolvedOrderRule,
+    reset_order_rule_cache,
 )
 from orders.services.order_upsert_microtech import OrderRuleDebugInfo, OrderUpsertMicrotechService
 from orders.services.order_sync import OrderSyncService
+from products.models import Product
 
 
 class OrderGraphQLPayloadTest(SimpleTestCase):
@@ -351,6 +359,107 @@ class OrderRuleResolverDynamicRulesTest(TestCase):
         self.assertEqual(resolved.rule_id, fallback_rule.id)
 
 
+class OrderRuleInvalidationRollbackTest(TransactionTestCase):
+    def setUp(self):
+        reset_order_rule_cache()
+        self.addCleanup(reset_order_rule_cache)
+
+    def test_rollback_clears_the_pending_invalidation(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            order_rule_resolver.invalidate_order_rules()
+            self.assertTrue(order_rule_resolver._has_uncommitted_rule_changes())
+            raise RuntimeError("rollback")
+
+        self.assertFalse(order_rule_resolver._has_uncommitted_rule_changes())
+        self.assertFalse(order_rule_resolver._pending.dirty)
+
+
+class CompiledOrderRuleSetTest(TestCase):
+    def setUp(self):
+        reset_order_rule_cache()
+        self.addCleanup(reset_order_rule_cache)
+        redis_down = patch.object(order_rule_resolver, "get_redis", side_effect=ConnectionError("redis down"))
+        redis_down.start()
+        self.addCleanup(redis_down.stop)
+        self.order = OrderRuleResolverDynamicRulesTest._create_order(self, api_id="C1", shipping_country="AT")
+
+    def _create_rule(self, *, name: str, priority: int, country: str) -> MicrotechOrderRule:
+        rule = MicrotechOrderRule.objects.create(name=name, priority=priority, is_active=True)
+        MicrotechOrderRuleCondition.objects.create(
+            rule=rule,
+            django_field_path="shipping_address__country_code",
+            operator_code="eq",
+            expected_value=country,
+        )
+        return rule
+
+    def test_rule_set_is_compiled_once_until_a_rule_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            rule = self._create_rule(name="AT", priority=1, country="AT")
+        service = OrderRuleResolverService()
+
+        with patch.object(service, "compile_rule_set", wraps=service.compile_rule_set) as compile_mock:
+            self.assertEqual(service.resolve_for_order(order=self.order).rule_id, rule.id)
+            self.assertEqual(service.resolve_for_order(order=self.order).rule_id, rule.id)
+            self.assertEqual(compile_mock.call_count, 1)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                rule.conditions.update(expected_value="CH")
+                rule.save()
+            self.assertIsNone(service.resolve_for_order(order=self.order).rule_id)
+            self.assertEqual(compile_mock.call_count, 2)
+
+    def test_uncommitted_rule_changes_are_not_cached(self):
+        service = OrderRuleResolverService()
+        rule = self._create_rule(name="AT", priority=1, country="AT")
+
+        self.assertEqual(service.resolve_for_order(order=self.order).rule_id, rule.id)
+        self.assertIsNone(order_rule_resolver._rule_set_cache["value"])
+
+    def test_each_field_path_is_resolved_once_per_order(self):
+        self._create_rule(name="CH", priority=1, country="CH")
+        fallback = self._create_rule(name="AT", priority=2, country="AT")
+
+        with patch.object(
+            order_rule_resolver,
+            "resolve_django_field_value",
+            wraps=order_rule_resolver.resolve_django_field_value,
+        ) as resolve_mock:
+            resolved = OrderRuleResolverService().resolve_for_orders(orders=[self.order])
+
+        self.assertEqual(resolved[0].rule_id, fallback.id)
+        self.assertEqual(resolve_mock.call_count, 1)
+
+    def test_compiled_predicates_match_condition_evaluation(self):
+        cases = [
+            ("eq", "AT", "string", ["at", "AT ", "DE", None]),
+            ("ne", "AT", "string", ["AT", "DE"]),
+            ("gt", "10", "decimal", ["10,5", "9", "", None]),
+            ("lt", "2026-01-01", "date", ["2025-12-31", "2026-01-01", "kaputt"]),
+            ("eq", "ja", "bool", [True, "0", "vielleicht"]),
+            ("gt", "kein datum", "datetime", ["2026-01-01T00:00:00"]),
+            ("contains", "pay", "string", ["PayPal", "Rechnung"]),
+            ("is_empty", "", "string", ["", None, "x"]),
+        ]
+        for operator, expected_raw, value_kind, actual_values in cases:
+            predicate = OrderRuleResolverService._compile_predicate(
+                operator=operator,
+                expected_raw=expected_raw,
+                value_kind=value_kind,
+            )
+            for actual_value in actual_values:
+                with self.subTest(operator=operator, value_kind=value_kind, actual_value=actual_value):
+                    self.assertEqual(
+                        predicate(actual_value),
+                        OrderRuleResolverService._evaluate_condition(
+                            operator=operator,
+                            actual_value=actual_value,
+                            expected_raw=expected_raw,
+                            value_kind=value_kind,
+                        ),
+                    )
+
+
 class OrderUpsertRuleDebugTest(SimpleTestCase):
     def test_payment_position_missing_amount_uses_default_article_price(self):
         order = SimpleNamespace(order_number="ORDER-TRACE")
@@ -519,3 +628,59 @@ class OrderUpsertRuleDebugTest(SimpleTestCase):
         )
         persist_erp_order_id_mock.assert_called_once_with(order=order, erp_order_id="BN-2000")
         clear_erp_order_id_mock.assert_not_called()
+
+
+class OrderPositionArticlePrefetchTest(TestCase):
+    def test_articles_of_an_order_are_read_in_one_batch_and_cached_on_product(self):
+        Product.objects.create(
+            erp_nr="100",
+            microtech_unit_raw="Stk",
+            microtech_name="Eins",
+            microtech_article_cached_at=timezone.now(),
+        )
+        stale = Product.objects.create(
+            erp_nr="200",
+            microtech_unit_raw="alt",
+            microtech_article_cached_at=timezone.now() - timedelta(days=30),
+        )
+        client = MagicMock(spec=MicrotechGraphQLClientService)
+        client.submit_request_products.return_value = ("job-1", 0.0)
+        client.poll_job.return_value = {
+            "status": "DONE",
+            "products": [{"erpNumber": "200", "unit": "% Stk", "name": "Zwei"}],
+        }
+        details = [SimpleNamespace(erp_nr=erp_nr) for erp_nr in ("200", "100", "300", "200")]
+
+        names, raw_units = OrderUpsertMicrotechService._prefetch_article_data(
+            details=details,
+            artikel_service=MicrotechArtikelService(erp=client),
+        )
+
+        client.submit_request_products.assert_called_once_with(erp_numbers=["200", "300"], include_images=False)
+        # "300" fehlt im Batch und bleibt ungecacht: dafür greift die Einzelsuche per find().
+        self.assertEqual(raw_units, {"100": "Stk", "200": "% Stk"})
+        self.assertEqual(names, {"100": "Eins", "200": "Zwei"})
+        stale.refresh_from_db()
+        self.assertEqual((stale.microtech_unit_raw, stale.microtech_name), ("% Stk", "Zwei"))
+
+    def test_article_missing_from_the_batch_is_looked_up_with_find(self):
+        artikel_service = MagicMock()
+        artikel_service.find.side_effect = [False, True]
+        artikel_service.get_unit.return_value = "Pack"
+        artikel_service.get_name.return_value = "Drei"
+        names: dict[str, str] = {}
+        raw_units: dict[str, str] = {}
+
+        unit = OrderUpsertMicrotechService._resolve_position_unit(
+            detail=SimpleNamespace(unit=""),
+            erp_nr="300",
+            artikel_service=artikel_service,
+            product_unit_map={},
+            article_name_cache=names,
+            article_raw_unit_cache=raw_units,
+        )
+
+        self.assertEqual(unit, "Pack")
+        self.assertEqual(artikel_service.find.call_args_list[0].args, ("300",))
+        artikel_service.find.assert_called_with("300")
+        self.assertEqual(names, {"300": "Drei"})
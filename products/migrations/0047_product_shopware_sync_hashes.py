@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-16 08:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0046_productvariantfamily_description_ch_de_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='shopware_sync_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='Shopware Produkt-Sync-Hash'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='shopware_price_sync_hash',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='Shopware Preis-Sync-Hash'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-16 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0047_product_shopware_sync_hashes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='microtech_unit_raw',
+            field=models.CharField(blank=True, default='', max_length=64, verbose_name='Microtech Einheit (roh)'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='microtech_name',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='Microtech Bezeichnung'),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='microtech_article_cached_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Microtech Artikeldaten gelesen am'),
+        ),
+    ]
@@ -265,6 +265,35 @@ class Product(BaseModel):
         default="",
         verbose_name=_("Shopware Bild-Sync-Hash"),
     )
+    shopware_sync_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        verbose_name=_("Shopware Produkt-Sync-Hash"),
+    )
+    shopware_price_sync_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        verbose_name=_("Shopware Preis-Sync-Hash"),
+    )
+    microtech_unit_raw = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        verbose_name=_("Microtech Einheit (roh)"),
+    )
+    microtech_name = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        verbose_name=_("Microtech Bezeichnung"),
+    )
+    microtech_article_cached_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_("Microtech Artikeldaten gelesen am"),
+    )
     sku = models.CharField(
         max_length=64,
         unique=True,
@@ -337,7 +366,13 @@ class Product(BaseModel):
 
         # Backward compatibility: older data may still be linked through the legacy images M2M field.
         known_image_ids = {product_image.image_id for product_image in ordered_product_images if product_image.image_id}
-        fallback_images = self.images.exclude(pk__in=known_image_ids).order_by("id")
+        if "images" in getattr(self, "_prefetched_objects_cache", {}):
+            fallback_images = sorted(
+                (image for image in self.images.all() if image.pk not in known_image_ids),
+                key=lambda image: image.pk,
+            )
+        else:
+            fallback_images = self.images.exclude(pk__in=known_image_ids).order_by("id")
         next_order = max((product_image.order for product_image in ordered_product_images), default=0)
         for offset, image in enumerate(fallback_images, start=1):
             ordered_product_images.append(
@@ -726,6 +761,16 @@ class Price(BaseModel):
                 .first()
             )
 
+        self.normalize_special_price()
+        super().save(*args, **kwargs)
+        self._create_history_entry(
+            previous_state=previous_state,
+            is_create=is_create,
+            history_tracked_fields=history_tracked_fields,
+        )
+
+    def normalize_special_price(self) -> None:
+        """Apply the special price rules ``save()`` enforces; used by bulk writers."""
         if self.special_percentage and self.price:
             self.special_price = self._round_up_5ct(
                 self.price * (Decimal("100") - self.special_percentage) / Decimal("100")
@@ -745,21 +790,34 @@ class Price(BaseModel):
             self.special_price = None
             self.special_start_date = None
             self.special_end_date = None
-        super().save(*args, **kwargs)
-        self._create_history_entry(
+
+    def history_state(self) -> dict:
+        return {field: getattr(self, field) for field in self.TRACKED_HISTORY_FIELDS}
+
+    def _create_history_entry(
+        self,
+        *,
+        previous_state: dict | None,
+        is_create: bool,
+        history_tracked_fields: tuple[str, ...] | list[str],
+    ) -> None:
+        history_entry = self.build_history_entry(
             previous_state=previous_state,
             is_create=is_create,
             history_tracked_fields=history_tracked_fields,
         )
+        if history_entry is not None:
+            history_entry.save()
 
-    def _create_history_entry(
+    def build_history_entry(
         self,
         *,
         previous_state: dict | None,
         is_create: bool,
         history_tracked_fields: tuple[str, ...] | list[str],
-    ) -> None:
-        current_state = {field: getattr(self, field) for field in self.TRACKED_HISTORY_FIELDS}
+    ) -> "PriceHistory | None":
+        """Return the unsaved history snapshot for this state, or ``None`` without tracked changes."""
+        current_state = self.history_state()
         if previous_state is None:
             # Initial-Snapshot: nur tatsächlich belegte Felder als "geändert" führen.
             changed_fields = [field for field in history_tracked_fields if current_state.get(field) is not None]
@@ -771,9 +829,9 @@ class Price(BaseModel):
             ]
 
         if not changed_fields:
-            return
+            return None
 
-        PriceHistory.objects.create(
+        return PriceHistory(
             price_entry=self,
             change_type=PriceHistory.ChangeType.CREATED if is_create else PriceHistory.ChangeType.UPDATED,
             changed_fields=", ".join(changed_fields),
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
+from datetime import timedelta
 from threading import local
 
+from django.conf import settings
 from django.core.management import call_command
-from django.db import IntegrityError, transaction
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q
 from django.utils import timezone
 
 from core.live_events import emit_event
@@ -78,80 +81,248 @@ class ProductAutoSyncService(BaseService):
             )
             if job is None or job.status != ProductSyncJob.Status.QUEUED:
                 return job
+            self._mark_running([job.pk])
 
-            job.status = ProductSyncJob.Status.RUNNING
-            job.attempt += 1
-            job.started_at = timezone.now()
-            job.finished_at = None
-            job.last_error = ""
-            job.save(update_fields=("status", "attempt", "started_at", "finished_at", "last_error", "updated_at"))
-            product_erp_nr = job.product.erp_nr
-            product_id = job.product_id
-            changed_fields = list(job.changed_fields or [])
-            target = job.target
+        job.refresh_from_db()
+        return self._run_job(job)
 
+    def process_coalesced(self, *, job_id: int) -> dict:
+        """Einstieg des Celery-Tasks: wartende Jobs eines Ziels gesammelt verarbeiten.
+
+        Jeder Job bekommt weiterhin seinen eigenen Task. Nur der Task des
+        aeltesten wartenden Jobs eines Ziels arbeitet: er wartet das
+        Sammelfenster ab (``deferred``) und arbeitet dann die Warteschlange des
+        Ziels in Batches ab. Die Tasks juengerer Jobs enden sofort
+        (``coalesced``), ihre Jobs werden im Batch mitgenommen.
+        """
+        job = (
+            ProductSyncJob.objects.filter(pk=job_id)
+            .only("pk", "target", "status", "created_at")
+            .first()
+        )
+        if job is None or job.status != ProductSyncJob.Status.QUEUED:
+            return {"status": "skipped", "job_id": job_id}
+        if self._has_older_queued_job(job):
+            return {"status": "coalesced", "job_id": job_id}
+
+        remaining = self._coalesce_seconds() - (timezone.now() - job.created_at).total_seconds()
+        if remaining > 0:
+            return {"status": "deferred", "job_id": job_id, "countdown": remaining}
+
+        batches = []
+        while True:
+            summary = self.process_queued_jobs(target=job.target)
+            if not summary["claimed"]:
+                break
+            batches.append(summary)
+        return {"status": "processed", "job_id": job_id, "batches": batches}
+
+    def process_queued_jobs(self, *, target: str, limit: int | None = None) -> dict:
+        """Wartende Jobs eines Ziels per SKIP LOCKED beanspruchen und gemeinsam synchronisieren.
+
+        Shopware 6 und Shopware 5 laufen als ein Befehlsaufruf fuer alle
+        ERP-Nummern. Schlaegt der Batch fehl, wird jeder Job einzeln
+        wiederholt, damit Erfolg und Fehler pro Job stimmen. Microtech-Jobs
+        werden immer einzeln an den Sentinel uebergeben.
+        """
+        limit = limit or self._batch_size()
+        ordering = ("priority", "created_at", "id")
+        with transaction.atomic():
+            job_ids = list(
+                ProductSyncJob.objects.select_for_update(**self._skip_locked_kwargs())
+                .filter(target=target, status=ProductSyncJob.Status.QUEUED)
+                .order_by(*ordering)
+                .values_list("pk", flat=True)[:limit]
+            )
+            if job_ids:
+                self._mark_running(job_ids)
+
+        summary = {"target": target, "claimed": len(job_ids), "succeeded": 0, "failed": 0}
+        if not job_ids:
+            return summary
+        jobs = list(ProductSyncJob.objects.select_related("product").filter(pk__in=job_ids).order_by(*ordering))
+
+        if target == ProductSyncJob.Target.MICROTECH or len(jobs) == 1:
+            results = [self._run_job(job, raise_errors=False) for job in jobs]
+        else:
+            results = self._run_batch(target, jobs)
+        for job in results:
+            if job.status == ProductSyncJob.Status.SUCCEEDED:
+                summary["succeeded"] += 1
+            else:
+                summary["failed"] += 1
+        return summary
+
+    def _run_job(self, job: ProductSyncJob, *, raise_errors: bool = True) -> ProductSyncJob:
         task = "products.auto_sync"
-        run_id = str(job_id)
-        target_label = _TARGET_LABELS.get(target, str(target))
+        run_id = str(job.pk)
+        product_erp_nr = job.product.erp_nr
+        target_label = _TARGET_LABELS.get(job.target, str(job.target))
         emit_event(
             task, entity=product_erp_nr, step=f"→ {target_label}", status="info",
             summary=f"Produkt {product_erp_nr} → {target_label}",
             run_id=run_id, target=target_label,
         )
         try:
-            if target == ProductSyncJob.Target.SHOPWARE:
-                call_command("shopware_sync_products", product_erp_nr, skip_images=True)
-                from products.services.variant_family import ProductVariantFamilyResolverService
-
-                variant_family_slugs = [
-                    family.slug
-                    for family in ProductVariantFamilyResolverService().families_for_product(job.product)
-                ]
-                if variant_family_slugs:
-                    call_command(
-                        "shopware_sync_variants",
-                        *variant_family_slugs,
-                        apply=True,
-                        skip_product_sync=True,
-                    )
-            elif target == ProductSyncJob.Target.SHOPWARE5:
-                call_command("shopware5_sync_products", product_erp_nr)
-            elif target == ProductSyncJob.Target.MICROTECH:
-                self._submit_microtech_sentinel_jobs(
-                    product_id=product_id,
-                    product_sync_job_id=job_id,
-                    product_erp_nr=product_erp_nr,
-                    changed_fields=changed_fields,
-                )
-            else:
-                raise ValueError(f"Unsupported product sync target: {target}")
+            if self._sync_jobs(job.target, [job]):
+                raise RuntimeError(f"Produkt {product_erp_nr} konnte nicht nach {target_label} geschrieben werden.")
         except Exception as exc:
             emit_event(
                 task, entity=product_erp_nr, step=f"→ {target_label}", status="error",
                 summary=f"{target_label}-Fehler: {exc}",
                 run_id=run_id, target=target_label, payload={"error": str(exc)},
             )
-            with transaction.atomic():
-                job = ProductSyncJob.objects.select_for_update().get(pk=job_id)
-                job.status = ProductSyncJob.Status.FAILED
-                job.finished_at = timezone.now()
-                job.last_error = str(exc)
-                job.save(update_fields=("status", "finished_at", "last_error", "updated_at"))
-            raise
+            self._mark_finished([job.pk], status=ProductSyncJob.Status.FAILED, error=str(exc))
+            if raise_errors:
+                raise
         else:
             emit_event(
                 task, entity=product_erp_nr, step=f"→ {target_label}", status="ok",
                 summary=f"Produkt {product_erp_nr} nach {target_label} geschrieben",
                 run_id=run_id, target=target_label,
             )
+            self._mark_finished([job.pk], status=ProductSyncJob.Status.SUCCEEDED)
+        job.refresh_from_db()
+        return job
 
-        with transaction.atomic():
-            job = ProductSyncJob.objects.select_for_update().get(pk=job_id)
-            job.status = ProductSyncJob.Status.SUCCEEDED
-            job.finished_at = timezone.now()
-            job.last_error = ""
-            job.save(update_fields=("status", "finished_at", "last_error", "updated_at"))
-            return job
+    def _run_batch(self, target: str, jobs: list[ProductSyncJob]) -> list[ProductSyncJob]:
+        task = "products.auto_sync"
+        run_id = f"batch-{jobs[0].pk}"
+        target_label = _TARGET_LABELS.get(target, str(target))
+        entity = f"{len(jobs)} Produkte"
+        erp_nrs = [job.product.erp_nr for job in jobs]
+        emit_event(
+            task, entity=entity, step=f"→ {target_label}", status="info",
+            summary=f"{len(jobs)} Produkte gesammelt → {target_label}",
+            run_id=run_id, target=target_label, payload={"erp_nrs": erp_nrs},
+        )
+        try:
+            failed_erp_nrs = self._sync_jobs(target, jobs)
+        except Exception as exc:
+            emit_event(
+                task, entity=entity, step=f"→ {target_label}", status="info",
+                summary=f"Batch nach {target_label} fehlgeschlagen, Jobs werden einzeln wiederholt: {exc}",
+                run_id=run_id, target=target_label, payload={"error": str(exc), "erp_nrs": erp_nrs},
+            )
+            return [self._run_job(job, raise_errors=False) for job in jobs]
+
+        failed_jobs = [job for job in jobs if job.product.erp_nr in failed_erp_nrs]
+        succeeded_jobs = [job for job in jobs if job.product.erp_nr not in failed_erp_nrs]
+        for job in failed_jobs:
+            error = f"Produkt {job.product.erp_nr} konnte nicht nach {target_label} geschrieben werden."
+            emit_event(
+                task, entity=job.product.erp_nr, step=f"→ {target_label}", status="error",
+                summary=f"{target_label}-Fehler: {error}",
+                run_id=run_id, target=target_label, payload={"error": error},
+            )
+            self._mark_finished([job.pk], status=ProductSyncJob.Status.FAILED, error=error)
+        emit_event(
+            task, entity=entity, step=f"→ {target_label}", status="error" if failed_jobs else "ok",
+            summary=f"{len(succeeded_jobs)} von {len(jobs)} Produkten nach {target_label} geschrieben",
+            run_id=run_id, target=target_label, payload={"erp_nrs": erp_nrs},
+        )
+        self._mark_finished([job.pk for job in succeeded_jobs], status=ProductSyncJob.Status.SUCCEEDED)
+        for job in jobs:
+            job.refresh_from_db(fields=("status", "finished_at", "last_error"))
+        return jobs
+
+    def _sync_jobs(self, target: str, jobs: list[ProductSyncJob]) -> set[str]:
+        """Synchronisiert die Produkte der Jobs; gibt die ERP-Nummern fehlgeschlagener Produkte zurueck."""
+        erp_nrs = [job.product.erp_nr for job in jobs]
+        failed_erp_nrs: set[str] = set()
+        if target == ProductSyncJob.Target.SHOPWARE:
+            from shopware.management.commands.shopware_sync_products import ShopwareProductSyncFailed
+
+            try:
+                call_command("shopware_sync_products", *erp_nrs, skip_images=True, fail_on_product_errors=True)
+            except ShopwareProductSyncFailed as exc:
+                failed_erp_nrs = set(exc.erp_nrs)
+            from products.services.variant_family import ProductVariantFamilyResolverService
+
+            resolver = ProductVariantFamilyResolverService()
+            variant_family_slugs = list(
+                dict.fromkeys(
+                    family.slug
+                    for job in jobs
+                    if job.product.erp_nr not in failed_erp_nrs
+                    for family in resolver.families_for_product(job.product)
+                )
+            )
+            if variant_family_slugs:
+                call_command(
+                    "shopware_sync_variants",
+                    *variant_family_slugs,
+                    apply=True,
+                    skip_product_sync=True,
+                )
+        elif target == ProductSyncJob.Target.SHOPWARE5:
+            call_command("shopware5_sync_products", *erp_nrs)
+        elif target == ProductSyncJob.Target.MICROTECH:
+            for job in jobs:
+                self._submit_microtech_sentinel_jobs(
+                    product_id=job.product_id,
+                    product_sync_job_id=job.pk,
+                    product_erp_nr=job.product.erp_nr,
+                    changed_fields=list(job.changed_fields or []),
+                )
+        else:
+            raise ValueError(f"Unsupported product sync target: {target}")
+        return failed_erp_nrs
+
+    @staticmethod
+    def _mark_running(job_ids: list[int]) -> None:
+        ProductSyncJob.objects.filter(pk__in=job_ids).update(
+            status=ProductSyncJob.Status.RUNNING,
+            attempt=F("attempt") + 1,
+            started_at=timezone.now(),
+            finished_at=None,
+            last_error="",
+            updated_at=timezone.now(),
+        )
+
+    @staticmethod
+    def _mark_finished(job_ids: list[int], *, status: str, error: str = "") -> None:
+        ProductSyncJob.objects.filter(pk__in=job_ids).update(
+            status=status,
+            finished_at=timezone.now(),
+            last_error=error,
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def _has_older_queued_job(cls, job: ProductSyncJob) -> bool:
+        """Gibt es einen aelteren wartenden Job, dessen Task die Warteschlange abarbeitet?
+
+        Jobs, die laenger als Sammelfenster plus ``PRODUCT_AUTO_SYNC_STALE_SECONDS``
+        warten, gelten als verloren (z. B. Task beim Worker-Neustart verworfen)
+        und werden ignoriert; der juengere Task nimmt sie im Batch mit.
+        """
+        stale_before = timezone.now() - timedelta(seconds=cls._coalesce_seconds() + cls._stale_seconds())
+        return (
+            ProductSyncJob.objects.filter(target=job.target, status=ProductSyncJob.Status.QUEUED)
+            .exclude(celery_task_id="")
+            .filter(created_at__gte=stale_before)
+            .filter(Q(created_at__lt=job.created_at) | Q(created_at=job.created_at, pk__lt=job.pk))
+            .exists()
+        )
+
+    @staticmethod
+    def _coalesce_seconds() -> float:
+        return max(0.0, float(getattr(settings, "PRODUCT_AUTO_SYNC_COALESCE_SECONDS", 5.0)))
+
+    @staticmethod
+    def _stale_seconds() -> float:
+        return max(0.0, float(getattr(settings, "PRODUCT_AUTO_SYNC_STALE_SECONDS", 300.0)))
+
+    @staticmethod
+    def _batch_size() -> int:
+        return max(1, int(getattr(settings, "PRODUCT_AUTO_SYNC_BATCH_SIZE", 200)))
+
+    @staticmethod
+    def _skip_locked_kwargs() -> dict[str, bool]:
+        if connection.features.has_select_for_update_skip_locked:
+            return {"skip_locked": True}
+        return {}
 
     def _upsert_queued_job(
         self,
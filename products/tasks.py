@@ -5,7 +5,7 @@ from collections.abc import Sequence
 from celery import shared_task
 from django.core.management import call_command
 
-from core.live_events import emit_event, emit_run_finished, emit_run_started
+from core.live_events import buffered_events, emit_event, emit_run_finished, emit_run_started
 from issues.services import TaskIssueCollector
 
 PRODUCT_SYNC_CONTINUATION = "products.scheduled_product_sync_page"
@@ -109,10 +109,15 @@ def expire_special_prices() -> dict:
 
 
 @shared_task(name="products.process_product_sync_job")
-def process_product_sync_job(job_id: int) -> None:
+def process_product_sync_job(job_id: int) -> dict:
     from products.services import ProductAutoSyncService
 
-    ProductAutoSyncService().process_job(job_id=job_id)
+    result = ProductAutoSyncService().process_coalesced(job_id=job_id)
+    if result["status"] == "deferred":
+        # Sammelfenster noch offen: spaeter erneut versuchen, dann mit allen
+        # inzwischen wartenden Jobs des Ziels.
+        process_product_sync_job.apply_async((job_id,), countdown=result["countdown"])
+    return result
 
 
 @shared_task(name="products.sync_variant_family_to_shopware")
@@ -301,15 +306,12 @@ def scheduled_product_sync(
 
 def _scheduled_product_sync_continuation(job) -> None:
     from loguru import logger
-    from microtech.management.commands.microtech_sync_products import (
-        Command as SyncCommand,
-        _get_admin_user_id,
-    )
+    from microtech.management.commands.microtech_sync_products import _get_admin_user_id
     from microtech.services import (
         MicrotechExpiredSpecialSyncService,
         MicrotechGraphQLClientService,
     )
-    from microtech.services.artikel import MicrotechArtikelService
+    from microtech.services.product_import import MicrotechProductImportService
     from django.contrib.contenttypes.models import ContentType
     from products.models import Product as ProductModel
     from products.services import disable_product_auto_sync
@@ -327,54 +329,56 @@ def _scheduled_product_sync_continuation(job) -> None:
     client = MicrotechGraphQLClientService()
     result = client.product_list_job(str(job.external_job_id))
     products = result.get("products") or []
-    artikel_service = MicrotechArtikelService(erp=client)
-    # GraphQL product jobs already contain stock and storageLocation.
-    lager_service = None
-    tax_map = SyncCommand._ensure_taxes()
-    cmd = SyncCommand()
+    if limit:
+        products = products[: max(0, limit - state["processed"])]
     admin_user_id = _get_admin_user_id()
     content_type_id = ContentType.objects.get_for_model(ProductModel).id if admin_user_id else None
+    # GraphQL product jobs already contain stock and storageLocation, so the
+    # bulk import needs no Lager lookup.
+    importer = MicrotechProductImportService(
+        client=client,
+        admin_user_id=admin_user_id,
+        content_type_id=content_type_id,
+        preserve_is_active=True,
+        skip_images=not include_images,
+    )
 
     run_id = str(job.external_job_id)
     task_name = "products.scheduled_product_sync"
     emit_run_started(task_name, run_id, f"Microtech-Import gestartet ({len(products)} Datensätze)")
     with TaskIssueCollector("products.scheduled_product_sync"), disable_product_auto_sync():
-        for product_data in products:
-            if limit and state["processed"] >= limit:
-                break
-            try:
-                artikel_service.load_product_record(product_data)
-                if artikel_service.range_eof():
-                    state["errors"] += 1
-                    state["processed"] += 1
-                    continue
-                cmd._sync_current_record(
-                    artikel_service,
-                    lager_service,
-                    tax_map=tax_map,
-                    admin_user_id=admin_user_id,
-                    content_type_id=content_type_id,
-                    preserve_is_active=True,
-                    skip_images=not include_images,
-                )
-                state["success"] += 1
+        import_result = importer.import_products(products)
+
+        # Ein Event je Produkt: gesammelt per Redis-Pipeline statt einzeln schreiben.
+        with buffered_events():
+            for erp_nr in import_result.imported:
                 emit_event(
-                    task_name, entity=str(artikel_service.get_erp_nr() or ""),
+                    task_name, entity=erp_nr,
                     step="microtech→django", status="ok",
-                    summary=f"Produkt {artikel_service.get_erp_nr()} importiert",
+                    summary=f"Produkt {erp_nr} importiert",
                     run_id=run_id, target="django",
                 )
-            except Exception as exc:
-                logger.warning("scheduled_product_sync: record error - {}", exc)
-                state["errors"] += 1
+            for entity, error in import_result.failed:
+                logger.warning("scheduled_product_sync: record error - {}", error)
                 emit_event(
                     task_name,
-                    entity=str(product_data.get("artNr") or product_data.get("erpNr") or ""),
+                    entity=entity,
                     step="microtech→django", status="skipped",
-                    summary=f"Übersprungen: {exc}", run_id=run_id,
-                    payload={"error": str(exc)},
+                    summary=f"Übersprungen: {error}", run_id=run_id,
+                    payload={"error": error},
                 )
-            state["processed"] += 1
+        state["success"] += len(import_result.imported)
+        state["errors"] += len(import_result.failed) + import_result.missing
+        state["processed"] += import_result.processed
+        logger.info(
+            "scheduled_product_sync: bulk import "
+            "(created={}, updated={}, unchanged={}, price_history={}, fallback_chunks={})",
+            import_result.created,
+            import_result.updated,
+            import_result.unchanged,
+            import_result.price_history,
+            import_result.fallback_chunks,
+        )
 
     emit_run_finished(
         task_name, run_id,
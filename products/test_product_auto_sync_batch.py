@@ -0,0 +1,151 @@
+from datetime import timedelta
+from unittest.mock import call, patch
+
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from products import tasks as product_tasks
+from products.models import Product, ProductSyncJob
+from products.services.product_auto_sync import ProductAutoSyncService
+from shopware.management.commands.shopware_sync_products import ShopwareProductSyncFailed
+
+
+class ProductAutoSyncBatchTest(TestCase):
+    def _job(self, erp_nr: str, target=ProductSyncJob.Target.SHOPWARE, **kwargs) -> ProductSyncJob:
+        product = Product.objects.create(erp_nr=erp_nr, name="Artikel")
+        return ProductSyncJob.objects.create(product=product, target=target, **kwargs)
+
+    @patch("products.services.product_auto_sync.emit_event")
+    @patch("products.services.product_auto_sync.call_command")
+    def test_queued_shopware_jobs_are_synced_with_one_command(self, mock_call_command, _mock_emit):
+        jobs = [self._job(f"B-{index}") for index in range(3)]
+        other_target = self._job("B-SW5", target=ProductSyncJob.Target.SHOPWARE5)
+
+        summary = ProductAutoSyncService().process_queued_jobs(target=ProductSyncJob.Target.SHOPWARE)
+
+        mock_call_command.assert_called_once_with(
+            "shopware_sync_products", "B-0", "B-1", "B-2", skip_images=True, fail_on_product_errors=True
+        )
+        self.assertEqual(summary, {"target": "shopware", "claimed": 3, "succeeded": 3, "failed": 0})
+        for job in jobs:
+            job.refresh_from_db()
+            self.assertEqual(job.status, ProductSyncJob.Status.SUCCEEDED)
+            self.assertEqual(job.attempt, 1)
+            self.assertIsNotNone(job.finished_at)
+        other_target.refresh_from_db()
+        self.assertEqual(other_target.status, ProductSyncJob.Status.QUEUED)
+
+    @patch("products.services.product_auto_sync.emit_event")
+    @patch("products.services.product_auto_sync.call_command")
+    def test_failed_batch_is_retried_per_job(self, mock_call_command, _mock_emit):
+        def run(command, *erp_nrs, **options):
+            if "B-BAD" in erp_nrs:
+                raise CommandError(f"boom {len(erp_nrs)}")
+
+        mock_call_command.side_effect = run
+        good = self._job("B-GOOD", target=ProductSyncJob.Target.SHOPWARE5)
+        bad = self._job("B-BAD", target=ProductSyncJob.Target.SHOPWARE5)
+
+        summary = ProductAutoSyncService().process_queued_jobs(target=ProductSyncJob.Target.SHOPWARE5)
+
+        self.assertEqual(
+            mock_call_command.call_args_list,
+            [
+                call("shopware5_sync_products", "B-GOOD", "B-BAD"),
+                call("shopware5_sync_products", "B-GOOD"),
+                call("shopware5_sync_products", "B-BAD"),
+            ],
+        )
+        self.assertEqual(summary["succeeded"], 1)
+        self.assertEqual(summary["failed"], 1)
+        good.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(good.status, ProductSyncJob.Status.SUCCEEDED)
+        self.assertEqual(bad.status, ProductSyncJob.Status.FAILED)
+        self.assertEqual(bad.last_error, "boom 1")
+
+    @patch("products.services.product_auto_sync.emit_event")
+    @patch("products.services.product_auto_sync.call_command")
+    def test_products_that_failed_inside_the_batch_fail_their_jobs(self, mock_call_command, _mock_emit):
+        mock_call_command.side_effect = ShopwareProductSyncFailed(["B-41"])
+        good = self._job("B-40")
+        bad = self._job("B-41")
+
+        summary = ProductAutoSyncService().process_queued_jobs(target=ProductSyncJob.Target.SHOPWARE)
+
+        mock_call_command.assert_called_once_with(
+            "shopware_sync_products", "B-40", "B-41", skip_images=True, fail_on_product_errors=True
+        )
+        self.assertEqual(summary, {"target": "shopware", "claimed": 2, "succeeded": 1, "failed": 1})
+        good.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertEqual(good.status, ProductSyncJob.Status.SUCCEEDED)
+        self.assertEqual(bad.status, ProductSyncJob.Status.FAILED)
+        self.assertIn("B-41", bad.last_error)
+
+    @override_settings(PRODUCT_AUTO_SYNC_COALESCE_SECONDS=60)
+    def test_job_inside_window_is_deferred_and_younger_jobs_are_coalesced(self):
+        first = self._job("B-10", celery_task_id="task-1")
+        second = self._job("B-11", celery_task_id="task-2")
+
+        deferred = ProductAutoSyncService().process_coalesced(job_id=first.pk)
+        coalesced = ProductAutoSyncService().process_coalesced(job_id=second.pk)
+
+        self.assertEqual(deferred["status"], "deferred")
+        self.assertGreater(deferred["countdown"], 0)
+        self.assertEqual(coalesced["status"], "coalesced")
+
+    @override_settings(PRODUCT_AUTO_SYNC_COALESCE_SECONDS=0, PRODUCT_AUTO_SYNC_STALE_SECONDS=60)
+    @patch("products.services.product_auto_sync.emit_event")
+    @patch("products.services.product_auto_sync.call_command")
+    def test_lost_older_job_does_not_block_younger_jobs(self, mock_call_command, _mock_emit):
+        lost = self._job("B-30", celery_task_id="task-lost")
+        ProductSyncJob.objects.filter(pk=lost.pk).update(created_at=timezone.now() - timedelta(minutes=10))
+        younger = self._job("B-31", celery_task_id="task-new")
+
+        result = ProductAutoSyncService().process_coalesced(job_id=younger.pk)
+
+        self.assertEqual(result["status"], "processed")
+        mock_call_command.assert_called_once_with(
+            "shopware_sync_products", "B-30", "B-31", skip_images=True, fail_on_product_errors=True
+        )
+        lost.refresh_from_db()
+        self.assertEqual(lost.status, ProductSyncJob.Status.SUCCEEDED)
+
+    @override_settings(PRODUCT_AUTO_SYNC_COALESCE_SECONDS=0, PRODUCT_AUTO_SYNC_BATCH_SIZE=2)
+    @patch("products.services.product_auto_sync.emit_event")
+    @patch("products.services.product_auto_sync.call_command")
+    def test_due_job_drains_the_target_queue_in_batches(self, mock_call_command, _mock_emit):
+        jobs = [self._job(f"B-2{index}", celery_task_id=f"task-{index}") for index in range(3)]
+
+        result = ProductAutoSyncService().process_coalesced(job_id=jobs[0].pk)
+
+        self.assertEqual(result["status"], "processed")
+        self.assertEqual([batch["claimed"] for batch in result["batches"]], [2, 1])
+        self.assertEqual(
+            mock_call_command.call_args_list,
+            [
+                call("shopware_sync_products", "B-20", "B-21", skip_images=True, fail_on_product_errors=True),
+                call("shopware_sync_products", "B-22", skip_images=True, fail_on_product_errors=True),
+            ],
+        )
+        self.assertEqual(
+            set(ProductSyncJob.objects.values_list("status", flat=True)),
+            {ProductSyncJob.Status.SUCCEEDED},
+        )
+        self.assertEqual(
+            ProductAutoSyncService().process_coalesced(job_id=jobs[1].pk)["status"],
+            "skipped",
+        )
+
+    @override_settings(PRODUCT_AUTO_SYNC_COALESCE_SECONDS=60)
+    @patch("products.tasks.process_product_sync_job.apply_async")
+    def test_task_reschedules_deferred_job(self, mock_apply_async):
+        job = self._job("B-30", celery_task_id="task-30")
+
+        product_tasks.process_product_sync_job(job.pk)
+
+        mock_apply_async.assert_called_once()
+        self.assertEqual(mock_apply_async.call_args.args[0], (job.pk,))
+        self.assertGreater(mock_apply_async.call_args.kwargs["countdown"], 0)
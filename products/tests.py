@@ -1026,7 +1026,9 @@ class ProductAutoSyncServiceTest(TestCase):
 
         ProductAutoSyncService().process_job(job_id=job.pk)
 
-        mock_call_command.assert_called_once_with("shopware_sync_products", "A-9201", skip_images=True)
+        mock_call_command.assert_called_once_with(
+            "shopware_sync_products", "A-9201", skip_images=True, fail_on_product_errors=True
+        )
 
     @patch("products.services.product_auto_sync.call_command")
     def test_process_shopware5_job_calls_sync_command(self, mock_call_command):
@@ -1355,36 +1357,45 @@ class ProductCeleryTaskTest(SimpleTestCase):
     @patch("products.tasks.TaskIssueCollector")
     @patch("products.services.disable_product_auto_sync")
     @patch("microtech.management.commands.microtech_sync_products._get_admin_user_id", return_value=None)
-    @patch("microtech.management.commands.microtech_sync_products.Command")
-    @patch("microtech.services.artikel.MicrotechArtikelService")
+    @patch("microtech.services.product_import.MicrotechProductImportService")
     @patch("microtech.services.MicrotechGraphQLClientService")
     @patch("microtech.services.MicrotechExpiredSpecialSyncService")
-    def test_product_sync_continuation_uses_graphql_stock_without_lager_lookup(
+    def test_product_sync_continuation_imports_graphql_batch_in_bulk(
         self,
         expired_special_service_cls,
         microtech_client_cls,
-        artikel_service_cls,
-        sync_command_cls,
+        import_service_cls,
         _admin_user_id,
         _disable_auto_sync,
         _issue_collector,
         finalize_sync,
     ):
+        from microtech.services.product_import import MicrotechProductImportResult
+
         expired_special_service_cls.return_value.clear_expired_specials.return_value = (0, set())
         client = microtech_client_cls.return_value
-        client.product_list_job.return_value = {"products": [{"erpNumber": "A-1000"}]}
-        artikel_service_cls.return_value.range_eof.return_value = False
+        client.product_list_job.return_value = {"products": [{"erpNumber": "A-1000"}, {"erpNumber": "A-1001"}]}
+        import_service_cls.return_value.import_products.return_value = MicrotechProductImportResult(
+            imported=["A-1000"],
+            failed=[("A-1001", "kaputt")],
+        )
         job = SimpleNamespace(
-            context={"erp_nrs": ["A-1000"], "include_images": False},
+            context={"erp_nrs": ["A-1000", "A-1001"], "include_images": False, "limit": 1},
             external_job_id="remote-1000",
         )
 
         product_tasks._scheduled_product_sync_continuation(job)
 
-        sync_command_cls.return_value._sync_current_record.assert_called_once()
-        self.assertIsNone(sync_command_cls.return_value._sync_current_record.call_args.args[1])
+        import_service_cls.assert_called_once_with(
+            client=client,
+            admin_user_id=None,
+            content_type_id=None,
+            preserve_is_active=True,
+            skip_images=True,
+        )
+        import_service_cls.return_value.import_products.assert_called_once_with([{"erpNumber": "A-1000"}])
         expired_special_service_cls.return_value.clear_expired_specials.assert_called_once_with()
-        finalize_sync.assert_called_once_with(include_images=False, limit=None, erp_nrs=["A-1000"])
+        finalize_sync.assert_called_once_with(include_images=False, limit=None, erp_nrs=["A-1000", "A-1001"])
 
     @patch("products.tasks._active_product_erp_nrs", return_value=["A-1000", "A-1001"])
     @patch("microtech.services.MicrotechJobSentinelService")
@@ -107,6 +107,11 @@ class Command(MonitoredBaseCommand):
             action="store_true",
             help="Aktiviert aussagekraeftige Batch- und Produktlogs fuer den Bild-Sync.",
         )
+        parser.add_argument(
+            "--reupload-all",
+            action="store_true",
+            help="Auch Bilder neu hochladen, deren Datei in Shopware bereits gleich gross vorliegt.",
+        )
 
     def handle(self, *args, **options):
         erp_nrs = _clean_erp_nrs(options.get("erp_nrs"))
@@ -114,6 +119,7 @@ class Command(MonitoredBaseCommand):
         batch_size = options.get("batch_size") or DEFAULT_BATCH_SIZE
         only_with_images = options.get("only_with_images", False)
         log_images = options.get("log_images", False)
+        reupload_all = options.get("reupload_all", False)
         if batch_size <= 0:
             raise CommandError("Batch-Groesse muss groesser als 0 sein.")
 
@@ -213,6 +219,7 @@ class Command(MonitoredBaseCommand):
                 media_entities=list(media_entities.values()),
                 media_uploads=list(media_uploads.values()),
                 log_images=log_images,
+                reupload_all=reupload_all,
                 errors=errors,
             ):
                 continue
@@ -271,6 +278,7 @@ class Command(MonitoredBaseCommand):
         media_uploads: list[dict],
         log_images: bool,
         errors: list[dict[str, object]],
+        reupload_all: bool = False,
     ) -> bool:
         try:
             media_sync_service.sync_media_assets(
@@ -278,6 +286,7 @@ class Command(MonitoredBaseCommand):
                 media_entities=media_entities,
                 media_uploads=media_uploads,
                 log_uploads=log_images,
+                skip_unchanged=not reupload_all,
             )
             logger.info(
                 "Shopware force image batch {} upload ok: products={} uploads={}",
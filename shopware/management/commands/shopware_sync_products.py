@@ -2,25 +2,41 @@ from __future__ import annotations
 
 import hashlib
 import json
-from decimal import Decimal
+import queue
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.core.management.base import CommandError
 from core.management.base import MonitoredBaseCommand
 from django.db.models import Prefetch
+from django.utils import timezone
 from loguru import logger
 from core.admin_utils import log_admin_change
 from core.services import CommandRuntimeService
 from products.models import Price, Product, ProductImage, Storage
 from shopware.models import ShopwareSettings
 from shopware.services import ProductMediaSyncService, ProductService
+from shopware.services.client_cache import new_client
 from shopware.services.translations import ShopwareTranslationService
 
 DEFAULT_TAX_ID = "d391e13bdd95404a885f4ad28ea218e0"
 REDUCED_TAX_ID = "be66a53eae3a49829f4a8c5959535501"
 
+
+class ShopwareProductSyncFailed(CommandError):
+    """Raised with ``--fail-on-product-errors`` when single products could not be synced."""
+
+    def __init__(self, erp_nrs: list[str]) -> None:
+        self.erp_nrs = erp_nrs
+        super().__init__(f"Shopware-Sync fehlgeschlagen fuer {len(erp_nrs)} Produkt(e): {', '.join(erp_nrs)}")
+
+
 def _get_admin_user_id() -> int | None:
     user = get_user_model().objects.filter(is_superuser=True).order_by("id").first()
     return user.id if user else None
@@ -243,6 +259,7 @@ def _prefetch_sync_queryset(products):
                 queryset=Price.objects.select_related("sales_channel").order_by("sales_channel_id", "id"),
                 to_attr="prefetched_prices_for_shopware_sync",
             ),
+            "images",
             "mappei_products",
         )
     if hasattr(products, "only"):
@@ -273,14 +290,25 @@ def _prefetch_sync_queryset(products):
             "min_purchase",
             "purchase_unit",
             "shopware_image_sync_hash",
+            "shopware_sync_hash",
+            "shopware_price_sync_hash",
             "tax_id",
             "tax__shopware_id",
+            "tax__rate",
             "storage__stock",
             "storage__virtual_stock",
         )
     return products
 
 
+def _product_prices(product: Product) -> list[Price]:
+    """Prices of ``product``, taken from the sync prefetch when available."""
+    prefetched = getattr(product, "prefetched_prices_for_shopware_sync", None)
+    if prefetched is not None:
+        return list(prefetched)
+    return list(product.prices.select_related("sales_channel").all())
+
+
 def _build_product_sync_payload(
     *,
     product: Product,
@@ -293,7 +321,7 @@ def _build_product_sync_payload(
 ) -> dict:
     prices_by_channel = {
         price.sales_channel_id: price
-        for price in product.prices.select_related("sales_channel").all()
+        for price in _product_prices(product)
         if price.sales_channel_id
     }
     payload = {
@@ -396,6 +424,62 @@ def _build_product_sync_payload(
     return payload
 
 
+def _sync_hash(value) -> str:
+    normalized = json.dumps(value, sort_keys=True, ensure_ascii=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _build_payload_sync_hash(payload: dict) -> str:
+    """Fingerprint of the normalized product payload, prices included, media excluded.
+
+    Media relations have their own hash (``shopware_image_sync_hash``) and are
+    therefore left out; the payload must be hashed before media is appended.
+    """
+    return _sync_hash({key: value for key, value in payload.items() if key not in {"media", "coverId"}})
+
+
+def _build_price_sync_hash(payload: dict) -> str:
+    """Fingerprint of the price block (base price and advanced prices)."""
+    return _sync_hash({"price": payload.get("price"), "prices": payload.get("prices")})
+
+
+def _has_payload_changed(*, product: Product, payload_sync_hash: str) -> bool:
+    return (getattr(product, "shopware_sync_hash", "") or "") != payload_sync_hash
+
+
+def _has_prices_changed(*, product: Product, price_sync_hash: str) -> bool:
+    return (getattr(product, "shopware_price_sync_hash", "") or "") != price_sync_hash
+
+
+def _store_sync_hashes(sync_hashes: list[tuple[Product, str, str]]) -> None:
+    now = timezone.now()
+    for synced_product, payload_sync_hash, price_sync_hash in sync_hashes:
+        synced_product.shopware_sync_hash = payload_sync_hash
+        synced_product.shopware_price_sync_hash = price_sync_hash
+        synced_product.updated_at = now
+    _bulk_update_products(
+        [synced_product for synced_product, _, _ in sync_hashes],
+        ["shopware_sync_hash", "shopware_price_sync_hash", "updated_at"],
+    )
+
+
+def _store_media_sync_hashes(media_sync_hashes: list[tuple[Product, str]]) -> None:
+    now = timezone.now()
+    for synced_product, media_sync_hash in media_sync_hashes:
+        synced_product.shopware_image_sync_hash = media_sync_hash
+        synced_product.updated_at = now
+    _bulk_update_products(
+        [synced_product for synced_product, _ in media_sync_hashes],
+        ["shopware_image_sync_hash", "updated_at"],
+    )
+
+
+def _bulk_update_products(products: list[Product], fields: list[str]) -> None:
+    """One UPDATE per batch instead of one ``save()`` per product (no signals, like before)."""
+    if products:
+        Product.objects.bulk_update(products, fields)
+
+
 def _append_media_payload(
     *,
     product: Product,
@@ -428,6 +512,353 @@ def _image_names_for_product(product: Product) -> list[str]:
     return result
 
 
+@dataclass
+class _SyncContext:
+    service: ProductService
+    media_sync_service: ProductMediaSyncService
+    channels: list[ShopwareSettings]
+    default_channel: ShopwareSettings | None
+    cleanup_rule_ids: list[str]
+    admin_user_id: int | None
+    content_type_id: int | None
+    translation_language_ids: dict[str, list[str]]
+    skip_images: bool
+    log_images: bool
+    # ERP numbers of products that could not be written; only touched in the command's thread.
+    failed_erp_nrs: set[str] = field(default_factory=set)
+
+
+@dataclass
+class _PreparedBatch:
+    """One batch built from the DB, ready to be sent to Shopware."""
+
+    batch_no: int
+    payloads: list[dict]
+    payload_products: list[Product]
+    fallback_products: list[Product]
+    fallback_payloads: list[dict]
+    media_entities: dict[str, dict]
+    media_uploads: dict[str, dict]
+    media_sync_hashes: list[tuple[Product, str]]
+    payload_sync_hashes: list[tuple[Product, str, str]]
+    cleanup_price_product_ids: list[str]
+    cleanup_media_product_ids: list[str]
+
+
+def _max_in_flight(value: int | None) -> int:
+    if value is None:
+        value = getattr(settings, "SHOPWARE6_SYNC_MAX_IN_FLIGHT", 1)
+    return max(1, int(value))
+
+
+def _send_batch(context: _SyncContext, batch: _PreparedBatch, service: ProductService | None = None) -> None:
+    """Network part of a batch: purges, media uploads and the product upsert.
+
+    Runs in a worker thread in pipelined mode and therefore must not touch
+    the database; everything it needs was prepared beforehand. Worker threads
+    pass their own ``service`` (see ``_send_batch_pooled``).
+    """
+    service = service or context.service
+    media_sync_service = context.media_sync_service
+    log_images = context.log_images
+    cleanup_rule_ids = context.cleanup_rule_ids
+    batch_no = batch.batch_no
+    payloads = batch.payloads
+    payload_products = batch.payload_products
+    media_entities = batch.media_entities
+    media_uploads = batch.media_uploads
+    cleanup_price_product_ids = batch.cleanup_price_product_ids
+    cleanup_media_product_ids = batch.cleanup_media_product_ids
+    if cleanup_price_product_ids and cleanup_rule_ids:
+        service.purge_product_prices_by_product_and_rule(
+            product_ids=cleanup_price_product_ids,
+            rule_ids=cleanup_rule_ids,
+        )
+    if cleanup_media_product_ids:
+        if log_images:
+            logger.info(
+                "Shopware image sync batch {} cleanup existing media relations for products={}",
+                batch_no,
+                cleanup_media_product_ids,
+            )
+        service.purge_product_media_by_product_ids(product_ids=cleanup_media_product_ids)
+    if log_images and payloads:
+        media_product_payloads = [
+            {
+                "erp_nr": product.erp_nr,
+                "sku": payload.get("id"),
+                "images": _image_names_for_product(product),
+                "media_relations": [
+                    {
+                        "id": relation.get("id"),
+                        "mediaId": relation.get("mediaId"),
+                        "position": relation.get("position"),
+                    }
+                    for relation in (payload.get("media") or [])
+                ],
+                "coverId": payload.get("coverId"),
+            }
+            for product, payload in zip(payload_products, payloads, strict=False)
+            if payload.get("media")
+        ]
+        logger.info(
+            "Shopware image sync batch {} upload stage: uploads={} products_with_media={}",
+            batch_no,
+            len(media_uploads),
+            [item["erp_nr"] for item in media_product_payloads],
+        )
+        logger.info(
+            "Shopware image sync batch {} media payload summary={}",
+            batch_no,
+            json.dumps(media_product_payloads, ensure_ascii=True),
+        )
+    if payloads:
+        if media_entities or media_uploads:
+            media_sync_service.sync_media_assets(
+                product_service=service,
+                media_entities=list(media_entities.values()),
+                media_uploads=list(media_uploads.values()),
+                log_uploads=log_images,
+            )
+        if log_images:
+            logger.info(
+                "Shopware image sync batch {} product upsert start: payload_products={} products_with_media={}",
+                batch_no,
+                [payload.get("productNumber") for payload in payloads],
+                [payload.get("productNumber") for payload in payloads if payload.get("media")],
+            )
+        service.bulk_upsert(payloads)
+        if log_images:
+            logger.info(
+                "Shopware image sync batch {} product upsert ok: payload_products={}",
+                batch_no,
+                [payload.get("productNumber") for payload in payloads],
+            )
+
+
+def _send_batch_safely(
+    context: _SyncContext,
+    batch: _PreparedBatch,
+    service: ProductService | None = None,
+) -> Exception | None:
+    try:
+        _send_batch(context, batch, service)
+    except Exception as exc:
+        return exc
+    return None
+
+
+def _send_batch_pooled(context: _SyncContext, batch: _PreparedBatch, services: queue.SimpleQueue) -> Exception | None:
+    """Send a batch with a ProductService taken from ``services``.
+
+    The Shopware client keeps its OAuth token on the instance without
+    locking, so concurrent batches must not share one client. Each pooled
+    service has its own client; there is one per worker thread.
+    """
+    service = services.get()
+    try:
+        return _send_batch_safely(context, batch, service)
+    finally:
+        services.put(service)
+
+
+def _wait_oldest(in_flight: deque) -> tuple[_PreparedBatch, Exception | None]:
+    batch, future = in_flight.popleft()
+    return batch, future.result()
+
+
+def _finish_batch(context: _SyncContext, batch: _PreparedBatch, exc: Exception | None) -> None:
+    """DB part after a batch was sent: store hashes, then handle products without SKU.
+
+    Always runs in the command's thread, in batch order.
+    """
+    try:
+        if exc is not None:
+            raise exc
+        _store_media_sync_hashes(batch.media_sync_hashes)
+        _store_sync_hashes(batch.payload_sync_hashes)
+        if batch.fallback_products:
+            _sync_fallback_products(context, batch)
+    except Exception as exc:
+        if context.log_images:
+            logger.exception(
+                "Shopware image sync batch {} failed: payload_products={} products_with_media={} cleanup_media_products={}",
+                batch.batch_no,
+                [payload.get("productNumber") for payload in batch.payloads],
+                [payload.get("productNumber") for payload in batch.payloads if payload.get("media")],
+                batch.cleanup_media_product_ids,
+            )
+        for product in batch.payload_products:
+            _log_admin_error(
+                admin_user_id=context.admin_user_id,
+                content_type_id=context.content_type_id,
+                message=f"Shopware bulk sync failed for {product.erp_nr}: {exc}",
+                object_id=str(product.pk),
+                object_repr=f"Product {product.erp_nr}",
+            )
+        context.failed_erp_nrs.update(product.erp_nr for product in batch.payload_products)
+        context.failed_erp_nrs.update(product.erp_nr for product in batch.fallback_products)
+
+
+def _sync_fallback_products(context: _SyncContext, batch: _PreparedBatch) -> None:
+    service = context.service
+    media_sync_service = context.media_sync_service
+    channels = context.channels
+    default_channel = context.default_channel
+    cleanup_rule_ids = context.cleanup_rule_ids
+    admin_user_id = context.admin_user_id
+    content_type_id = context.content_type_id
+    translation_language_ids = context.translation_language_ids
+    skip_images = context.skip_images
+    log_images = context.log_images
+    batch_no = batch.batch_no
+    fallback_products = batch.fallback_products
+    fallback_payloads = batch.fallback_payloads
+    try:
+        if log_images:
+            logger.info(
+                "Shopware image sync fallback create batch {} start: payload_products={}",
+                batch_no,
+                [payload.get("productNumber") for payload in fallback_payloads],
+            )
+        service.bulk_upsert(fallback_payloads)
+        if log_images:
+            logger.info(
+                "Shopware image sync fallback create batch {} ok: payload_products={}",
+                batch_no,
+                [payload.get("productNumber") for payload in fallback_payloads],
+            )
+    except Exception as exc:
+        if log_images:
+            logger.exception(
+                "Shopware image sync fallback create batch {} failed: payload_products={}",
+                batch_no,
+                [payload.get("productNumber") for payload in fallback_payloads],
+            )
+        for product in fallback_products:
+            _log_admin_error(
+                admin_user_id=admin_user_id,
+                content_type_id=content_type_id,
+                message=f"Shopware fallback create failed for {product.erp_nr}: {exc}",
+                object_id=str(product.pk),
+                object_repr=f"Product {product.erp_nr}",
+            )
+            context.failed_erp_nrs.add(product.erp_nr)
+    refreshed_map = service.get_sku_map([product.erp_nr for product in fallback_products])
+    resolved_fallback_payloads: list[dict] = []
+    fallback_media_payloads: list[dict] = []
+    fallback_media_entities: dict[str, dict] = {}
+    fallback_media_uploads: dict[str, dict] = {}
+    fallback_media_sync_hashes: list[tuple[Product, str]] = []
+    fallback_payload_sync_hashes: list[tuple[Product, str, str]] = []
+    resolved_fallback_products: list[Product] = []
+    resolved_fallback_product_ids: list[str] = []
+    resolved_fallback_media_ids: list[str] = []
+    for product in fallback_products:
+        resolved_sku = refreshed_map.get(product.erp_nr)
+        if resolved_sku:
+            product.sku = resolved_sku
+            resolved_fallback_products.append(product)
+            resolved_fallback_product_ids.append(resolved_sku)
+            resolved_payload = _build_product_sync_payload(
+                product=product,
+                effective_sku=resolved_sku,
+                default_channel=default_channel,
+                channels=channels,
+                admin_user_id=admin_user_id,
+                content_type_id=content_type_id,
+                translation_language_ids=translation_language_ids,
+            )
+            resolved_fallback_payloads.append(resolved_payload)
+            fallback_payload_sync_hashes.append(
+                (
+                    product,
+                    _build_payload_sync_hash(resolved_payload),
+                    _build_price_sync_hash(resolved_payload),
+                )
+            )
+            image_names = []
+            media_changed = False
+            if not skip_images:
+                image_names = _image_names_for_product(product)
+                media_sync_hash = media_sync_service.build_media_sync_hash(product=product)
+                media_changed = media_sync_service.has_media_changed(
+                    product=product,
+                    media_sync_hash=media_sync_hash,
+                )
+            if log_images and not skip_images:
+                logger.info(
+                    "Shopware image sync fallback product erp_nr={} sku={} image_count={} changed={} images={}",
+                    product.erp_nr,
+                    resolved_sku,
+                    len(image_names),
+                    media_changed,
+                    image_names,
+                )
+            if media_changed and not skip_images:
+                resolved_fallback_media_ids.append(resolved_sku)
+                fallback_media_sync_hashes.append((product, media_sync_hash))
+                fallback_payload = {"id": resolved_sku, "productNumber": product.erp_nr}
+                _append_media_payload(
+                    product=product,
+                    effective_sku=resolved_sku,
+                    payload=fallback_payload,
+                    media_sync_service=media_sync_service,
+                    media_entities=fallback_media_entities,
+                    media_uploads=fallback_media_uploads,
+                )
+                fallback_media_payloads.append(fallback_payload)
+            continue
+        _log_admin_error(
+            admin_user_id=admin_user_id,
+            content_type_id=content_type_id,
+            message=(
+                f"Shopware SKU konnte nach Fallback-Upsert nicht aufgeloest werden "
+                f"fuer productNumber {product.erp_nr}."
+            ),
+            object_id=str(product.pk),
+            object_repr=f"Product {product.erp_nr}",
+        )
+        context.failed_erp_nrs.add(product.erp_nr)
+    _bulk_update_products(resolved_fallback_products, ["sku"])
+    if resolved_fallback_payloads:
+        if resolved_fallback_product_ids and cleanup_rule_ids:
+            service.purge_product_prices_by_product_and_rule(
+                product_ids=resolved_fallback_product_ids,
+                rule_ids=cleanup_rule_ids,
+            )
+        service.bulk_upsert(resolved_fallback_payloads)
+        _store_sync_hashes(fallback_payload_sync_hashes)
+    if resolved_fallback_media_ids:
+        if log_images:
+            logger.info(
+                "Shopware image sync fallback batch {} cleanup existing media relations for products={}",
+                batch_no,
+                resolved_fallback_media_ids,
+            )
+        service.purge_product_media_by_product_ids(product_ids=resolved_fallback_media_ids)
+        media_sync_service.sync_media_assets(
+            product_service=service,
+            media_entities=list(fallback_media_entities.values()),
+            media_uploads=list(fallback_media_uploads.values()),
+            log_uploads=log_images,
+        )
+        if log_images:
+            logger.info(
+                "Shopware image sync fallback batch {} product upsert start: payload_products={}",
+                batch_no,
+                [payload.get("productNumber") for payload in fallback_media_payloads],
+            )
+        service.bulk_upsert(fallback_media_payloads)
+        if log_images:
+            logger.info(
+                "Shopware image sync fallback batch {} product upsert ok: payload_products={}",
+                batch_no,
+                [payload.get("productNumber") for payload in fallback_media_payloads],
+            )
+        _store_media_sync_hashes(fallback_media_sync_hashes)
+
+
 class Command(MonitoredBaseCommand):
     help = "Sync products from Django to Shopware6 (updates only)."
 
@@ -469,6 +900,25 @@ class Command(MonitoredBaseCommand):
             action="store_true",
             help="Produktdaten und Preise synchronisieren, ohne Bilder/Medien zu verarbeiten.",
         )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Sync-Hashes ignorieren und alle Produkte inkl. Preise vollstaendig senden.",
+        )
+        parser.add_argument(
+            "--fail-on-product-errors",
+            action="store_true",
+            help="Mit Fehler beenden, wenn einzelne Produkte nicht geschrieben werden konnten.",
+        )
+        parser.add_argument(
+            "--max-in-flight",
+            type=int,
+            default=None,
+            help=(
+                "Anzahl Batches, die gleichzeitig an Shopware gesendet werden "
+                "(Default: SHOPWARE6_SYNC_MAX_IN_FLIGHT, 1 = nacheinander)."
+            ),
+        )
 
     def handle(self, *args, **options):
         erp_nrs = [nr.strip() for nr in options.get("erp_nrs") or [] if nr.strip()]
@@ -478,6 +928,9 @@ class Command(MonitoredBaseCommand):
         only_with_images = options.get("only_with_images", False)
         log_images = options.get("log_images", False)
         skip_images = options.get("skip_images", False)
+        force = options.get("force", False)
+        max_in_flight = _max_in_flight(options.get("max_in_flight"))
+        fail_on_product_errors = options.get("fail_on_product_errors", False)
 
         runtime = CommandRuntimeService().start(
             command_name="shopware_sync_products",
@@ -489,8 +942,12 @@ class Command(MonitoredBaseCommand):
                 "only_with_images": only_with_images,
                 "log_images": log_images,
                 "skip_images": skip_images,
+                "force": force,
+                "max_in_flight": max_in_flight,
             },
         )
+        executor = None
+        worker_services: list[ProductService] = []
         try:
             if not erp_nrs and not sync_all:
                 raise CommandError("Bitte ERP-Nummern angeben oder --all verwenden.")
@@ -515,8 +972,31 @@ class Command(MonitoredBaseCommand):
             channels = list(ShopwareSettings.objects.filter(is_active=True))
             default_channel = next((ch for ch in channels if ch.is_default), None)
 
+            context = _SyncContext(
+                service=service,
+                media_sync_service=media_sync_service,
+                channels=channels,
+                default_channel=default_channel,
+                cleanup_rule_ids=[str(channel.rule_id_price).strip() for channel in channels if channel.rule_id_price],
+                admin_user_id=admin_user_id,
+                content_type_id=content_type_id,
+                translation_language_ids=translation_language_ids,
+                skip_images=skip_images,
+                log_images=log_images,
+            )
+            # Pipeline: waehrend Batch N an Shopware geht, wird Batch N+1 aus der DB gebaut.
+            in_flight: deque = deque()
+            services: queue.SimpleQueue = queue.SimpleQueue()
+            if max_in_flight > 1:
+                # Built here, not in the workers: the constructor reads the connection config from the DB.
+                worker_services = [ProductService(client=new_client()) for _ in range(max_in_flight)]
+                for worker_service in worker_services:
+                    services.put(worker_service)
+                executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="shopware-sync")
+
             products = list(qs)
             total_products = len(products)
+            skipped_unchanged = 0
             runtime.update(stage="prepare", total_products=total_products)
             for offset in range(0, total_products, batch_size):
                 batch = products[offset : offset + batch_size]
@@ -526,6 +1006,7 @@ class Command(MonitoredBaseCommand):
                     processed=offset,
                     total_products=total_products,
                     current_batch_size=len(batch),
+                    skipped_unchanged=skipped_unchanged,
                 )
                 if log_images:
                     logger.info(
@@ -537,6 +1018,7 @@ class Command(MonitoredBaseCommand):
                     )
                 missing = [p.erp_nr for p in batch if not p.sku]
                 sku_map = service.get_sku_map(missing) if missing else {}
+                resolved_sku_products: list[Product] = []
 
                 payloads = []
                 payload_products: list[Product] = []
@@ -545,6 +1027,8 @@ class Command(MonitoredBaseCommand):
                 media_entities: dict[str, dict] = {}
                 media_uploads: dict[str, dict] = {}
                 media_sync_hashes: list[tuple[Product, str]] = []
+                payload_sync_hashes: list[tuple[Product, str, str]] = []
+                cleanup_price_product_ids: list[str] = []
                 cleanup_media_product_ids: list[str] = []
                 for product in batch:
                     effective_sku = product.sku
@@ -553,7 +1037,7 @@ class Command(MonitoredBaseCommand):
                         if resolved_sku:
                             effective_sku = resolved_sku
                             product.sku = resolved_sku
-                            product.save(update_fields=["sku"])
+                            resolved_sku_products.append(product)
 
                     payload = _build_product_sync_payload(
                         product=product,
@@ -566,6 +1050,8 @@ class Command(MonitoredBaseCommand):
                     )
 
                     if effective_sku:
+                        payload_sync_hash = _build_payload_sync_hash(payload)
+                        price_sync_hash = _build_price_sync_hash(payload)
                         image_names = []
                         media_changed = False
                         if not skip_images:
@@ -581,6 +1067,19 @@ class Command(MonitoredBaseCommand):
                                 media_changed,
                                 image_names,
                             )
+                        payload_changed = force or _has_payload_changed(
+                            product=product,
+                            payload_sync_hash=payload_sync_hash,
+                        )
+                        if not payload_changed and not (media_changed and not skip_images):
+                            skipped_unchanged += 1
+                            continue
+                        if force or _has_prices_changed(product=product, price_sync_hash=price_sync_hash):
+                            cleanup_price_product_ids.append(effective_sku)
+                        else:
+                            # Unveraenderte Staffelpreise bleiben in Shopware stehen.
+                            payload.pop("prices", None)
+                        payload_sync_hashes.append((product, payload_sync_hash, price_sync_hash))
                         if media_changed and not skip_images:
                             cleanup_media_product_ids.append(effective_sku)
                             media_sync_hashes.append((product, media_sync_hash))
@@ -599,230 +1098,52 @@ class Command(MonitoredBaseCommand):
                     fallback_products.append(product)
                     fallback_payloads.append(payload)
 
+                _bulk_update_products(resolved_sku_products, ["sku"])
                 if not payloads and not fallback_payloads:
                     continue
 
-                try:
-                    cleanup_product_ids = [str(payload.get("id")).strip() for payload in payloads if payload.get("id")]
-                    cleanup_rule_ids = [str(channel.rule_id_price).strip() for channel in channels if channel.rule_id_price]
-                    if cleanup_product_ids and cleanup_rule_ids:
-                        service.purge_product_prices_by_product_and_rule(
-                            product_ids=cleanup_product_ids,
-                            rule_ids=cleanup_rule_ids,
-                        )
-                    if cleanup_media_product_ids:
-                        if log_images:
-                            logger.info(
-                                "Shopware image sync batch {} cleanup existing media relations for products={}",
-                                batch_no,
-                                cleanup_media_product_ids,
-                            )
-                        service.purge_product_media_by_product_ids(product_ids=cleanup_media_product_ids)
-                    if log_images and payloads:
-                        media_product_payloads = [
-                            {
-                                "erp_nr": product.erp_nr,
-                                "sku": payload.get("id"),
-                                "images": _image_names_for_product(product),
-                                "media_relations": [
-                                    {
-                                        "id": relation.get("id"),
-                                        "mediaId": relation.get("mediaId"),
-                                        "position": relation.get("position"),
-                                    }
-                                    for relation in (payload.get("media") or [])
-                                ],
-                                "coverId": payload.get("coverId"),
-                            }
-                            for product, payload in zip(payload_products, payloads, strict=False)
-                            if payload.get("media")
-                        ]
-                        logger.info(
-                            "Shopware image sync batch {} upload stage: uploads={} products_with_media={}",
-                            batch_no,
-                            len(media_uploads),
-                            [item["erp_nr"] for item in media_product_payloads],
-                        )
-                        logger.info(
-                            "Shopware image sync batch {} media payload summary={}",
-                            batch_no,
-                            json.dumps(media_product_payloads, ensure_ascii=True),
-                        )
-                    if payloads:
-                        if media_entities or media_uploads:
-                            media_sync_service.sync_media_assets(
-                                product_service=service,
-                                media_entities=list(media_entities.values()),
-                                media_uploads=list(media_uploads.values()),
-                                log_uploads=log_images,
-                            )
-                        if log_images:
-                            logger.info(
-                                "Shopware image sync batch {} product upsert start: payload_products={} products_with_media={}",
-                                batch_no,
-                                [payload.get("productNumber") for payload in payloads],
-                                [payload.get("productNumber") for payload in payloads if payload.get("media")],
-                            )
-                        service.bulk_upsert(payloads)
-                        if log_images:
-                            logger.info(
-                                "Shopware image sync batch {} product upsert ok: payload_products={}",
-                                batch_no,
-                                [payload.get("productNumber") for payload in payloads],
-                            )
-                    for synced_product, media_sync_hash in media_sync_hashes:
-                        synced_product.shopware_image_sync_hash = media_sync_hash
-                        synced_product.save(update_fields=["shopware_image_sync_hash", "updated_at"])
-                    if fallback_products:
-                        try:
-                            if log_images:
-                                logger.info(
-                                    "Shopware image sync fallback create batch {} start: payload_products={}",
-                                    batch_no,
-                                    [payload.get("productNumber") for payload in fallback_payloads],
-                                )
-                            service.bulk_upsert(fallback_payloads)
-                            if log_images:
-                                logger.info(
-                                    "Shopware image sync fallback create batch {} ok: payload_products={}",
-                                    batch_no,
-                                    [payload.get("productNumber") for payload in fallback_payloads],
-                                )
-                        except Exception as exc:
-                            if log_images:
-                                logger.exception(
-                                    "Shopware image sync fallback create batch {} failed: payload_products={}",
-                                    batch_no,
-                                    [payload.get("productNumber") for payload in fallback_payloads],
-                                )
-                            for product in fallback_products:
-                                _log_admin_error(
-                                    admin_user_id=admin_user_id,
-                                    content_type_id=content_type_id,
-                                    message=f"Shopware fallback create failed for {product.erp_nr}: {exc}",
-                                    object_id=str(product.pk),
-                                    object_repr=f"Product {product.erp_nr}",
-                                )
-                        refreshed_map = service.get_sku_map([product.erp_nr for product in fallback_products])
-                        resolved_fallback_payloads: list[dict] = []
-                        fallback_media_payloads: list[dict] = []
-                        fallback_media_entities: dict[str, dict] = {}
-                        fallback_media_uploads: dict[str, dict] = {}
-                        fallback_media_sync_hashes: list[tuple[Product, str]] = []
-                        resolved_fallback_product_ids: list[str] = []
-                        resolved_fallback_media_ids: list[str] = []
-                        for product in fallback_products:
-                            resolved_sku = refreshed_map.get(product.erp_nr)
-                            if resolved_sku:
-                                product.sku = resolved_sku
-                                product.save(update_fields=["sku"])
-                                resolved_fallback_product_ids.append(resolved_sku)
-                                resolved_fallback_payloads.append(
-                                    _build_product_sync_payload(
-                                        product=product,
-                                        effective_sku=resolved_sku,
-                                        default_channel=default_channel,
-                                        channels=channels,
-                                        admin_user_id=admin_user_id,
-                                        content_type_id=content_type_id,
-                                        translation_language_ids=translation_language_ids,
-                                    )
-                                )
-                                image_names = []
-                                media_changed = False
-                                if not skip_images:
-                                    image_names = _image_names_for_product(product)
-                                    media_sync_hash = media_sync_service.build_media_sync_hash(product=product)
-                                    media_changed = media_sync_service.has_media_changed(
-                                        product=product,
-                                        media_sync_hash=media_sync_hash,
-                                    )
-                                if log_images and not skip_images:
-                                    logger.info(
-                                        "Shopware image sync fallback product erp_nr={} sku={} image_count={} changed={} images={}",
-                                        product.erp_nr,
-                                        resolved_sku,
-                                        len(image_names),
-                                        media_changed,
-                                        image_names,
-                                    )
-                                if media_changed and not skip_images:
-                                    resolved_fallback_media_ids.append(resolved_sku)
-                                    fallback_media_sync_hashes.append((product, media_sync_hash))
-                                    fallback_payload = {"id": resolved_sku, "productNumber": product.erp_nr}
-                                    _append_media_payload(
-                                        product=product,
-                                        effective_sku=resolved_sku,
-                                        payload=fallback_payload,
-                                        media_sync_service=media_sync_service,
-                                        media_entities=fallback_media_entities,
-                                        media_uploads=fallback_media_uploads,
-                                    )
-                                    fallback_media_payloads.append(fallback_payload)
-                                continue
-                            _log_admin_error(
-                                admin_user_id=admin_user_id,
-                                content_type_id=content_type_id,
-                                message=(
-                                    f"Shopware SKU konnte nach Fallback-Upsert nicht aufgeloest werden "
-                                    f"fuer productNumber {product.erp_nr}."
-                                ),
-                                object_id=str(product.pk),
-                                object_repr=f"Product {product.erp_nr}",
-                            )
-                        if resolved_fallback_payloads:
-                            if resolved_fallback_product_ids and cleanup_rule_ids:
-                                service.purge_product_prices_by_product_and_rule(
-                                    product_ids=resolved_fallback_product_ids,
-                                    rule_ids=cleanup_rule_ids,
-                                )
-                            service.bulk_upsert(resolved_fallback_payloads)
-                        if resolved_fallback_media_ids:
-                            if log_images:
-                                logger.info(
-                                    "Shopware image sync fallback batch {} cleanup existing media relations for products={}",
-                                    batch_no,
-                                    resolved_fallback_media_ids,
-                                )
-                            service.purge_product_media_by_product_ids(product_ids=resolved_fallback_media_ids)
-                            media_sync_service.sync_media_assets(
-                                product_service=service,
-                                media_entities=list(fallback_media_entities.values()),
-                                media_uploads=list(fallback_media_uploads.values()),
-                                log_uploads=log_images,
-                            )
-                            if log_images:
-                                logger.info(
-                                    "Shopware image sync fallback batch {} product upsert start: payload_products={}",
-                                    batch_no,
-                                    [payload.get("productNumber") for payload in fallback_media_payloads],
-                                )
-                            service.bulk_upsert(fallback_media_payloads)
-                            if log_images:
-                                logger.info(
-                                    "Shopware image sync fallback batch {} product upsert ok: payload_products={}",
-                                    batch_no,
-                                    [payload.get("productNumber") for payload in fallback_media_payloads],
-                                )
-                            for synced_product, media_sync_hash in fallback_media_sync_hashes:
-                                synced_product.shopware_image_sync_hash = media_sync_hash
-                                synced_product.save(update_fields=["shopware_image_sync_hash", "updated_at"])
-                except Exception as exc:
-                    if log_images:
-                        logger.exception(
-                            "Shopware image sync batch {} failed: payload_products={} products_with_media={} cleanup_media_products={}",
-                            batch_no,
-                            [payload.get("productNumber") for payload in payloads],
-                            [payload.get("productNumber") for payload in payloads if payload.get("media")],
-                            cleanup_media_product_ids,
-                        )
-                    for product in payload_products:
-                        _log_admin_error(
-                            admin_user_id=admin_user_id,
-                            content_type_id=content_type_id,
-                            message=f"Shopware bulk sync failed for {product.erp_nr}: {exc}",
-                            object_id=str(product.pk),
-                            object_repr=f"Product {product.erp_nr}",
-                        )
+                prepared = _PreparedBatch(
+                    batch_no=batch_no,
+                    payloads=payloads,
+                    payload_products=payload_products,
+                    fallback_products=fallback_products,
+                    fallback_payloads=fallback_payloads,
+                    media_entities=media_entities,
+                    media_uploads=media_uploads,
+                    media_sync_hashes=media_sync_hashes,
+                    payload_sync_hashes=payload_sync_hashes,
+                    cleanup_price_product_ids=cleanup_price_product_ids,
+                    cleanup_media_product_ids=cleanup_media_product_ids,
+                )
+                if executor is None:
+                    _finish_batch(context, prepared, _send_batch_safely(context, prepared))
+                    continue
+                # Backpressure: hoechstens max_in_flight Batches gleichzeitig unterwegs.
+                while len(in_flight) >= max_in_flight:
+                    _finish_batch(context, *_wait_oldest(in_flight))
+                in_flight.append((prepared, executor.submit(_send_batch_pooled, context, prepared, services)))
+
+            while in_flight:
+                _finish_batch(context, *_wait_oldest(in_flight))
+            if skipped_unchanged:
+                logger.info(
+                    "Shopware product sync skipped {} of {} unchanged products.",
+                    skipped_unchanged,
+                    total_products,
+                )
+            failed_erp_nrs = sorted(context.failed_erp_nrs)
+            if failed_erp_nrs:
+                logger.warning(
+                    "Shopware product sync failed for {} of {} products: {}",
+                    len(failed_erp_nrs),
+                    total_products,
+                    failed_erp_nrs,
+                )
+                if fail_on_product_errors:
+                    raise ShopwareProductSyncFailed(failed_erp_nrs)
         finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+            for worker_service in worker_services:
+                worker_service.client.close()
             runtime.close()
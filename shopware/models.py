@@ -37,6 +37,9 @@ class ShopwareConnection(BaseModel):
     def save(self, *args, **kwargs):
         self.pk = 1
         super().save(*args, **kwargs)
+        from shopware.services.client_cache import invalidate_connection_config
+
+        invalidate_connection_config()
 
     @classmethod
     def load(cls) -> "ShopwareConnection":
@@ -35,22 +35,10 @@ class ShopwareBaseService(BaseService, ABC):
 
     @staticmethod
     def _load_db_config() -> dict:
-        """Load Shopware connection settings from the database (if configured)."""
-        try:
-            from shopware.models import ShopwareConnection
-            cfg = ShopwareConnection.objects.filter(pk=1).first()
-            if cfg and cfg.api_url:
-                return {
-                    "api_url": cfg.api_url,
-                    "client_id": cfg.client_id,
-                    "client_secret": cfg.client_secret,
-                    "grant_type": cfg.grant_type,
-                    "username": cfg.username,
-                    "password": cfg.password,
-                }
-        except Exception:
-            pass
-        return {}
+        """Load Shopware connection settings from the database (if configured), cached per process."""
+        from shopware.services.client_cache import load_connection_config
+
+        return load_connection_config()
 
     @abstractmethod
     def authenticate(self) -> str:
@@ -0,0 +1,311 @@
+"""Process-wide Shopware6 Admin API client and OAuth token cache.
+
+Every ``Shopware6Service()`` used to read ``ShopwareConnection`` from the
+database and build a fresh ``Shopware6AdminAPIClientBase``, which in turn
+fetched a new OAuth token on its first request. Services are constructed per
+customer, per order and per auto-sync job, so almost every unit of work paid
+an extra auth round trip.
+
+This module keeps one client per connection config and process. The access
+token is additionally shared across processes through Redis, so a freshly
+forked Celery worker reuses the token of its siblings. Tokens are refreshed
+proactively ``SHOPWARE6_TOKEN_REFRESH_MARGIN_SECONDS`` before they expire.
+Redis is best effort: when it is unavailable the client simply fetches its own
+token, exactly as before.
+
+Shopware answers overload with 429/503. The client then pauses *all* requests
+of the process (honouring ``Retry-After``) and retries, so concurrent sync
+batches back off together instead of hammering the shop.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from django.conf import settings
+from lib_shopware6_api_base import Shopware6AdminAPIClientBase
+from lib_shopware6_api_base.conf_shopware6_api_base_classes import ShopwareAPIError
+from loguru import logger
+
+from core.redis_client import get_redis
+from shopware.services.config import ConfShopware6ApiBase
+
+TOKEN_CACHE_KEY_PREFIX = "shopware6:oauth-token"
+BACKPRESSURE_STATUS_CODES = frozenset({429, 503})
+MAX_BACKPRESSURE_DELAY_SECONDS = 60.0
+
+_lock = threading.Lock()
+_clients: dict[tuple[int, str], "SharedTokenShopware6AdminAPIClient"] = {}
+# Overload pauses per connection config, shared by all clients of the process.
+_pause_lock = threading.Lock()
+_paused_until: dict[str, float] = {}
+_connection_cache: dict[str, Any] = {
+    "loaded_at": 0.0,
+    "value": None,
+}
+_api_config_cache: dict[str, Any] = {
+    "loaded_at": 0.0,
+    "value": None,
+}
+
+
+def _config_cache_seconds() -> float:
+    return float(getattr(settings, "SHOPWARE6_CONFIG_CACHE_SECONDS", 60.0))
+
+
+def _token_refresh_margin() -> float:
+    return float(getattr(settings, "SHOPWARE6_TOKEN_REFRESH_MARGIN_SECONDS", 60.0))
+
+
+def _backpressure_max_retries() -> int:
+    return int(getattr(settings, "SHOPWARE6_BACKPRESSURE_MAX_RETRIES", 5))
+
+
+def _backpressure_backoff() -> float:
+    return float(getattr(settings, "SHOPWARE6_BACKPRESSURE_BACKOFF_SECONDS", 1.0))
+
+
+def _response_of(exc: Exception):
+    return getattr(exc.__cause__, "response", None)
+
+
+def backpressure_delay(exc: Exception, attempt: int) -> float | None:
+    """Seconds to wait before retrying, or ``None`` if ``exc`` is no overload response."""
+    response = _response_of(exc)
+    if getattr(response, "status_code", None) not in BACKPRESSURE_STATUS_CODES:
+        return None
+    retry_after = (getattr(response, "headers", None) or {}).get("Retry-After")
+    try:
+        delay = float(retry_after)
+    except (TypeError, ValueError):
+        delay = _backpressure_backoff() * (2**attempt)
+    return min(max(delay, 0.0), MAX_BACKPRESSURE_DELAY_SECONDS)
+
+
+def _is_fresh(cache: dict[str, Any]) -> bool:
+    return cache.get("value") is not None and time.monotonic() - float(cache.get("loaded_at") or 0.0) < _config_cache_seconds()
+
+
+def load_connection_config() -> dict:
+    """Shopware connection settings from the database, cached per process."""
+    if _is_fresh(_connection_cache):
+        return dict(_connection_cache["value"])
+
+    value: dict = {}
+    try:
+        from shopware.models import ShopwareConnection
+
+        cfg = ShopwareConnection.objects.filter(pk=1).first()
+        if cfg and cfg.api_url:
+            value = {
+                "api_url": cfg.api_url,
+                "client_id": cfg.client_id,
+                "client_secret": cfg.client_secret,
+                "grant_type": cfg.grant_type,
+                "username": cfg.username,
+                "password": cfg.password,
+            }
+    except Exception:
+        # Without a reachable DB (e.g. during startup) the env config applies;
+        # do not cache that fallback.
+        return {}
+    _connection_cache.update({"loaded_at": time.monotonic(), "value": value})
+    return dict(value)
+
+
+def load_api_config() -> ConfShopware6ApiBase:
+    """Admin API client config, cached per process."""
+    if _is_fresh(_api_config_cache):
+        return _api_config_cache["value"]
+    value = ConfShopware6ApiBase()
+    _api_config_cache.update({"loaded_at": time.monotonic(), "value": value})
+    return value
+
+
+def config_cache_key(config: ConfShopware6ApiBase) -> str:
+    """Stable fingerprint of the credentials a token is bound to."""
+    identity = {
+        "url": str(config.shopware_admin_api_url or "").rstrip("/"),
+        "grant_type": str(getattr(config.grant_type, "value", config.grant_type)),
+        "client_id": config.client_id,
+        "client_secret": config.client_secret,
+        "username": config.username,
+        "password": config.password,
+    }
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SharedTokenShopware6AdminAPIClient(Shopware6AdminAPIClientBase):
+    """Admin API client whose token is shared via Redis and refreshed early."""
+
+    def __init__(self, config: ConfShopware6ApiBase, *, cache_key: str | None = None) -> None:
+        super().__init__(config=config)
+        self.cache_key = cache_key or config_cache_key(config)
+
+    @property
+    def token_cache_key(self) -> str:
+        return f"{TOKEN_CACHE_KEY_PREFIX}:{self.cache_key}"
+
+    def _token_is_expired(self) -> bool:
+        expires_at = self.token.get("expires_at")
+        if expires_at is None:
+            return False
+        return time.time() >= float(expires_at) - _token_refresh_margin()
+
+    def _get_token(self) -> dict[str, Any]:
+        shared = self._load_shared_token()
+        if shared:
+            self.token = shared
+            return self.token
+        self.token = super()._get_token()
+        self._store_shared_token(self.token)
+        return self.token
+
+    def _refresh_token(self) -> dict[str, Any]:
+        shared = self._load_shared_token()
+        if shared and shared.get("access_token") != self.token.get("access_token"):
+            # Another process already refreshed the token.
+            self.token = shared
+            return self.token
+        self.token = super()._refresh_token()
+        self._store_shared_token(self.token)
+        return self.token
+
+    def _request(self, http_method, **kwargs):
+        attempt = 0
+        while True:
+            self._wait_while_paused()
+            try:
+                return super()._request(http_method, **kwargs)
+            except ShopwareAPIError as exc:
+                delay = backpressure_delay(exc, attempt)
+                if delay is not None and attempt < _backpressure_max_retries():
+                    attempt += 1
+                    logger.warning(
+                        "Shopware6 overloaded ({}), pausing requests for {:.1f}s (attempt {}).",
+                        getattr(_response_of(exc), "status_code", "?"),
+                        delay,
+                        attempt,
+                    )
+                    self.pause(delay)
+                    continue
+                if "401" in str(exc):
+                    # The library retries with a fresh token; it must not pick up
+                    # the rejected one from Redis again.
+                    self.invalidate_token()
+                raise
+
+    @property
+    def _paused_until(self) -> float:
+        with _pause_lock:
+            return _paused_until.get(self.cache_key, 0.0)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request of this connection (all clients and threads) for ``seconds``."""
+        with _pause_lock:
+            _paused_until[self.cache_key] = max(_paused_until.get(self.cache_key, 0.0), time.monotonic() + seconds)
+
+    def _wait_while_paused(self) -> None:
+        while True:
+            remaining = self._paused_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def invalidate_token(self) -> None:
+        """Drop the token locally and in Redis; the next request re-authenticates."""
+        self.token = {}
+        try:
+            get_redis().delete(self.token_cache_key)
+        except Exception as exc:
+            logger.debug("Shopware6 token cache delete failed: {}", exc)
+
+    def _load_shared_token(self) -> dict[str, Any] | None:
+        try:
+            raw = get_redis().get(self.token_cache_key)
+        except Exception as exc:
+            logger.debug("Shopware6 token cache read failed: {}", exc)
+            return None
+        if not raw:
+            return None
+        try:
+            token = json.loads(raw)
+        except (TypeError, ValueError):
+            return None
+        if not isinstance(token, dict) or not token.get("access_token"):
+            return None
+        expires_at = token.get("expires_at")
+        if expires_at is not None and time.time() >= float(expires_at) - _token_refresh_margin():
+            return None
+        return token
+
+    def _store_shared_token(self, token: dict[str, Any]) -> None:
+        if not token or not token.get("access_token"):
+            return
+        expires_at = token.get("expires_at")
+        ttl = int(float(expires_at) - time.time() - _token_refresh_margin()) if expires_at is not None else None
+        if ttl is not None and ttl <= 0:
+            return
+        try:
+            get_redis().set(self.token_cache_key, json.dumps(token), ex=ttl)
+        except Exception as exc:
+            logger.debug("Shopware6 token cache write failed: {}", exc)
+
+
+def get_shared_client(
+    config: ConfShopware6ApiBase | None = None,
+    *,
+    refresh: bool = False,
+) -> SharedTokenShopware6AdminAPIClient:
+    """Return the process-wide client for ``config``.
+
+    ``refresh=True`` discards the cached token (locally and in Redis), e.g.
+    after Shopware rejected it. The HTTP session is kept, other threads may
+    still be using it.
+    """
+    config = config or load_api_config()
+    key = (os.getpid(), config_cache_key(config))
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = SharedTokenShopware6AdminAPIClient(config=config, cache_key=key[1])
+            _clients[key] = client
+            return client
+    if refresh:
+        client.invalidate_token()
+    return client
+
+
+def new_client(config: ConfShopware6ApiBase | None = None) -> SharedTokenShopware6AdminAPIClient:
+    """Return a client with its own HTTP session and token state.
+
+    The library client keeps its OAuth token on the instance without locking,
+    so threads that send requests concurrently each need their own client.
+    The token itself is still shared via Redis and overload pauses still apply
+    to the whole process. The caller closes the client.
+    """
+    return SharedTokenShopware6AdminAPIClient(config=config or load_api_config())
+
+
+def reset_shared_clients() -> None:
+    """Close all cached clients and forget the cached connection config."""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _connection_cache.update({"loaded_at": 0.0, "value": None})
+        _api_config_cache.update({"loaded_at": 0.0, "value": None})
+    with _pause_lock:
+        _paused_until.clear()
+    for client in clients:
+        client.close()
+
+
+def invalidate_connection_config() -> None:
+    """Forget the cached connection config, e.g. after it was edited in the admin."""
+    with _lock:
+        _connection_cache.update({"loaded_at": 0.0, "value": None})
+        _api_config_cache.update({"loaded_at": 0.0, "value": None})
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any
 
-from .shopware6 import ContainsFilter, Criteria, EqualsFilter, Shopware6Service
+from .shopware6 import ContainsFilter, Criteria, EqualsAnyFilter, EqualsFilter, Shopware6Service
 
 
 class CustomerService(Shopware6Service):
@@ -48,6 +48,12 @@ class CustomerService(Shopware6Service):
         criteria.filter.append(EqualsFilter(field="id", value=customer_id))
         return self.request_post(self.search_path, payload=criteria)
 
+    def list_by_ids(self, customer_ids: list[str]) -> dict[str, Any]:
+        """Loads several customers including their addresses with one search request."""
+        criteria = self._base_customer_criteria(limit=len(customer_ids))
+        criteria.filter.append(EqualsAnyFilter(field="id", value=list(customer_ids)))
+        return self.request_post(self.search_path, payload=criteria)
+
     def get_by_customer_number(self, customer_number: str) -> dict[str, Any]:
         criteria = self._base_customer_criteria(limit=1)
         criteria.filter.append(EqualsFilter(field="customerNumber", value=customer_number))
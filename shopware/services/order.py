@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from typing import Any
 
+from lib_shopware6_api_base import MultiFilter, RangeFilter
 from loguru import logger
 
 from .shopware6 import Criteria, EqualsFilter, Shopware6Service
@@ -13,6 +15,13 @@ def _to_str(value: Any) -> str:
     return str(value).strip()
 
 
+def _to_shopware_datetime(value: datetime) -> datetime:
+    # Shopware speichert Zeitstempel in UTC ohne Offset.
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.replace(microsecond=0)
+
+
 DEFAULT_TRANSITION_ACTIONS: dict[str, list[str]] = {
     # Based on common Shopware state machine actions.
     "order": ["process", "complete", "cancel", "reopen"],
@@ -46,6 +55,7 @@ class OrderService(Shopware6Service):
         sales_channel_id: str,
         page: int = 1,
         limit: int = 100,
+        changed_since: datetime | None = None,
     ) -> Criteria:
         criteria = Criteria(page=page, limit=limit, total_count_mode=1)
 
@@ -71,6 +81,16 @@ class OrderService(Shopware6Service):
 
         criteria.filter.append(EqualsFilter(field="salesChannelId", value=sales_channel_id))
         criteria.filter.append(EqualsFilter(field="stateMachineState.technicalName", value="open"))
+        if changed_since is not None:
+            # Neue Bestellungen haben noch kein updatedAt, daher auch createdAt pruefen.
+            since = _to_shopware_datetime(changed_since)
+            criteria.filter.append(MultiFilter(
+                operator="or",
+                queries=[
+                    RangeFilter(field="updatedAt", parameters={"gte": since}),
+                    RangeFilter(field="createdAt", parameters={"gte": since}),
+                ],
+            ))
         return criteria
 
     def list_open_by_sales_channel(
@@ -79,11 +99,13 @@ class OrderService(Shopware6Service):
         sales_channel_id: str,
         page: int = 1,
         limit: int = 100,
+        changed_since: datetime | None = None,
     ) -> dict[str, Any]:
         payload = self._build_open_order_criteria(
             sales_channel_id=sales_channel_id,
             page=page,
             limit=limit,
+            changed_since=changed_since,
         )
         return self.request_post(self.search_path, payload=payload)
 
@@ -92,6 +114,7 @@ class OrderService(Shopware6Service):
         *,
         sales_channel_id: str,
         limit_per_page: int = 100,
+        changed_since: datetime | None = None,
     ) -> dict[str, Any]:
         all_rows: list[dict[str, Any]] = []
         page = 1
@@ -102,6 +125,7 @@ class OrderService(Shopware6Service):
                 sales_channel_id=sales_channel_id,
                 page=page,
                 limit=limit_per_page,
+                changed_since=changed_since,
             )
             rows = (response or {}).get("data", []) or []
             total = int((response or {}).get("total") or total or 0)
@@ -19,6 +19,7 @@ class ProductService(Shopware6Service):
     product_media_base_path = "/product-media"
     product_category_search_path = "/search/product-category"
     media_base_path = "/media"
+    media_search_path = "/search/media"
     bulk_sync_path = "/_action/sync"
 
     def get(self, product_id: str) -> Any:
@@ -389,13 +390,58 @@ class ProductService(Shopware6Service):
             ],
             "limit": 50,
         }
-        result = self.request_post("/search/media", payload=payload)
+        result = self.request_post(self.media_search_path, payload=payload)
         return [
             media_id
             for media_id in (self._entity_id(row) for row in (result or {}).get("data", []))
             if media_id
         ]
 
+    def find_media_for_uploads(self, *, media_ids: list[str], file_names: list[str]) -> list[dict[str, Any]]:
+        """Media matching one of ``media_ids`` or ``file_names``, in as few searches as possible.
+
+        Used to resolve filename conflicts and to detect already uploaded
+        files for a whole upload batch at once.
+        """
+        media_ids = sorted({str(value).strip() for value in (media_ids or []) if str(value).strip()})
+        file_names = sorted({str(value).strip() for value in (file_names or []) if str(value).strip()})
+        queries = []
+        if media_ids:
+            queries.append({"type": "equalsAny", "field": "id", "value": "|".join(media_ids)})
+        if file_names:
+            queries.append({"type": "equalsAny", "field": "fileName", "value": "|".join(file_names)})
+        if not queries:
+            return []
+
+        page = 1
+        limit = 500
+        media: list[dict[str, Any]] = []
+        while True:
+            payload = {
+                "filter": [{"type": "multi", "operator": "or", "queries": queries}],
+                "limit": limit,
+                "page": page,
+            }
+            result = self.request_post(self.media_search_path, payload=payload)
+            rows = (result or {}).get("data", []) or []
+            for row in rows:
+                media_id = self._entity_id(row)
+                if not media_id:
+                    continue
+                file_size = self._entity_field(row, "fileSize")
+                media.append(
+                    {
+                        "id": media_id,
+                        "fileName": self._entity_field(row, "fileName"),
+                        "fileExtension": self._entity_field(row, "fileExtension").lower(),
+                        "fileSize": int(file_size) if file_size.isdigit() else None,
+                    }
+                )
+            if len(rows) < limit:
+                break
+            page += 1
+        return media
+
     def delete_media_by_ids(self, media_ids: list[str]) -> int:
         deleted = 0
         for media_id in sorted({str(value).strip() for value in media_ids if str(value).strip()}):
@@ -423,13 +469,27 @@ class ProductService(Shopware6Service):
         ]
         return self.delete_media_by_ids(media_ids)
 
-    def upload_media_from_url(self, *, media_id: str, file_name: str, source_url: str) -> Any:
+    def upload_media_from_url(
+        self,
+        *,
+        media_id: str,
+        file_name: str,
+        source_url: str,
+        resolve_conflicts: bool = True,
+    ) -> Any:
+        """Let Shopware fetch ``source_url`` into media ``media_id``.
+
+        ``resolve_conflicts=False`` skips the filename conflict search when the
+        caller already resolved conflicts for the whole batch; a duplicate
+        filename error still triggers the per-file cleanup and one retry.
+        """
         base_name, extension = ProductMediaSyncService.split_file_name(file_name)
-        self.delete_conflicting_media_by_filename(
-            file_name=base_name,
-            extension=extension,
-            exclude_media_id=media_id,
-        )
+        if resolve_conflicts:
+            self.delete_conflicting_media_by_filename(
+                file_name=base_name,
+                extension=extension,
+                exclude_media_id=media_id,
+            )
         try:
             return self.request_post(
                 f"/_action/media/{media_id}/upload",
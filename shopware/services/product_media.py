@@ -2,13 +2,17 @@ from __future__ import annotations
 
 import hashlib
 import os
-from typing import TYPE_CHECKING
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable
 
+import requests
 from django.conf import settings
 from lib_shopware6_api_base.conf_shopware6_api_base_classes import ShopwareAPIError
 from loguru import logger
 
 from core.services import BaseService
+from .client_cache import new_client
 
 if TYPE_CHECKING:
     from products.models import Image, Product
@@ -82,47 +86,188 @@ class ProductMediaSyncService(BaseService):
         media_entities: list[dict],
         media_uploads: list[dict],
         log_uploads: bool = False,
+        skip_unchanged: bool = True,
     ) -> None:
+        """Create media entities and let Shopware fetch their files.
+
+        Uploads are deduplicated by media ID. Filename conflicts of the whole
+        batch are resolved with one media search, uploads run in a bounded
+        worker pool (``SHOPWARE6_MEDIA_UPLOAD_WORKERS``). With
+        ``skip_unchanged`` a media whose remote file has the same name and
+        size as the source is not uploaded again.
+        """
         if media_entities:
             product_service.bulk_upsert_media(media_entities)
-        for upload in media_uploads:
+        uploads = list({upload["media_id"]: upload for upload in media_uploads}.values())
+        if not uploads:
+            return
+
+        remote_sizes = self._resolve_upload_conflicts(product_service=product_service, uploads=uploads)
+        if not skip_unchanged:
+            remote_sizes = {}
+
+        def run(service: "ProductService", upload: dict) -> Exception | None:
+            try:
+                self._upload_media(
+                    product_service=service,
+                    upload=upload,
+                    remote_size=remote_sizes.get(upload["media_id"]),
+                    log_uploads=log_uploads,
+                )
+            except Exception as exc:
+                return exc
+            return None
+
+        workers = min(self._upload_workers(), len(uploads))
+        if workers > 1:
+            errors = self._run_pooled(product_service=product_service, workers=workers, run=run, uploads=uploads)
+        else:
+            errors = [run(product_service, upload) for upload in uploads]
+        for error in errors:
+            if error is not None:
+                raise error
+
+    def _run_pooled(
+        self,
+        *,
+        product_service: "ProductService",
+        workers: int,
+        run: Callable[["ProductService", dict], Exception | None],
+        uploads: list[dict],
+    ) -> list[Exception | None]:
+        """Run ``run`` for each upload in a thread pool.
+
+        The Shopware client keeps its OAuth token on the instance without
+        locking, so each worker thread gets its own service and client.
+        """
+        worker_services = [self._worker_product_service(product_service) for _ in range(workers)]
+        services: queue.SimpleQueue = queue.SimpleQueue()
+        for worker_service in worker_services:
+            services.put(worker_service)
+
+        def run_pooled(upload: dict) -> Exception | None:
+            service = services.get()
+            try:
+                return run(service, upload)
+            finally:
+                services.put(service)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="shopware-media") as executor:
+                return list(executor.map(run_pooled, uploads))
+        finally:
+            for worker_service in worker_services:
+                worker_service.client.close()
+
+    @staticmethod
+    def _worker_product_service(product_service: "ProductService") -> "ProductService":
+        # Same connection config as the caller, so the worker does not read it from the DB.
+        return type(product_service)(client=new_client(product_service.client.config))
+
+    def _resolve_upload_conflicts(
+        self,
+        *,
+        product_service: "ProductService",
+        uploads: list[dict],
+    ) -> dict[str, int]:
+        """Delete foreign media blocking an upload's filename; return remote sizes of existing files."""
+        names: dict[tuple[str, str], str] = {}
+        for upload in uploads:
+            try:
+                names[self.split_file_name(upload["file_name"])] = upload["media_id"]
+            except ValueError:
+                continue
+        own_media_ids = {upload["media_id"] for upload in uploads}
+        remote_media = product_service.find_media_for_uploads(
+            media_ids=sorted(own_media_ids),
+            file_names=sorted({base_name for base_name, _extension in names}),
+        )
+
+        conflicting_ids: list[str] = []
+        remote_sizes: dict[str, int] = {}
+        for media in remote_media:
+            name = (media["fileName"], media["fileExtension"])
+            target_media_id = names.get(name)
+            if media["id"] in own_media_ids:
+                if target_media_id == media["id"] and media["fileSize"]:
+                    remote_sizes[media["id"]] = media["fileSize"]
+                continue
+            if target_media_id:
+                conflicting_ids.append(media["id"])
+        if conflicting_ids:
+            product_service.delete_media_by_ids(conflicting_ids)
+        return remote_sizes
+
+    def _upload_media(
+        self,
+        *,
+        product_service: "ProductService",
+        upload: dict,
+        remote_size: int | None,
+        log_uploads: bool,
+    ) -> None:
+        if remote_size is not None and self.source_file_size(upload["source_url"]) == remote_size:
             if log_uploads:
                 logger.info(
-                    "Shopware image upload start: media_id={} file_name={} source_url={}",
+                    "Shopware image upload skipped (unchanged): media_id={} file_name={}",
                     upload["media_id"],
                     upload["file_name"],
-                    upload["source_url"],
                 )
-            try:
-                product_service.upload_media_from_url(
-                    media_id=upload["media_id"],
-                    file_name=upload["file_name"],
-                    source_url=upload["source_url"],
+            return
+        if log_uploads:
+            logger.info(
+                "Shopware image upload start: media_id={} file_name={} source_url={}",
+                upload["media_id"],
+                upload["file_name"],
+                upload["source_url"],
+            )
+        try:
+            product_service.upload_media_from_url(
+                media_id=upload["media_id"],
+                file_name=upload["file_name"],
+                source_url=upload["source_url"],
+                resolve_conflicts=False,
+            )
+        except ShopwareAPIError as exc:
+            if "CONTENT__MEDIA_CANNOT_OPEN_SOURCE_STREAM_TO_READ" in str(exc):
+                logger.warning(
+                    "Shopware image upload skipped (source not found): media_id={} file_name={} source_url={}",
+                    upload["media_id"],
+                    upload["file_name"],
+                    upload["source_url"],
                 )
-            except ShopwareAPIError as exc:
-                if "CONTENT__MEDIA_CANNOT_OPEN_SOURCE_STREAM_TO_READ" in str(exc):
-                    logger.warning(
-                        "Shopware image upload skipped (source not found): media_id={} file_name={} source_url={}",
-                        upload["media_id"],
-                        upload["file_name"],
-                        upload["source_url"],
-                    )
-                else:
-                    raise
-            except Exception:
-                if log_uploads:
-                    logger.exception(
-                        "Shopware image upload failed: media_id={} file_name={}",
-                        upload["media_id"],
-                        upload["file_name"],
-                    )
-                raise
+                return
+            raise
+        except Exception:
             if log_uploads:
-                logger.info(
-                    "Shopware image upload ok: media_id={} file_name={}",
+                logger.exception(
+                    "Shopware image upload failed: media_id={} file_name={}",
                     upload["media_id"],
                     upload["file_name"],
                 )
+            raise
+        if log_uploads:
+            logger.info(
+                "Shopware image upload ok: media_id={} file_name={}",
+                upload["media_id"],
+                upload["file_name"],
+            )
+
+    @staticmethod
+    def source_file_size(source_url: str) -> int | None:
+        """Content-Length of the image source, ``None`` if it cannot be determined."""
+        try:
+            response = requests.head(source_url, allow_redirects=True, timeout=10)
+        except requests.RequestException:
+            return None
+        if not response.ok:
+            return None
+        content_length = response.headers.get("Content-Length", "")
+        return int(content_length) if content_length.isdigit() else None
+
+    @staticmethod
+    def _upload_workers() -> int:
+        return max(1, int(getattr(settings, "SHOPWARE6_MEDIA_UPLOAD_WORKERS", 4)))
 
     @staticmethod
     def build_media_id(file_name: str) -> str:
@@ -1,15 +1,15 @@
 from typing import Any
 
 from lib_shopware6_api_base import (
-    Shopware6AdminAPIClientBase,
     Criteria,
+    EqualsAnyFilter,
     EqualsFilter,
     ContainsFilter,
 )
 from loguru import logger
 
 from shopware.services.base import ShopwareBaseService
-from shopware.services.config import ConfShopware6ApiBase
+from shopware.services.client_cache import get_shared_client
 
 try:
     from authlib.integrations.base_client.errors import InvalidTokenError
@@ -19,13 +19,15 @@ except Exception:  # pragma: no cover
 
 
 class Shopware6Service(ShopwareBaseService):
-    def __init__(self) -> None:
+    def __init__(self, *, client=None) -> None:
         super().__init__()
-        self.client = self._build_client()
+        # An own client (see ``client_cache.new_client``) is kept on token errors.
+        self._own_client = client is not None
+        self.client = client or self._build_client()
 
     @staticmethod
-    def _build_client():
-        return Shopware6AdminAPIClientBase(config=ConfShopware6ApiBase())
+    def _build_client(*, refresh: bool = False):
+        return get_shared_client(refresh=refresh)
 
     @staticmethod
     def _is_invalid_token_error(exc: Exception) -> bool:
@@ -38,8 +40,11 @@ class Shopware6Service(ShopwareBaseService):
         except Exception as exc:
             if not self._is_invalid_token_error(exc):
                 raise
-            logger.warning("Shopware token invalid. Reinitializing API client and retrying request once.")
-            self.client = self._build_client()
+            logger.warning("Shopware token invalid. Dropping the shared token and retrying request once.")
+            if self._own_client:
+                self.client.invalidate_token()
+            else:
+                self.client = self._build_client(refresh=True)
             retry_method = getattr(self.client, method_name)
             return retry_method(*args, **kwargs)
 
@@ -145,6 +150,7 @@ class Shopware6Service(ShopwareBaseService):
 __all__ = [
     "Shopware6Service",
     "Criteria",
+    "EqualsAnyFilter",
     "EqualsFilter",
     "ContainsFilter",
 ]
@@ -1,3 +1,7 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
 from decimal import Decimal
 from io import StringIO
 from types import SimpleNamespace
@@ -5,8 +9,13 @@ from unittest.mock import MagicMock, patch
 
 from django.core.management import call_command
 from django.core.management.base import CommandError
-from django.test import SimpleTestCase, TestCase
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
+import httpx
+from lib_shopware6_api_base import Shopware6AdminAPIClientBase
+from lib_shopware6_api_base.conf_shopware6_api_base_classes import ShopwareAPIError
 from requests.auth import HTTPBasicAuth, HTTPDigestAuth
 
 from products.models import (
@@ -21,15 +30,19 @@ from products.models import (
     PropertyGroup,
     PropertyValue,
     Storage,
+    Tax,
 )
 from shopware.management.commands.shopware_sync_products import (
     Command as ShopwareSyncProductsCommand,
+    ShopwareProductSyncFailed,
     _build_product_translations,
     _build_product_sync_payload,
     _shopware_translation_language_ids,
 )
 from shopware.management.commands.shopware_force_product_image_uploads import Command as ForceProductImageUploadsCommand
 from shopware.models import ShopwareSettings
+from shopware.services.client_cache import get_shared_client, reset_shared_clients
+from shopware.services.config import ConfShopware6ApiBase
 from shopware.services.customer import CustomerService
 from shopware.services.order import OrderService
 from shopware.services.category_translation import ShopwareCategoryTranslationSyncService
@@ -320,7 +333,7 @@ class Shopware6CustomSearchKeywordsPayloadTest(SimpleTestCase):
 
 
 class Shopware6ServiceTokenRetryTest(SimpleTestCase):
-    @patch("shopware.services.shopware6.Shopware6AdminAPIClientBase")
+    @patch("shopware.services.shopware6.get_shared_client")
     def test_request_post_retries_once_on_invalid_token(self, client_factory):
         first_client = MagicMock()
         second_client = MagicMock()
@@ -333,6 +346,7 @@ class Shopware6ServiceTokenRetryTest(SimpleTestCase):
 
         self.assertEqual(result, {"ok": True})
         self.assertEqual(client_factory.call_count, 2)
+        self.assertEqual(client_factory.call_args_list[1].kwargs, {"refresh": True})
         first_client.request_post.assert_called_once_with(
             "/search/product",
             payload={"limit": 1},
@@ -383,6 +397,122 @@ class Shopware6ServiceTokenRetryTest(SimpleTestCase):
         )
 
 
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+class Shopware6SharedClientCacheTest(SimpleTestCase):
+    def setUp(self):
+        reset_shared_clients()
+        self.addCleanup(reset_shared_clients)
+        self.redis = _FakeRedis()
+        redis_patcher = patch("shopware.services.client_cache.get_redis", return_value=self.redis)
+        redis_patcher.start()
+        self.addCleanup(redis_patcher.stop)
+        self.config = ConfShopware6ApiBase(
+            shopware_admin_api_url="https://shop.example.com/api",
+            client_id="client",
+            client_secret="secret",
+            grant_type="resource_owner",
+        )
+
+    def test_service_instances_share_one_client(self):
+        with patch("shopware.services.client_cache.load_api_config", return_value=self.config):
+            first = Shopware6Service()
+            second = CustomerService()
+
+        self.assertIs(first.client, second.client)
+
+    def test_token_is_reused_from_redis_by_a_new_client(self):
+        token = {"access_token": "shared", "expires_at": time.time() + 600}
+        with patch.object(Shopware6AdminAPIClientBase, "_get_token", return_value=token) as fetch:
+            first = get_shared_client(self.config)
+            first._get_session()
+
+        reset_shared_clients()
+        with patch.object(Shopware6AdminAPIClientBase, "_get_token") as fetch_again:
+            second = get_shared_client(self.config)
+            second._get_session()
+
+        fetch.assert_called_once()
+        fetch_again.assert_not_called()
+        self.assertIsNot(first, second)
+        self.assertEqual(second.token["access_token"], "shared")
+
+    def test_token_is_renewed_before_it_expires(self):
+        client = get_shared_client(self.config)
+        client.token = {"access_token": "old", "expires_at": time.time() + 30}
+        renewed = {"access_token": "new", "expires_at": time.time() + 600}
+
+        with patch.object(Shopware6AdminAPIClientBase, "_get_token", return_value=renewed) as fetch:
+            client._get_session()
+
+        fetch.assert_called_once()
+        self.assertEqual(client.token["access_token"], "new")
+
+    def test_refresh_drops_the_shared_token(self):
+        client = get_shared_client(self.config)
+        client.token = {"access_token": "rejected", "expires_at": time.time() + 600}
+        self.redis.set(client.token_cache_key, json.dumps(client.token))
+
+        self.assertIs(get_shared_client(self.config, refresh=True), client)
+        self.assertEqual(client.token, {})
+        self.assertIsNone(self.redis.get(client.token_cache_key))
+
+    @staticmethod
+    def _http_error(status_code: int, headers: dict | None = None) -> ShopwareAPIError:
+        request = httpx.Request("POST", "https://shop.example.com/api/_action/sync")
+        response = httpx.Response(status_code, headers=headers or {}, request=request)
+        error = ShopwareAPIError(f"{status_code} error")
+        error.__cause__ = httpx.HTTPStatusError(f"{status_code}", request=request, response=response)
+        return error
+
+    def test_overload_responses_pause_and_retry_the_request(self):
+        client = get_shared_client(self.config)
+        side_effect = [self._http_error(429, {"Retry-After": "2"}), self._http_error(503), "ok"]
+
+        with (
+            patch.object(Shopware6AdminAPIClientBase, "_request", side_effect=side_effect) as base_request,
+            patch.object(client, "pause") as pause,
+        ):
+            self.assertEqual(client._request("POST", request_url="_action/sync", payload={}), "ok")
+
+        self.assertEqual(base_request.call_count, 3)
+        # Retry-After gewinnt, sonst exponentieller Backoff (1s * 2**1).
+        self.assertEqual([call.args[0] for call in pause.call_args_list], [2.0, 2.0])
+
+    @patch("shopware.services.client_cache.time.sleep")
+    def test_pause_holds_back_requests_of_all_threads(self, mock_sleep):
+        client = get_shared_client(self.config)
+        client.pause(5)
+
+        with patch("shopware.services.client_cache.time.monotonic", side_effect=[client._paused_until - 5, client._paused_until]):
+            client._wait_while_paused()
+
+        mock_sleep.assert_called_once_with(5)
+
+    @patch("shopware.services.client_cache.time.sleep")
+    def test_overload_retries_are_bounded(self, _mock_sleep):
+        client = get_shared_client(self.config)
+
+        with (
+            self.settings(SHOPWARE6_BACKPRESSURE_MAX_RETRIES=1, SHOPWARE6_BACKPRESSURE_BACKOFF_SECONDS=0),
+            patch.object(Shopware6AdminAPIClientBase, "_request", side_effect=[self._http_error(503)] * 2),
+            self.assertRaises(ShopwareAPIError),
+        ):
+            client._request("POST", request_url="_action/sync", payload={})
+
+
 class Shopware5ProductSyncServiceTest(SimpleTestCase):
     def test_configured_shop_url_is_normalized_to_shopware_api_url(self):
         service = Shopware5ProductSyncService(
@@ -1264,6 +1394,41 @@ class OrderServiceMicrotechWritebackTest(SimpleTestCase):
         )
 
 
+
+class OrderServiceOpenOrderCriteriaTest(SimpleTestCase):
+    def test_watermark_filters_on_updated_or_created_at(self):
+        service = OrderService.__new__(OrderService)
+        changed_since = datetime(2026, 3, 1, 13, 30, 15, 123456, tzinfo=dt_timezone(timedelta(hours=1)))
+
+        criteria = service._build_open_order_criteria(
+            sales_channel_id="sc-1",
+            changed_since=changed_since,
+        )
+        payload = OrderService._normalize_payload(criteria)
+
+        watermark_filter = payload["filter"][-1]
+        self.assertEqual(watermark_filter["type"], "multi")
+        self.assertEqual(watermark_filter["operator"], "or")
+        self.assertEqual(
+            [(query["type"], query["field"], query["parameters"]) for query in watermark_filter["queries"]],
+            [
+                ("range", "updatedAt", {"gte": datetime(2026, 3, 1, 12, 30, 15)}),
+                ("range", "createdAt", {"gte": datetime(2026, 3, 1, 12, 30, 15)}),
+            ],
+        )
+
+    def test_without_watermark_only_open_orders_are_filtered(self):
+        service = OrderService.__new__(OrderService)
+
+        payload = OrderService._normalize_payload(
+            service._build_open_order_criteria(sales_channel_id="sc-1")
+        )
+
+        self.assertEqual(
+            [(item["type"], item["field"]) for item in payload["filter"]],
+            [("equals", "salesChannelId"), ("equals", "stateMachineState.technicalName")],
+        )
+
 class Shopware6DashboardMetricServiceTest(SimpleTestCase):
     def test_customer_criteria_loads_the_customer_group(self):
         criteria = CustomerService.__new__(CustomerService)._base_customer_criteria()
@@ -1476,6 +1641,137 @@ class ProductMediaSyncServiceTest(SimpleTestCase):
             },
         )
 
+    @staticmethod
+    def _upload(media_id: str, file_name: str) -> dict:
+        return {"media_id": media_id, "file_name": file_name, "source_url": f"https://cdn.example.com/img/{file_name}"}
+
+    @override_settings(SHOPWARE6_MEDIA_UPLOAD_WORKERS=1)
+    def test_sync_media_assets_dedupes_and_resolves_conflicts_once_per_batch(self):
+        product_service = MagicMock()
+        product_service.find_media_for_uploads.return_value = [
+            {"id": "media-a", "fileName": "a", "fileExtension": "jpg", "fileSize": None},
+            {"id": "foreign", "fileName": "b", "fileExtension": "png", "fileSize": 10},
+            {"id": "unrelated", "fileName": "b", "fileExtension": "jpg", "fileSize": 10},
+        ]
+        uploads = [self._upload("media-a", "a.jpg"), self._upload("media-b", "b.png"), self._upload("media-a", "a.jpg")]
+
+        ProductMediaSyncService().sync_media_assets(
+            product_service=product_service,
+            media_entities=[],
+            media_uploads=uploads,
+        )
+
+        product_service.find_media_for_uploads.assert_called_once_with(
+            media_ids=["media-a", "media-b"],
+            file_names=["a", "b"],
+        )
+        product_service.delete_media_by_ids.assert_called_once_with(["foreign"])
+        self.assertEqual(
+            sorted(call.kwargs["media_id"] for call in product_service.upload_media_from_url.call_args_list),
+            ["media-a", "media-b"],
+        )
+        self.assertTrue(
+            all(call.kwargs["resolve_conflicts"] is False for call in product_service.upload_media_from_url.call_args_list)
+        )
+
+    @override_settings(SHOPWARE6_MEDIA_UPLOAD_WORKERS=1)
+    @patch.object(ProductMediaSyncService, "source_file_size", return_value=1234)
+    def test_sync_media_assets_skips_files_with_matching_remote_size(self, _mock_source_file_size):
+        product_service = MagicMock()
+        product_service.find_media_for_uploads.return_value = [
+            {"id": "media-a", "fileName": "a", "fileExtension": "jpg", "fileSize": 1234},
+            {"id": "media-b", "fileName": "b", "fileExtension": "jpg", "fileSize": 99},
+        ]
+        uploads = [self._upload("media-a", "a.jpg"), self._upload("media-b", "b.jpg")]
+
+        ProductMediaSyncService().sync_media_assets(
+            product_service=product_service,
+            media_entities=[],
+            media_uploads=uploads,
+        )
+        self.assertEqual(
+            [call.kwargs["media_id"] for call in product_service.upload_media_from_url.call_args_list],
+            ["media-b"],
+        )
+
+        product_service.upload_media_from_url.reset_mock()
+        ProductMediaSyncService().sync_media_assets(
+            product_service=product_service,
+            media_entities=[],
+            media_uploads=uploads,
+            skip_unchanged=False,
+        )
+        self.assertEqual(product_service.upload_media_from_url.call_count, 2)
+
+    def test_sync_media_assets_raises_after_all_uploads_finished(self):
+        product_service = MagicMock()
+        product_service.find_media_for_uploads.return_value = []
+        product_service.upload_media_from_url.side_effect = [RuntimeError("upload failed"), None, None]
+        uploads = [self._upload(f"media-{index}", f"{index}.jpg") for index in range(3)]
+
+        with self.settings(SHOPWARE6_MEDIA_UPLOAD_WORKERS=1), self.assertRaisesMessage(RuntimeError, "upload failed"):
+            ProductMediaSyncService().sync_media_assets(
+                product_service=product_service,
+                media_entities=[],
+                media_uploads=uploads,
+            )
+
+        self.assertEqual(product_service.upload_media_from_url.call_count, 3)
+
+    @override_settings(SHOPWARE6_MEDIA_UPLOAD_WORKERS=2)
+    def test_sync_media_assets_uploads_with_one_client_per_worker(self):
+        product_service = MagicMock()
+        product_service.find_media_for_uploads.return_value = []
+        worker_services = [MagicMock(), MagicMock()]
+        uploads = [self._upload(f"media-{index}", f"{index}.jpg") for index in range(4)]
+
+        with patch.object(ProductMediaSyncService, "_worker_product_service", side_effect=worker_services):
+            ProductMediaSyncService().sync_media_assets(
+                product_service=product_service,
+                media_entities=[],
+                media_uploads=uploads,
+            )
+
+        product_service.upload_media_from_url.assert_not_called()
+        self.assertEqual(
+            sorted(
+                call.kwargs["media_id"]
+                for worker_service in worker_services
+                for call in worker_service.upload_media_from_url.call_args_list
+            ),
+            ["media-0", "media-1", "media-2", "media-3"],
+        )
+        for worker_service in worker_services:
+            worker_service.client.close.assert_called_once_with()
+
+    @patch.object(ProductService, "request_post")
+    def test_find_media_for_uploads_uses_one_search(self, mock_request_post):
+        service = ProductService.__new__(ProductService)
+        mock_request_post.return_value = {
+            "data": [{"id": "media-1", "attributes": {"fileName": "bild", "fileExtension": "JPG", "fileSize": 2048}}]
+        }
+
+        media = ProductService.find_media_for_uploads(service, media_ids=["media-1"], file_names=["bild", "anderes"])
+
+        self.assertEqual(media, [{"id": "media-1", "fileName": "bild", "fileExtension": "jpg", "fileSize": 2048}])
+        mock_request_post.assert_called_once_with(
+            "/search/media",
+            payload={
+                "filter": [
+                    {
+                        "type": "multi",
+                        "operator": "or",
+                        "queries": [
+                            {"type": "equalsAny", "field": "id", "value": "media-1"},
+                            {"type": "equalsAny", "field": "fileName", "value": "anderes|bild"},
+                        ],
+                    }
+                ],
+                "limit": 500,
+                "page": 1,
+            },
+        )
+
     def test_split_file_name_extracts_base_name_and_extension(self):
         base_name, extension = ProductMediaSyncService.split_file_name("produkt-bild.JPEG")
 
@@ -1740,6 +2036,250 @@ class ShopwareSyncProductsCommandBatchTest(TestCase):
         self.assertEqual(payloads[0]["name"], "A-7003")
         runtime.close.assert_called_once()
 
+    @patch("shopware.management.commands.shopware_sync_products.CommandRuntimeService.start")
+    @patch("shopware.management.commands.shopware_sync_products.ProductService")
+    def test_handle_skips_unchanged_products_on_second_run(
+        self,
+        product_service_factory,
+        mock_runtime_start,
+    ):
+        mock_runtime_start.return_value = MagicMock()
+        service = MagicMock()
+        service.get_sku_map.return_value = {}
+        product_service_factory.return_value = service
+
+        channel = ShopwareSettings.objects.create(
+            name="Default",
+            is_active=True,
+            is_default=True,
+            currency_id="currency-default",
+            rule_id_price="rule-default",
+        )
+        product = Product.objects.create(erp_nr="A-7005", sku="sku-5", name="Hash Produkt")
+        Price.objects.create(product=product, sales_channel=channel, price=Decimal("10.00"))
+
+        cmd = ShopwareSyncProductsCommand()
+        options = dict(erp_nrs=["A-7005"], all=False, limit=None, batch_size=10, only_with_images=False, log_images=False)
+        cmd.handle(**options)
+
+        self.assertEqual(service.bulk_upsert.call_count, 1)
+        service.purge_product_prices_by_product_and_rule.assert_called_once()
+        product.refresh_from_db()
+        self.assertTrue(product.shopware_sync_hash)
+        self.assertTrue(product.shopware_price_sync_hash)
+
+        service.reset_mock()
+        cmd.handle(**options)
+
+        service.bulk_upsert.assert_not_called()
+        service.purge_product_prices_by_product_and_rule.assert_not_called()
+
+        cmd.handle(**options, force=True)
+
+        service.bulk_upsert.assert_called_once()
+        service.purge_product_prices_by_product_and_rule.assert_called_once()
+
+    @patch("shopware.management.commands.shopware_sync_products.CommandRuntimeService.start")
+    @patch("shopware.management.commands.shopware_sync_products.ProductService")
+    def test_handle_rewrites_prices_only_when_price_block_changed(
+        self,
+        product_service_factory,
+        mock_runtime_start,
+    ):
+        mock_runtime_start.return_value = MagicMock()
+        service = MagicMock()
+        service.get_sku_map.return_value = {}
+        product_service_factory.return_value = service
+
+        channel = ShopwareSettings.objects.create(
+            name="Default",
+            is_active=True,
+            is_default=True,
+            currency_id="currency-default",
+            rule_id_price="rule-default",
+        )
+        product = Product.objects.create(erp_nr="A-7006", sku="sku-6", name="Vorher")
+        price = Price.objects.create(product=product, sales_channel=channel, price=Decimal("10.00"))
+
+        cmd = ShopwareSyncProductsCommand()
+        options = dict(erp_nrs=["A-7006"], all=False, limit=None, batch_size=10, only_with_images=False, log_images=False)
+        cmd.handle(**options)
+
+        Product.objects.filter(pk=product.pk).update(name="Nachher", name_de="Nachher")
+        service.reset_mock()
+        cmd.handle(**options)
+
+        payload = service.bulk_upsert.call_args.args[0][0]
+        self.assertEqual(payload["name"], "Nachher")
+        self.assertNotIn("prices", payload)
+        service.purge_product_prices_by_product_and_rule.assert_not_called()
+
+        Price.objects.filter(pk=price.pk).update(price=Decimal("11.00"))
+        service.reset_mock()
+        cmd.handle(**options)
+
+        payload = service.bulk_upsert.call_args.args[0][0]
+        self.assertIn("prices", payload)
+        service.purge_product_prices_by_product_and_rule.assert_called_once_with(
+            product_ids=["sku-6"],
+            rule_ids=["rule-default"],
+        )
+
+    @patch("shopware.management.commands.shopware_sync_products.new_client")
+    @patch("shopware.management.commands.shopware_sync_products.CommandRuntimeService.start")
+    @patch("shopware.management.commands.shopware_sync_products.ProductService")
+    def test_handle_pipelines_batches_and_isolates_failures(
+        self,
+        product_service_factory,
+        mock_runtime_start,
+        mock_new_client,
+    ):
+        mock_runtime_start.return_value = MagicMock()
+        service = MagicMock()
+        worker_services = [MagicMock() for _ in range(3)]
+        product_service_factory.side_effect = lambda client=None: worker_services.pop(0) if client else service
+        mock_new_client.side_effect = lambda: MagicMock()
+        for index in range(6):
+            Product.objects.create(erp_nr=f"P-{index}", sku=f"sku-p-{index}", name=f"Artikel {index}")
+
+        lock = threading.Lock()
+        active = {"now": 0, "max": 0}
+
+        def bulk_upsert(payloads):
+            with lock:
+                active["now"] += 1
+                active["max"] = max(active["max"], active["now"])
+            time.sleep(0.05)
+            with lock:
+                active["now"] -= 1
+            if payloads[0]["productNumber"] == "P-2":
+                raise RuntimeError("batch failed")
+
+        for worker_service in worker_services:
+            worker_service.bulk_upsert.side_effect = bulk_upsert
+        workers = list(worker_services)
+
+        cmd = ShopwareSyncProductsCommand()
+        cmd.handle(
+            erp_nrs=[f"P-{index}" for index in range(6)],
+            all=False,
+            limit=None,
+            batch_size=2,
+            only_with_images=False,
+            log_images=False,
+            max_in_flight=3,
+        )
+
+        # Jeder Worker sendet mit eigenem Service/Client, nie mit dem geteilten.
+        service.bulk_upsert.assert_not_called()
+        self.assertEqual(sum(worker.bulk_upsert.call_count for worker in workers), 3)
+        self.assertEqual(len({id(call.kwargs["client"]) for call in product_service_factory.call_args_list if call.kwargs}), 3)
+        for worker in workers:
+            worker.client.close.assert_called_once()
+        self.assertGreater(active["max"], 1)
+        self.assertLessEqual(active["max"], 3)
+        synced = set(Product.objects.exclude(shopware_sync_hash="").values_list("erp_nr", flat=True))
+        self.assertEqual(synced, {"P-0", "P-1", "P-4", "P-5"})
+
+    @patch("shopware.management.commands.shopware_sync_products.new_client")
+    @patch("shopware.management.commands.shopware_sync_products.CommandRuntimeService.start")
+    @patch("shopware.management.commands.shopware_sync_products.ProductService")
+    def test_handle_fails_on_product_errors_when_requested(
+        self,
+        product_service_factory,
+        mock_runtime_start,
+        mock_new_client,
+    ):
+        mock_runtime_start.return_value = MagicMock()
+        worker_service = MagicMock()
+        product_service_factory.return_value = worker_service
+        mock_new_client.side_effect = lambda: MagicMock()
+        for index in range(4):
+            Product.objects.create(erp_nr=f"P-{index}", sku=f"sku-p-{index}", name=f"Artikel {index}")
+
+        def bulk_upsert(payloads):
+            if payloads[0]["productNumber"] == "P-2":
+                raise RuntimeError("batch failed")
+
+        worker_service.bulk_upsert.side_effect = bulk_upsert
+
+        with self.assertRaises(ShopwareProductSyncFailed) as ctx:
+            ShopwareSyncProductsCommand().handle(
+                erp_nrs=[f"P-{index}" for index in range(4)],
+                all=False,
+                limit=None,
+                batch_size=2,
+                only_with_images=False,
+                log_images=False,
+                max_in_flight=1,
+                fail_on_product_errors=True,
+            )
+
+        self.assertEqual(ctx.exception.erp_nrs, ["P-2", "P-3"])
+        synced = set(Product.objects.exclude(shopware_sync_hash="").values_list("erp_nr", flat=True))
+        self.assertEqual(synced, {"P-0", "P-1"})
+
+    def _sync_products_query_count(self, service, *, prefix: str, count: int, channels, tax) -> int:
+        erp_nrs = []
+        for index in range(count):
+            erp_nr = f"{prefix}-{index}"
+            product = Product.objects.create(erp_nr=erp_nr, name=f"Artikel {index}", tax=tax)
+            Storage.objects.create(product=product, stock=5)
+            image = Image.objects.create(path=f"{erp_nr}.jpg")
+            ProductImage.objects.create(product=product, image=image, order=1)
+            product.images.add(Image.objects.create(path=f"{erp_nr}-legacy.jpg"))
+            for channel in channels:
+                Price.objects.create(product=product, sales_channel=channel, price=Decimal("10.00"))
+            erp_nrs.append(erp_nr)
+        service.get_sku_map.side_effect = lambda numbers: {number: f"sku-{number}" for number in numbers}
+
+        cmd = ShopwareSyncProductsCommand()
+        with CaptureQueriesContext(connection) as queries:
+            cmd.handle(erp_nrs=erp_nrs, all=False, limit=None, batch_size=50, only_with_images=False, log_images=False)
+        self.assertEqual(service.bulk_upsert.call_args.args[0][-1]["id"], f"sku-{erp_nrs[-1]}")
+        self.assertEqual(
+            set(Product.objects.filter(erp_nr__in=erp_nrs).values_list("sku", flat=True)),
+            {f"sku-{erp_nr}" for erp_nr in erp_nrs},
+        )
+        self.assertFalse(Product.objects.filter(erp_nr__in=erp_nrs, shopware_image_sync_hash="").exists())
+        return len(queries)
+
+    @patch("shopware.services.product_media.ProductMediaSyncService.sync_media_assets")
+    @patch("shopware.management.commands.shopware_sync_products.CommandRuntimeService.start")
+    @patch("shopware.management.commands.shopware_sync_products.ProductService")
+    def test_handle_query_count_per_batch_does_not_grow_with_batch_size(
+        self,
+        product_service_factory,
+        mock_runtime_start,
+        _mock_sync_media_assets,
+    ):
+        mock_runtime_start.return_value = MagicMock()
+        service = MagicMock()
+        product_service_factory.return_value = service
+        channels = [
+            ShopwareSettings.objects.create(
+                name="Default",
+                is_active=True,
+                is_default=True,
+                currency_id="currency-default",
+                rule_id_price="rule-default",
+            ),
+            ShopwareSettings.objects.create(
+                name="B2B",
+                is_active=True,
+                currency_id="currency-b2b",
+                rule_id_price="rule-b2b",
+            ),
+        ]
+        tax = Tax.objects.create(name="Ermaessigt", rate=Decimal("7.00"))
+        # Warm-up: ContentType- und Admin-Lookups laufen nur beim ersten Mal.
+        self._sync_products_query_count(service, prefix="Q-WARM", count=1, channels=channels, tax=tax)
+
+        small = self._sync_products_query_count(service, prefix="Q-SMALL", count=2, channels=channels, tax=tax)
+        large = self._sync_products_query_count(service, prefix="Q-LARGE", count=8, channels=channels, tax=tax)
+
+        self.assertEqual(small, large)
+
 
 class ShopwareVariantSyncServiceTest(TestCase):
     def setUp(self):
@@ -1940,6 +2480,7 @@ class ShopwareVariantSyncServiceTest(TestCase):
             media_id=color_media_id,
             file_name="quick-tabs-color-white.jpg",
             source_url=self.color_image.url,
+            resolve_conflicts=False,
         )
         product_service.bulk_upsert.assert_any_call(
             [
@@ -157,7 +157,7 @@ class TestEmailCampaignAdmin(SimpleTestCase):
 
         assert response.status_code == 200
         render_campaign_mjml.assert_called_once_with(campaign, recipient=preview_recipient)
-        compile_mjml_to_html.assert_called_once_with("<mjml>Preview</mjml>")
+        compile_mjml_to_html.assert_called_once_with("<mjml>Preview</mjml>", cache=True)
         html_to_plain_text.assert_called_once_with("<html>Preview</html>")
         assert json.loads(response.content) == {
             "html": "<html>Preview</html>",
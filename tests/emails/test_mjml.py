@@ -7,8 +7,10 @@ from types import SimpleNamespace
 from emails.mjml import (
     ProductEmailProxy,
     campaign_offer_context,
+    compile_campaign,
     compile_mjml_to_html,
     html_to_plain_text,
+    markup_uses_recipient_structure,
     render_campaign_mjml,
 )
 
@@ -228,6 +230,15 @@ class TestProductEmailProxy:
 
 
 class TestCompileMjmlToHtml:
+    @pytest.fixture(autouse=True)
+    def cli_only(self, settings):
+        from emails.mjml_pool import html_cache
+
+        settings.MJML_WORKER_POOL_SIZE = 0
+        settings.MJML_CACHE_SIZE = 0
+        settings.MJML_CACHE_SECONDS = 0
+        html_cache.clear()
+
     def test_uses_installed_mjml_binary_when_available(self, monkeypatch):
         calls = []
 
@@ -260,6 +271,57 @@ class TestCompileMjmlToHtml:
         assert html == "<html>compiled</html>"
         assert calls[0][:2] == ["npx", "mjml"]
 
+    def test_uses_worker_pool_and_caches_by_content_hash(self, monkeypatch, settings):
+        from emails.mjml_pool import html_cache, worker_pool
+
+        settings.MJML_WORKER_POOL_SIZE = 1
+        settings.MJML_CACHE_SIZE = 8
+        compiled = []
+
+        def fake_compile(mjml_string, options=None):
+            compiled.append(mjml_string)
+            return "<html>pool</html>"
+
+        monkeypatch.setattr(worker_pool, "compile", fake_compile)
+        monkeypatch.setattr("emails.mjml.subprocess.run", MagicMock(side_effect=AssertionError("CLI used")))
+
+        assert compile_mjml_to_html("<mjml>a</mjml>", cache=True) == "<html>pool</html>"
+        assert compile_mjml_to_html("<mjml>a</mjml>", cache=True) == "<html>pool</html>"
+        assert compiled == ["<mjml>a</mjml>"]
+        html_cache.clear()
+
+    def test_one_off_documents_are_not_cached(self, monkeypatch, settings):
+        from emails.mjml_pool import html_cache, worker_pool
+
+        settings.MJML_WORKER_POOL_SIZE = 1
+        settings.MJML_CACHE_SIZE = 8
+        settings.MJML_CACHE_SECONDS = 3600
+        redis = MagicMock()
+        monkeypatch.setattr("emails.mjml_pool.get_redis", lambda: redis)
+        monkeypatch.setattr(worker_pool, "compile", lambda mjml_string, options=None: "<html>pool</html>")
+
+        assert compile_mjml_to_html("<mjml>c</mjml>") == "<html>pool</html>"
+        assert compile_mjml_to_html("<mjml>c</mjml>") == "<html>pool</html>"
+
+        redis.get.assert_not_called()
+        redis.set.assert_not_called()
+        html_cache.clear()
+
+    def test_falls_back_to_cli_when_worker_pool_fails(self, monkeypatch, settings):
+        from emails.mjml_pool import MjmlWorkerError, worker_pool
+
+        settings.MJML_WORKER_POOL_SIZE = 1
+
+        def fake_run(command, **kwargs):
+            with open(command[3], "w", encoding="utf-8") as html_file:
+                html_file.write("<html>cli</html>")
+
+        monkeypatch.setattr(worker_pool, "compile", MagicMock(side_effect=MjmlWorkerError("crashed")))
+        monkeypatch.setattr("emails.mjml.shutil.which", lambda command: "/usr/local/bin/mjml")
+        monkeypatch.setattr("emails.mjml.subprocess.run", fake_run)
+
+        assert compile_mjml_to_html("<mjml>b</mjml>") == "<html>cli</html>"
+
 
 class TestHtmlToPlainText:
     def test_creates_readable_text_and_preserves_links(self):
@@ -818,3 +880,78 @@ class TestHeadBodySplit:
         assert "<mj-style>body{}</mj-style>" in head_part
         assert "<mj-section/>" in body_part
         assert "<mj-style>body{}</mj-style>" not in body_part
+
+
+class TestCompileCampaign:
+    @pytest.mark.parametrize(
+        "markup",
+        [
+            "<mj-text>{{ recipient.last_name }}</mj-text>",
+            "<mj-text>{{ customer.erp_nr }} {{ is_customer }} {{ recipient.custom_fields['kdnr'] }}</mj-text>",
+            "<mj-text>{% for product in products %}{{ recipient.first_name }}{% endfor %}</mj-text>",
+        ],
+    )
+    def test_plain_recipient_output_can_be_compiled_once(self, markup):
+        assert markup_uses_recipient_structure(markup) is False
+
+    @pytest.mark.parametrize(
+        "markup",
+        [
+            "{% if is_customer %}<mj-text>Kunde</mj-text>{% endif %}",
+            "<mj-text>{{ recipient.email|urlencode }}</mj-text>",
+            "<mj-text>{{ recipient.first_name ~ ' ' }}</mj-text>",
+            "{% set name = recipient.last_name %}<mj-text>{{ name }}</mj-text>",
+        ],
+    )
+    def test_structural_recipient_usage_requires_per_recipient_compile(self, markup):
+        assert markup_uses_recipient_structure(markup) is True
+
+    def _campaign(self, markup):
+        lib = SimpleNamespace(placement="body", name="Recipient", mjml_markup=markup, default_variables={})
+        component = SimpleNamespace(
+            library_component=lib,
+            library_component_id=True,
+            variables={},
+            order=10,
+            enabled=True,
+        )
+        return SimpleNamespace(pk=7, campaign_products=FakeQuerySet(), components=FakeQuerySet([component]))
+
+    def _patch_rendering(self, monkeypatch, compile_calls):
+        def fake_render_to_string(template_name, context):
+            return context["body_mjml"] if template_name == "emails/newsletter_base.mjml" else ""
+
+        def fake_compile(mjml, *, cache=False):
+            compile_calls.append(mjml)
+            return mjml.replace("mj-text", "p")
+
+        monkeypatch.setattr("emails.mjml.render_to_string", fake_render_to_string)
+        monkeypatch.setattr("emails.mjml._campaign_sales_channel_ids", lambda campaign: ())
+        monkeypatch.setattr("emails.mjml.compile_mjml_to_html", fake_compile)
+
+    def test_compiles_once_and_substitutes_escaped_recipient_values(self, monkeypatch):
+        compile_calls = []
+        self._patch_rendering(monkeypatch, compile_calls)
+        compiled = compile_campaign(
+            self._campaign("<mj-text>Hallo {{ recipient.last_name }} ({{ customer.erp_nr }})</mj-text>")
+        )
+        recipients = [
+            SimpleNamespace(last_name="Muster", customer=SimpleNamespace(erp_nr="10042")),
+            SimpleNamespace(last_name="<Müller>", customer=None),
+        ]
+
+        rendered = [compiled.render(recipient) for recipient in recipients]
+
+        assert len(compile_calls) == 1
+        assert rendered[0][1] == "<p>Hallo Muster (10042)</p>"
+        assert rendered[1][1] == "<p>Hallo &lt;Müller&gt; ()</p>"
+        assert rendered[1][2] == "Hallo <Müller> ()"
+
+    def test_returns_none_for_recipient_dependent_structure(self, monkeypatch):
+        compile_calls = []
+        self._patch_rendering(monkeypatch, compile_calls)
+
+        compiled = compile_campaign(self._campaign("{% if is_customer %}<mj-text>Kunde</mj-text>{% endif %}"))
+
+        assert compiled is None
+        assert compile_calls == []
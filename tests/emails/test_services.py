@@ -150,12 +150,14 @@ class TestEmailCampaignQueueService:
         compile_mjml_to_html.assert_called_once_with("<mjml>neu</mjml>")
 
     @pytest.mark.django_db
+    @patch("emails.services.compile_campaign", return_value=None)
     @patch("emails.services.compile_mjml_to_html", return_value="<html>queued</html>")
     @patch("emails.services.render_campaign_mjml", return_value="<mjml>queued</mjml>")
     def test_queue_due_campaigns_before_send_queues_ready_campaign_recipients(
         self,
         render_campaign_mjml,
         compile_mjml_to_html,
+        compile_campaign,
     ):
         from django.utils import timezone
 
@@ -208,3 +210,38 @@ class TestEmailCampaignQueueService:
         assert entry.rendered_text == "queued"
         render_campaign_mjml.assert_called_once_with(due_campaign, recipient=active_recipient)
         compile_mjml_to_html.assert_called_once_with("<mjml>queued</mjml>")
+
+    @pytest.mark.django_db
+    @patch("emails.services.render_campaign_mjml")
+    def test_queue_campaign_recipients_compiles_once_and_substitutes_recipients(self, render_campaign_mjml):
+        from emails.mjml import CompiledCampaign
+        from emails.models import EmailCampaign, EmailCampaignQueueEntry
+        from emails.services import EmailCampaignQueueService
+        from newsletter.models import NewsletterRecipient
+
+        campaign = EmailCampaign.objects.create(internal_title="Newsletter")
+        for shopware_id, last_name in (("r-1", "Muster"), ("r-2", "Müller & Söhne")):
+            NewsletterRecipient.objects.create(
+                shopware_id=shopware_id,
+                email=f"{shopware_id}@example.com",
+                last_name=last_name,
+                status=NewsletterRecipient.Status.OPT_IN,
+                selected_email_campaign=campaign,
+            )
+        compiled = CompiledCampaign(
+            campaign_id=campaign.pk,
+            mjml="<mj-text>Hallo [[gc-recipient:0]]</mj-text>",
+            html="<p>Hallo [[gc-recipient:0]]</p>",
+            text="Hallo [[gc-recipient:0]]",
+            paths=(("recipient", ("attr", "last_name")),),
+        )
+
+        with patch("emails.services.compile_campaign", return_value=compiled) as compile_campaign:
+            summary = EmailCampaignQueueService().queue_campaign_recipients(campaign)
+
+        assert summary == {"recipients": 2, "queued": 2, "failed": 0}
+        compile_campaign.assert_called_once_with(campaign)
+        render_campaign_mjml.assert_not_called()
+        entry = EmailCampaignQueueEntry.objects.get(recipient__shopware_id="r-2")
+        assert entry.rendered_html == "<p>Hallo Müller &amp; Söhne</p>"
+        assert entry.rendered_text == "Hallo Müller & Söhne"
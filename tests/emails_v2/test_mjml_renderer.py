@@ -242,3 +242,68 @@ def test_product_context_on_non_section_block_is_ignored():
 
     assert "NO_PRODUCT" in result
     assert "Testprodukt" not in result
+
+
+def _fake_compile(compiled: list[str]):
+    import re
+
+    def compile_mjml(mjml: str, *, cache: bool = False) -> str:
+        compiled.append(mjml)
+        body = re.search(r"<mj-body>(.*)</mj-body>", mjml, re.S).group(1)
+        body = body.replace("<mj-raw>", "").replace("</mj-raw>", "")
+        styles = "".join(f"<style>.{name}{{}}</style>" for name in re.findall(r'css-class="([^"]+)"', body))
+        return f"<html><head><style>base</style>{styles}</head><body><div>{body}</div></body></html>"
+
+    return compile_mjml
+
+
+@pytest.fixture
+def preview_compiler(monkeypatch):
+    from emails_v2 import mjml as preview_mjml
+
+    compiled: list[str] = []
+    monkeypatch.setattr(preview_mjml, "compile_mjml_to_html", _fake_compile(compiled))
+    preview_mjml._compile_fragment.cache_clear()
+    preview_mjml._compile_shell.cache_clear()
+    yield compiled
+    preview_mjml._compile_fragment.cache_clear()
+    preview_mjml._compile_shell.cache_clear()
+
+
+@pytest.mark.django_db
+def test_preview_recompiles_only_changed_blocks(preview_compiler):
+    from emails_v2.mjml import render_campaign_preview
+
+    campaign = EmailBuilderCampaign.objects.create(internal_title="Preview")
+    EmailBlock.objects.create(campaign=campaign, tag="mj-section", order=0, attributes={"css-class": "first"})
+    second = EmailBlock.objects.create(
+        campaign=campaign, tag="mj-text", order=1, variables={"content": "Alt"},
+    )
+
+    html = render_campaign_preview(campaign)
+
+    assert '<mj-section css-class="first"></mj-section><mj-text>Alt</mj-text>' in html
+    assert html.count("<style>base</style>") == 1
+    assert "<style>.first{}</style></head>" in html
+    assert len(preview_compiler) == 3
+
+    second.variables = {"content": "Neu"}
+    second.save(update_fields=["variables"])
+    html = render_campaign_preview(campaign)
+
+    assert "<mj-text>Neu</mj-text>" in html
+    assert len(preview_compiler) == 4
+    assert "Neu" in preview_compiler[-1]
+
+
+@pytest.mark.django_db
+def test_superseded_preview_stops_before_compiling(preview_compiler):
+    from emails_v2.mjml import PreviewSuperseded, render_campaign_preview
+
+    campaign = EmailBuilderCampaign.objects.create(internal_title="Preview")
+    EmailBlock.objects.create(campaign=campaign, tag="mj-section", order=0)
+
+    with pytest.raises(PreviewSuperseded):
+        render_campaign_preview(campaign, is_superseded=lambda: True)
+
+    assert preview_compiler == []